@@ -2,7 +2,7 @@
 
 # Import preložených nástrojov
 from .graf import nakresli_plotly_graf
-from .databaza import vykonaj_sql
+from .databaza import vykonaj_sql, zobraz_riadky_vysledku
 from .email import draft_email
 from .browser import open_browser
 from .python_file import  execute_python_file, create_python_file
@@ -26,6 +26,7 @@ nastroje = [
     #draft_email,
     nakresli_plotly_graf,
     vykonaj_sql,
+    zobraz_riadky_vysledku,
 ]
 
 __all__ = ["nastroje"]
@@ -67,7 +67,7 @@ async def open_browser_handler(prompt: str):
 
         llm = ziskaj_llm()
         structured_llm = llm.with_structured_output(WebUrl)
-        response = structured_llm.invoke(prompt_structure)
+        response = await structured_llm.ainvoke(prompt_structure)
 
         logger.info(f"📖 open_browser() Response: {response}")
 
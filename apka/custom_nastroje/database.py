@@ -114,7 +114,7 @@ async def execute_sql_handler(question: str):
         )
 
         chain = prompt_template | structured_llm
-        sql_response = chain.invoke({"question": question})
+        sql_response = await chain.ainvoke({"question": question})
 
         # Log the generated SQL
         logger.info(f"💡 Generated SQL query: {sql_response.query}")
@@ -9,8 +9,12 @@
 
 """Nástroj na dopytovanie databázy s konverziou prirodzeného jazyka na SQL."""
 
+import asyncio
+import itertools
 import json # Add missing import
+from typing import Optional, Tuple
 import chainlit as cl
+from chainlit.context import ChainlitContextException
 from langchain.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 from ultravox_client.session import ClientToolResult # Import ClientToolResult from specific module
@@ -18,16 +22,28 @@ from ultravox_client.session import ClientToolResult # Import ClientToolResult f
 
 # Predpokladáme, že tieto budú dostupné po refaktorizácii/preklade príslušných modulov
 # Používame priamo db_konfiguracia namiesto aliasu db_config
-from apka.settings.databaza import db_konfiguracia, db_connection, dialect_info
+from apka.settings.databaza import ZakladPripojeniaDatabazy, ZrusenieDotazu, db_konfiguracia, dialect_info, spravca_pripojeni
 from apka.widgets.LLM_modely import ziskaj_llm
 from apka.widgets.spolocne import zapisovac
-from apka.utils.schema_helper import POPIS_SCHEMY
+from apka.utils.schema_helper import formatuj_priklady
+from apka.utils.kontext_databazy import KontextDatabazy, kontext_aplikacie, kontexty_databaz
+from apka.utils.nl2sql_cache import nl2sql_cache
+from apka.utils.planovac_llm import LLMPretazene
+from apka.utils.priklady_dotazov import POCET_PRIKLADOV_V_PROMPTE, priklady_dotazov
+from apka.utils.spekulativne_sql import POCET_KANDIDATOV, prvy_platny_kandidat, teploty_pre_kandidatov
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+from apka.utils.subor_vysledku import nacitaj_riadky_zo_suboru, zapis_davky_do_suboru
+from apka.utils.suhrn_vysledku import SuhrnVysledku
+from apka.models.db_models import KonfiguraciaDatabazy
 from apka.models.sql_models import SQLDotaz
 
 
 definicia_vykonaj_sql = {
     "name": "vykonaj_sql",
-    "description": "Prevedie prirodzený jazyk na SQL a vykoná dotaz v databáze.",
+    "description": (
+        "Prevedie prirodzený jazyk na SQL a vykoná dotaz v databáze. Vráti súhrn výsledku: počet riadkov, "
+        "štatistiky stĺpcov (súčet, minimum, maximum, priemer, najvyššie a najčastejšie hodnoty) a prvé riadky."
+    ),
     "parameters": {
         "type": "object",
         "properties": {
@@ -41,6 +57,288 @@ definicia_vykonaj_sql = {
 }
 
 
+async def vygeneruj_sql_dotaz(
+    otazka: str,
+    dialekt: str,
+    popis_schemy: Optional[str] = None,
+    teplota: Optional[float] = None,
+    kontext: Optional[KontextDatabazy] = None,
+) -> SQLDotaz:
+    """
+    Pomocou LLM prevedie otázku v prirodzenom jazyku na SQL dotaz pre daný dialekt.
+    Ak nie je zadaný popis schémy, do promptu sa vložia len tabuľky schémy `kontext` (predvolene
+    databázy aplikácie) relevantné k otázke a najpodobnejšie úspešné príklady otázka→SQL z úložiska príkladov.
+    """
+    if not popis_schemy:
+        kontext = kontext or await kontext_aplikacie.priprav()
+        popis_schemy = kontext.popis_pre_otazku(otazka)
+        priklady = priklady_dotazov.najdi(otazka, dialekt, POCET_PRIKLADOV_V_PROMPTE, odtlacok=kontext.odtlacok)
+        if priklady:
+            popis_schemy += formatuj_priklady(priklady)
+    llm = ziskaj_llm("sql_generation", teplota)
+    strukturovany_llm = llm.with_structured_output(SQLDotaz)
+
+    pomoc_k_dialektu = dialect_info.get(dialekt, {"notes": "", "examples": ""}) if dialect_info else {"notes": "", "examples": ""}
+
+
+    systemova_sablona = f"""
+    Ste expert na generovanie SQL dotazov pre {dialekt.upper()} databázy. Preveďte danú otázku v prirodzenom jazyku na {dialekt.upper()}-kompatibilný SQL dotaz.
+    Zabezpečte, aby bol dotaz efektívny a dodržiaval syntax a osvedčené postupy pre {dialekt.upper()}.
+
+    # Dôležité poznámky pre {dialekt.upper()}
+    {pomoc_k_dialektu["notes"]}
+
+    # Schéma Databázy
+    {popis_schemy}
+
+    # Príkladové Dotazy pre {dialekt.upper()}
+    {pomoc_k_dialektu["examples"]}
+
+    # Otázka
+    {{otazka}}
+
+    # Úloha
+    1. Analyzujte otázku a schému
+    2. Vygenerujte {dialekt.upper()}-kompatibilný SQL dotaz
+    3. Konkrétne hodnoty z otázky (čísla, roky, mená, dátumy) nepíšte do SQL, ale ako parametre :nazov a ich hodnoty uveďte v poli parametre
+    4. Poskytnite stručné vysvetlenie, čo dotaz robí
+    5. Vráťte dotaz, parametre aj vysvetlenie
+    """
+
+    sablona_promptu = PromptTemplate(
+        input_variables=["otazka"],
+        template=systemova_sablona,
+    )
+
+    retazec = sablona_promptu | strukturovany_llm
+    return await retazec.ainvoke({"otazka": otazka})
+
+
+def _konfiguracia_relacie() -> KonfiguraciaDatabazy:
+    """Konfigurácia databázy relácie (nastavená napr. pri štarte chatu podľa používateľa), inak predvolená."""
+    try:
+        return cl.user_session.get("db_konfiguracia") or db_konfiguracia
+    except ChainlitContextException:
+        # Mimo relácie Chainlitu (napr. benchmark) platí predvolená databáza
+        return db_konfiguracia
+
+
+def _spojenie_relacie() -> ZakladPripojeniaDatabazy:
+    """Pripojenie, cez ktoré relácia vykonala posledný dotaz (jeho stránkovanie a súbor výsledku)."""
+    return cl.user_session.get("sql_spojenie")
+
+
+async def vygeneruj_overeny_sql_dotaz(
+    otazka: str,
+    dialekt: str,
+    pocet_kandidatov: int = POCET_KANDIDATOV,
+    db_spojenie: Optional[ZakladPripojeniaDatabazy] = None,
+    kontext: Optional[KontextDatabazy] = None,
+) -> SQLDotaz:
+    """
+    Vygeneruje SQL dotaz a overí ho cez EXPLAIN. Pri `pocet_kandidatov` > 1 sa kandidáti s rôznymi
+    teplotami generujú súbežne a použije sa prvý platný (ostatní sa zrušia), takže neplatný
+    prvý pokus nepredĺži odpoveď o ďalšie volanie LLM. Bez zadaného pripojenia a kontextu sa použije
+    databáza relácie.
+    """
+    db_spojenie = db_spojenie or await spravca_pripojeni.ziskaj_async(_konfiguracia_relacie())
+    if kontext is None:
+        konfiguracia = db_spojenie.konfiguracia if db_spojenie is not None else _konfiguracia_relacie()
+        kontext = await kontexty_databaz.pre_konfiguraciu(konfiguracia).priprav(db_spojenie)
+    if pocet_kandidatov <= 1 or db_spojenie is None:
+        return await vygeneruj_sql_dotaz(otazka, dialekt, kontext=kontext)
+    generatory = [
+        (lambda teplota=teplota: vygeneruj_sql_dotaz(otazka, dialekt, teplota=teplota, kontext=kontext))
+        for teplota in teploty_pre_kandidatov(pocet_kandidatov)
+    ]
+    sql_dotaz, _ = await prvy_platny_kandidat(generatory, db_spojenie.over_dotaz_async)
+    return sql_dotaz
+
+
+async def _posli_stranu_vysledkov(davka: dict, strankovac, nadpis: str) -> None:
+    """Zobrazí jednu stranu výsledkov; ak existujú ďalšie riadky, pridá akciu na ich načítanie."""
+    tabulka = davka["rows"].do_markdown()
+    obsah = f"{nadpis}\n\n{tabulka}"
+    akcie = []
+    if davka["dalsie"]:
+        cl.user_session.set("sql_strankovac", strankovac)
+        _naplanuj_zatvorenie_strankovaca(strankovac)
+        akcie.append(cl.Action(name="nacitaj_dalsie_riadky", value="dalsie", label="⬇️ Načítať ďalšie riadky"))
+    else:
+        cl.user_session.set("sql_strankovac", None)
+        if davka["orezane"]:
+            obsah += "\n\n⚠️ Výsledok bol orezaný podľa nastaveného limitu riadkov/pamäte."
+    await cl.Message(content=obsah, actions=akcie).send()
+
+
+def _zrus_casovac_strankovania() -> None:
+    casovac = cl.user_session.get("sql_casovac_strankovania")
+    if casovac and not casovac.done() and casovac is not asyncio.current_task():
+        casovac.cancel()
+    cl.user_session.set("sql_casovac_strankovania", None)
+
+
+def _naplanuj_zatvorenie_strankovaca(strankovac) -> None:
+    """
+    Ak používateľ nenačíta ďalšiu stranu do `necinnost_strankovania_s`, stránkovač sa zatvorí: inak by
+    držal spojenie z pool-u (na SQLite aj čítaciu transakciu, ktorá bráni checkpointu WAL) neobmedzene dlho.
+    """
+    _zrus_casovac_strankovania()
+    limit_s = _spojenie_relacie().konfiguracia.necinnost_strankovania_s
+    if not limit_s:
+        return
+
+    async def zatvor_po_necinnosti():
+        await asyncio.sleep(limit_s)
+        if cl.user_session.get("sql_strankovac") is strankovac:
+            cl.user_session.set("sql_strankovac", None)
+            await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+            zapisovac.info(f"⌛ Stránkovanie výsledku zatvorené po {limit_s:g} s nečinnosti")
+
+    cl.user_session.set("sql_casovac_strankovania", asyncio.create_task(zatvor_po_necinnosti()))
+
+
+async def _zatvor_strankovac_relacie() -> None:
+    """Zatvorí rozpracované stránkovanie predchádzajúceho dotazu v tejto relácii."""
+    _zrus_casovac_strankovania()
+    strankovac = cl.user_session.get("sql_strankovac")
+    if strankovac:
+        cl.user_session.set("sql_strankovac", None)
+        await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+
+
+async def zrus_pracu_relacie() -> None:
+    """
+    Preruší rozpracovanú prácu nástroja v tejto relácii (Stop / koniec chatu): zruší bežiaci DB dotaz
+    (SQLite interrupt, cancel na serveri), úlohu čakajúcu na LLM a uvoľní spojenie stránkovania.
+    """
+    zrusenie = cl.user_session.get("sql_zrusenie")
+    if zrusenie:
+        zrusenie.zrus()
+    uloha = cl.user_session.get("sql_uloha")
+    if uloha and not uloha.done() and uloha is not asyncio.current_task():
+        uloha.cancel()
+    _zrus_casovac_strankovania()
+    strankovac = cl.user_session.get("sql_strankovac")
+    if strankovac:
+        cl.user_session.set("sql_strankovac", None)
+        # Generátor môže práve dobiehať v inom vlákne či úlohe; po prerušení sa uvoľní do pár milisekúnd
+        for _ in range(50):
+            try:
+                await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+                break
+            except (ValueError, RuntimeError):
+                await asyncio.sleep(0.01)
+    zapisovac.info("⏹️ Rozpracované SQL dotazy relácie boli prerušené.")
+
+
+@cl.action_callback("nacitaj_dalsie_riadky")
+async def on_nacitaj_dalsie_riadky(action: cl.Action):
+    """Načíta a zobrazí ďalšiu stranu výsledkov posledného dotazu."""
+    await action.remove()
+    # Časovač nečinnosti nesmie zatvoriť stránkovač počas načítania; pri ďalšej strane sa naplánuje znova
+    _zrus_casovac_strankovania()
+    strankovac = cl.user_session.get("sql_strankovac")
+    if not strankovac:
+        await cl.Message(content="Nie sú k dispozícii žiadne ďalšie výsledky (stránkovanie mohlo vypršať, zopakujte otázku).").send()
+        return
+
+    davka = await _spojenie_relacie().dalsia_davka_async(strankovac)
+    if not davka or not davka.get("dalsie"):
+        await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+    if not davka or "error" in davka:
+        cl.user_session.set("sql_strankovac", None)
+        chyba = davka["error"] if davka else "Nie sú k dispozícii žiadne ďalšie výsledky."
+        await cl.Message(content=f"❌ {chyba}" if davka else chyba).send()
+        return
+    if not davka["rows"]:
+        cl.user_session.set("sql_strankovac", None)
+        await cl.Message(content="Všetky výsledky sú zobrazené.").send()
+        return
+    await _posli_stranu_vysledkov(davka, strankovac, "**Ďalšie výsledky:**")
+
+
+async def _nacitaj_alebo_odloz_do_suboru(
+    prva_davka: dict, strankovac, suhrn: SuhrnVysledku
+) -> Tuple[dict, object, Optional[dict], Optional[StlpcovyVysledok]]:
+    """
+    Pri výsledku väčšom ako `prah_suboru_riadkov` ho zapíše (streamovane, po dávkach) do súboru
+    a vráti (prvá dávka ako ukážka, None, info o súbore, prvá dávka). Menší výsledok načíta celý
+    do pamäte a vráti (prvá dávka, stránkovač nad načítanými dávkami, None, všetky riadky).
+    Všetky načítané riadky sa započítajú do `suhrn`.
+    """
+    konfiguracia = _spojenie_relacie().konfiguracia
+    prah = konfiguracia.prah_suboru_riadkov
+    if not prah or not prva_davka.get("dalsie"):
+        suhrn.pridaj(prva_davka["rows"])
+        return prva_davka, strankovac, None, prva_davka["rows"]
+
+    davky = [prva_davka]
+    pocet_riadkov = len(prva_davka["rows"])
+    while davky[-1]["dalsie"] and pocet_riadkov <= prah:
+        davka = await _spojenie_relacie().dalsia_davka_async(strankovac)
+        if not davka:
+            break
+        if "error" in davka:
+            await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+            return davka, strankovac, None, None
+        davky.append(davka)
+        pocet_riadkov += len(davka["rows"])
+
+    if pocet_riadkov <= prah:
+        # Celý výsledok je v pamäti, ďalšie strany sa zobrazia z načítaných dávok
+        await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+        nacitane = StlpcovyVysledok(prva_davka["columns"])
+        for davka in davky:
+            nacitane.pridaj(davka["rows"])
+        suhrn.pridaj(nacitane)
+        return prva_davka, _spojenie_relacie().strankovac_z_davok(davky[1:]), None, nacitane
+
+    zapisovac.info(f"💾 Výsledok má viac ako {prah} riadkov, zapisuje sa do súboru")
+    slucka = asyncio.get_running_loop()
+    # Pri zrušení úlohy zápis skončí sám: token zrušenia preruší dotaz a generátor vráti chybu
+    subor = await slucka.run_in_executor(
+        None,
+        zapis_davky_do_suboru,
+        itertools.chain(davky, _spojenie_relacie().davky_pre_vlakno(strankovac, slucka)),
+        konfiguracia.adresar_vysledkov,
+        konfiguracia.format_suboru,
+        suhrn,
+    )
+    await _spojenie_relacie().zatvor_strankovac_async(strankovac)
+    if "error" in subor:
+        return {"error": f"Zápis výsledku do súboru zlyhal: {subor['error']}"}, None, None, None
+    return prva_davka, None, subor, prva_davka["rows"]
+
+
+async def _posli_ukazku_so_suborom(davka: dict, subor: dict) -> None:
+    """Zobrazí prvú stranu výsledku ako ukážku a priloží súbor s celým výsledkom."""
+    obsah = (
+        f"**Výsledky Dotazu:** ukážka prvých {len(davka['rows'])} z {subor['pocet_riadkov']} riadkov, "
+        f"celý výsledok je v priloženom súbore.\n\n{davka['rows'].do_markdown()}"
+    )
+    if subor["orezane"]:
+        obsah += f"\n\n⚠️ Súbor obsahuje len prvých {subor['pocet_riadkov']} riadkov (limit `DB_MAX_RIADKOV_SUBORU`)."
+    priloha = cl.File(name=subor["nazov"], path=subor["cesta"], display="inline")
+    await cl.Message(content=obsah, elements=[priloha]).send()
+
+
+async def _potvrd_drahy_dotaz(posudok: dict) -> bool:
+    """Opýta sa používateľa, či spustiť dotaz, ktorý strážca nákladov označil za drahý."""
+    dovody = "\n".join(f"- {dovod}" for dovod in posudok.get("dovody", []))
+    odpoved = await cl.AskActionMessage(
+        content=f"⚠️ Dotaz môže byť veľmi náročný na vykonanie:\n{dovody}\n\nChcete ho napriek tomu spustiť?",
+        actions=[
+            cl.Action(name="spustit_drahy_dotaz", value="ano", label="▶️ Spustiť"),
+            cl.Action(name="zrusit_drahy_dotaz", value="nie", label="✖️ Zrušiť"),
+        ],
+        timeout=60,
+    ).send()
+    potvrdene = bool(odpoved) and odpoved.get("name") == "spustit_drahy_dotaz"
+    zapisovac.info(f"🛡️ Strážca dotazov: drahý dotaz {'potvrdený' if potvrdene else 'zrušený'} používateľom")
+    return potvrdene
+
+
 # Modify function signature to accept a single dictionary argument
 async def spracuj_sql_dotaz(params: dict) -> str:
     """Prevedie prirodzený jazyk na SQL, vykoná dotaz a vráti výsledky."""
@@ -59,53 +357,46 @@ async def spracuj_sql_dotaz(params: dict) -> str:
     try:
         zapisovac.info(f"🤔 Spracováva sa dotaz v prirodzenom jazyku: '{otazka}'")
 
-        llm = ziskaj_llm("sql_generation")
-        strukturovany_llm = llm.with_structured_output(SQLDotaz)
-
-        # Používame priamo db_konfiguracia
-        if not db_konfiguracia or not hasattr(db_konfiguracia, 'dialekt'):
+        konfiguracia = _konfiguracia_relacie()
+        if not konfiguracia or not hasattr(konfiguracia, 'dialekt'):
              chyba = "Chyba: Konfigurácia databázy (db_konfiguracia) nie je správne inicializovaná alebo jej chýba atribút 'dialekt'."
              zapisovac.error(chyba)
              await cl.Message(content=chyba, type="error").send()
              return ClientToolResult(result=f"Error: {chyba}") # Wrap in ClientToolResult
 
-        dialekt = db_konfiguracia.dialekt.lower()
-        pomoc_k_dialektu = dialect_info.get(dialekt, {"notes": "", "examples": ""}) if dialect_info else {"notes": "", "examples": ""}
-
-
-        systemova_sablona = f"""
-        Ste expert na generovanie SQL dotazov pre {dialekt.upper()} databázy. Preveďte danú otázku v prirodzenom jazyku na {dialekt.upper()}-kompatibilný SQL dotaz.
-        Zabezpečte, aby bol dotaz efektívny a dodržiaval syntax a osvedčené postupy pre {dialekt.upper()}.
-
-        # Dôležité poznámky pre {dialekt.upper()}
-        {pomoc_k_dialektu["notes"]}
-
-        # Schéma Databázy
-        {POPIS_SCHEMY}
-
-        # Príkladové Dotazy pre {dialekt.upper()}
-        {pomoc_k_dialektu["examples"]}
-
-        # Otázka
-        {{otazka}}
-
-        # Úloha
-        1. Analyzujte otázku a schému
-        2. Vygenerujte {dialekt.upper()}-kompatibilný SQL dotaz
-        3. Poskytnite stručné vysvetlenie, čo dotaz robí
-        4. Vráťte dotaz aj vysvetlenie
-        """
-
-        sablona_promptu = PromptTemplate(
-            input_variables=["otazka"],
-            template=systemova_sablona,
-        )
-
-        retazec = sablona_promptu | strukturovany_llm
-        sql_odpoved: SQLDotaz = retazec.invoke({"otazka": otazka})
+        dialekt = konfiguracia.dialekt.lower()
+
+        # Pripojenie relácie zo správcu pool-ov sa nadväzuje lenivo; nedostupná databáza nezdrží hlasovú odpoveď
+        db_spojenie = await spravca_pripojeni.ziskaj_async(konfiguracia)
+        if db_spojenie is None:
+            chyba = "Databáza je momentálne nedostupná, skúste to prosím o chvíľu."
+            zapisovac.error(f"❌ {chyba}")
+            await cl.Message(content=chyba, type="error").send()
+            return ClientToolResult(result=f"Error: {chyba}")
+
+        # Token zrušenia a aktuálna úloha sa ukladajú do relácie, aby ich Stop/koniec chatu vedel prerušiť
+        zrusenie = ZrusenieDotazu()
+        cl.user_session.set("sql_zrusenie", zrusenie)
+        cl.user_session.set("sql_uloha", asyncio.current_task())
+
+        # Schéma databázy relácie sa načíta pri prvom dotaze (katalóg databázy), nie pri importe nástroja
+        kontext = await kontexty_databaz.pre_konfiguraciu(konfiguracia).priprav(db_spojenie)
+        odtlacok = kontext.odtlacok
+
+        # Rýchla cesta (rozpoznané časté otázky) a sémantická cache: pri zásahu sa preskočí volanie LLM
+        sql_odpoved = await kontext.rychla_cesta.najdi(otazka, db_spojenie)
+        z_rychlej_cesty = sql_odpoved is not None
+        z_cache = False
+        if not sql_odpoved:
+            sql_odpoved = nl2sql_cache.najdi(otazka, odtlacok)
+            z_cache = sql_odpoved is not None
+            if z_cache:
+                zapisovac.info(f"⚡ SQL dotaz nájdený v NL2SQL cache: {nl2sql_cache.statistiky()}")
+        if not sql_odpoved:
+            sql_odpoved = await vygeneruj_overeny_sql_dotaz(otazka, dialekt, db_spojenie=db_spojenie, kontext=kontext)
 
         # Zaznamenať vygenerované SQL
-        zapisovac.info(f"💡 Vygenerovaný SQL dotaz: {sql_odpoved.dotaz}")
+        zapisovac.info(f"💡 Vygenerovaný SQL dotaz: {sql_odpoved.dotaz} (parametre: {sql_odpoved.parametre})")
         zapisovac.info(f"💡 Vygenerované SQL vysvetlenie: {sql_odpoved.vysvetlenie}")
 
         # Zoskupiť SQL dotaz a vysvetlenie do jednej správy s prvkami
@@ -116,21 +407,52 @@ async def spracuj_sql_dotaz(params: dict) -> str:
             .replace(" GROUP BY ", "\nGROUP BY ")
             .replace(" ORDER BY ", "\nORDER BY ")
         )
+        if sql_odpoved.parametre:
+            formatovany_sql += "\n-- parametre: " + ", ".join(f":{nazov} = {hodnota!r}" for nazov, hodnota in sql_odpoved.parametre.items())
 
         await cl.Message(content=formatovany_sql, language="sql").send()
         await cl.Message(content=f"**Vysvetlenie:** {sql_odpoved.vysvetlenie}").send()
 
-        # Vykonanie vygenerovaného SQL dotazu pomocou správnej metódy
-        vysledok = db_connection.vykonaj_dotaz(sql_odpoved.dotaz)
+        # Vykonanie vygenerovaného SQL dotazu mimo event loopu (ostatné relácie nečakajú).
+        # Výsledok sa načítava po dávkach, prvá strana sa zobrazí hneď.
+        # Veľký výsledok sa zapisuje do súboru, preto sa pri zapnutom prahu nedrží v pamäti (limit riadkov súboru)
+        await _zatvor_strankovac_relacie()
+        cl.user_session.set("sql_spojenie", db_spojenie)
+        do_suboru = bool(konfiguracia.prah_suboru_riadkov)
+        strankovac = db_spojenie.vykonaj_dotaz_po_davkach(
+            sql_odpoved.dotaz, zrusenie=zrusenie, do_suboru=do_suboru, parametre=sql_odpoved.parametre
+        )
+        vysledok = await db_spojenie.dalsia_davka_async(strankovac)
+        if vysledok.get("vyzaduje_potvrdenie") and await _potvrd_drahy_dotaz(vysledok["posudok"]):
+            # Strážca nákladov dotaz pozastavil, používateľ ho potvrdil
+            await db_spojenie.zatvor_strankovac_async(strankovac)
+            strankovac = db_spojenie.vykonaj_dotaz_po_davkach(
+                sql_odpoved.dotaz, potvrdene=True, zrusenie=zrusenie, do_suboru=do_suboru, parametre=sql_odpoved.parametre
+            )
+            vysledok = await db_spojenie.dalsia_davka_async(strankovac)
+        subor = None
+        suhrn = SuhrnVysledku()
+        if "rows" in vysledok:
+            vysledok, strankovac, subor, nacitane = await _nacitaj_alebo_odloz_do_suboru(vysledok, strankovac, suhrn)
+        if strankovac is not None and not vysledok.get("dalsie"):
+            await db_spojenie.zatvor_strankovac_async(strankovac)
+        if vysledok.get("upozornenie"):
+            await cl.Message(content=f"⚠️ {vysledok['upozornenie']}").send()
 
         if "error" in vysledok:
             error_msg = f"Chyba pri vykonávaní dotazu: {vysledok['error']}"
             await cl.Message(content=f"❌ {error_msg}", type="error").send()
             return ClientToolResult(result=f"Error: {error_msg}") # Wrap in ClientToolResult
 
+        if "rows" in vysledok and not z_rychlej_cesty and not z_cache:
+            # Do cache a medzi príklady pre prompt ukladáme len úspešné čítacie dotazy práve vygenerované LLM
+            # (opätovné uloženie zásahu by len predĺžilo platnosť položky a zbytočne zapisovalo na disk)
+            nl2sql_cache.uloz(otazka, odtlacok, sql_odpoved)
+            priklady_dotazov.pridaj(otazka, sql_odpoved.dotaz, dialekt, odtlacok=odtlacok)
+
         if "rows" in vysledok:
+
             # Formátovanie výsledkov SELECT dotazu
-            stlpce = vysledok["columns"]
             riadky = vysledok["rows"]
 
             if not riadky:
@@ -138,19 +460,23 @@ async def spracuj_sql_dotaz(params: dict) -> str:
                 await cl.Message(content=msg).send()
                 return ClientToolResult(result=msg) # Wrap in ClientToolResult
 
-            # Vytvorenie markdown tabuľky pre lepšie formátovanie
-            hlavicka = "| " + " | ".join(f"**{str(stlpec)}**" for stlpec in stlpce) + " |"
-            oddelovac = "|" + "|".join("---" for _ in stlpce) + "|"
-            riadky_formatovane = ["| " + " | ".join(str(hodnota) for hodnota in riadok.values()) + " |" for riadok in riadky]
-
-            tabulka = "\n".join([hlavicka, oddelovac] + riadky_formatovane)
-            await cl.Message(content=f"**Výsledky Dotazu:**\n\n{tabulka}").send()
-            # Return summary string including JSON data wrapped in ClientToolResult
+            # Celé dáta zostávajú k dispozícii pre nástroj zobraz_riadky_vysledku
+            cl.user_session.set("sql_posledny_vysledok", {"nacitane": nacitane, "subor": subor, "pocet_riadkov": suhrn.pocet_riadkov})
+            if subor:
+                # Veľký výsledok: používateľ vidí ukážku a súbor
+                await _posli_ukazku_so_suborom(vysledok, subor)
+            else:
+                await _posli_stranu_vysledkov(vysledok, strankovac, "**Výsledky Dotazu:**")
+            # Hlasový model dostane namiesto všetkých riadkov súhrn (štatistiky stĺpcov, top-k, prvé riadky)
             try:
-                # Convert rows (list of dicts) to JSON string
-                data_json = json.dumps(riadky, ensure_ascii=False)
-                # Return ONLY the JSON data string, wrapped in ClientToolResult
-                return ClientToolResult(result=data_json)
+                suhrn_json = suhrn.vysledok()
+                if subor:
+                    suhrn_json["subor"] = subor["nazov"]
+                if vysledok["dalsie"] or vysledok["orezane"] or (subor and subor["orezane"]):
+                    suhrn_json["poznamka"] = f"Súhrn zahŕňa len prvých {suhrn.pocet_riadkov} riadkov, výsledok obsahuje ďalšie."
+                if suhrn.pocet_riadkov > len(suhrn_json["prve_riadky"]):
+                    suhrn_json["dalsie_riadky"] = "Ďalšie riadky vráti nástroj zobraz_riadky_vysledku."
+                return ClientToolResult(result=json.dumps(suhrn_json, ensure_ascii=False, default=str))
             except Exception as json_e:
                 zapisovac.error(f"Chyba pri konverzii výsledkov SQL na JSON: {json_e}")
                 # Return an error message if JSON conversion fails
@@ -161,6 +487,10 @@ async def spracuj_sql_dotaz(params: dict) -> str:
             await cl.Message(content=sprava).send()
             return ClientToolResult(result=sprava) # Wrap in ClientToolResult
 
+    except LLMPretazene as e:
+        # Pri preťažení LLM hneď odpovieme, hlasová relácia nečaká na opakovania
+        await cl.Message(content=f"⏳ {e}").send()
+        return ClientToolResult(result=f"Error: {e}")
     except Exception as e:
         chybova_sprava = f"Chyba pri spracovaní dotazu: {str(e)}"
         zapisovac.error(f"❌ {chybova_sprava}")
@@ -169,3 +499,60 @@ async def spracuj_sql_dotaz(params: dict) -> str:
 
 
 vykonaj_sql = (definicia_vykonaj_sql, spracuj_sql_dotaz)
+
+
+# Najviac riadkov, ktoré hlasový model dostane naraz na požiadanie
+MAX_RIADKOV_NA_POZIADANIE = 50
+
+definicia_zobraz_riadky_vysledku = {
+    "name": "zobraz_riadky_vysledku",
+    "description": (
+        "Vráti konkrétne riadky výsledku posledného SQL dotazu (vykonaj_sql vracia len súhrn). "
+        f"Použi, keď súhrn nestačí, napr. na vymenovanie položiek. Najviac {MAX_RIADKOV_NA_POZIADANIE} riadkov naraz."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "od": {
+                "type": "integer",
+                "description": "Poradie prvého vráteného riadku (od 0).",
+            },
+            "pocet": {
+                "type": "integer",
+                "description": f"Počet riadkov (najviac {MAX_RIADKOV_NA_POZIADANIE}).",
+            },
+        },
+        "required": [],
+    },
+}
+
+
+async def spracuj_zobrazenie_riadkov(params: dict) -> str:
+    """Vráti riadky posledného výsledku z pamäte alebo zo súboru s veľkým výsledkom."""
+    posledny = cl.user_session.get("sql_posledny_vysledok")
+    if not posledny:
+        return ClientToolResult(result="Nie je k dispozícii žiadny výsledok SQL dotazu.")
+    try:
+        od = max(0, int(params.get("od") or 0))
+        pocet = min(MAX_RIADKOV_NA_POZIADANIE, max(1, int(params.get("pocet") or 20)))
+    except (TypeError, ValueError):
+        return ClientToolResult(result="Error: Parametre 'od' a 'pocet' musia byť celé čísla.")
+
+    nacitane, subor = posledny["nacitane"], posledny["subor"]
+    try:
+        if subor and od + pocet > len(nacitane):
+            slucka = asyncio.get_running_loop()
+            riadky = await slucka.run_in_executor(None, nacitaj_riadky_zo_suboru, subor["cesta"], od, pocet)
+        else:
+            riadky = nacitane.vyrez(od, od + pocet)
+    except Exception as e:
+        zapisovac.error(f"❌ Chyba pri načítaní riadkov výsledku: {e}")
+        return ClientToolResult(result=f"Error: Riadky výsledku sa nepodarilo načítať ({e}).")
+
+    zapisovac.info(f"📄 Riadky výsledku {od}–{od + len(riadky)} z {posledny['pocet_riadkov']} pre hlasový model")
+    return ClientToolResult(
+        result=f'{{"od": {od}, "pocet_riadkov": {posledny["pocet_riadkov"]}, "riadky": {riadky.do_json()}}}'
+    )
+
+
+zobraz_riadky_vysledku = (definicia_zobraz_riadky_vysledku, spracuj_zobrazenie_riadkov)
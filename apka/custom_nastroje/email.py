@@ -67,7 +67,7 @@ async def draft_email_handler(to: str, context: str):
 
         chain_input = {"to": to, "context": context}
 
-        email_draft = structured_llm.invoke(system_template.format(**chain_input))
+        email_draft = await structured_llm.ainvoke(system_template.format(**chain_input))
 
         # Send the draft email as a message
         await cl.Message(
@@ -18,8 +18,12 @@ from apka.widgets.LLM_modely import ziskaj_llm
 from apka.widgets.spolocne import zapisovac as logger, scratch_pad_adresar# Using the logger from spolocne like in other tools
 
 from apka.widgets.LLM_modely import ziskaj_konfiguraciu_generovania_obrazkov
-# Initialize Together AI client
-together_client = together.Together(api_key=os.getenv('TOGETHER_API_KEY'))
+from apka.utils.nahravanie_http import nahravac_http
+# Initialize Together AI client (through the HTTP recorder when HTTP_NAHRAVANIE is set)
+together_client = together.Together(
+    api_key=nahravac_http.api_kluc('TOGETHER_API_KEY'),
+    http_client=nahravac_http.httpx_klient("together") if nahravac_http.aktivny else None,
+)
 
 
 
@@ -85,7 +89,7 @@ async def generate_image_handler(params: dict) -> str:
         )
 
         chain = prompt_template | structured_llm
-        enhanced_prompt = chain.invoke({"prompt": prompt}).content
+        enhanced_prompt = (await chain.ainvoke({"prompt": prompt})).content
 
         logger.info(f"🌄 Generating image based on prompt: '{enhanced_prompt}'")
 
@@ -68,7 +68,7 @@ async def draft_linkedin_post_handler(topic):
         )
 
         chain = prompt_template | structured_llm
-        linkedin_post = chain.invoke({"topic": topic}).content
+        linkedin_post = (await chain.ainvoke({"topic": topic})).content
 
         filepath = os.path.join(scratch_pad_adresar, "linkedin_post.md")
         with open(filepath, "w") as f:
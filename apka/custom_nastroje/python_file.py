@@ -50,7 +50,7 @@ async def create_python_file_handler(filename: str, content_description: str):
     try:
         logger.info(f"📝 Drafting Python file that '{content_description}'")
 
-        llm = get_llm("python_code")
+        llm = ziskaj_llm("python_code")
 
         structured_llm = llm.with_structured_output(PythonFile)
 
@@ -73,7 +73,7 @@ async def create_python_file_handler(filename: str, content_description: str):
         )
 
         chain = prompt_template | structured_llm
-        python_file = chain.invoke({"content_description": content_description})
+        python_file = await chain.ainvoke({"content_description": content_description})
         content = python_file.content
 
         filepath = os.path.join(scratch_pad_dir, filename)
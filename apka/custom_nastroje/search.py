@@ -12,6 +12,7 @@ from apka.widgets.LLM_modely import ziskaj_llm
 # Assuming logger is defined elsewhere or replacing with standard logging if needed
 # from utils.db_utils import logger # This might be incorrect if logger isn't there
 from apka.widgets.spolocne import zapisovac as logger # Using the logger from spolocne like in other tools
+from apka.utils.nahravanie_http import nahravac_http
 
 internet_search_def = {
     "name": "internet_search",
@@ -30,13 +31,14 @@ internet_search_def = {
 
 
 # Initialize Tavily client using API key from environment
-tavily_api_key = os.getenv("TAVILY_API_KEY")
+tavily_api_key = nahravac_http.api_kluc("TAVILY_API_KEY")
 if not tavily_api_key:
     logger.error("❌ TAVILY_API_KEY not found in environment variables.")
     # Handle the case where the key is missing, maybe raise an error or use a dummy client
     tavily_client = None
 else:
-    tavily_client = TavilyClient(api_key=tavily_api_key)
+    # Session through the HTTP recorder (record/replay when HTTP_NAHRAVANIE is set)
+    tavily_client = TavilyClient(api_key=tavily_api_key, session=nahravac_http.requests_session("tavily"))
 
 
 async def internet_search_handler(query: str) -> str | dict: # Return string on error, dict on success
@@ -0,0 +1,89 @@
+"""
+Záťažový test synchrónneho a asynchrónneho databázového backendu pri súbežných hlasových reláciách.
+
+Každá relácia (asyncio úloha v jednom event loope, ako v Chainlite) v cykle „počúva" (simulovaná
+latencia hlasového modelu a LLM) a potom vykoná čítací dotaz cez `vykonaj_dotaz_async`.
+Porovnáva sa `PripojenieDatabazy` (blokujúci ovládač v pool-e vlákien `max_vlakien`)
+s `AsyncPripojenieDatabazy` (aiosqlite priamo v event loope). Okrem latencie dotazov sa meria
+oneskorenie event loopu (pravidelný 10 ms tik), ktoré pri hlasovej relácii znamená trhané audio.
+
+Použitie:
+    python -m apka.helpers.benchmark_async --relacie 50 --trvanie 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from apka.helpers.benchmark_poolu import CITACIE_DOTAZY
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import AsyncPripojenieDatabazy, PripojenieDatabazy, ZakladPripojeniaDatabazy
+
+TIK_S = 0.01
+
+
+async def relacia(spojenie: ZakladPripojeniaDatabazy, koniec: float, premyslanie_ms: float, seed: int) -> dict:
+    nahoda = random.Random(seed)
+    casy, chyby = [], 0
+    while time.perf_counter() < koniec:
+        await asyncio.sleep(nahoda.uniform(0.5, 1.5) * premyslanie_ms / 1000)
+        dotaz = nahoda.choice(CITACIE_DOTAZY).format(
+            pobocka=nahoda.randint(1, 5), pouzivatel=nahoda.randint(1, 20),
+            dni=nahoda.choice([7, 30, 90]), id=nahoda.randint(1, 50_000),
+        )
+        zaciatok = time.perf_counter()
+        vysledok = await spojenie.vykonaj_dotaz_async(dotaz)
+        casy.append(time.perf_counter() - zaciatok)
+        chyby += "error" in vysledok
+    return {"casy": casy, "chyby": chyby}
+
+
+async def meraj_oneskorenie(koniec: float) -> list:
+    """Oneskorenie prebudenia pravidelného tiku oproti plánu (blokovaný event loop)."""
+    oneskorenia = []
+    while time.perf_counter() < koniec:
+        zaciatok = time.perf_counter()
+        await asyncio.sleep(TIK_S)
+        oneskorenia.append(time.perf_counter() - zaciatok - TIK_S)
+    return oneskorenia
+
+
+async def zmeraj(nazov: str, spojenie: ZakladPripojeniaDatabazy, relacie: int, trvanie: float, premyslanie_ms: float) -> None:
+    koniec = time.perf_counter() + trvanie
+    oneskorenie = asyncio.create_task(meraj_oneskorenie(koniec))
+    vysledky = await asyncio.gather(*(relacia(spojenie, koniec, premyslanie_ms, i) for i in range(relacie)))
+    oneskorenia = await oneskorenie
+
+    casy = [cas for vysledok in vysledky for cas in vysledok["casy"]]
+    suhrn, suhrn_slucky = zhrn_casy(casy), zhrn_casy(oneskorenia)
+    print(
+        f"{nazov:<10} {len(casy) / trvanie:>8.0f} dotazov/s  p50 {suhrn['p50_ms']:>6.1f} ms  p95 {suhrn['p95_ms']:>7.1f} ms  "
+        f"oneskorenie slučky p95 {suhrn_slucky['p95_ms']:>6.1f} ms  chyby {sum(v['chyby'] for v in vysledky)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relacie", type=int, default=50, help="Počet súbežných hlasových relácií")
+    parser.add_argument("--trvanie", type=float, default=10, help="Trvanie merania jedného backendu v sekundách")
+    parser.add_argument("--premyslanie", type=float, default=200, help="Priemerná simulovaná latencia LLM medzi dotazmi (ms)")
+    parser.add_argument("--vlakna", type=int, default=4, help="Veľkosť pool-u vlákien synchrónneho backendu")
+    parser.add_argument("--vypozicky", type=int, default=20_000, help="Počet výpožičiek v testovacej DB")
+    args = parser.parse_args()
+
+    cesta = vytvor_benchmark_databazu(args.vypozicky)
+    konfiguracia = KonfiguraciaDatabazy(
+        dialekt="sqlite", databaza=cesta, max_vlakien=args.vlakna, pool_velkost=args.relacie,
+        cache_vysledkov_max_poloziek=0, strazca_politika="vypnuty", poradca_indexov=False,
+    )
+    print(f"{args.relacie} relácií, {args.trvanie:g} s, LLM ~{args.premyslanie:g} ms, {args.vypozicky:,} výpožičiek\n")
+    for nazov, trieda in (("sync", PripojenieDatabazy), ("async", AsyncPripojenieDatabazy)):
+        spojenie = trieda()
+        spojenie.pripoj(konfiguracia)
+        asyncio.run(zmeraj(nazov, spojenie, args.relacie, args.trvanie, args.premyslanie))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark špekulatívneho generovania SQL (viac kandidátov súbežne) oproti opakovaniu po chybe.
+
+Simulované LLM má latenciu s dlhým chvostom (lognormálne rozdelenie) a s pravdepodobnosťou
+--chybovost vráti neplatný SQL. Kandidáti sa reálne overujú cez EXPLAIN nad knižničnou databázou.
+Porovnáva sa čas do platného SQL (p50/p95) a počet volaní LLM (spotreba tokenov).
+S prepínačom --llm sa to isté zmeria so skutočným modelom nad príkladovými otázkami.
+
+Použitie:
+    python -m apka.helpers.benchmark_kandidatov --otazky 200 --kandidati 3
+    python -m apka.helpers.benchmark_kandidatov --llm --kandidati 3
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.models.sql_models import SQLDotaz
+from apka.settings.databaza import PripojenieDatabazy
+from apka.utils.schema_helper import nacitaj_data_schemy
+from apka.utils.spekulativne_sql import prvy_platny_kandidat
+
+PLATNY_SQL = "SELECT stav, COUNT(*) FROM vypozicky GROUP BY stav"
+NEPLATNY_SQL = "SELECT status, COUNT(*) FROM vypozicky GROUP BY status"
+
+
+class SimulovaneLLM:
+    """Náhodná latencia s dlhým chvostom a náhodne neplatný výstup; počíta volania."""
+
+    def __init__(self, latencia: float, chybovost: float):
+        self.latencia = latencia
+        self.chybovost = chybovost
+        self.volania = 0
+        self.dokoncene = 0
+
+    async def generuj(self) -> SQLDotaz:
+        self.volania += 1
+        await asyncio.sleep(random.lognormvariate(0, 0.6) * self.latencia)
+        self.dokoncene += 1
+        dotaz = NEPLATNY_SQL if random.random() < self.chybovost else PLATNY_SQL
+        return SQLDotaz(dotaz=dotaz, vysvetlenie="")
+
+
+async def do_platneho(generator, over, pocet_kandidatov: int, max_kol: int) -> float:
+    """Opakuje kolá (po `pocet_kandidatov` súbežných kandidátoch), kým nedostane platný SQL. Vráti čas."""
+    zaciatok = time.perf_counter()
+    for _ in range(max_kol):
+        _, chyby = await prvy_platny_kandidat([generator] * pocet_kandidatov, over)
+        if len(chyby) < pocet_kandidatov:
+            break
+    return time.perf_counter() - zaciatok
+
+
+async def simulacia(spojenie: PripojenieDatabazy, otazky: int, kandidati: int, latencia: float, chybovost: float) -> None:
+    for nazov, pocet in (("opakovanie po chybe", 1), (f"{kandidati} kandidáti súbežne", kandidati)):
+        random.seed(11)
+        llm = SimulovaneLLM(latencia, chybovost)
+        casy = [await do_platneho(llm.generuj, spojenie.over_dotaz_async, pocet, max_kol=5) for _ in range(otazky)]
+        suhrn = zhrn_casy(casy)
+        print(
+            f"{nazov:<24} p50 {suhrn['p50_ms']:>6.0f} ms, p95 {suhrn['p95_ms']:>6.0f} ms, max {suhrn['max_ms']:>6.0f} ms, "
+            f"volania LLM {llm.volania / otazky:.2f}/otázku (dokončené {llm.dokoncene / otazky:.2f})"
+        )
+
+
+async def skutocne_llm(kandidati: int) -> None:
+    # Import až tu: nástroj potrebuje Chainlit a API kľúč pre LLM
+    from apka.custom_nastroje.databaza import vygeneruj_overeny_sql_dotaz
+
+    otazky = [priklad["question"] for priklad in (nacitaj_data_schemy() or {}).get("example_queries", [])]
+    for nazov, pocet in (("jeden kandidát", 1), (f"{kandidati} kandidáti súbežne", kandidati)):
+        casy = []
+        for otazka in otazky:
+            zaciatok = time.perf_counter()
+            try:
+                await vygeneruj_overeny_sql_dotaz(otazka, "sqlite", pocet)
+            except Exception as e:
+                print(f"  chyba LLM ({otazka}): {e}")
+                continue
+            casy.append(time.perf_counter() - zaciatok)
+        suhrn = zhrn_casy(casy)
+        print(f"{nazov:<24} p50 {suhrn['p50_ms']:>6.0f} ms, p95 {suhrn['p95_ms']:>6.0f} ms ({len(casy)} otázok)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--otazky", type=int, default=200, help="Počet simulovaných otázok")
+    parser.add_argument("--kandidati", type=int, default=3, help="Počet súbežných kandidátov")
+    parser.add_argument("--latencia-llm", type=float, default=0.3, help="Medián simulovanej latencie LLM v sekundách")
+    parser.add_argument("--chybovost", type=float, default=0.2, help="Pravdepodobnosť neplatného SQL od LLM")
+    parser.add_argument("--llm", action="store_true", help="Zmerať so skutočným LLM (vyžaduje GROQ_API_KEY)")
+    args = parser.parse_args()
+
+    if args.llm:
+        asyncio.run(skutocne_llm(args.kandidati))
+        return
+
+    spojenie = PripojenieDatabazy()
+    spojenie.pripoj(KonfiguraciaDatabazy(dialekt="sqlite", databaza=vytvor_benchmark_databazu(5_000)))
+    asyncio.run(simulacia(spojenie, args.otazky, args.kandidati, args.latencia_llm, args.chybovost))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Beh NL→SQL toku (generovanie SQL cez Groq + vykonanie nad knižničnou DB) nad nahrávkami HTTP komunikácie.
+
+Raz sa spustí online v režime `nahravaj`, odpovede Groq sa uložia do nahrávok. V režime `prehravaj` potom
+beží rovnaký tok bez siete a bez API kľúčov (napr. na offline stroji alebo v CI), s nahranou latenciou
+alebo s pevnou latenciou `--latencia-ms`. Vypíše čas LLM a databázy pre každú otázku a p50/p95. Prompt
+obsahuje celú schému bez dynamických príkladov, aby sa požiadavky pri prehrávaní zhodovali s nahranými.
+
+Použitie:
+    python -m apka.helpers.benchmark_nahravok --rezim nahravaj
+    python -m apka.helpers.benchmark_nahravok --rezim prehravaj --latencia-ms 0
+"""
+
+import argparse
+import asyncio
+import time
+
+from apka.custom_nastroje.databaza import vygeneruj_sql_dotaz
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.helpers.pokrytie_rychlej_cesty import VZORKA_OTAZOK
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import AsyncPripojenieDatabazy
+from apka.utils.nahravanie_http import nahravac_http
+from apka.utils.schema_helper import nacitaj_popis_schemy
+
+
+async def zmeraj(otazky, cesta: str) -> None:
+    spojenie = AsyncPripojenieDatabazy()
+    spojenie.pripoj(KonfiguraciaDatabazy(dialekt="sqlite", databaza=cesta, cache_vysledkov_max_poloziek=0))
+    casy_llm, casy_db, chyby = [], [], 0
+    for otazka in otazky:
+        zaciatok = time.perf_counter()
+        try:
+            sql_dotaz = await vygeneruj_sql_dotaz(otazka, "sqlite", popis_schemy=nacitaj_popis_schemy())
+        except Exception as e:
+            chyby += 1
+            print(f"  ✗ {otazka}: {e}")
+            continue
+        po_llm = time.perf_counter()
+        vysledok = await spojenie.vykonaj_dotaz_async(sql_dotaz.dotaz, parametre=sql_dotaz.parametre)
+        koniec = time.perf_counter()
+        casy_llm.append(po_llm - zaciatok)
+        casy_db.append(koniec - po_llm)
+        chyby += "error" in vysledok
+        print(f"  LLM {1000 * (po_llm - zaciatok):>7.0f} ms  DB {1000 * (koniec - po_llm):>6.1f} ms  {otazka}")
+    await spojenie.zatvor_async()
+
+    for nazov, casy in (("LLM", casy_llm), ("DB", casy_db)):
+        if casy:
+            suhrn = zhrn_casy(casy)
+            print(f"{nazov:<4} p50 {suhrn['p50_ms']:>7.1f} ms  p95 {suhrn['p95_ms']:>7.1f} ms")
+    print(f"chyby {chyby}, nahrávač {nahravac_http.statistiky()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rezim", choices=["nahravaj", "prehravaj"], default=nahravac_http.rezim if nahravac_http.aktivny else "prehravaj")
+    parser.add_argument("--latencia-ms", type=float, help="Pevná latencia prehrávaných odpovedí (predvolene nahraná)")
+    parser.add_argument("--otazky", help="Súbor s otázkami, jedna na riadok (predvolene vstavaná vzorka)")
+    parser.add_argument("--vypozicky", type=int, default=20_000, help="Počet výpožičiek v testovacej DB")
+    args = parser.parse_args()
+
+    # HTTP klienti Groq sa vytvárajú lenivo, režim stačí nastaviť pred prvým volaním
+    nahravac_http.rezim = args.rezim
+    if args.latencia_ms is not None:
+        nahravac_http.latencia_s = args.latencia_ms / 1000
+    if args.otazky:
+        with open(args.otazky, "r", encoding="utf-8") as f:
+            otazky = [riadok.strip() for riadok in f if riadok.strip()]
+    else:
+        otazky = VZORKA_OTAZOK
+
+    print(f"{len(otazky)} otázok, režim {args.rezim}, nahrávky v {nahravac_http.adresar}")
+    asyncio.run(zmeraj(otazky, vytvor_benchmark_databazu(args.vypozicky)))
+
+
+if __name__ == "__main__":
+    main()
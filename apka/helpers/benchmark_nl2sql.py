@@ -0,0 +1,73 @@
+"""
+Benchmark priepustnosti NL2SQL nástroja pri N súbežných otázkach.
+
+Porovnáva pôvodný blokujúci priebeh (synchrónne volanie LLM a DB priamo v event loope)
+s neblokujúcim priebehom (async LLM + DB v ohraničenom pool-e vlákien).
+Latencia LLM je simulovaná, DB dotazy sa reálne vykonávajú nad knižničnou databázou.
+
+Použitie:
+    python -m apka.helpers.benchmark_nl2sql --sucasne 20 --latencia-llm 0.4
+"""
+
+import argparse
+import asyncio
+import time
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import PripojenieDatabazy
+
+DOTAZ = """
+SELECT p.meno, p.priezvisko, COUNT(v.id) AS pocet_vypoziciek
+FROM pouzivatelia p
+JOIN vypozicky v ON p.id = v.id_pouzivatela
+GROUP BY p.id, p.meno, p.priezvisko
+ORDER BY pocet_vypoziciek DESC
+LIMIT 5
+"""
+
+
+async def blokujuca_otazka(spojenie: PripojenieDatabazy, latencia_llm: float) -> float:
+    """Simuluje pôvodný priebeh: blokujúce `invoke` aj `vykonaj_dotaz` v event loope. Vráti čas dokončenia."""
+    time.sleep(latencia_llm)
+    spojenie.vykonaj_dotaz(DOTAZ)
+    return time.perf_counter()
+
+
+async def neblokujuca_otazka(spojenie: PripojenieDatabazy, latencia_llm: float) -> float:
+    """Simuluje nový priebeh: `ainvoke` a `vykonaj_dotaz_async`. Vráti čas dokončenia."""
+    await asyncio.sleep(latencia_llm)
+    await spojenie.vykonaj_dotaz_async(DOTAZ)
+    return time.perf_counter()
+
+
+async def zmeraj(nazov: str, otazka, spojenie: PripojenieDatabazy, sucasne: int, latencia_llm: float) -> None:
+    zaciatok = time.perf_counter()
+    konce = await asyncio.gather(*(otazka(spojenie, latencia_llm) for _ in range(sucasne)))
+    trvanie = time.perf_counter() - zaciatok
+    # Čas odpovede meriame od spoločného štartu, teda vrátane čakania na iné relácie
+    suhrn = zhrn_casy([koniec - zaciatok for koniec in konce])
+    print(
+        f"{nazov:<12} {sucasne} otázok za {trvanie:.2f} s -> {sucasne / trvanie:.1f} otázok/s, "
+        f"p50 {suhrn['p50_ms']:.0f} ms, p95 {suhrn['p95_ms']:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sucasne", type=int, default=20, help="Počet súbežných otázok")
+    parser.add_argument("--latencia-llm", type=float, default=0.4, help="Simulovaná latencia LLM v sekundách")
+    parser.add_argument("--vypozicky", type=int, default=50_000, help="Počet výpožičiek v testovacej databáze")
+    parser.add_argument("--vlakna", type=int, default=4, help="Veľkosť pool-u vlákien pre DB")
+    args = parser.parse_args()
+
+    cesta = vytvor_benchmark_databazu(args.vypozicky)
+    spojenie = PripojenieDatabazy()
+    spojenie.pripoj(KonfiguraciaDatabazy(dialekt="sqlite", databaza=cesta, max_vlakien=args.vlakna))
+
+    asyncio.run(zmeraj("blokujúci", blokujuca_otazka, spojenie, args.sucasne, args.latencia_llm))
+    asyncio.run(zmeraj("neblokujúci", neblokujuca_otazka, spojenie, args.sucasne, args.latencia_llm))
+
+
+if __name__ == "__main__":
+    main()
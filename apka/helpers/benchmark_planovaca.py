@@ -0,0 +1,113 @@
+"""
+Simulácia preťaženia LLM: súbežné relácie s interaktívnymi SQL dotazmi a generovaním textov na pozadí
+proti simulovanému API s limitom požiadaviek za minútu (odpoveď 429 pri prekročení).
+
+Bez plánovača každé volanie opakuje po 429 samo (exponenciálne čakanie ako klient Groq), s plánovačom
+`PlanovacLLM` čakajú volania vo fronte podľa priority a pri preťažení sa hneď odmietnu. Pre každú
+prioritu sa vypíše počet úspešných, neúspešných/odmietnutých volaní, p50/p95 latencie a počet odpovedí 429.
+Čas je zrýchlený: limit platí za `--okno` sekúnd namiesto minúty.
+
+Použitie:
+    python -m apka.helpers.benchmark_planovaca --relacie 30 --limit 20 --trvanie 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+import groq
+
+from apka.helpers.benchmark_spolocne import zhrn_casy
+from apka.utils.planovac_llm import LLMPretazene, PlanovacLLM
+
+ULOHY = [("sql_generation", 0, 8.0), ("image_prompt", 1, 30.0), ("email_generation", 2, 60.0)]
+
+
+class SimulovaneAPI:
+    """Pevné okno s limitom požiadaviek; nad limit odpovedá 429 s `retry-after` do konca okna."""
+
+    def __init__(self, limit: int, okno_s: float, latencia_s: float):
+        self.limit, self.okno_s, self.latencia_s = limit, okno_s, latencia_s
+        self.zaciatok_okna, self.v_okne, self.odpovede_429 = time.monotonic(), 0, 0
+
+    async def volaj(self) -> str:
+        teraz = time.monotonic()
+        if teraz - self.zaciatok_okna >= self.okno_s:
+            self.zaciatok_okna, self.v_okne = teraz, 0
+        if self.v_okne >= self.limit:
+            self.odpovede_429 += 1
+            zostava = self.okno_s - (teraz - self.zaciatok_okna)
+            odpoved = httpx.Response(429, headers={"retry-after": f"{zostava:.3f}"}, request=httpx.Request("POST", "http://api"))
+            raise groq.RateLimitError("rate limit", response=odpoved, body=None)
+        self.v_okne += 1
+        await asyncio.sleep(self.latencia_s)
+        return "ok"
+
+
+async def volanie_bez_planovaca(api: SimulovaneAPI, max_pokusov: int) -> str:
+    for pokus in range(max_pokusov + 1):
+        try:
+            return await api.volaj()
+        except groq.RateLimitError:
+            if pokus == max_pokusov:
+                raise
+            await asyncio.sleep(min(0.5 * 2 ** pokus, 8.0) * random.uniform(0.75, 1.0))
+
+
+async def relacia(api, planovac, koniec: float, premyslanie_s: float, seed: int, vysledky: dict) -> None:
+    nahoda = random.Random(seed)
+    while time.monotonic() < koniec:
+        await asyncio.sleep(nahoda.uniform(0.5, 1.5) * premyslanie_s)
+        uloha, priorita, max_cakanie_s = nahoda.choice(ULOHY)
+        zaciatok = time.monotonic()
+        try:
+            if planovac is None:
+                await volanie_bez_planovaca(api, max_pokusov=2)
+            else:
+                await planovac.vykonaj(api.volaj, uloha, priorita, odhad_tokenov=0, max_cakanie_s=max_cakanie_s)
+            vysledky[uloha]["casy"].append(time.monotonic() - zaciatok)
+        except (groq.RateLimitError, LLMPretazene):
+            vysledky[uloha]["neuspesne"] += 1
+            vysledky[uloha]["cas_neuspechu"].append(time.monotonic() - zaciatok)
+
+
+async def zmeraj(nazov: str, s_planovacom: bool, args) -> None:
+    api = SimulovaneAPI(args.limit, args.okno, args.latencia_ms / 1000)
+    # Rozpočet plánovača zodpovedá limitu API prepočítanému na minútu
+    planovac = PlanovacLLM(rpm=int(args.limit * 60 / args.okno), tpm=0, max_fronta=args.relacie) if s_planovacom else None
+    if planovac is not None:
+        planovac._poziadavky = args.limit
+    vysledky = {uloha: {"casy": [], "neuspesne": 0, "cas_neuspechu": []} for uloha, _, _ in ULOHY}
+    koniec = time.monotonic() + args.trvanie
+    await asyncio.gather(*(relacia(api, planovac, koniec, args.premyslanie, seed, vysledky) for seed in range(args.relacie)))
+
+    print(f"\n{nazov} (odpovede 429: {api.odpovede_429})")
+    for uloha, priorita, _ in ULOHY:
+        vysledok = vysledky[uloha]
+        suhrn = zhrn_casy(vysledok["casy"]) if vysledok["casy"] else {"p50_ms": 0.0, "p95_ms": 0.0}
+        neuspech = zhrn_casy(vysledok["cas_neuspechu"]) if vysledok["cas_neuspechu"] else {"p50_ms": 0.0}
+        print(
+            f"  {uloha:<17} priorita {priorita}  OK {len(vysledok['casy']):>4}  p50 {suhrn['p50_ms']:>7.0f} ms  "
+            f"p95 {suhrn['p95_ms']:>7.0f} ms  neúspešné {vysledok['neuspesne']:>4} (po {neuspech['p50_ms']:.0f} ms)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relacie", type=int, default=30, help="Počet súbežných relácií")
+    parser.add_argument("--limit", type=int, default=20, help="Limit požiadaviek API za okno")
+    parser.add_argument("--okno", type=float, default=6.0, help="Dĺžka okna limitu v sekundách (zrýchlená minúta)")
+    parser.add_argument("--premyslanie", type=float, default=3.0, help="Priemerný čas medzi volaniami jednej relácie (s)")
+    parser.add_argument("--latencia-ms", type=float, default=300, help="Latencia odpovede API")
+    parser.add_argument("--trvanie", type=float, default=15, help="Trvanie každého behu v sekundách")
+    args = parser.parse_args()
+
+    print(f"{args.relacie} relácií, limit {args.limit} požiadaviek / {args.okno:g} s, {args.trvanie:g} s")
+    asyncio.run(zmeraj("bez plánovača", False, args))
+    asyncio.run(zmeraj("s plánovačom", True, args))
+
+
+if __name__ == "__main__":
+    main()
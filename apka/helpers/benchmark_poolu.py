@@ -0,0 +1,102 @@
+"""
+Benchmark pool-u spojení a SQLite pragiem pri súbežných reláciách.
+
+Každá relácia (vlákno) v cykle vykonáva typické čítacie dotazy nad knižničnou databázou
+a s pravdepodobnosťou --zapisy aj zápis (nová výpožička). Porovnáva sa pôvodné nastavenie
+(predvolený pool, rollback journal, synchronous=FULL, bez mmap, malá cache) s nastavením
+z konfigurácie (pool podľa počtu relácií, WAL, synchronous=NORMAL, mmap_size, cache_size).
+Každá konfigurácia dostane vlastnú kópiu databázy, pretože režim WAL sa ukladá do súboru.
+
+Použitie:
+    python -m apka.helpers.benchmark_poolu --relacie 16 --trvanie 10
+"""
+
+import argparse
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import PripojenieDatabazy
+
+CITACIE_DOTAZY = [
+    "SELECT k.nazov, COUNT(v.id) AS pocet FROM knihy k JOIN vypozicky v ON v.id_knihy = k.id "
+    "WHERE v.id_pobocky = {pobocka} GROUP BY k.id ORDER BY pocet DESC LIMIT 5",
+    "SELECT stav, COUNT(*) FROM vypozicky WHERE id_pouzivatela = {pouzivatel} GROUP BY stav",
+    "SELECT COUNT(*) FROM vypozicky WHERE datum_vypozicky >= date('now', '-{dni} days')",
+    "SELECT id, id_knihy, datum_vypozicky FROM vypozicky WHERE id = {id}",
+]
+ZAPIS = (
+    "INSERT INTO vypozicky (id_pouzivatela, id_knihy, id_pobocky, datum_vypozicky, predpokladany_datum_vratenia, stav) "
+    "VALUES ({pouzivatel}, {kniha}, {pobocka}, datetime('now'), datetime('now', '+21 days'), 'požičaná')"
+)
+
+# Nastavenia, ktoré zodpovedajú správaniu pred zavedením konfigurácie pool-u a pragiem
+POVODNE = dict(
+    pool_velkost=5, pool_max_navyse=10, pool_pre_ping=False,
+    sqlite_wal=False, sqlite_synchronous="FULL", sqlite_mmap_mb=0, sqlite_cache_mb=2,
+)
+
+
+def relacia(spojenie: PripojenieDatabazy, koniec: float, podiel_zapisov: float, seed: int) -> dict:
+    nahoda = random.Random(seed)
+    casy, zapisy, chyby = [], 0, 0
+    while time.perf_counter() < koniec:
+        parametre = dict(
+            pobocka=nahoda.randint(1, 5), pouzivatel=nahoda.randint(1, 20), kniha=nahoda.randint(1, 15),
+            dni=nahoda.choice([7, 30, 90]), id=nahoda.randint(1, 50_000),
+        )
+        zapis = nahoda.random() < podiel_zapisov
+        dotaz = (ZAPIS if zapis else nahoda.choice(CITACIE_DOTAZY)).format(**parametre)
+        zaciatok = time.perf_counter()
+        vysledok = spojenie.vykonaj_dotaz(dotaz)
+        casy.append(time.perf_counter() - zaciatok)
+        chyby += "error" in vysledok
+        zapisy += zapis
+    return {"casy": casy, "zapisy": zapisy, "chyby": chyby}
+
+
+def zmeraj(nazov: str, cesta: str, relacie: int, trvanie: float, podiel_zapisov: float, **nastavenia) -> None:
+    spojenie = PripojenieDatabazy()
+    spojenie.pripoj(KonfiguraciaDatabazy(
+        dialekt="sqlite", databaza=cesta, max_vlakien=relacie,
+        cache_vysledkov_max_poloziek=0, strazca_politika="vypnuty", poradca_indexov=False,
+        **nastavenia,
+    ))
+    koniec = time.perf_counter() + trvanie
+    with ThreadPoolExecutor(max_workers=relacie) as pool:
+        vysledky = list(pool.map(lambda i: relacia(spojenie, koniec, podiel_zapisov, i), range(relacie)))
+    spojenie.engine.dispose()
+
+    casy = [cas for vysledok in vysledky for cas in vysledok["casy"]]
+    suhrn = zhrn_casy(casy)
+    print(
+        f"{nazov:<15} {len(casy) / trvanie:>8.0f} dotazov/s  zápisy {sum(v['zapisy'] for v in vysledky) / trvanie:>6.0f}/s  "
+        f"p50 {suhrn['p50_ms']:>6.1f} ms  p95 {suhrn['p95_ms']:>7.1f} ms  chyby {sum(v['chyby'] for v in vysledky)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relacie", type=int, default=16, help="Počet súbežných relácií (vlákien)")
+    parser.add_argument("--trvanie", type=float, default=10, help="Trvanie merania jednej konfigurácie v sekundách")
+    parser.add_argument("--zapisy", type=float, default=0.05, help="Podiel zapisujúcich dotazov")
+    parser.add_argument("--vypozicky", type=int, default=20_000, help="Počet výpožičiek v testovacej DB")
+    args = parser.parse_args()
+
+    zdroj = vytvor_benchmark_databazu(args.vypozicky)
+    print(f"{args.relacie} relácií, {args.trvanie:g} s, {100 * args.zapisy:g} % zápisov, {args.vypozicky:,} výpožičiek\n")
+    for nazov, nastavenia in (
+        ("pôvodné", POVODNE),
+        ("pool + pragmy", dict(pool_velkost=args.relacie)),
+    ):
+        cesta = os.path.join(os.path.dirname(zdroj), f"kniznica_{len(nastavenia)}.db")
+        shutil.copyfile(zdroj, cesta)
+        zmeraj(nazov, cesta, args.relacie, args.trvanie, args.zapisy, **nastavenia)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark vykonania SQL šablón s viazanými parametrami oproti dotazom s literálmi.
+
+Rovnaké typické čítacie dotazy nad knižničnou databázou sa vykonajú raz s hodnotami vloženými
+priamo do SQL (každá hodnota = nový príkaz: text(), kompilácia SQLAlchemy aj príprava v SQLite)
+a raz ako šablóna s parametrami `:nazov` (pripravený príkaz sa použije znova). Cache výsledkov
+a strážca nákladov sú vypnuté, aby sa meralo len vykonanie.
+
+Použitie:
+    python -m apka.helpers.benchmark_sablon --dotazy 20000
+"""
+
+import argparse
+import random
+import time
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import PripojenieDatabazy
+
+SABLONY = [
+    "SELECT stav, COUNT(*) FROM vypozicky WHERE id_pouzivatela = :pouzivatel GROUP BY stav",
+    "SELECT id, id_knihy, datum_vypozicky FROM vypozicky WHERE id = :id",
+    "SELECT COUNT(*) FROM vypozicky WHERE id_pobocky = :pobocka AND id_knihy = :kniha",
+]
+
+
+def zmeraj(nazov: str, spojenie: PripojenieDatabazy, dotazy: int, s_parametrami: bool) -> None:
+    nahoda = random.Random(0)
+    casy, chyby = [], 0
+    zaciatok_merania = time.perf_counter()
+    for _ in range(dotazy):
+        parametre = dict(
+            pouzivatel=nahoda.randint(1, 20), id=nahoda.randint(1, 50_000),
+            pobocka=nahoda.randint(1, 5), kniha=nahoda.randint(1, 15),
+        )
+        sablona = nahoda.choice(SABLONY)
+        zaciatok = time.perf_counter()
+        if s_parametrami:
+            vysledok = spojenie.vykonaj_dotaz(sablona, parametre=parametre)
+        else:
+            dotaz = sablona
+            for kluc, hodnota in parametre.items():
+                dotaz = dotaz.replace(f":{kluc}", str(hodnota))
+            vysledok = spojenie.vykonaj_dotaz(dotaz)
+        casy.append(time.perf_counter() - zaciatok)
+        chyby += "error" in vysledok
+    trvanie = time.perf_counter() - zaciatok_merania
+
+    suhrn = zhrn_casy(casy)
+    print(
+        f"{nazov:<10} {dotazy / trvanie:>8.0f} dotazov/s  p50 {suhrn['p50_ms']:>6.3f} ms  p95 {suhrn['p95_ms']:>6.3f} ms  "
+        f"chyby {chyby}  cache príkazov {spojenie.statistiky_prikazov()['miera_zasahov']:.0%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dotazy", type=int, default=20_000, help="Počet vykonaných dotazov v každom režime")
+    parser.add_argument("--vypozicky", type=int, default=20_000, help="Počet výpožičiek v testovacej DB")
+    args = parser.parse_args()
+
+    cesta = vytvor_benchmark_databazu(args.vypozicky)
+    print(f"{args.dotazy:,} dotazov, {len(SABLONY)} šablóny, {args.vypozicky:,} výpožičiek\n")
+    for nazov, s_parametrami in (("literály", False), ("šablóny", True)):
+        spojenie = PripojenieDatabazy()
+        spojenie.pripoj(KonfiguraciaDatabazy(
+            dialekt="sqlite", databaza=cesta,
+            cache_vysledkov_max_poloziek=0, strazca_politika="vypnuty", poradca_indexov=False,
+        ))
+        zmeraj(nazov, spojenie, args.dotazy, s_parametrami)
+        spojenie.zatvor()
+
+
+if __name__ == "__main__":
+    main()
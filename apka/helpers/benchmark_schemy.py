@@ -0,0 +1,125 @@
+"""
+Offline benchmark zúženého popisu schémy oproti celej schéme v prompte.
+
+Pre každú otázku s referenčným SQL porovná veľkosť popisu schémy (odhad tokenov),
+čas výberu tabuliek a či výber obsahuje všetky tabuľky z referenčného SQL.
+S prepínačom --llm navyše zavolá LLM s celou aj zúženou schémou, zmeria latenciu
+a porovná výsledky vygenerovaného SQL s referenčným SQL nad testovacou databázou.
+
+Použitie:
+    python -m apka.helpers.benchmark_schemy
+    python -m apka.helpers.benchmark_schemy --llm
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import PripojenieDatabazy, poskytovatel_db, tabulky_v_dotaze
+from apka.utils.kontext_databazy import KontextDatabazy, kontext_aplikacie
+from apka.utils.vyber_schemy import ROZPOCET_TOKENOV_SCHEMY, odhadni_tokeny
+
+# Doplňujúce otázky s referenčným SQL (okrem príkladov z popis_schemy.yaml)
+DOPLNKOVE_OTAZKY = [
+    {
+        "question": "Koľko kníh napísal Ladislav Mňačko?",
+        "sql": "SELECT COUNT(*) FROM knihy k JOIN autori a ON k.id_autora = a.id WHERE a.priezvisko = 'Mňačko'",
+    },
+    {
+        "question": "Aké udalosti sa konajú na pobočkách v Bratislave?",
+        "sql": "SELECT u.nazov FROM udalosti u JOIN pobocky p ON u.id_pobocky = p.id WHERE p.mesto = 'Bratislava' ORDER BY u.nazov",
+    },
+    {
+        "question": "Ktorí vydavatelia sú aktívni?",
+        "sql": "SELECT nazov FROM vydavatelia WHERE je_aktivny = 1 ORDER BY nazov",
+    },
+    {
+        "question": "Koľko výpožičiek je momentálne prekročených?",
+        "sql": "SELECT COUNT(*) FROM vypozicky WHERE stav = 'prekročená'",
+    },
+]
+
+
+def nacitaj_otazky(kontext: KontextDatabazy):
+    return list((kontext.schema.aktualne_data() or {}).get("example_queries", [])) + DOPLNKOVE_OTAZKY
+
+
+def offline_porovnanie(kontext: KontextDatabazy, otazky, rozpocet_tokenov: int) -> None:
+    index = kontext.index
+    tokeny_cela = odhadni_tokeny(kontext.popis_schemy)
+    tokeny_zuzena, casy, uspesne = [], [], 0
+
+    print(f"{'otázka':<70} {'tokeny':>7} {'tabuľky':>8} {'pokrytie':>9}")
+    for otazka in otazky:
+        zaciatok = time.perf_counter()
+        vybrane = index.vyber_tabulky(otazka["question"], rozpocet_tokenov)
+        popis = index.popis_pre_otazku(otazka["question"], rozpocet_tokenov)
+        casy.append(time.perf_counter() - zaciatok)
+
+        potrebne = tabulky_v_dotaze(otazka["sql"]) & set(index.tabulky)
+        pokryte = potrebne <= set(vybrane)
+        uspesne += pokryte
+        tokeny_zuzena.append(odhadni_tokeny(popis))
+        print(f"{otazka['question'][:68]:<70} {tokeny_zuzena[-1]:>7} {len(vybrane):>8} {'áno' if pokryte else 'NIE':>9}")
+
+    print()
+    print(f"Celá schéma:   {tokeny_cela} tokenov v každom prompte")
+    print(f"Zúžená schéma: priemerne {statistics.fmean(tokeny_zuzena):.0f} tokenov "
+          f"({100 * statistics.fmean(tokeny_zuzena) / tokeny_cela:.0f} % celej schémy)")
+    print(f"Výber tabuliek: priemerne {1000 * statistics.fmean(casy):.2f} ms")
+    print(f"Pokrytie referenčných tabuliek: {uspesne}/{len(otazky)}")
+
+
+async def llm_porovnanie(kontext: KontextDatabazy, otazky, rozpocet_tokenov: int) -> None:
+    # Import až tu: nástroj potrebuje Chainlit a API kľúč pre LLM
+    from apka.custom_nastroje.databaza import vygeneruj_sql_dotaz
+
+    spojenie = PripojenieDatabazy()
+    spojenie.pripoj(KonfiguraciaDatabazy(dialekt="sqlite", databaza=vytvor_benchmark_databazu(5_000), cache_vysledkov_max_poloziek=0))
+
+    for nazov, popis_pre in (
+        ("celá schéma", lambda otazka: kontext.popis_schemy),
+        ("zúžená schéma", lambda otazka: kontext.index.popis_pre_otazku(otazka, rozpocet_tokenov)),
+    ):
+        casy, spravne = [], 0
+        for otazka in otazky:
+            zaciatok = time.perf_counter()
+            try:
+                sql = await vygeneruj_sql_dotaz(otazka["question"], "sqlite", popis_pre(otazka["question"]))
+            except Exception as e:
+                print(f"  chyba LLM ({otazka['question']}): {e}")
+                continue
+            casy.append(time.perf_counter() - zaciatok)
+            ocakavany = spojenie.vykonaj_dotaz(otazka["sql"])
+            ziskany = spojenie.vykonaj_dotaz(sql.dotaz, parametre=sql.parametre)
+            if "rows" in ziskany and list(ziskany["rows"].riadky()) == list(ocakavany["rows"].riadky()):
+                spravne += 1
+        if casy:
+            print(f"{nazov:<14} latencia LLM priemer {1000 * statistics.fmean(casy):.0f} ms, "
+                  f"zhodné výsledky {spravne}/{len(otazky)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rozpocet", type=int, default=ROZPOCET_TOKENOV_SCHEMY, help="Rozpočet tokenov pre popis schémy")
+    parser.add_argument("--llm", action="store_true", help="Zmerať aj latenciu a presnosť LLM (vyžaduje GROQ_API_KEY)")
+    args = parser.parse_args()
+
+    # Schéma aplikácie zo živej databázy (ak je dostupná), inak z YAML
+    kontext = asyncio.run(kontext_aplikacie.priprav(poskytovatel_db.ziskaj()))
+    if kontext.index is None:
+        print("Popis schémy nie je dostupný.")
+        return
+
+    otazky = nacitaj_otazky(kontext)
+    offline_porovnanie(kontext, otazky, args.rozpocet)
+    if args.llm:
+        print()
+        asyncio.run(llm_porovnanie(kontext, otazky, args.rozpocet))
+
+
+if __name__ == "__main__":
+    main()
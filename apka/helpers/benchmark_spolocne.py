@@ -0,0 +1,66 @@
+"""Spoločné pomôcky pre benchmarky nad knižničnou databázou."""
+
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from apka.helpers.vytvor_velku_db import POBOCKY, POUZIVATELIA, KNIHY, vytvor_tabulky, vloz_vzorove_data
+
+
+def vytvor_benchmark_databazu(pocet_vypoziciek: int = 50_000, cesta: str | None = None) -> str:
+    """Vytvorí knižničnú SQLite databázu s daným počtom výpožičiek a vráti cestu k nej."""
+    if cesta is None:
+        cesta = os.path.join(tempfile.mkdtemp(prefix="apka_benchmark_"), "kniznica.db")
+    if os.path.exists(cesta):
+        os.remove(cesta)
+
+    random.seed(42)
+    spojenie = sqlite3.connect(cesta)
+    try:
+        kurzor = spojenie.cursor()
+        vytvor_tabulky(kurzor)
+        vloz_vzorove_data(kurzor)
+
+        zaciatok = datetime.now() - timedelta(days=365)
+        stavy = ["požičaná", "vrátená", "vrátená", "prekročená"]
+        kurzor.executemany(
+            "INSERT INTO vypozicky (id_pouzivatela, id_knihy, id_pobocky, datum_vypozicky, predpokladany_datum_vratenia, stav) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    random.randint(1, len(POUZIVATELIA)),
+                    random.randint(1, len(KNIHY)),
+                    random.randint(1, len(POBOCKY)),
+                    (zaciatok + timedelta(minutes=i)).isoformat(sep=" "),
+                    (zaciatok + timedelta(minutes=i, days=21)).isoformat(sep=" "),
+                    random.choice(stavy),
+                )
+                for i in range(pocet_vypoziciek)
+            ),
+        )
+        spojenie.commit()
+    finally:
+        spojenie.close()
+    return cesta
+
+
+def percentil(hodnoty: List[float], p: float) -> float:
+    """Vráti p-ty percentil (0-100) zo zoznamu hodnôt."""
+    if not hodnoty:
+        return 0.0
+    zoradene = sorted(hodnoty)
+    index = min(len(zoradene) - 1, max(0, round(p / 100 * (len(zoradene) - 1))))
+    return zoradene[index]
+
+
+def zhrn_casy(casy_s: List[float]) -> Dict[str, float]:
+    """Zhrnie namerané časy (v sekundách) do priemeru a percentilov v milisekundách."""
+    return {
+        "priemer_ms": statistics.fmean(casy_s) * 1000 if casy_s else 0.0,
+        "p50_ms": percentil(casy_s, 50) * 1000,
+        "p95_ms": percentil(casy_s, 95) * 1000,
+        "max_ms": max(casy_s) * 1000 if casy_s else 0.0,
+    }
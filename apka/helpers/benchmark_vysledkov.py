@@ -0,0 +1,132 @@
+"""
+Benchmark reprezentácie výsledku dotazu: slovník pre každý riadok vs. `StlpcovyVysledok`.
+
+Pre každú veľkosť výsledku (riadky v tvare výpožičiek: id, id_knihy, dátum, stav, pokuta)
+zmeria pamäť držaného výsledku a špičku pamäte (tracemalloc) a CPU čas zostavenia výsledku
+z dávok n-tíc kurzora (ako pri `fetchmany`) a jeho prevodu na markdown a JSON.
+
+Použitie:
+    python -m apka.helpers.benchmark_vysledkov
+    python -m apka.helpers.benchmark_vysledkov --riadky 10000 100000 1000000
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+
+STLPCE = ["id", "id_knihy", "datum_vypozicky", "stav", "pokuta"]
+VELKOST_DAVKY = 1000
+
+
+def vygeneruj_riadky(pocet: int) -> list:
+    """N-tice v tvare, v akom ich vracia `fetchmany` pre tabuľku výpožičiek."""
+    random.seed(12)
+    zaciatok = datetime(2024, 1, 1)
+    stavy = ["požičaná", "vrátená", "prekročená"]
+    return [
+        (
+            i,
+            random.randint(1, 5000),
+            (zaciatok + timedelta(minutes=i)).isoformat(sep=" "),
+            random.choice(stavy),
+            round(random.random() * 5, 2) if i % 4 == 0 else None,
+        )
+        for i in range(pocet)
+    ]
+
+
+def davky(riadky):
+    for zaciatok in range(0, len(riadky), VELKOST_DAVKY):
+        yield riadky[zaciatok:zaciatok + VELKOST_DAVKY]
+
+
+def slovniky_zostav(riadky):
+    vysledok = []
+    for davka in davky(riadky):
+        vysledok.extend(dict(zip(STLPCE, riadok)) for riadok in davka)
+    return vysledok
+
+
+def stlpcovy_zostav(riadky):
+    vysledok = StlpcovyVysledok(STLPCE)
+    for davka in davky(riadky):
+        vysledok.pridaj_riadky(davka)
+    return vysledok
+
+
+def slovniky_markdown(vysledok) -> str:
+    hlavicka = "| " + " | ".join(f"**{stlpec}**" for stlpec in STLPCE) + " |"
+    oddelovac = "|" + "|".join("---" for _ in STLPCE) + "|"
+    return "\n".join([hlavicka, oddelovac] + ["| " + " | ".join(str(h) for h in r.values()) + " |" for r in vysledok])
+
+
+def slovniky_json(vysledok) -> str:
+    return json.dumps(vysledok, ensure_ascii=False)
+
+
+VARIANTY = {
+    "slovník/riadok": (slovniky_zostav, slovniky_markdown, slovniky_json, None),
+    "stĺpcový": (
+        stlpcovy_zostav,
+        lambda vysledok: vysledok.do_markdown(),
+        lambda vysledok: vysledok.do_json(),
+        lambda vysledok: vysledok.do_json(po_stlpcoch=True),
+    ),
+}
+
+
+def zmeraj_pamat(zostav, riadky) -> tuple:
+    """Vráti (MB držané výsledkom, MB špička pri zostavení)."""
+    gc.collect()
+    tracemalloc.start()
+    vysledok = zostav(riadky)
+    drzane, spicka = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vysledok
+    return drzane / 2**20, spicka / 2**20
+
+
+def zmeraj_cas(funkcia, *argumenty) -> tuple:
+    """Vráti (CPU ms, výsledok) funkcie."""
+    gc.collect()
+    zaciatok = time.process_time()
+    vysledok = funkcia(*argumenty)
+    return 1000 * (time.process_time() - zaciatok), vysledok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--riadky", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Veľkosti výsledku")
+    args = parser.parse_args()
+
+    print(
+        f"{'riadky':>9} {'variant':<15} {'pamäť MB':>9} {'špička MB':>10} {'zostav ms':>10} {'markdown ms':>12}"
+        f" {'JSON ms':>9} {'JSON po stĺpcoch ms':>20}"
+    )
+    for pocet in args.riadky:
+        riadky = vygeneruj_riadky(pocet)
+        vystupy = {}
+        for nazov, (zostav, markdown, do_json, do_json_stlpce) in VARIANTY.items():
+            drzane, spicka = zmeraj_pamat(zostav, riadky)
+            cas_zostavenia, vysledok = zmeraj_cas(zostav, riadky)
+            cas_markdown, tabulka = zmeraj_cas(markdown, vysledok)
+            cas_json, data_json = zmeraj_cas(do_json, vysledok)
+            cas_json_stlpce = f"{zmeraj_cas(do_json_stlpce, vysledok)[0]:.0f}" if do_json_stlpce else "-"
+            vystupy[nazov] = (tabulka, data_json)
+            del vysledok, tabulka, data_json
+            print(
+                f"{pocet:>9,} {nazov:<15} {drzane:>9.1f} {spicka:>10.1f} {cas_zostavenia:>10.0f} {cas_markdown:>12.0f}"
+                f" {cas_json:>9.0f} {cas_json_stlpce:>20}"
+            )
+        # Obe reprezentácie musia dať rovnaký markdown aj JSON
+        assert len({vystup for vystup in vystupy.values()}) == 1, "Výstupy variantov sa líšia"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Poradca indexov nad zaznamenanou záťažou dotazov.
+
+Načíta záťaž, ktorú aplikácia zaznamenáva pri vykonávaní SQL (`scratchpad/zataz_dotazov.json`),
+nájde opakované úplné prehľadávania tabuliek a dočasné B-stromy a navrhne CREATE INDEX
+s odhadom prínosu. S prepínačom --aplikuj indexy vytvorí a zmeria dotazy pred a po.
+
+S prepínačom --demo vytvorí testovaciu knižničnú databázu, prehrá nad ňou typické dotazy
+(JOIN cez id_autora/id_pouzivatela, rozsahy dátumov) a poradcu spustí nad touto záťažou.
+
+Použitie:
+    python -m apka.helpers.navrhni_indexy
+    python -m apka.helpers.navrhni_indexy --aplikuj
+    python -m apka.helpers.navrhni_indexy --demo --vypozicky 200000 --aplikuj
+"""
+
+import argparse
+import random
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import PripojenieDatabazy
+from apka.utils.poradca_indexov import PoradcaIndexov, poradca_indexov, zmeraj_a_aplikuj
+
+# Typické dotazy, aké generuje LLM nad knižničnou schémou ({} sa nahradí náhodnou hodnotou)
+DEMO_DOTAZY = [
+    "SELECT k.nazov, COUNT(v.id) AS pocet FROM knihy k JOIN vypozicky v ON v.id_knihy = k.id "
+    "WHERE k.id_autora = {autor} GROUP BY k.id, k.nazov ORDER BY pocet DESC",
+    "SELECT v.id, k.nazov, v.datum_vypozicky FROM vypozicky v JOIN knihy k ON v.id_knihy = k.id "
+    "WHERE v.id_pouzivatela = {pouzivatel} ORDER BY v.datum_vypozicky DESC",
+    "SELECT COUNT(*) FROM vypozicky WHERE datum_vypozicky >= date('now', '-{dni} days')",
+    "SELECT stav, COUNT(*) FROM vypozicky WHERE id_pobocky = {pobocka} GROUP BY stav",
+    "SELECT u.nazov, u.datum_zaciatku FROM udalosti u WHERE u.id_pobocky = {pobocka} ORDER BY u.datum_zaciatku",
+]
+
+
+def prehraj_demo_zataz(spojenie: PripojenieDatabazy, pocet: int) -> None:
+    random.seed(7)
+    for _ in range(pocet):
+        dotaz = random.choice(DEMO_DOTAZY).format(
+            autor=random.randint(1, 15),
+            pouzivatel=random.randint(1, 20),
+            dni=random.choice([7, 30, 90]),
+            pobocka=random.randint(1, 5),
+        )
+        spojenie.vykonaj_dotaz(dotaz)
+
+
+def vypis_navrhy(navrhy) -> None:
+    if not navrhy:
+        print("Žiadne návrhy indexov: záťaž neobsahuje opakované úplné prehľadávania, ktorým by index pomohol.")
+        return
+    for poradie, navrh in enumerate(navrhy, start=1):
+        print(f"{poradie}. {navrh['sql']}")
+        print(f"   odhad prínosu: {navrh['odhad_prinosu']:,.0f} ušetrených riadkov, "
+              f"čas dotazov v záťaži {1000 * navrh['cas_dotazov_s']:.0f} ms, dotazov: {len(navrh['dotazy'])}")
+        for dovod in navrh["dovody"]:
+            print(f"   - {dovod}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--demo", action="store_true", help="Vytvoriť testovaciu DB a prehrať ukážkovú záťaž")
+    parser.add_argument("--vypozicky", type=int, default=100_000, help="Počet výpožičiek v testovacej DB (--demo)")
+    parser.add_argument("--dotazy", type=int, default=200, help="Počet dotazov ukážkovej záťaže (--demo)")
+    parser.add_argument("--min-vykonani", type=int, default=2, help="Ignorovať dotazy vykonané menej krát")
+    parser.add_argument("--aplikuj", action="store_true", help="Vytvoriť navrhnuté indexy a zmerať dotazy pred/po")
+    parser.add_argument("--opakovani", type=int, default=5, help="Počet opakovaní merania pred/po")
+    args = parser.parse_args()
+
+    if args.demo:
+        spojenie = PripojenieDatabazy()
+        spojenie.pripoj(KonfiguraciaDatabazy(
+            dialekt="sqlite",
+            databaza=vytvor_benchmark_databazu(args.vypozicky),
+            cache_vysledkov_max_poloziek=0,
+            strazca_politika="vypnuty",
+        ))
+        # Samostatný poradca len v pamäti, aby demo nezmiešalo záťaž aplikácie
+        poradca = PoradcaIndexov()
+        spojenie.poradca_indexov = poradca
+        prehraj_demo_zataz(spojenie, args.dotazy)
+    else:
+        from apka.settings.databaza import poskytovatel_db
+        spojenie = poskytovatel_db.ziskaj()
+        poradca = poradca_indexov
+        if not spojenie:
+            print("Databáza nie je dostupná.")
+            return
+
+    navrhy = poradca.navrhni(spojenie.engine, min_vykonani=args.min_vykonani)
+    vypis_navrhy(navrhy)
+
+    if args.aplikuj and navrhy:
+        print("\nVytváram indexy a meriam dotazy pred/po:")
+        for vysledok in zmeraj_a_aplikuj(spojenie.engine, navrhy, args.opakovani):
+            zrychlenie = vysledok["pred_ms"] / vysledok["po_ms"] if vysledok["po_ms"] else float("inf")
+            print(f"  {vysledok['sql']}\n    {vysledok['pred_ms']:.1f} ms → {vysledok['po_ms']:.1f} ms ({zrychlenie:.1f}×)")
+
+
+if __name__ == "__main__":
+    main()
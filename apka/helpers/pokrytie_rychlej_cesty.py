@@ -0,0 +1,89 @@
+"""
+Pokrytie a latencia rýchlej cesty (rozpoznávanie častých otázok bez volania LLM).
+
+Otázky (zo súboru, jedna na riadok, alebo vstavaná vzorka) sa pošlú do `RychlaCesta` nad
+knižničnou benchmark databázou. Rozpoznané otázky sa hneď vykonajú; vypíše sa podiel otázok
+obslúžených rýchlou cestou, latencia rozpoznania a vykonania a zoznam nerozpoznaných otázok,
+ktoré by prepadli na generovanie cez LLM.
+
+Použitie:
+    python -m apka.helpers.pokrytie_rychlej_cesty --otazky otazky.txt
+"""
+
+import argparse
+import asyncio
+import time
+
+from apka.helpers.benchmark_spolocne import vytvor_benchmark_databazu, zhrn_casy
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import AsyncPripojenieDatabazy
+from apka.utils.rychla_cesta import RychlaCesta
+from apka.utils.schema_helper import nacitaj_data_schemy
+
+VZORKA_OTAZOK = [
+    "Koľko kníh má autor Dominik Tatarka?",
+    "Aké knihy napísala Margita Figuli?",
+    "Top 5 autorov podľa výpožičiek",
+    "Ktorých desať kníh je najpožičiavanejších?",
+    "Traja najaktívnejší čitatelia",
+    "Koľko výpožičiek bolo za posledný mesiac?",
+    "Ukáž výpožičky za posledných 7 dní",
+    "Koľko kníh má autor Hviezdoslav?",
+    "Ktoré pobočky majú najviac prekročených výpožičiek?",
+    "Priemerný počet strán kníh podľa žánru",
+    "Ktorí používatelia z Bratislavy si nevrátili knihu včas?",
+    "Porovnaj výpožičky tento a minulý rok podľa pobočiek",
+]
+
+
+async def zmeraj(otazky, cesta: str) -> None:
+    spojenie = AsyncPripojenieDatabazy()
+    spojenie.pripoj(KonfiguraciaDatabazy(
+        dialekt="sqlite", databaza=cesta,
+        cache_vysledkov_max_poloziek=0, strazca_politika="vypnuty", poradca_indexov=False,
+    ))
+    rychla_cesta = RychlaCesta(tabulky=(nacitaj_data_schemy() or {}).get("tables"))
+    casy_rozpoznania, casy_vykonania, nerozpoznane, chyby = [], [], [], 0
+    for otazka in otazky:
+        zaciatok = time.perf_counter()
+        sql_dotaz = await rychla_cesta.najdi(otazka, spojenie)
+        casy_rozpoznania.append(time.perf_counter() - zaciatok)
+        if sql_dotaz is None:
+            nerozpoznane.append(otazka)
+            continue
+        zaciatok = time.perf_counter()
+        vysledok = await spojenie.vykonaj_dotaz_async(sql_dotaz.dotaz, parametre=sql_dotaz.parametre)
+        casy_vykonania.append(time.perf_counter() - zaciatok)
+        chyby += "error" in vysledok
+    await spojenie.zatvor_async()
+
+    statistiky = rychla_cesta.statistiky()
+    rozpoznanie, vykonanie = zhrn_casy(casy_rozpoznania), zhrn_casy(casy_vykonania)
+    print(f"pokrytie     {statistiky['pokrytie']:.0%} ({statistiky['zasahy']}/{len(otazky)} otázok), chyby {chyby}")
+    print(f"rozpoznanie  p50 {rozpoznanie['p50_ms']:>7.3f} ms  p95 {rozpoznanie['p95_ms']:>7.3f} ms")
+    if casy_vykonania:
+        print(f"vykonanie    p50 {vykonanie['p50_ms']:>7.3f} ms  p95 {vykonanie['p95_ms']:>7.3f} ms")
+    print(f"zámery       {statistiky['zamery']}")
+    if nerozpoznane:
+        print("\nNerozpoznané (idú cez LLM):")
+        for otazka in nerozpoznane:
+            print(f"  - {otazka}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--otazky", help="Súbor s otázkami, jedna na riadok (predvolene vstavaná vzorka)")
+    parser.add_argument("--vypozicky", type=int, default=20_000, help="Počet výpožičiek v testovacej DB")
+    args = parser.parse_args()
+
+    if args.otazky:
+        with open(args.otazky, "r", encoding="utf-8") as f:
+            otazky = [riadok.strip() for riadok in f if riadok.strip()]
+    else:
+        otazky = VZORKA_OTAZOK
+
+    asyncio.run(zmeraj(otazky, vytvor_benchmark_databazu(args.vypozicky)))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,12 @@ load_dotenv()
 
 # Import nástrojov - predpokladáme, že tento import zostáva alebo bude upravený
 from apka.custom_nastroje import nastroje
+from apka.custom_nastroje.databaza import zrus_pracu_relacie
+from apka.settings.databaza import db_konfiguracia, poskytovatel_db
+from apka.utils.metriky_llm import metriky_llm
+from apka.utils.nahravanie_http import nahravac_http
+from chainlit.server import app as chainlit_app
+from fastapi.responses import PlainTextResponse
 
 # --- Helper funkcia na maskovanie kľúčov ---
 def mask_api_key(api_key: str | None) -> str:
@@ -35,7 +41,7 @@ def mask_api_key(api_key: str | None) -> str:
 # --- Removed OpenAI Cost Fetching ---
 
 # Placeholder for Ultravox API Key and Endpoint - replace with actual values from .env
-ULTRAVOX_API_KEY = os.getenv("ULTRAVOX_API_KEY", "YOUR_ULTRAVOX_API_KEY_HERE") # Replace placeholder if needed
+ULTRAVOX_API_KEY = nahravac_http.api_kluc("ULTRAVOX_API_KEY") or "YOUR_ULTRAVOX_API_KEY_HERE" # Replace placeholder if needed
 ULTRAVOX_API_ENDPOINT = os.getenv("ULTRAVOX_API_ENDPOINT", "https://api.ultravox.ai/api/calls") # Default endpoint
 
 # --- Helper function for REST API call ---
@@ -98,7 +104,8 @@ def create_ultravox_call_session(api_key: str, endpoint_url: str, tools_config:
     logger.info(f"Creating Ultravox call with payload: {json.dumps(payload, indent=2)}")
 
     try:
-        response = requests.post(endpoint_url, headers=headers, json=payload, timeout=15)
+        # Session through the HTTP recorder (record/replay when HTTP_NAHRAVANIE is set)
+        response = nahravac_http.requests_session("ultravox").post(endpoint_url, headers=headers, json=payload, timeout=15)
         response.raise_for_status()
         data = response.json()
         join_url = data.get("joinUrl")
@@ -126,6 +133,26 @@ def create_ultravox_call_session(api_key: str, endpoint_url: str, tools_config:
 # --- End Helper function ---
 
 
+# --- Metriky LLM ---
+def metriky_endpoint() -> str:
+    """Metriky volaní LLM (latencia, TTFT, tokeny, opakovania, náklady, plánovač) vo formáte Prometheus."""
+    return metriky_llm.prometheus()
+
+
+chainlit_app.add_api_route("/metriky", metriky_endpoint, methods=["GET"], response_class=PlainTextResponse)
+# Chainlit obsluhuje všetky ostatné GET cesty frontendom, vlastná cesta preto musí byť pred ním
+chainlit_app.router.routes.insert(0, chainlit_app.router.routes.pop())
+
+
+@cl.on_app_startup
+async def on_app_startup():
+    """Spustí pravidelný súhrn metrík LLM do logu a zahriatie pripojenia k databáze na pozadí."""
+    metriky_llm.spusti_suhrn()
+    # Pri štarte servera, nie pri importe (import nastavení databázy sa nikam nepripája)
+    if db_konfiguracia.zahriatie_s >= 0:
+        poskytovatel_db.zahrej(db_konfiguracia.zahriatie_s)
+
+
 # Store join_url in session for connect button
 def store_join_url(join_url: str | None):
     if join_url:
@@ -387,6 +414,11 @@ async def on_audio_chunk(chunk: cl.InputAudioChunk):
 async def on_end():
     """Handles end events, leaves the Ultravox call if connected."""
     logger.info("Received end event (audio/chat/stop).")
+    # Najprv prerušiť bežiace DB dotazy a generovanie SQL, aby nedržali spojenia
+    try:
+        await zrus_pracu_relacie()
+    except Exception as e:
+        logger.error(f"Error cancelling in-flight SQL work: {e}")
     session: uv.UltravoxSession = cl.user_session.get("ultravox_session")
     # Only try to leave if session exists and might be connected
     if session and session.status != uv.UltravoxSessionStatus.DISCONNECTED:
@@ -1,6 +1,6 @@
 """Pydantic modely pre konfiguráciu databázy."""
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class KonfiguraciaDatabazy(BaseModel):
@@ -30,3 +30,135 @@ class KonfiguraciaDatabazy(BaseModel):
         ...,
         description="Názov databázy",
     )
+    max_vlakien: int = Field(
+        4,
+        description="Maximálny počet vlákien pre súbežné vykonávanie dotazov mimo event loopu",
+    )
+    velkost_stranky: int = Field(
+        50,
+        description="Počet riadkov v jednej dávke/strane výsledku (fetchmany)",
+    )
+    necinnost_strankovania_s: float = Field(
+        120,
+        description="Rozpracované stránkovanie bez načítania ďalšej strany sa po toľkých sekundách zatvorí a uvoľní spojenie (0 = bez limitu)",
+    )
+    max_riadkov: int = Field(
+        10000,
+        description="Tvrdý limit počtu riadkov načítaných pre jeden dotaz",
+    )
+    max_pamat_mb: float = Field(
+        64,
+        description="Približný limit pamäte (MB) pre riadky načítané pre jeden dotaz",
+    )
+    cache_vysledkov_max_poloziek: int = Field(
+        256,
+        description="Maximálny počet výsledkov v cache dotazov (0 = cache vypnutá)",
+    )
+    cache_vysledkov_max_riadkov: int = Field(
+        5000,
+        description="Maximálny počet riadkov jedného výsledku, ktorý sa ešte uloží do cache",
+    )
+    cache_prikazov_max_poloziek: int = Field(
+        256,
+        description="Počet SQL šablón, ktorých pripravené príkazy sa držia pre opakované použitie s inými parametrami (0 = bez cache)",
+    )
+    poradca_indexov: bool = Field(
+        True,
+        description="Zaznamenávať čítacie dotazy a ich plány pre poradcu indexov",
+    )
+    timeout_dotazu_s: float = Field(
+        30,
+        description="Časový limit (s) jednej DB operácie (vykonanie dotazu / načítanie dávky), 0 = bez limitu",
+    )
+    strazca_politika: str = Field(
+        "potvrdit",
+        description="Politika pri drahom dotaze podľa EXPLAIN: 'odmietnut', 'obmedzit' (pridá LIMIT), 'potvrdit' alebo 'vypnuty'",
+    )
+    strazca_max_naklady: float = Field(
+        10_000_000,
+        description="Limit odhadovaných nákladov dotazu (SQLite: prečítané riadky, PostgreSQL: jednotky plánovača)",
+    )
+    strazca_max_riadkov: float = Field(
+        1_000_000,
+        description="Limit odhadovaného počtu riadkov výsledku dotazu podľa plánu",
+    )
+    strazca_limit_riadkov: int = Field(
+        1000,
+        description="LIMIT, ktorý strážca pridá k drahému dotazu pri politike 'obmedzit'",
+    )
+    prah_suboru_riadkov: int = Field(
+        500,
+        description="Výsledok s viac riadkami sa zapíše do súboru a v chate sa zobrazí len ukážka (0 = vypnuté)",
+    )
+    format_suboru: str = Field(
+        "csv",
+        description="Formát súboru s veľkým výsledkom: 'csv' alebo 'parquet' (vyžaduje pyarrow)",
+    )
+    max_riadkov_suboru: int = Field(
+        1_000_000,
+        description="Limit počtu riadkov zapísaných do súboru s výsledkom",
+    )
+    adresar_vysledkov: str = Field(
+        "scratchpad/vysledky",
+        description="Adresár pre súbory s veľkými výsledkami",
+    )
+    pool_velkost: int = Field(
+        5,
+        description="Počet trvalo otvorených spojení v pool-e",
+    )
+    pool_max_navyse: int = Field(
+        10,
+        description="Počet spojení, ktoré pool otvorí nad `pool_velkost` pri špičke (napr. otvorené stránkovania)",
+    )
+    pool_timeout_s: float = Field(
+        30,
+        description="Ako dlho (s) čakať na voľné spojenie z pool-u",
+    )
+    pool_recyklacia_s: int = Field(
+        1800,
+        description="Spojenie staršie ako tento počet sekúnd sa pred použitím nahradí novým (-1 = nikdy)",
+    )
+    pool_pre_ping: bool = Field(
+        True,
+        description="Pred vydaním spojenia z pool-u overiť, či je živé (odolnosť voči reštartu servera)",
+    )
+    sqlite_wal: bool = Field(
+        True,
+        description="SQLite: journal_mode=WAL (čitatelia neblokujú zapisovateľa a naopak)",
+    )
+    sqlite_synchronous: str = Field(
+        "NORMAL",
+        description="SQLite: PRAGMA synchronous (NORMAL je s WAL bezpečné a rýchlejšie ako FULL)",
+    )
+    sqlite_mmap_mb: int = Field(
+        256,
+        description="SQLite: PRAGMA mmap_size v MB (0 = vypnuté)",
+    )
+    sqlite_cache_mb: int = Field(
+        64,
+        description="SQLite: veľkosť page cache jedného spojenia v MB (PRAGMA cache_size)",
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        5000,
+        description="SQLite: ako dlho čakať na uzamknutú databázu pred chybou (PRAGMA busy_timeout)",
+    )
+    repliky: List[str] = Field(
+        default_factory=list,
+        description="Repliky na čítanie: 'hostitel[:port]' (rovnaké prihlasovacie údaje a databáza ako primárna), pre SQLite cesta k súboru",
+    )
+    replika_pauza_s: float = Field(
+        30,
+        description="Ako dlho (s) sa nedostupná replika vynecháva, kým sa na ňu znova skúsi pripojiť",
+    )
+    pripojenie_pauza_s: float = Field(
+        1,
+        description="Odstup (s) pred ďalším pokusom o pripojenie po neúspechu; po každom ďalšom neúspechu sa zdvojnásobí",
+    )
+    pripojenie_max_pauza_s: float = Field(
+        60,
+        description="Najdlhší odstup (s) medzi pokusmi o pripojenie",
+    )
+    zahriatie_s: float = Field(
+        0,
+        description="Za koľko sekúnd po štarte sa pripojiť na pozadí (záporné = až pri prvom dotaze)",
+    )
@@ -1,13 +1,22 @@
 """Pydantic modely pre SQL operácie."""
 
+from typing import Any, Dict
+
 from pydantic import BaseModel, Field
 
 class SQLDotaz(BaseModel):
-    """SQL dotaz vygenerovaný z prirodzeného jazyka."""
+    """
+    SQL dotaz vygenerovaný z prirodzeného jazyka: šablóna s viazanými parametrami (`:nazov`)
+    a ich hodnoty. Rovnaká šablóna s inými hodnotami je pre databázu ten istý príkaz.
+    """
 
     dotaz: str = Field(
         ...,
-        description="SQL dotaz na vykonanie",
+        description="SQL dotaz na vykonanie; konkrétne hodnoty z otázky (čísla, roky, mená, dátumy) zapíšte ako parametre :nazov",
+    )
+    parametre: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Hodnoty parametrov dotazu podľa názvu (bez dvojbodky), napr. {\"rok\": 1959}",
     )
     vysvetlenie: str = Field(
         ...,
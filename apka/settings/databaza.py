@@ -1,45 +1,470 @@
 """Správa konfigurácie a pripojenia k databáze."""
 
+import asyncio
+import json
 import os
-from typing import Any, Dict, Optional, Tuple
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Generator, Iterator, List, Optional, Set, Tuple
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.util import await_only
 from apka.widgets.spolocne import zapisovac
 from apka.models.db_models import KonfiguraciaDatabazy
 from apka.utils.db_utils import INFO_O_DIALEKTE
+from apka.utils.poradca_indexov import poradca_indexov
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+from apka.utils.strazca_dotazov import StrazcaDotazov
 
 
-class PripojenieDatabazy:
-    """Spravuje databázové pripojenia a operácie."""
+def normalizuj_sql(dotaz: str) -> str:
+    """Zjednotí biele znaky mimo reťazcových literálov a odstráni koncovú bodkočiarku."""
+    casti = re.split(r"('(?:[^']|'')*')", dotaz.strip().rstrip(";").strip())
+    return "".join(cast if cast.startswith("'") else re.sub(r"\s+", " ", cast) for cast in casti)
+
+
+def vloz_parametre(dotaz: str, parametre: Optional[Dict[str, Any]], dialekt) -> str:
+    """
+    SQL šablóna s hodnotami parametrov vloženými ako literály daného dialektu (napr. pre poradcu indexov).
+    Ak sa hodnoty vložiť nedajú (chýbajúci parameter, nepodporovaný typ), vráti šablónu.
+    """
+    if not parametre:
+        return dotaz
+    try:
+        prikaz = text(dotaz)
+        if set(prikaz._bindparams) - set(parametre):
+            # Chýbajúci parameter by sa vložil ako NULL a plán by nezodpovedal skutočnému dotazu
+            return dotaz
+        prikaz = prikaz.bindparams(**{nazov: hodnota for nazov, hodnota in parametre.items() if nazov in prikaz._bindparams})
+        return str(prikaz.compile(dialect=dialekt, compile_kwargs={"literal_binds": True}))
+    except Exception:
+        return dotaz
+
+
+# Identifikátor tabuľky, voliteľne so schémou (`public.knihy`, `"kniznica"."knihy"`)
+_IDENTIFIKATOR = r"[\"`\[]?\w+[\"`\]]?(?:\s*\.\s*[\"`\[]?\w+[\"`\]]?)*"
+_TOKEN_SQL = re.compile(rf"'(?:[^']|'')*'|\(|\)|,|;|{_IDENTIFIKATOR}")
+# Kľúčové slová, za ktorými nasleduje tabuľka (FROM a UPDATE začínajú zoznam oddelený čiarkami)
+_PRED_TABULKOU = {"from", "join", "update", "into", "table"}
+# Kľúčové slová, ktoré ukončujú zoznam tabuliek za FROM/UPDATE
+_KONIEC_ZOZNAMU = {
+    "where", "group", "order", "having", "limit", "offset", "fetch", "union", "except", "intersect",
+    "window", "returning", "set", "values", "select", "for",
+}
+_NIE_TABULKA = {"lateral", "only"}
+# Cieľová tabuľka zapisujúceho príkazu
+_CIEL_ZAPISU = re.compile(
+    r"\s*(?:insert(?:\s+or\s+\w+)?\s+into|replace\s+into|update(?:\s+or\s+\w+)?|delete\s+from|merge\s+into"
+    rf"|truncate(?:\s+table)?|(?:alter|drop)\s+table(?:\s+if\s+exists)?)\s+(?:only\s+)?({_IDENTIFIKATOR})",
+    flags=re.IGNORECASE,
+)
+
+
+def _nazov_tabulky(identifikator: str) -> str:
+    """Názov tabuľky bez schémy a úvodzoviek, malými písmenami."""
+    return re.sub(r"[\"`\[\]\s]", "", identifikator).split(".")[-1].lower()
+
+
+def tabulky_v_dotaze(dotaz: str) -> Set[str]:
+    """
+    Vráti názvy tabuliek (bez schémy), na ktoré SQL dotaz odkazuje: za FROM/JOIN/UPDATE/INTO/TABLE
+    vrátane zoznamov oddelených čiarkami (`FROM autori a, knihy k`) a tabuliek v poddotazoch.
+    """
+    tabulky: Set[str] = set()
+    hlbka = 0
+    # Pre každú úroveň zátvoriek: čaká sa názov tabuľky / sme v zozname tabuliek za FROM či UPDATE
+    ocakava_tabulku: Dict[int, bool] = {}
+    v_zozname: Dict[int, bool] = {}
+    for zhoda in _TOKEN_SQL.finditer(dotaz):
+        token = zhoda.group(0)
+        male = token.lower()
+        if token == "(":
+            ocakava_tabulku[hlbka] = False
+            hlbka += 1
+        elif token == ")":
+            ocakava_tabulku.pop(hlbka, None)
+            v_zozname.pop(hlbka, None)
+            hlbka = max(hlbka - 1, 0)
+        elif token == ",":
+            ocakava_tabulku[hlbka] = v_zozname.get(hlbka, False)
+        elif token == ";" or token.startswith("'"):
+            ocakava_tabulku[hlbka] = False
+        elif male in _PRED_TABULKOU:
+            ocakava_tabulku[hlbka] = True
+            if male in ("from", "update"):
+                v_zozname[hlbka] = True
+        elif male in _KONIEC_ZOZNAMU:
+            ocakava_tabulku[hlbka] = v_zozname[hlbka] = False
+        elif ocakava_tabulku.get(hlbka) and male not in _NIE_TABULKA:
+            tabulky.add(_nazov_tabulky(token))
+            ocakava_tabulku[hlbka] = False
+    return tabulky
+
+
+def ciel_zapisu(dotaz: str) -> Optional[str]:
+    """Tabuľka, do ktorej zapisujúci príkaz zapisuje (INSERT/UPDATE/DELETE/...), alebo None, ak sa nedá určiť."""
+    zhoda = _CIEL_ZAPISU.match(dotaz)
+    return _nazov_tabulky(zhoda.group(1)) if zhoda else None
+
+
+def sqlite_pragmy(konfiguracia: KonfiguraciaDatabazy, replika: bool = False) -> List[str]:
+    """
+    PRAGMA príkazy, ktoré sa vykonajú na každom novom SQLite spojení. Replika je otvorená len
+    na čítanie, režim žurnálu jej preto nenastavujeme (je uložený v súbore).
+    """
+    pragmy = [
+        f"PRAGMA busy_timeout = {int(konfiguracia.sqlite_busy_timeout_ms)}",
+        f"PRAGMA cache_size = {-1024 * int(konfiguracia.sqlite_cache_mb)}",  # záporné = KiB
+        f"PRAGMA mmap_size = {1024 * 1024 * int(konfiguracia.sqlite_mmap_mb)}",
+        f"PRAGMA synchronous = {konfiguracia.sqlite_synchronous.upper()}",
+    ]
+    if konfiguracia.sqlite_wal and not replika:
+        pragmy.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmy
+
+
+def je_citaci_dotaz(dotaz: str) -> bool:
+    """Rozhodne, či dotaz len číta dáta (SELECT/WITH bez zapisujúcich príkazov)."""
+    return bool(re.match(r"\s*(select|with)\b", dotaz, flags=re.IGNORECASE)) and not re.search(
+        r"\b(insert|update|delete|replace|merge|create|drop|alter|truncate)\b", dotaz, flags=re.IGNORECASE
+    )
+
+
+def je_dotaz_pre_repliku(dotaz: str) -> bool:
+    """
+    Rozhodne, či môže dotaz ísť na repliku: čítací dotaz bez zamykania riadkov (FOR UPDATE/SHARE)
+    a bez funkcií, ktoré menia stav servera (sekvencie, advisory zámky).
+    """
+    return je_citaci_dotaz(dotaz) and not re.search(
+        r"\bfor\s+(?:no\s+key\s+)?(?:key\s+)?(?:update|share)\b|\b(?:nextval|setval|pg_advisory\w*|get_lock)\s*\(",
+        dotaz,
+        flags=re.IGNORECASE,
+    )
+
+
+class CacheVysledkov:
+    """
+    LRU cache výsledkov SELECT dotazov kľúčovaná normalizovaným SQL a hodnotami parametrov.
+    Položka je platná, kým sa nezmení verzia dát: počítadlá zmien dotknutých tabuliek
+    (zvyšuje ich každý zapisujúci dotaz cez `vykonaj_dotaz`) a pri SQLite aj `PRAGMA data_version`.
+    """
+
+    def __init__(self, max_poloziek: int = 256, max_riadkov_polozky: int = 5000):
+        self.max_poloziek = max_poloziek
+        self.max_riadkov_polozky = max_riadkov_polozky
+        self._zamok = threading.Lock()
+        self._polozky: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pocitadla_tabuliek: Dict[str, int] = {}
+        self._globalna_verzia = 0
+        self._statistiky = {"zasahy": 0, "minutia": 0, "zneplatnenia": 0, "vyradenia": 0}
+
+    def _verzia_tabuliek(self, tabulky: Set[str]) -> Dict[str, int]:
+        return {tabulka: self._pocitadla_tabuliek.get(tabulka, 0) for tabulka in tabulky}
+
+    @staticmethod
+    def _kluc(dotaz: str, parametre: Optional[Dict[str, Any]]) -> str:
+        kluc = normalizuj_sql(dotaz)
+        return f"{kluc}|{json.dumps(parametre, sort_keys=True, default=str)}" if parametre else kluc
+
+    def najdi(self, dotaz: str, verzia_dat: int, parametre: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Vráti uložený výsledok dotazu, ak sa odvtedy nezmenili dáta, inak None."""
+        kluc = self._kluc(dotaz, parametre)
+        with self._zamok:
+            polozka = self._polozky.get(kluc)
+            if polozka is None:
+                self._statistiky["minutia"] += 1
+                return None
+            if (
+                polozka["verzia_dat"] != verzia_dat
+                or polozka["globalna_verzia"] != self._globalna_verzia
+                or polozka["verzia_tabuliek"] != self._verzia_tabuliek(set(polozka["verzia_tabuliek"]))
+            ):
+                del self._polozky[kluc]
+                self._statistiky["zneplatnenia"] += 1
+                self._statistiky["minutia"] += 1
+                return None
+            self._polozky.move_to_end(kluc)
+            self._statistiky["zasahy"] += 1
+            return polozka["vysledok"]
+
+    def snimka(self, dotaz: str) -> Dict[str, Any]:
+        """Zachytí verzie tabuliek dotazu pred jeho vykonaním (zápis počas vykonávania položku zneplatní)."""
+        with self._zamok:
+            return {
+                "globalna_verzia": self._globalna_verzia,
+                "verzia_tabuliek": self._verzia_tabuliek(tabulky_v_dotaze(dotaz)),
+            }
+
+    def uloz(
+        self,
+        dotaz: str,
+        verzia_dat: int,
+        snimka: Dict[str, Any],
+        stlpce: List[str],
+        riadky: StlpcovyVysledok,
+        parametre: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Uloží kompletný výsledok SELECT dotazu (príliš veľké výsledky sa neukladajú)."""
+        if self.max_poloziek <= 0 or len(riadky) > self.max_riadkov_polozky:
+            return
+        kluc = self._kluc(dotaz, parametre)
+        with self._zamok:
+            self._polozky[kluc] = {
+                "verzia_dat": verzia_dat,
+                **snimka,
+                "vysledok": {"columns": stlpce, "rows": riadky},
+            }
+            self._polozky.move_to_end(kluc)
+            while len(self._polozky) > self.max_poloziek:
+                self._polozky.popitem(last=False)
+                self._statistiky["vyradenia"] += 1
+
+    def zaznamenaj_zapis(self, dotaz: str) -> None:
+        """
+        Zvýši počítadlá zmien tabuliek dotknutých zapisujúcim dotazom. Ak sa cieľová tabuľka zápisu
+        nedá určiť (CTE so zápisom, volanie procedúry, ...), zneplatní sa celá cache.
+        """
+        tabulky = tabulky_v_dotaze(dotaz)
+        with self._zamok:
+            if not tabulky or ciel_zapisu(dotaz) is None:
+                self._globalna_verzia += 1
+            for tabulka in tabulky:
+                self._pocitadla_tabuliek[tabulka] = self._pocitadla_tabuliek.get(tabulka, 0) + 1
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Vráti metriky cache (zásahy, minutia, zneplatnenia, vyradenia, úspešnosť)."""
+        with self._zamok:
+            spolu = self._statistiky["zasahy"] + self._statistiky["minutia"]
+            return {
+                **self._statistiky,
+                "pocet_poloziek": len(self._polozky),
+                "miera_zasahov": self._statistiky["zasahy"] / spolu if spolu else 0.0,
+            }
+
+
+class CachePrikazov:
+    """
+    LRU cache pripravených SQL príkazov (`text()`) kľúčovaná normalizovanou šablónou s parametrami `:nazov`.
+    Tá istá šablóna s inými hodnotami parametrov vráti ten istý objekt príkazu: SQLAlchemy ho nájde
+    vo svojej cache skompilovaných príkazov a ovládač dostane identický SQL reťazec, takže
+    pripravený príkaz spojenia (SQLite statement cache, asyncpg) sa použije znova bez parsovania a plánovania.
+    """
+
+    def __init__(self, max_poloziek: int = 256):
+        self.max_poloziek = max_poloziek
+        self._zamok = threading.Lock()
+        self._prikazy: "OrderedDict[str, TextClause]" = OrderedDict()
+        self._statistiky = {"zasahy": 0, "minutia": 0}
+
+    def prikaz(self, sablona: str) -> TextClause:
+        """Vráti (a pri prvom použití vytvorí) príkaz pre SQL šablónu."""
+        kluc = normalizuj_sql(sablona)
+        with self._zamok:
+            prikaz = self._prikazy.get(kluc)
+            if prikaz is not None:
+                self._prikazy.move_to_end(kluc)
+                self._statistiky["zasahy"] += 1
+                return prikaz
+            self._statistiky["minutia"] += 1
+        prikaz = text(kluc)
+        if self.max_poloziek > 0:
+            with self._zamok:
+                self._prikazy[kluc] = prikaz
+                while len(self._prikazy) > self.max_poloziek:
+                    self._prikazy.popitem(last=False)
+        return prikaz
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Vráti počty zásahov/minutí a počet šablón v cache."""
+        with self._zamok:
+            spolu = self._statistiky["zasahy"] + self._statistiky["minutia"]
+            return {
+                **self._statistiky,
+                "pocet_sablon": len(self._prikazy),
+                "miera_zasahov": self._statistiky["zasahy"] / spolu if spolu else 0.0,
+            }
+
+
+class SmerovacReplik:
+    """
+    Rozdeľuje čítacie dotazy medzi repliky (round-robin) a sleduje ich dostupnosť. Kontrolou
+    zdravia je samotné pripojenie (pri `pool_pre_ping` aj `SELECT 1` pred vydaním spojenia):
+    replika, na ktorú sa nepodarí pripojiť, sa na `pauza_s` vynechá, potom ju ďalší dotaz znova
+    vyskúša a pri úspechu sa vráti do rotácie.
+    """
+
+    def __init__(self, pauza_s: float = 30.0):
+        self.pauza_s = pauza_s
+        self._repliky: List[Dict[str, Any]] = []
+        self._dalsia = 0
+        self._zamok = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._repliky)
+
+    def pridaj(self, nazov: str, engine) -> None:
+        self._repliky.append({"nazov": nazov, "engine": engine, "nedostupna_do": 0.0, "dotazy": 0, "chyby": 0})
+
+    def poradie(self) -> List[Dict[str, Any]]:
+        """Dostupné repliky v poradí, v akom sa majú skúsiť (každé volanie začína ďalšou)."""
+        with self._zamok:
+            teraz = time.monotonic()
+            dostupne = [replika for replika in self._repliky if replika["nedostupna_do"] <= teraz]
+            if not dostupne:
+                return []
+            zaciatok = self._dalsia % len(dostupne)
+            self._dalsia += 1
+            return dostupne[zaciatok:] + dostupne[:zaciatok]
+
+    def oznac_chybu(self, replika: Dict[str, Any], chyba: Exception) -> None:
+        with self._zamok:
+            replika["chyby"] += 1
+            replika["nedostupna_do"] = time.monotonic() + self.pauza_s
+        zapisovac.warning(f"⚠️ Replika {replika['nazov']} je nedostupná, {self.pauza_s:g} s sa vynecháva: {chyba}")
+
+    def oznac_uspech(self, replika: Dict[str, Any]) -> None:
+        with self._zamok:
+            replika["dotazy"] += 1
+            obnovena = replika["nedostupna_do"] > 0
+            replika["nedostupna_do"] = 0.0
+        if obnovena:
+            zapisovac.info(f"✅ Replika {replika['nazov']} je opäť dostupná")
+
+    def enginy(self) -> list:
+        return [replika["engine"] for replika in self._repliky]
+
+    def statistiky(self) -> List[Dict[str, Any]]:
+        """Počty dotazov a chýb pripojenia jednotlivých replík."""
+        teraz = time.monotonic()
+        return [
+            {"nazov": r["nazov"], "dostupna": r["nedostupna_do"] <= teraz, "dotazy": r["dotazy"], "chyby": r["chyby"]}
+            for r in self._repliky
+        ]
+
+
+class ZrusenieDotazu:
+    """
+    Token pre časový limit a kooperatívne zrušenie dotazu, zdieľaný medzi event loopom a vláknom DB.
+    Limit `timeout_s` platí pre každú DB operáciu zvlášť (vykonanie dotazu, načítanie dávky),
+    takže stránkovanie, pri ktorom používateľ medzi dávkami čaká, nevyprší.
+    """
+
+    def __init__(self, timeout_s: Optional[float] = None):
+        self.timeout_s = timeout_s
+        self.dovod: Optional[str] = None
+        self._zamok = threading.Lock()
+        self._termin: Optional[float] = None
+        # Okamžité prerušenie práve bežiaceho príkazu (sqlite3 interrupt, cancel na serveri)
+        self._prerusenia: Dict[int, Callable[[], None]] = {}
+
+    def zacni_operaciu(self) -> None:
+        """Nastaví termín pre nasledujúcu DB operáciu."""
+        self._termin = time.monotonic() + self.timeout_s if self.timeout_s else None
+
+    def ma_skoncit(self) -> bool:
+        """True, ak bol dotaz zrušený alebo aktuálna operácia prekročila časový limit."""
+        if self.dovod is None and self._termin is not None and time.monotonic() > self._termin:
+            self.dovod = f"prekročený časový limit {self.timeout_s:g} s"
+        return self.dovod is not None
+
+    def zrus(self, dovod: str = "zrušené používateľom") -> None:
+        """
+        Zruší dotaz a okamžite preruší práve bežiaci príkaz (volateľné z ľubovoľného vlákna). Z event
+        loopu sa prerušenie spustí v samostatnom vlákne: `cancel()` PostgreSQL aj `KILL QUERY` MySQL
+        (nové spojenie na server) sú blokujúce sieťové volania.
+        """
+        with self._zamok:
+            if self.dovod is None:
+                self.dovod = dovod
+            prerusenia = list(self._prerusenia.values())
+        if not prerusenia:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._prerus(prerusenia)
+            return
+        threading.Thread(target=self._prerus, args=(prerusenia,), name="db-prerusenie", daemon=True).start()
+
+    @staticmethod
+    def _prerus(prerusenia: List[Callable[[], None]]) -> None:
+        for prerus in prerusenia:
+            try:
+                prerus()
+            except Exception as e:
+                zapisovac.warning(f"⚠️ Nepodarilo sa prerušiť bežiaci dotaz: {e}")
+
+    def registruj_prerusenie(self, prerus: Callable[[], None]) -> int:
+        with self._zamok:
+            kluc = id(prerus)
+            self._prerusenia[kluc] = prerus
+        if self.dovod is not None:
+            prerus()
+        return kluc
+
+    def odregistruj_prerusenie(self, kluc: int) -> None:
+        with self._zamok:
+            self._prerusenia.pop(kluc, None)
+
+
+class ZakladPripojeniaDatabazy:
+    """
+    Spoločný základ synchrónneho a asynchrónneho pripojenia: konfigurácia a pool-y enginov (aj replík),
+    cache výsledkov a príkazov, strážca nákladov, prerušenie dotazu a logika dávok nad otvoreným
+    synchrónnym spojením. Podtriedy dodajú `_vytvor_engine`, `_over_pripojenie`, `engine`
+    a vykonávanie dotazov (blokujúce v pool-e vlákien alebo natívne asynchrónne).
+    """
 
     def __init__(self):
         self._engine = None
         self._retazec_pripojenia = None
+        self._konfiguracia: Optional[KonfiguraciaDatabazy] = None
+        self._cache_vysledkov = CacheVysledkov()
+        self._prikazy = CachePrikazov()
+        self._strazca = StrazcaDotazov(politika="vypnuty")
+        # Zaznamenávanie záťaže pre poradcu indexov (predvolene zdieľaný poradca aplikácie)
+        self.poradca_indexov = poradca_indexov
+        # Samostatné SQLite spojenie len na čítanie PRAGMA data_version (mení sa pri commite iného spojenia)
+        self._sledovac_verzie: Optional[sqlite3.Connection] = None
+        self._zamok_sledovaca = threading.Lock()
+        self._repliky = SmerovacReplik()
 
     def pripoj(self, konfiguracia: KonfiguraciaDatabazy) -> bool:
         """Vytvorí databázové pripojenie na základe poskytnutej konfigurácie."""
         try:
-            # Zostavenie reťazca pripojenia na základe dialektu
+            self._retazec_pripojenia = self._zostav_retazec(konfiguracia)
             if konfiguracia.dialekt == "sqlite":
-                # Zabezpečíme, že cesta pre SQLite je relatívna k root adresáru projektu, ak nie je absolútna
-                db_cesta = konfiguracia.databaza
-                if not os.path.isabs(db_cesta):
-                     # Predpokladáme, že tento súbor je v apka/settings, ideme o 2 úrovne vyššie
-                     project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                     db_cesta = os.path.join(project_root, db_cesta)
-                     # Vytvoríme adresár, ak neexistuje
-                     os.makedirs(os.path.dirname(db_cesta), exist_ok=True)
-                self._retazec_pripojenia = f"sqlite:///{db_cesta}"
-            else:
-                # Pre PostgreSQL, MySQL, atď.
-                autentifikacia = f"{konfiguracia.pouzivatelske_meno}:{konfiguracia.heslo}@" if konfiguracia.pouzivatelske_meno else ""
-                hostitel = f"{konfiguracia.hostitel}:{konfiguracia.port}" if konfiguracia.hostitel else "localhost"
-                self._retazec_pripojenia = f"{konfiguracia.dialekt}://{autentifikacia}{hostitel}/{konfiguracia.databaza}"
+                self._sledovac_verzie = sqlite3.connect(self._cesta_sqlite(konfiguracia.databaza), check_same_thread=False)
+                zapisovac.info(f"⚙️ SQLite pragmy: {'; '.join(sqlite_pragmy(konfiguracia))}")
+            self._engine = self._novy_engine(self._retazec_pripojenia, konfiguracia)
 
-            self._engine = create_engine(self._retazec_pripojenia)
-            # Otestovanie pripojenia
-            with self._engine.connect() as spojenie:
-                spojenie.execute(text("SELECT 1"))
+            self._repliky = SmerovacReplik(konfiguracia.replika_pauza_s)
+            for ciel in konfiguracia.repliky:
+                self._repliky.pridaj(ciel, self._novy_engine(self._zostav_retazec(konfiguracia, ciel), konfiguracia, replika=True))
+            if self._repliky:
+                zapisovac.info(f"📚 Čítacie dotazy sa smerujú na repliky: {', '.join(konfiguracia.repliky)}")
+            self._konfiguracia = konfiguracia
+            self._cache_vysledkov = CacheVysledkov(
+                max_poloziek=konfiguracia.cache_vysledkov_max_poloziek,
+                max_riadkov_polozky=konfiguracia.cache_vysledkov_max_riadkov,
+            )
+            self._prikazy = CachePrikazov(konfiguracia.cache_prikazov_max_poloziek)
+            self._strazca = StrazcaDotazov(
+                politika=konfiguracia.strazca_politika,
+                max_naklady=konfiguracia.strazca_max_naklady,
+                max_riadkov=konfiguracia.strazca_max_riadkov,
+                limit_riadkov=konfiguracia.strazca_limit_riadkov,
+            )
+            self._over_pripojenie()
 
             zapisovac.info(f"Úspešne pripojené k {konfiguracia.dialekt} databáze: {konfiguracia.databaza}")
             return True
@@ -50,44 +475,935 @@ class PripojenieDatabazy:
             self._retazec_pripojenia = None
             return False
 
-    def vykonaj_dotaz(self, dotaz: str) -> Dict[str, Any]:
-        """Vykoná SQL dotaz a vráti výsledky."""
+    @staticmethod
+    def _cesta_sqlite(db_cesta: str) -> str:
+        """Cesta k SQLite súboru; relatívna cesta je relatívna k root adresáru projektu."""
+        if not os.path.isabs(db_cesta):
+             # Predpokladáme, že tento súbor je v apka/settings, ideme o 2 úrovne vyššie
+             project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+             db_cesta = os.path.join(project_root, db_cesta)
+             # Vytvoríme adresár, ak neexistuje
+             os.makedirs(os.path.dirname(db_cesta), exist_ok=True)
+        return db_cesta
+
+    def _zostav_retazec(self, konfiguracia: KonfiguraciaDatabazy, replika: Optional[str] = None) -> str:
+        """
+        Reťazec pripojenia k primárnej databáze, alebo k replike `replika` ('hostitel[:port]',
+        pre SQLite cesta k súboru otvorenému len na čítanie, takže chýbajúci súbor sa nevytvorí).
+        """
+        ovladac = self._ovladac(konfiguracia.dialekt)
+        if konfiguracia.dialekt == "sqlite":
+            if replika:
+                return f"{ovladac}:///file:{self._cesta_sqlite(replika)}?mode=ro&uri=true"
+            return f"{ovladac}:///{self._cesta_sqlite(konfiguracia.databaza)}"
+        # Pre PostgreSQL, MySQL, atď.
+        autentifikacia = f"{konfiguracia.pouzivatelske_meno}:{konfiguracia.heslo}@" if konfiguracia.pouzivatelske_meno else ""
+        if replika:
+            hostitel = replika
+        else:
+            hostitel = f"{konfiguracia.hostitel}:{konfiguracia.port}" if konfiguracia.hostitel else "localhost"
+        return f"{ovladac}://{autentifikacia}{hostitel}/{konfiguracia.databaza}"
+
+    def _novy_engine(self, retazec_pripojenia: str, konfiguracia: KonfiguraciaDatabazy, replika: bool = False):
+        """Engine s vlastným pool-om spojení (a SQLite pragmami na každom novom spojení)."""
+        engine = self._vytvor_engine(
+            retazec_pripojenia,
+            pool_size=konfiguracia.pool_velkost,
+            max_overflow=konfiguracia.pool_max_navyse,
+            pool_timeout=konfiguracia.pool_timeout_s,
+            pool_recycle=konfiguracia.pool_recyklacia_s,
+            pool_pre_ping=konfiguracia.pool_pre_ping,
+            query_cache_size=konfiguracia.cache_prikazov_max_poloziek,
+            connect_args=self._argumenty_ovladaca(konfiguracia),
+        )
+        if konfiguracia.dialekt == "sqlite":
+            pragmy = sqlite_pragmy(konfiguracia, replika=replika)
+
+            # Asynchrónny engine registruje udalosti na svojom synchrónnom jadre
+            @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+            def nastav_pragmy(dbapi_spojenie, _zaznam):
+                # Nastavenia platia pre spojenie, preto sa aplikujú pri každom novom spojení v pool-e
+                kurzor = dbapi_spojenie.cursor()
+                for pragma in pragmy:
+                    kurzor.execute(pragma)
+                kurzor.close()
+
+        return engine
+
+    def _ovladac(self, dialekt: str) -> str:
+        """Názov dialektu (s ovládačom) pre reťazec pripojenia."""
+        return dialekt
+
+    def _argumenty_ovladaca(self, konfiguracia: KonfiguraciaDatabazy) -> Dict[str, Any]:
+        """Veľkosť cache pripravených príkazov v ovládači (príkaz sa na spojení pripraví len raz)."""
+        if konfiguracia.dialekt == "sqlite":
+            return {"cached_statements": konfiguracia.cache_prikazov_max_poloziek}
+        return {}
+
+    def _najdi_v_cache(
+        self, dotaz: str, parametre: Dict[str, Any]
+    ) -> Tuple[Optional[Tuple[Dict[str, Any], int]], Optional[Dict[str, Any]]]:
+        """Pre čítací dotaz vráti (snímka verzií a verzia dát pre neskoršie uloženie, výsledok z cache alebo None)."""
+        if not je_citaci_dotaz(dotaz):
+            return None, None
+        snimka = self._cache_vysledkov.snimka(dotaz)
+        verzia_dat = self._verzia_dat()
+        ulozeny = self._cache_vysledkov.najdi(dotaz, verzia_dat, parametre)
+        if ulozeny is not None:
+            zapisovac.info(f"⚡ Výsledok dotazu z cache: {self._cache_vysledkov.statistiky()}")
+        return (snimka, verzia_dat), ulozeny
+
+    def _priprav_zrusenie(self, zrusenie: Optional[ZrusenieDotazu]) -> ZrusenieDotazu:
+        """Doplní token zrušenia o časový limit z konfigurácie."""
+        if zrusenie is None:
+            return ZrusenieDotazu(self._konfiguracia.timeout_dotazu_s)
+        if zrusenie.timeout_s is None:
+            zrusenie.timeout_s = self._konfiguracia.timeout_dotazu_s
+        return zrusenie
+
+    def _chyba_dotazu(self, chyba: Exception, zrusenie: ZrusenieDotazu) -> Dict[str, Any]:
+        """Dávka s chybou dotazu (pri zrušení/časovom limite s `prerusene=True`)."""
+        if zrusenie.dovod:
+            zapisovac.warning(f"⏹️ Dotaz prerušený ({zrusenie.dovod})")
+            return {"error": f"Dotaz bol prerušený: {zrusenie.dovod}", "prerusene": True}
+        zapisovac.error(f"Chyba pri vykonávaní dotazu: {str(chyba)}")
+        return {"error": str(chyba)}
+
+    def _davky_zo_spojenia(
+        self,
+        spojenie,
+        dotaz: str,
+        parametre: Dict[str, Any],
+        velkost_davky: int,
+        potvrdene: bool,
+        zrusenie: ZrusenieDotazu,
+        do_suboru: bool,
+        stav_cache: Optional[Tuple[Dict[str, Any], int]],
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Jadro `vykonaj_dotaz_po_davkach` nad otvoreným (synchrónnym) spojením: strážca nákladov,
+        vykonanie, dávky s limitmi a uloženie do cache. Používa ho aj asynchrónny backend
+        (cez `AsyncConnection.run_sync`).
+        """
+        if do_suboru:
+            max_riadkov, max_bajtov = self._konfiguracia.max_riadkov_suboru, float("inf")
+        else:
+            max_riadkov = self._konfiguracia.max_riadkov
+            max_bajtov = self._konfiguracia.max_pamat_mb * 1024 * 1024
+        citaci = stav_cache is not None
+        snimka, verzia_dat = stav_cache or (None, None)
+        upozornenie = None
+        with self._prerusitelne(spojenie, zrusenie):
+            zrusenie.zacni_operaciu()
+            if citaci and not potvrdene:
+                posudok = self._strazca.posud(spojenie, dotaz, parametre)
+                if posudok["rozhodnutie"] == "odmietnut":
+                    yield {"error": f"Dotaz bol odmietnutý ako príliš drahý ({'; '.join(posudok['dovody'])})", "posudok": posudok}
+                    return
+                if posudok["rozhodnutie"] == "potvrdit":
+                    yield {
+                        "error": f"Dotaz je pravdepodobne drahý a vyžaduje potvrdenie ({'; '.join(posudok['dovody'])})",
+                        "vyzaduje_potvrdenie": True,
+                        "posudok": posudok,
+                    }
+                    return
+                if posudok["rozhodnutie"] == "obmedzit":
+                    dotaz = posudok["dotaz"]
+                    upozornenie = f"Dotaz bol pre vysoké odhadované náklady obmedzený na {self._strazca.limit_riadkov} riadkov."
+
+            zaciatok = time.perf_counter()
+            vysledok = spojenie.execution_options(stream_results=True, max_row_buffer=velkost_davky).execute(
+                self._prikazy.prikaz(dotaz), parametre
+            )
+
+            # Pre INSERT, UPDATE, DELETE vrátime počet ovplyvnených riadkov
+            if not vysledok.returns_rows:
+                spojenie.commit() # Commit changes for non-SELECT statements
+                self._cache_vysledkov.zaznamenaj_zapis(dotaz)
+                yield {"affected_rows": vysledok.rowcount}
+                return
+            if not citaci:
+                # Napr. INSERT ... RETURNING: vracia riadky, ale mení dáta
+                spojenie.commit()
+                self._cache_vysledkov.zaznamenaj_zapis(dotaz)
+
+            stlpce = list(vysledok.keys())
+            pocet_riadkov, pocet_bajtov = 0, 0
+            # Riadky pre cache zbierame len kým sa zmestia do limitu položky
+            riadky_pre_cache: Optional[StlpcovyVysledok] = StlpcovyVysledok(stlpce) if citaci else None
+            while True:
+                poziadavka = min(velkost_davky, max_riadkov - pocet_riadkov)
+                zrusenie.zacni_operaciu()
+                if zrusenie.ma_skoncit():
+                    # Zrušené medzi dávkami (napr. koniec relácie počas stránkovania)
+                    yield {"error": f"Dotaz bol prerušený: {zrusenie.dovod}", "prerusene": True}
+                    return
+                riadky = vysledok.fetchmany(poziadavka)
+                if citaci and not pocet_riadkov and self._konfiguracia.poradca_indexov:
+                    # Čas po prvú dávku a plán dotazu pre poradcu indexov
+                    self.poradca_indexov.zaznamenaj(
+                        spojenie, vloz_parametre(dotaz, parametre, spojenie.dialect), time.perf_counter() - zaciatok
+                    )
+                pocet_riadkov += len(riadky)
+                if not do_suboru:
+                    # Odhad pamäte podľa veľkosti hodnôt (stačí na ochranu pred obrovskými výsledkami)
+                    pocet_bajtov += sum(sys.getsizeof(hodnota) for riadok in riadky for hodnota in riadok)
+                plna_davka = len(riadky) == poziadavka
+                orezane = plna_davka and (pocet_riadkov >= max_riadkov or pocet_bajtov >= max_bajtov)
+                dalsie = plna_davka and not orezane
+                riadky_davky = StlpcovyVysledok.z_riadkov(stlpce, riadky)
+                davka = {
+                    "columns": stlpce,
+                    "rows": riadky_davky,
+                    "dalsie": dalsie,
+                    "orezane": orezane,
+                }
+                if upozornenie:
+                    davka["upozornenie"] = upozornenie
+                    upozornenie = None
+                if riadky_pre_cache is not None:
+                    riadky_pre_cache.pridaj(riadky_davky)
+                    if len(riadky_pre_cache) > self._cache_vysledkov.max_riadkov_polozky:
+                        riadky_pre_cache = None
+                    elif not dalsie and not orezane:
+                        # Kompletný výsledok uložíme ešte pred poslednou dávkou (spotrebiteľ môže generátor zavrieť)
+                        self._cache_vysledkov.uloz(dotaz, verzia_dat, snimka, stlpce, riadky_pre_cache, parametre)
+                yield davka
+                if not dalsie or orezane:
+                    if orezane:
+                        zapisovac.warning(f"⚠️ Výsledok dotazu orezaný na {pocet_riadkov} riadkov (limit riadkov/pamäte).")
+                    return
+
+    @contextmanager
+    def _prerusitelne(self, spojenie, zrusenie: ZrusenieDotazu) -> Iterator[None]:
+        """
+        Naviaže token zrušenia na spojenie: SQLite progress handler (limit + zrušenie) a `interrupt()`,
+        PostgreSQL `statement_timeout` a `cancel()`, MySQL `max_execution_time` a `KILL QUERY`.
+        Po skončení vráti spojenie do pôvodného stavu (vracia sa do poolu).
+        """
+        dialekt = self._engine.dialect.name
+        dbapi_spojenie = spojenie.connection.dbapi_connection
+        timeout_ms = int(1000 * zrusenie.timeout_s) if zrusenie.timeout_s else 0
+
+        if self._engine.dialect.is_async:
+            # Asynchrónne ovládače: spojenie beží v greenlete `run_sync`, volania ovládača sa čakajú cez
+            # `await_only`. Okamžité prerušenie z iného vlákna nahrádza zrušenie asyncio úlohy.
+            prerus = None
+            if dialekt == "sqlite":
+                ovladac = spojenie.connection.driver_connection
+                await_only(ovladac.set_progress_handler(lambda: 1 if zrusenie.ma_skoncit() else 0, 1000))
+                obnov = lambda: await_only(ovladac.set_progress_handler(None, 0))
+            elif dialekt == "postgresql":
+                spojenie.exec_driver_sql(f"SET statement_timeout = {timeout_ms}")
+                obnov = lambda: spojenie.exec_driver_sql("RESET statement_timeout")
+            elif dialekt in ("mysql", "mariadb"):
+                spojenie.exec_driver_sql(f"SET SESSION max_execution_time = {timeout_ms}")
+                obnov = lambda: spojenie.exec_driver_sql("SET SESSION max_execution_time = 0")
+            else:
+                obnov = None
+        elif dialekt == "sqlite":
+            # Handler sa volá každých N inštrukcií VM; nenulová návratová hodnota preruší dotaz
+            dbapi_spojenie.set_progress_handler(lambda: 1 if zrusenie.ma_skoncit() else 0, 1000)
+            prerus = dbapi_spojenie.interrupt
+            obnov = lambda: dbapi_spojenie.set_progress_handler(None, 0)
+        elif dialekt == "postgresql":
+            spojenie.exec_driver_sql(f"SET statement_timeout = {timeout_ms}")
+            prerus = dbapi_spojenie.cancel
+            obnov = lambda: spojenie.exec_driver_sql("RESET statement_timeout")
+        elif dialekt in ("mysql", "mariadb"):
+            spojenie.exec_driver_sql(f"SET SESSION max_execution_time = {timeout_ms}")
+            id_spojenia = spojenie.exec_driver_sql("SELECT CONNECTION_ID()").scalar()
+
+            def prerus():
+                # KILL QUERY musí ísť na ten istý server (primárny alebo repliku)
+                with spojenie.engine.connect() as ine_spojenie:
+                    ine_spojenie.exec_driver_sql(f"KILL QUERY {int(id_spojenia)}")
+
+            obnov = lambda: spojenie.exec_driver_sql("SET SESSION max_execution_time = 0")
+        else:
+            prerus, obnov = None, None
+
+        kluc = zrusenie.registruj_prerusenie(prerus) if prerus else None
+        try:
+            yield
+        finally:
+            if kluc is not None:
+                zrusenie.odregistruj_prerusenie(kluc)
+            if obnov:
+                try:
+                    obnov()
+                except Exception as e:
+                    # Spojenie v chybovom stave pool pri vrátení aj tak resetuje
+                    zapisovac.warning(f"⚠️ Nepodarilo sa obnoviť nastavenia spojenia po dotaze: {e}")
+
+    def _davky_z_cache(self, ulozeny: Dict[str, Any], velkost_davky: int) -> Generator[Dict[str, Any], None, None]:
+        """Rozdelí výsledok uložený v cache na dávky v rovnakom tvare ako pri čítaní z DB."""
+        riadky = ulozeny["rows"]
+        for zaciatok in range(0, max(len(riadky), 1), velkost_davky):
+            dalsie = zaciatok + velkost_davky < len(riadky)
+            yield {
+                "columns": ulozeny["columns"],
+                "rows": riadky.vyrez(zaciatok, zaciatok + velkost_davky),
+                "dalsie": dalsie,
+                "orezane": False,
+            }
+
+    def _verzia_dat(self) -> int:
+        """Vráti `PRAGMA data_version` pre SQLite (zmeny z iných spojení/procesov), inak 0."""
+        if not self._sledovac_verzie:
+            return 0
+        try:
+            with self._zamok_sledovaca:
+                return self._sledovac_verzie.execute("PRAGMA data_version").fetchone()[0]
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa zistiť PRAGMA data_version: {e}")
+            return -1
+
+    def statistiky_cache(self) -> Dict[str, Any]:
+        """Vráti metriky cache výsledkov dotazov."""
+        return self._cache_vysledkov.statistiky()
+
+    def statistiky_prikazov(self) -> Dict[str, Any]:
+        """Vráti metriky cache pripravených príkazov (opakované šablóny dotazov)."""
+        return self._prikazy.statistiky()
+
+    def statistiky_strazcu(self) -> Dict[str, int]:
+        """Vráti počty rozhodnutí strážcu nákladov dotazov."""
+        return self._strazca.statistiky()
+
+    def statistiky_replik(self) -> List[Dict[str, Any]]:
+        """Vráti dostupnosť a počty dotazov replík na čítanie."""
+        return self._repliky.statistiky()
+
+    def je_pripojene(self) -> bool:
+         """Skontroluje, či je pripojenie aktívne."""
+         return self._engine is not None
+
+    @property
+    def konfiguracia(self) -> Optional[KonfiguraciaDatabazy]:
+        """Konfigurácia aktívneho pripojenia."""
+        return self._konfiguracia
+
+    def _enginy(self) -> list:
+        """Synchrónne jadrá enginov primárnej databázy a replík."""
+        enginy = [self._engine] + self._repliky.enginy() if self._engine is not None else []
+        return [getattr(engine, "sync_engine", engine) for engine in enginy]
+
+    def pouzivane_spojenia(self) -> int:
+        """Počet spojení práve vydaných z pool-ov (bežiace dotazy a otvorené stránkovania)."""
+        return sum(getattr(engine.pool, "checkedout", lambda: 0)() for engine in self._enginy())
+
+    def _uvolni(self) -> None:
+        self._engine = None
+        self._repliky = SmerovacReplik()
+        if self._sledovac_verzie is not None:
+            with self._zamok_sledovaca:
+                self._sledovac_verzie.close()
+                self._sledovac_verzie = None
+
+
+class PripojenieDatabazy(ZakladPripojeniaDatabazy):
+    """Spravuje databázové pripojenia a operácie (blokujúci ovládač, z event loopu cez ohraničený pool vlákien)."""
+
+    def __init__(self):
+        super().__init__()
+        # Ohraničený pool vlákien pre blokujúce DB operácie volané z event loopu
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def pripoj(self, konfiguracia: KonfiguraciaDatabazy) -> bool:
+        """Vytvorí databázové pripojenie na základe poskytnutej konfigurácie."""
+        if not super().pripoj(konfiguracia):
+            return False
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=konfiguracia.max_vlakien, thread_name_prefix="db")
+        return True
+
+    def _spojenie(self, na_repliku: bool):
+        """
+        Spojenie z pool-u repliky (ďalšia dostupná v poradí, pri chybe pripojenia ďalšia a nakoniec
+        primárna databáza), alebo z pool-u primárnej databázy.
+        """
+        if na_repliku:
+            for replika in self._repliky.poradie():
+                try:
+                    spojenie = replika["engine"].connect()
+                except Exception as e:
+                    self._repliky.oznac_chybu(replika, e)
+                    continue
+                self._repliky.oznac_uspech(replika)
+                return spojenie
+        return self._engine.connect()
+
+    def _vytvor_engine(self, retazec_pripojenia: str, **nastavenia_poolu):
+        return create_engine(retazec_pripojenia, **nastavenia_poolu)
+
+    def _over_pripojenie(self) -> None:
+        """Otestovanie pripojenia (výnimka = pripojenie zlyhalo)."""
+        with self._engine.connect() as spojenie:
+            spojenie.execute(text("SELECT 1"))
+
+    def vykonaj_dotaz(
+        self,
+        dotaz: str,
+        potvrdene: bool = False,
+        zrusenie: Optional[ZrusenieDotazu] = None,
+        parametre: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Vykoná SQL dotaz (šablónu s viazanými `parametre`) a vráti výsledky (najviac `max_riadkov` riadkov);
+        `rows` je `StlpcovyVysledok`.
+        """
+        vysledok: Dict[str, Any] = {}
+        for davka in self.vykonaj_dotaz_po_davkach(dotaz, potvrdene=potvrdene, zrusenie=zrusenie, parametre=parametre):
+            if "rows" not in davka:
+                return davka
+            if not vysledok:
+                vysledok = {"columns": davka["columns"], "rows": StlpcovyVysledok(davka["columns"])}
+                if "upozornenie" in davka:
+                    vysledok["upozornenie"] = davka["upozornenie"]
+            vysledok["rows"].pridaj(davka["rows"])
+            vysledok["orezane"] = davka["orezane"]
+        return vysledok or {"error": "Nie je nadviazané žiadne databázové pripojenie"}
+
+    def vykonaj_dotaz_po_davkach(
+        self,
+        dotaz: str,
+        velkost_davky: Optional[int] = None,
+        potvrdene: bool = False,
+        zrusenie: Optional[ZrusenieDotazu] = None,
+        do_suboru: bool = False,
+        parametre: Optional[Dict[str, Any]] = None,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Vykoná SQL dotaz so server-side kurzorom a postupne vracia dávky riadkov (`fetchmany`).
+        Dotaz je šablóna s parametrami `:nazov`, ktorých hodnoty sa viažu z `parametre`; pripravený
+        príkaz sa pre rovnakú šablónu používa znova (`CachePrikazov`).
+        Riadky dávky (`rows`) sú `StlpcovyVysledok` (hodnoty po stĺpcoch, bez slovníka pre každý riadok).
+        Pre dotazy vracajúce riadky vždy vráti aspoň jednu (aj prázdnu) dávku. Po prekročení
+        limitu riadkov alebo pamäte z konfigurácie vráti poslednú dávku s `orezane=True` a skončí.
+
+        Čítacie dotazy mimo cache najprv posúdi strážca nákladov (EXPLAIN). Drahý dotaz podľa politiky
+        odmietne (`error`), obmedzí LIMIT-om (`upozornenie` v prvej dávke) alebo vráti `error`
+        s `vyzaduje_potvrdenie=True` a `posudok`; po potvrdení ho treba zavolať s `potvrdene=True`.
+
+        Každá DB operácia má časový limit `timeout_dotazu_s` z konfigurácie; cez `zrusenie.zrus()`
+        sa dotaz preruší okamžite aj z iného vlákna (napr. pri ukončení relácie).
+
+        S `do_suboru=True` spotrebiteľ dávky nedrží v pamäti (zapisuje ich do súboru): platí limit
+        `max_riadkov_suboru` a limit pamäte sa neuplatní.
+        """
+        if not self._engine:
+            yield {"error": "Nie je nadviazané žiadne databázové pripojenie"}
+            return
+
+        velkost_davky = velkost_davky or self._konfiguracia.velkost_stranky
+        parametre = parametre or {}
+        stav_cache, ulozeny = self._najdi_v_cache(dotaz, parametre)
+        if ulozeny is not None:
+            yield from self._davky_z_cache(ulozeny, velkost_davky)
+            return
+
+        zrusenie = self._priprav_zrusenie(zrusenie)
+        try:
+            with self._spojenie(je_dotaz_pre_repliku(dotaz)) as spojenie:
+                yield from self._davky_zo_spojenia(
+                    spojenie, dotaz, parametre, velkost_davky, potvrdene, zrusenie, do_suboru, stav_cache
+                )
+        except Exception as e:
+            yield self._chyba_dotazu(e, zrusenie)
+
+    def over_dotaz(self, dotaz: str, parametre: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Lacno overí SQL dotaz (s hodnotami `parametre`) bez jeho vykonania (`EXPLAIN` ho len skompiluje/naplánuje):
+        zachytí syntaktické chyby, neexistujúce tabuľky či stĺpce a chýbajúce parametre. Vráti text chyby alebo None.
+        """
         if not self._engine:
+            return "Nie je nadviazané žiadne databázové pripojenie"
+        try:
+            # EXPLAIN dotaz nevykoná, môže ísť na repliku
+            with self._spojenie(na_repliku=True) as spojenie:
+                spojenie.execute(text(f"EXPLAIN {dotaz.strip().rstrip(';')}"), parametre or {}).fetchall()
+            return None
+        except Exception as e:
+            return str(getattr(e, "orig", e)).strip()
+
+    async def over_dotaz_async(self, dotaz: str, parametre: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Asynchrónna verzia `over_dotaz` (v pool-e vlákien DB)."""
+        slucka = asyncio.get_running_loop()
+        return await slucka.run_in_executor(self._executor, self.over_dotaz, dotaz, parametre)
+
+    async def vykonaj_dotaz_async(
+        self,
+        dotaz: str,
+        potvrdene: bool = False,
+        zrusenie: Optional[ZrusenieDotazu] = None,
+        parametre: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Vykoná SQL dotaz v ohraničenom pool-e vlákien, aby neblokoval event loop.
+        Zrušenie čakajúcej korutiny preruší aj bežiaci dotaz.
+        """
+        if not self._executor:
             return {"error": "Nie je nadviazané žiadne databázové pripojenie"}
+        zrusenie = zrusenie or ZrusenieDotazu(self._konfiguracia.timeout_dotazu_s)
+        slucka = asyncio.get_running_loop()
+        try:
+            return await slucka.run_in_executor(self._executor, self.vykonaj_dotaz, dotaz, potvrdene, zrusenie, parametre)
+        except asyncio.CancelledError:
+            zrusenie.zrus()
+            raise
+
+    async def dalsia_davka_async(self, strankovac: Generator[Dict[str, Any], None, None]) -> Optional[Dict[str, Any]]:
+        """Načíta ďalšiu dávku z generátora `vykonaj_dotaz_po_davkach` mimo event loopu (None = koniec)."""
+        slucka = asyncio.get_running_loop()
+        return await slucka.run_in_executor(self._executor, next, strankovac, None)
+
+    async def zatvor_strankovac_async(self, strankovac: Generator[Dict[str, Any], None, None]) -> None:
+        """Zatvorí rozpracovaný generátor dávok a uvoľní jeho databázové spojenie."""
+        slucka = asyncio.get_running_loop()
+        await slucka.run_in_executor(self._executor, strankovac.close)
+
+    def strankovac_z_davok(self, davky: List[Dict[str, Any]]) -> Generator[Dict[str, Any], None, None]:
+        """Stránkovač nad už načítanými dávkami (rovnaké rozhranie ako `vykonaj_dotaz_po_davkach`)."""
+        return (davka for davka in davky)
+
+    def davky_pre_vlakno(self, strankovac: Generator[Dict[str, Any], None, None], slucka: asyncio.AbstractEventLoop) -> Iterator[Dict[str, Any]]:
+        """Dávky stránkovača ako iterátor pre kód bežiaci v inom vlákne (napr. zápis do súboru)."""
+        return strankovac
+
+    @property
+    def engine(self):
+        """SQLAlchemy engine aktívneho pripojenia (None, ak nie je pripojené)."""
+        return self._engine
+
+    def zatvor(self) -> None:
+        """Zatvorí pool-y spojení (aj replík); ďalšie dotazy vrátia chybu nepripojenej databázy."""
+        for engine in self._enginy():
+            engine.dispose()
+        self._uvolni()
+
+    def _uvolni(self) -> None:
+        if self._executor is not None:
+            # Rozpracované stránkovače sa ešte dajú zatvoriť v predvolenom pool-e vlákien event loopu
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        super()._uvolni()
+
+    async def zatvor_async(self) -> None:
+        """Asynchrónna verzia `zatvor` (zatváranie spojení neblokuje event loop)."""
+        slucka = asyncio.get_running_loop()
+        await slucka.run_in_executor(None, self.zatvor)
+
+
+class AsyncPripojenieDatabazy(ZakladPripojeniaDatabazy):
+    """
+    Pripojenie s natívne asynchrónnym ovládačom (`create_async_engine`: aiosqlite, asyncpg, aiomysql).
+    Dotazy bežia priamo v event loope bez pool-u vlákien; `vykonaj_dotaz_po_davkach` je asynchrónny
+    generátor a logika dávok, strážcu a cache je spoločná so synchrónnou triedou (`ZakladPripojeniaDatabazy`,
+    cez `run_sync`). Má len asynchrónne API; `engine` vracia synchrónny engine so štandardným
+    ovládačom len na introspekciu schémy a poradcu indexov.
+    """
+
+    OVLADACE = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgresql": "postgresql+asyncpg",
+        "mysql": "mysql+aiomysql",
+        "mariadb": "mariadb+aiomysql",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self._engine_introspekcie = None
+
+    def _ovladac(self, dialekt: str) -> str:
+        return self.OVLADACE.get(dialekt, dialekt)
+
+    def _vytvor_engine(self, retazec_pripojenia: str, **nastavenia_poolu):
+        return create_async_engine(retazec_pripojenia, **nastavenia_poolu)
 
+    def _argumenty_ovladaca(self, konfiguracia: KonfiguraciaDatabazy) -> Dict[str, Any]:
+        if konfiguracia.dialekt == "postgresql":
+            # asyncpg pripravuje príkazy na serveri, cache ich drží pre každé spojenie
+            return {"prepared_statement_cache_size": konfiguracia.cache_prikazov_max_poloziek}
+        return super()._argumenty_ovladaca(konfiguracia)
+
+    def _over_pripojenie(self) -> None:
+        """Otestuje pripojenie, ak ešte nebeží event loop (inak sa chyba prejaví pri prvom dotaze)."""
         try:
-            with self._engine.connect() as spojenie:
-                vysledok = spojenie.execute(text(dotaz))
+            asyncio.get_running_loop()
+            return
+        except RuntimeError:
+            pass
+
+        async def over():
+            async with self._engine.connect() as spojenie:
+                await spojenie.execute(text("SELECT 1"))
+            # Spojenia v pool-e sú viazané na tento dočasný event loop
+            await self._engine.dispose()
 
-                # Pre INSERT, UPDATE, DELETE vrátime počet ovplyvnených riadkov
-                if not vysledok.returns_rows:
-                     spojenie.commit() # Commit changes for non-SELECT statements
-                     return {"affected_rows": vysledok.rowcount}
+        asyncio.run(over())
+
+    async def vykonaj_dotaz_po_davkach(
+        self,
+        dotaz: str,
+        velkost_davky: Optional[int] = None,
+        potvrdene: bool = False,
+        zrusenie: Optional[ZrusenieDotazu] = None,
+        do_suboru: bool = False,
+        parametre: Optional[Dict[str, Any]] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Asynchrónna verzia `PripojenieDatabazy.vykonaj_dotaz_po_davkach` (rovnaké dávky aj limity)."""
+        if not self._engine:
+            yield {"error": "Nie je nadviazané žiadne databázové pripojenie"}
+            return
 
-                # Pre SELECT dotazy vrátime výsledky
-                stlpce = list(vysledok.keys())
-                riadky = [dict(zip(stlpce, riadok)) for riadok in vysledok.fetchall()]
-                return {"columns": stlpce, "rows": riadky}
+        velkost_davky = velkost_davky or self._konfiguracia.velkost_stranky
+        parametre = parametre or {}
+        stav_cache, ulozeny = self._najdi_v_cache(dotaz, parametre)
+        if ulozeny is not None:
+            for davka in self._davky_z_cache(ulozeny, velkost_davky):
+                yield davka
+            return
+
+        zrusenie = self._priprav_zrusenie(zrusenie)
+        try:
+            async with self._spojenie_async(je_dotaz_pre_repliku(dotaz)) as spojenie:
+                davky = self._davky_zo_spojenia(
+                    spojenie.sync_connection, dotaz, parametre, velkost_davky, potvrdene, zrusenie, do_suboru, stav_cache
+                )
+                try:
+                    # Každá dávka sa načíta v greenlete, kde sa blokujúce volania ovládača čakajú v event loope
+                    while (davka := await self._dalsia_davka_spojenia(spojenie, davky, zrusenie)) is not None:
+                        yield davka
+                finally:
+                    await spojenie.run_sync(lambda _: davky.close())
+        except Exception as e:
+            yield self._chyba_dotazu(e, zrusenie)
 
+    @asynccontextmanager
+    async def _spojenie_async(self, na_repliku: bool) -> AsyncIterator[AsyncConnection]:
+        """Asynchrónna verzia `_spojenie` (repliky s failoverom, inak primárna databáza)."""
+        spojenie = None
+        if na_repliku:
+            for replika in self._repliky.poradie():
+                try:
+                    spojenie = await replika["engine"].connect().start()
+                except Exception as e:
+                    self._repliky.oznac_chybu(replika, e)
+                    continue
+                self._repliky.oznac_uspech(replika)
+                break
+        if spojenie is None:
+            spojenie = await self._engine.connect().start()
+        try:
+            yield spojenie
+        finally:
+            await spojenie.close()
+
+    @staticmethod
+    async def _dalsia_davka_spojenia(spojenie, davky, zrusenie: ZrusenieDotazu) -> Optional[Dict[str, Any]]:
+        """
+        Načíta ďalšiu dávku zo synchrónneho generátora nad spojením. Zrušenie úlohy sa do ovládača
+        nepreposiela (SQLAlchemy by spojenie zahodilo až po dobehnutí dotazu): dotaz zastaví token
+        zrušenia a spojenie ostane použiteľné.
+        """
+        uloha = asyncio.ensure_future(spojenie.run_sync(lambda _: next(davky, None)))
+        try:
+            return await asyncio.shield(uloha)
+        except asyncio.CancelledError:
+            zrusenie.zrus()
+            await asyncio.gather(uloha, return_exceptions=True)
+            raise
+
+    async def vykonaj_dotaz_async(
+        self,
+        dotaz: str,
+        potvrdene: bool = False,
+        zrusenie: Optional[ZrusenieDotazu] = None,
+        parametre: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Vykoná SQL dotaz priamo v event loope a vráti výsledky (najviac `max_riadkov` riadkov)."""
+        vysledok: Dict[str, Any] = {}
+        async for davka in self.vykonaj_dotaz_po_davkach(dotaz, potvrdene=potvrdene, zrusenie=zrusenie, parametre=parametre):
+            if "rows" not in davka:
+                return davka
+            if not vysledok:
+                vysledok = {"columns": davka["columns"], "rows": StlpcovyVysledok(davka["columns"])}
+                if "upozornenie" in davka:
+                    vysledok["upozornenie"] = davka["upozornenie"]
+            vysledok["rows"].pridaj(davka["rows"])
+            vysledok["orezane"] = davka["orezane"]
+        return vysledok or {"error": "Nie je nadviazané žiadne databázové pripojenie"}
+
+    async def over_dotaz_async(self, dotaz: str, parametre: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Overí SQL dotaz (s hodnotami `parametre`) cez `EXPLAIN` bez jeho vykonania. Vráti text chyby alebo None."""
+        if not self._engine:
+            return "Nie je nadviazané žiadne databázové pripojenie"
+        try:
+            async with self._spojenie_async(na_repliku=True) as spojenie:
+                await spojenie.execute(text(f"EXPLAIN {dotaz.strip().rstrip(';')}"), parametre or {})
+            return None
         except Exception as e:
-            zapisovac.error(f"Chyba pri vykonávaní dotazu: {str(e)}")
-            # V prípade chyby môžeme chcieť vrátiť transakciu späť, ak bola spustená
-            # with self._engine.connect() as spojenie:
-            #     spojenie.rollback() # Toto nemusí byť vždy potrebné alebo možné v závislosti od chyby
-            return {"error": str(e)}
+            return str(getattr(e, "orig", e)).strip()
+
+    async def dalsia_davka_async(self, strankovac: AsyncGenerator[Dict[str, Any], None]) -> Optional[Dict[str, Any]]:
+        """Načíta ďalšiu dávku z asynchrónneho generátora dávok (None = koniec)."""
+        return await anext(strankovac, None)
+
+    async def zatvor_strankovac_async(self, strankovac: AsyncGenerator[Dict[str, Any], None]) -> None:
+        """Zatvorí rozpracovaný generátor dávok a vráti jeho spojenie do pool-u."""
+        await strankovac.aclose()
+
+    async def zatvor_async(self) -> None:
+        """Zatvorí pool-y spojení (aj replík) a engine na introspekciu."""
+        for engine in [self._engine] + self._repliky.enginy() if self._engine is not None else []:
+            await engine.dispose()
+        if self._engine_introspekcie is not None:
+            self._engine_introspekcie.dispose()
+            self._engine_introspekcie = None
+        self._uvolni()
+
+    async def strankovac_z_davok(self, davky: List[Dict[str, Any]]) -> AsyncGenerator[Dict[str, Any], None]:
+        for davka in davky:
+            yield davka
+
+    def davky_pre_vlakno(self, strankovac: AsyncGenerator[Dict[str, Any], None], slucka: asyncio.AbstractEventLoop) -> Iterator[Dict[str, Any]]:
+        """Dávky sa načítavajú v event loope `slucka`, vlákno na každú len čaká."""
+        while (davka := asyncio.run_coroutine_threadsafe(anext(strankovac, None), slucka).result()) is not None:
+            yield davka
+
+    @property
+    def engine(self):
+        """Synchrónny engine (štandardný ovládač, bez pool-u) na introspekciu schémy a poradcu indexov."""
+        if self._engine is None:
+            return None
+        if self._engine_introspekcie is None:
+            self._engine_introspekcie = create_engine(
+                self._engine.url.set(drivername=self._konfiguracia.dialekt), poolclass=NullPool
+            )
+        return self._engine_introspekcie
+
+
+class PoskytovatelDatabazy:
+    """
+    Lenivo inicializované globálne pripojenie k databáze: pripojí sa až pri prvom použití (nie pri
+    importe), voliteľne sa zahreje na pozadí a po neúspešnom pokuse sa skúša znova s exponenciálne
+    rastúcim odstupom. Počas odstupu `ziskaj` hneď vráti None, takže nástroj nečaká na nedostupnú
+    databázu. Bezpečné pre vlákna (zámok) aj pre event loop (`ziskaj_async` sa pripája mimo neho).
+    """
+
+    def __init__(self, konfiguracia: KonfiguraciaDatabazy, trieda: type = PripojenieDatabazy):
+        self.konfiguracia = konfiguracia
+        self.info_o_dialekte = INFO_O_DIALEKTE.get(konfiguracia.dialekt.lower(), {})
+        self._trieda = trieda
+        self._spojenie: Optional[ZakladPripojeniaDatabazy] = None
+        self._zamok = threading.Lock()
+        self._pauza_s = konfiguracia.pripojenie_pauza_s
+        self._dalsi_pokus = 0.0
+        self._pokusy = 0
+
+    @property
+    def spojenie(self) -> Optional[ZakladPripojeniaDatabazy]:
+        """Už nadviazané pripojenie (bez pokusu o pripojenie), inak None."""
+        return self._spojenie
 
     def je_pripojene(self) -> bool:
-         """Skontroluje, či je pripojenie aktívne."""
-         return self._engine is not None
+        return self._spojenie is not None
+
+    def ziskaj(self) -> Optional[ZakladPripojeniaDatabazy]:
+        """Vráti pripojenie; ak ešte nie je a uplynul odstup po poslednej chybe, pokúsi sa pripojiť."""
+        if self._spojenie is not None:
+            return self._spojenie
+        with self._zamok:
+            if self._spojenie is None and time.monotonic() >= self._dalsi_pokus:
+                self._pripoj()
+            return self._spojenie
+
+    async def ziskaj_async(self) -> Optional[ZakladPripojeniaDatabazy]:
+        """Asynchrónna verzia `ziskaj` (pripájanie beží v pool-e vlákien, event loop neblokuje)."""
+        if self._spojenie is not None:
+            return self._spojenie
+        slucka = asyncio.get_running_loop()
+        return await slucka.run_in_executor(None, self.ziskaj)
+
+    def _pripoj(self) -> None:
+        self._pokusy += 1
+        spojenie = self._trieda()
+        if spojenie.pripoj(self.konfiguracia):
+            self._spojenie = spojenie
+            self._pauza_s = self.konfiguracia.pripojenie_pauza_s
+            return
+        self._dalsi_pokus = time.monotonic() + self._pauza_s
+        zapisovac.warning(
+            f"⚠️ Pripojenie k databáze zlyhalo (pokus {self._pokusy}), ďalší pokus najskôr o {self._pauza_s:g} s"
+        )
+        self._pauza_s = min(2 * self._pauza_s, self.konfiguracia.pripojenie_max_pauza_s)
+
+    async def zatvor_async(self) -> None:
+        """Zatvorí pripojenie (pool-y spojení); ďalšie `ziskaj` sa pripojí znova."""
+        with self._zamok:
+            spojenie, self._spojenie = self._spojenie, None
+        if spojenie is not None:
+            await spojenie.zatvor_async()
+
+    def zahrej(self, oneskorenie_s: float = 0.0) -> threading.Thread:
+        """Po `oneskorenie_s` sa na pozadí pripája (s odstupom medzi pokusmi), kým sa to nepodarí."""
 
+        def zahrievaj():
+            time.sleep(oneskorenie_s)
+            while self.ziskaj() is None:
+                time.sleep(max(self._dalsi_pokus - time.monotonic(), 0.1))
+            zapisovac.info("🔥 Pripojenie k databáze pripravené (zahriatie na pozadí)")
 
-def inicializuj_globalne_db_spojenie() -> Tuple[Optional[PripojenieDatabazy], Optional[KonfiguraciaDatabazy], Optional[dict]]:
+        vlakno = threading.Thread(target=zahrievaj, name="db-zahriatie", daemon=True)
+        vlakno.start()
+        return vlakno
+
+
+def spojeni_konfiguracie(konfiguracia: KonfiguraciaDatabazy) -> int:
+    """Najväčší počet spojení, ktoré môžu pool-y konfigurácie otvoriť (primárna databáza a repliky)."""
+    return (1 + len(konfiguracia.repliky)) * (konfiguracia.pool_velkost + konfiguracia.pool_max_navyse)
+
+
+class SpravcaPripojeni:
     """
-    Načíta konfiguráciu z prostredia, inicializuje a otestuje globálne pripojenie k databáze.
-    Vracia inštanciu pripojenia, konfiguráciu a informácie o dialekte.
+    Pripojenia k databázam podľa konfigurácie (napr. iná databáza pre používateľa či tenanta).
+    Relácie s rovnakou konfiguráciou zdieľajú jedno pripojenie a jeho pool-y. Počet pripojení
+    obmedzuje LRU `max_poolov` a súčet ich možných spojení `max_spojeni` (ochrana súborových
+    deskriptorov a spojení na serveri); pri nedostatku miesta sa zatvoria najdlhšie nepoužité
+    pripojenia bez vydaných spojení, prípadne sa nové pripojenie vytvorí s menším pool-om.
+    Pripojenia nepoužité dlhšie ako `necinnost_s` sa zatvárajú. Registrovaní poskytovatelia (napr.
+    globálny `poskytovatel_db`) sa nikdy nevyraďujú ani nemenia; každá iná konfigurácia dostane
+    vlastného poskytovateľa.
     """
-    # Konfigurácia pripojenia k databáze z premenných prostredia alebo predvolených hodnôt
-    konfiguracia = KonfiguraciaDatabazy(
+
+    def __init__(
+        self,
+        max_poolov: int = 16,
+        max_spojeni: int = 200,
+        necinnost_s: float = 300,
+        trieda: type = PripojenieDatabazy,
+    ):
+        self.max_poolov = max_poolov
+        self.max_spojeni = max_spojeni
+        self.necinnost_s = necinnost_s
+        self._trieda = trieda
+        # kľúč konfigurácie -> {"poskytovatel", "spojeni", "pouzite"}; poradie = LRU
+        self._polozky: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Kľúče registrovaných poskytovateľov (patria volajúcemu, správca ich nezatvára)
+        self._registrovani: Set[str] = set()
+        self._zamok = threading.Lock()
+        self._zatvorene = 0
+
+    @staticmethod
+    def _kluc(konfiguracia: KonfiguraciaDatabazy) -> str:
+        return konfiguracia.model_dump_json()
+
+    def registruj(self, poskytovatel: PoskytovatelDatabazy) -> None:
+        """Zaradí existujúceho poskytovateľa (napr. globálneho) pod kľúč jeho konfigurácie; nikdy sa nevyradí."""
+        kluc = self._kluc(poskytovatel.konfiguracia)
+        with self._zamok:
+            self._registrovani.add(kluc)
+            self._polozky[kluc] = {
+                "poskytovatel": poskytovatel,
+                "spojeni": spojeni_konfiguracie(poskytovatel.konfiguracia),
+                "pouzite": time.monotonic(),
+            }
+
+    async def ziskaj_async(self, konfiguracia: KonfiguraciaDatabazy) -> Optional[ZakladPripojeniaDatabazy]:
+        """
+        Vráti pripojenie pre konfiguráciu (pri prvom použití ho vytvorí). None, ak sa nedá pripojiť
+        alebo je vyčerpaný limit pripojení/spojení a žiadne iné pripojenie nie je nečinné.
+        """
+        kluc = self._kluc(konfiguracia)
+        with self._zamok:
+            na_zatvorenie = self._necinne(vynechat=kluc)
+            polozka = self._polozky.get(kluc)
+            if polozka is None:
+                polozka = self._vytvor(kluc, konfiguracia, na_zatvorenie)
+            if polozka is not None:
+                polozka["pouzite"] = time.monotonic()
+                self._polozky.move_to_end(kluc)
+        for poskytovatel in na_zatvorenie:
+            await poskytovatel.zatvor_async()
+        if polozka is None:
+            return None
+        return await polozka["poskytovatel"].ziskaj_async()
+
+    def _necinne(self, vynechat: str) -> List[PoskytovatelDatabazy]:
+        """Vyradí pripojenia nepoužité dlhšie ako `necinnost_s` (volá sa pod zámkom)."""
+        hranica = time.monotonic() - self.necinnost_s
+        vyradene = [
+            kluc for kluc, polozka in self._polozky.items()
+            if kluc != vynechat and polozka["pouzite"] < hranica and self._je_volne(kluc)
+        ]
+        return [self._vyrad(kluc) for kluc in vyradene]
+
+    def _je_volne(self, kluc: str) -> bool:
+        """Či sa pripojenie dá zatvoriť: nie je registrované a nemá vydané spojenia."""
+        if kluc in self._registrovani:
+            return False
+        spojenie = self._polozky[kluc]["poskytovatel"].spojenie
+        return spojenie is None or spojenie.pouzivane_spojenia() == 0
+
+    def _vyrad(self, kluc: str) -> PoskytovatelDatabazy:
+        self._zatvorene += 1
+        return self._polozky.pop(kluc)["poskytovatel"]
+
+    def _vytvor(
+        self, kluc: str, konfiguracia: KonfiguraciaDatabazy, na_zatvorenie: List[PoskytovatelDatabazy]
+    ) -> Optional[Dict[str, Any]]:
+        """Vytvorí pripojenie v rámci limitov, podľa potreby vyradí nepoužívané (volá sa pod zámkom)."""
+        potrebne = spojeni_konfiguracie(konfiguracia)
+        for stary_kluc in list(self._polozky):
+            obsadene = sum(polozka["spojeni"] for polozka in self._polozky.values())
+            if len(self._polozky) < self.max_poolov and obsadene + potrebne <= self.max_spojeni:
+                break
+            if self._je_volne(stary_kluc):
+                na_zatvorenie.append(self._vyrad(stary_kluc))
+
+        obsadene = sum(polozka["spojeni"] for polozka in self._polozky.values())
+        volne = self.max_spojeni - obsadene
+        pool_na_endpoint = volne // (1 + len(konfiguracia.repliky))
+        if len(self._polozky) >= self.max_poolov or pool_na_endpoint < 1:
+            zapisovac.warning(
+                f"⚠️ Limit databázových pripojení vyčerpaný ({len(self._polozky)} pripojení, {obsadene} spojení)"
+            )
+            return None
+        if potrebne > volne:
+            # Menší pool, aby súčet spojení neprekročil globálny limit
+            velkost = min(konfiguracia.pool_velkost, pool_na_endpoint)
+            konfiguracia = konfiguracia.model_copy(update={
+                "pool_velkost": velkost, "pool_max_navyse": min(konfiguracia.pool_max_navyse, pool_na_endpoint - velkost),
+            })
+            zapisovac.warning(f"⚠️ Pool pre {konfiguracia.databaza} zmenšený na {pool_na_endpoint} spojení (globálny limit)")
+
+        polozka = {
+            "poskytovatel": PoskytovatelDatabazy(konfiguracia, self._trieda),
+            "spojeni": spojeni_konfiguracie(konfiguracia),
+            "pouzite": time.monotonic(),
+        }
+        self._polozky[kluc] = polozka
+        return polozka
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Počet pripojení, ich možných a práve vydaných spojení a počet zatvorených pripojení."""
+        with self._zamok:
+            polozky = list(self._polozky.values())
+        return {
+            "pripojenia": len(polozky),
+            "spojenia_max": sum(polozka["spojeni"] for polozka in polozky),
+            "spojenia_vydane": sum(
+                polozka["poskytovatel"].spojenie.pouzivane_spojenia()
+                for polozka in polozky if polozka["poskytovatel"].spojenie is not None
+            ),
+            "zatvorene": self._zatvorene,
+        }
+
+
+def nacitaj_konfiguraciu_db() -> KonfiguraciaDatabazy:
+    """Načíta konfiguráciu databázy z premenných prostredia (bez pripájania)."""
+    return KonfiguraciaDatabazy(
         dialekt=os.getenv("DB_DIALECT", "sqlite"),
         pouzivatelske_meno=os.getenv("DB_USERNAME"),
         heslo=os.getenv("DB_PASSWORD"),
@@ -95,24 +1411,59 @@ def inicializuj_globalne_db_spojenie() -> Tuple[Optional[PripojenieDatabazy], Op
         port=int(os.getenv("DB_PORT")) if os.getenv("DB_PORT") else None,
         # Predvolená cesta pre SQLite relatívna k root adresáru projektu
         databaza=os.getenv("DB_DATABASE", "scratchpad/apka_databaza.db"),
+        max_vlakien=int(os.getenv("DB_MAX_VLAKIEN", "4")),
+        velkost_stranky=int(os.getenv("DB_VELKOST_STRANKY", "50")),
+        necinnost_strankovania_s=float(os.getenv("DB_NECINNOST_STRANKOVANIA_S", "120")),
+        max_riadkov=int(os.getenv("DB_MAX_RIADKOV", "10000")),
+        max_pamat_mb=float(os.getenv("DB_MAX_PAMAT_MB", "64")),
+        cache_vysledkov_max_poloziek=int(os.getenv("DB_CACHE_VYSLEDKOV_MAX_POLOZIEK", "256")),
+        cache_vysledkov_max_riadkov=int(os.getenv("DB_CACHE_VYSLEDKOV_MAX_RIADKOV", "5000")),
+        cache_prikazov_max_poloziek=int(os.getenv("DB_CACHE_PRIKAZOV_MAX_POLOZIEK", "256")),
+        poradca_indexov=os.getenv("DB_PORADCA_INDEXOV", "1") == "1",
+        timeout_dotazu_s=float(os.getenv("DB_TIMEOUT_DOTAZU_S", "30")),
+        strazca_politika=os.getenv("DB_STRAZCA_POLITIKA", "potvrdit"),
+        strazca_max_naklady=float(os.getenv("DB_STRAZCA_MAX_NAKLADY", "10000000")),
+        strazca_max_riadkov=float(os.getenv("DB_STRAZCA_MAX_RIADKOV", "1000000")),
+        strazca_limit_riadkov=int(os.getenv("DB_STRAZCA_LIMIT_RIADKOV", "1000")),
+        prah_suboru_riadkov=int(os.getenv("DB_PRAH_SUBORU_RIADKOV", "500")),
+        format_suboru=os.getenv("DB_FORMAT_SUBORU", "csv"),
+        max_riadkov_suboru=int(os.getenv("DB_MAX_RIADKOV_SUBORU", "1000000")),
+        adresar_vysledkov=os.getenv("DB_ADRESAR_VYSLEDKOV", "scratchpad/vysledky"),
+        pool_velkost=int(os.getenv("DB_POOL_VELKOST", "5")),
+        pool_max_navyse=int(os.getenv("DB_POOL_MAX_NAVYSE", "10")),
+        pool_timeout_s=float(os.getenv("DB_POOL_TIMEOUT_S", "30")),
+        pool_recyklacia_s=int(os.getenv("DB_POOL_RECYKLACIA_S", "1800")),
+        pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        sqlite_wal=os.getenv("DB_SQLITE_WAL", "1") == "1",
+        sqlite_synchronous=os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL"),
+        sqlite_mmap_mb=int(os.getenv("DB_SQLITE_MMAP_MB", "256")),
+        sqlite_cache_mb=int(os.getenv("DB_SQLITE_CACHE_MB", "64")),
+        sqlite_busy_timeout_ms=int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        repliky=[ciel.strip() for ciel in os.getenv("DB_REPLIKY", "").split(",") if ciel.strip()],
+        replika_pauza_s=float(os.getenv("DB_REPLIKA_PAUZA_S", "30")),
+        pripojenie_pauza_s=float(os.getenv("DB_PRIPOJENIE_PAUZA_S", "1")),
+        pripojenie_max_pauza_s=float(os.getenv("DB_PRIPOJENIE_MAX_PAUZA_S", "60")),
+        zahriatie_s=float(os.getenv("DB_ZAHRIATIE_S", "0")),
     )
 
-    # Vytvorenie globálnej inštancie pripojenia k databáze
-    spojenie = PripojenieDatabazy()
 
-    # Inicializácia pripojenia k databáze
-    if spojenie.pripoj(konfiguracia):
-        info_dialekt = INFO_O_DIALEKTE.get(konfiguracia.dialekt.lower(), {})
-        return spojenie, konfiguracia, info_dialekt
-    else:
-        zapisovac.warning("Nepodarilo sa inicializovať globálne databázové pripojenie.")
-        return None, konfiguracia, None # Vrátime konfiguráciu pre prípadnú diagnostiku
+# Konfigurácia sa načíta pri importe, pripojenie až pri prvom použití (alebo pri zahriatí po štarte aplikácie)
+db_konfiguracia = nacitaj_konfiguraciu_db()
+# DB_ASYNC=1: natívne asynchrónny ovládač
+trieda_pripojenia = AsyncPripojenieDatabazy if os.getenv("DB_ASYNC", "0") == "1" else PripojenieDatabazy
+poskytovatel_db = PoskytovatelDatabazy(db_konfiguracia, trieda_pripojenia)
+info_o_dialekte = poskytovatel_db.info_o_dialekte
 
-# Inicializácia globálnych premenných pri importe modulu
-db_spojenie, db_konfiguracia, info_o_dialekte = inicializuj_globalne_db_spojenie()
+# Pripojenia relácií (každá relácia môže mať vlastnú konfiguráciu, predvolene `db_konfiguracia`)
+spravca_pripojeni = SpravcaPripojeni(
+    max_poolov=int(os.getenv("DB_MAX_POOLOV", "16")),
+    max_spojeni=int(os.getenv("DB_MAX_SPOJENI", "200")),
+    necinnost_s=float(os.getenv("DB_NECINNOST_POOLU_S", "300")),
+    trieda=trieda_pripojenia,
+)
+spravca_pripojeni.registruj(poskytovatel_db)
 
 # Export preložených názvov pre kompatibilitu (ak ich iné moduly očakávajú)
 # Tieto aliasy by sa mali časom odstrániť a priamo používať nové názvy
-db_connection = db_spojenie
 db_config = db_konfiguracia
 dialect_info = info_o_dialekte
@@ -0,0 +1,175 @@
+"""Katalóg schémy zostavený zo živej databázy (SQLAlchemy inspector) s inkrementálnou cache na disku."""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from apka.widgets.spolocne import scratch_pad_adresar, zapisovac
+
+
+def _hash(hodnota: Any) -> str:
+    return hashlib.sha256(json.dumps(hodnota, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class KatalogSchemy:
+    """
+    Zostaví popis tabuliek zo živej databázy a uloží ho na disk.
+    Pri ďalšom štarte znovu načíta (inspector) len tabuľky, ktorých definícia sa zmenila:
+    SQLite podľa `PRAGMA schema_version` a SQL v `sqlite_master`, ostatné dialekty podľa
+    odtlačku stĺpcov z `information_schema.columns`.
+    """
+
+    def __init__(self, engine: Engine, cesta_cache: Optional[str] = None):
+        self._engine = engine
+        if cesta_cache is None:
+            identita = _hash(engine.url.render_as_string(hide_password=True))
+            cesta_cache = os.path.join(scratch_pad_adresar, f"katalog_schemy_{identita}.json")
+        self._cesta_cache = cesta_cache
+
+    # --- Verejné API ---
+
+    def nacitaj(self) -> Dict[str, dict]:
+        """Vráti tabuľky vo formáte popis_schemy.yaml (`columns` s name/type/constraints)."""
+        cache = self._nacitaj_cache()
+        with self._engine.connect() as spojenie:
+            verzia = self._verzia_schemy(spojenie)
+            if verzia is not None and cache.get("verzia") == verzia:
+                return cache["tabulky"]
+
+            odtlacky = self._odtlacky_tabuliek(spojenie)
+
+        stare_odtlacky = cache.get("odtlacky", {})
+        tabulky: Dict[str, dict] = {}
+        zmenene: List[str] = []
+        for nazov, odtlacok in odtlacky.items():
+            if odtlacok is not None and stare_odtlacky.get(nazov) == odtlacok and nazov in cache.get("tabulky", {}):
+                tabulky[nazov] = cache["tabulky"][nazov]
+            else:
+                zmenene.append(nazov)
+
+        if zmenene:
+            inspector = inspect(self._engine)
+            for nazov in zmenene:
+                tabulky[nazov] = self._introspekcia_tabulky(inspector, nazov)
+        zapisovac.info(
+            f"Katalóg schémy: {len(tabulky)} tabuliek, znovu načítaných {len(zmenene)} "
+            f"({', '.join(zmenene) if zmenene else 'žiadna zmena'})"
+        )
+
+        self._uloz_cache({"verzia": verzia, "odtlacky": odtlacky, "tabulky": tabulky})
+        return tabulky
+
+    # --- Detekcia zmien ---
+
+    def _verzia_schemy(self, spojenie) -> Optional[int]:
+        """Globálna verzia schémy (len SQLite); None, ak ju dialekt neposkytuje."""
+        if self._engine.dialect.name != "sqlite":
+            return None
+        return spojenie.execute(text("PRAGMA schema_version")).scalar()
+
+    def _odtlacky_tabuliek(self, spojenie) -> Dict[str, Optional[str]]:
+        """Vráti odtlačok definície každej tabuľky (None = zmenu nevieme zistiť, treba introspekciu)."""
+        dialekt = self._engine.dialect.name
+        if dialekt == "sqlite":
+            riadky = spojenie.execute(
+                text("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+            )
+            return {nazov: _hash(sql) for nazov, sql in riadky}
+
+        if dialekt in ("postgresql", "mysql", "mariadb"):
+            schema = "current_schema()" if dialekt == "postgresql" else "DATABASE()"
+            riadky = spojenie.execute(text(f"""
+                SELECT table_name, column_name, data_type, is_nullable, column_default
+                FROM information_schema.columns
+                WHERE table_schema = {schema}
+                ORDER BY table_name, ordinal_position
+            """))
+            stlpce_tabuliek: Dict[str, list] = {}
+            for nazov, *stlpec in riadky:
+                stlpce_tabuliek.setdefault(nazov, []).append(stlpec)
+            return {nazov: _hash(stlpce) for nazov, stlpce in stlpce_tabuliek.items()}
+
+        # Neznámy dialekt: bez odtlačku, každá tabuľka sa načíta znovu
+        return {nazov: None for nazov in inspect(self._engine).get_table_names()}
+
+    # --- Introspekcia ---
+
+    def _introspekcia_tabulky(self, inspector, nazov: str) -> dict:
+        primarny_kluc = set(inspector.get_pk_constraint(nazov).get("constrained_columns") or [])
+        cudzie_kluce = {}
+        for fk in inspector.get_foreign_keys(nazov):
+            for stlpec, ciel in zip(fk["constrained_columns"], fk["referred_columns"]):
+                cudzie_kluce[stlpec] = f"foreign key to {fk['referred_table']}.{ciel}"
+        try:
+            kontroly = [kontrola["sqltext"] for kontrola in inspector.get_check_constraints(nazov)]
+        except NotImplementedError:
+            kontroly = []
+
+        stlpce = []
+        for stlpec in inspector.get_columns(nazov):
+            obmedzenia = []
+            if stlpec["name"] in primarny_kluc:
+                obmedzenia.append("primary key")
+            if stlpec["name"] in cudzie_kluce:
+                obmedzenia.append(cudzie_kluce[stlpec["name"]])
+            if not stlpec.get("nullable", True) and stlpec["name"] not in primarny_kluc:
+                obmedzenia.append("not null")
+            if stlpec.get("default") is not None:
+                obmedzenia.append(f"default {stlpec['default']}")
+            obmedzenia += [
+                f"check {kontrola}" for kontrola in kontroly if re.search(rf"\b{re.escape(stlpec['name'])}\b", str(kontrola))
+            ]
+
+            popis_stlpca = {"name": stlpec["name"], "type": str(stlpec["type"]).lower()}
+            if obmedzenia:
+                popis_stlpca["constraints"] = ", ".join(obmedzenia)
+            stlpce.append(popis_stlpca)
+        return {"columns": stlpce}
+
+    # --- Cache na disku ---
+
+    def _nacitaj_cache(self) -> Dict[str, Any]:
+        if not os.path.exists(self._cesta_cache):
+            return {}
+        try:
+            with open(self._cesta_cache, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa načítať cache katalógu schémy: {e}")
+            return {}
+
+    def _uloz_cache(self, data: Dict[str, Any]) -> None:
+        try:
+            docasny_subor = f"{self._cesta_cache}.tmp"
+            with open(docasny_subor, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(docasny_subor, self._cesta_cache)
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa uložiť cache katalógu schémy: {e}")
+
+
+def zluc_s_popismi(tabulky_db: Dict[str, dict], tabulky_yaml: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Zlúči živý katalóg s ručnými popismi z YAML: štruktúra (tabuľky, stĺpce, typy, kľúče)
+    pochádza z databázy, popisy tabuliek a stĺpcov z YAML. Tabuľky, ktoré v DB nie sú, sa vynechajú.
+    """
+    zlucene = {}
+    for nazov, info in tabulky_db.items():
+        info_yaml = tabulky_yaml.get(nazov, {})
+        popisy_stlpcov = {stlpec["name"]: stlpec for stlpec in info_yaml.get("columns", [])}
+        stlpce = []
+        for stlpec in info["columns"]:
+            stlpec = dict(stlpec)
+            stlpec_yaml = popisy_stlpcov.get(stlpec["name"], {})
+            if stlpec_yaml.get("description"):
+                stlpec["description"] = stlpec_yaml["description"]
+            stlpce.append(stlpec)
+        zlucene[nazov] = {"columns": stlpce}
+        if info_yaml.get("description"):
+            zlucene[nazov]["description"] = info_yaml["description"]
+    return zlucene
@@ -0,0 +1,104 @@
+"""Schéma databázy a z nej odvodené štruktúry pre generovanie SQL (popis, index tabuliek, rýchla cesta, odtlačok)."""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from apka.models.db_models import KonfiguraciaDatabazy
+from apka.settings.databaza import db_konfiguracia
+from apka.utils.nl2sql_cache import odtlacok_schemy
+from apka.utils.priklady_dotazov import priklady_dotazov
+from apka.utils.rychla_cesta import RychlaCesta, vytvor_rychlu_cestu
+from apka.utils.schema_helper import SchemaDatabazy, schema_aplikacie
+from apka.utils.vyber_schemy import IndexSchemy, vyber_popis_schemy, vytvor_index
+
+
+class KontextDatabazy:
+    """
+    Schéma jednej databázy a štruktúry z nej odvodené pre NL→SQL: popis pre prompt, index tabuliek,
+    rýchla cesta a odtlačok pre NL→SQL cache a úložisko príkladov. `priprav` pred použitím doplní schému z katalógu
+    databázy (ak je pripojená) a po zmene schémy odvodené štruktúry obnoví.
+    """
+
+    def __init__(
+        self, schema: SchemaDatabazy, dialekt: str, rychla_cesta: Optional[RychlaCesta] = None, identita: str = ""
+    ):
+        self.schema = schema
+        self.dialekt = dialekt.lower()
+        self.identita = identita
+        self.rychla_cesta = rychla_cesta or vytvor_rychlu_cestu()
+        self.index: Optional[IndexSchemy] = None
+        self.popis_schemy = ""
+        self.popis_tabuliek = ""
+        self.odtlacok = ""
+        self._verzia: Optional[int] = None
+        self._zamok = threading.Lock()
+
+    async def priprav(self, db_spojenie=None) -> "KontextDatabazy":
+        """Načíta schému (pri prvom použití po pripojení aj z katalógu databázy) a obnoví odvodené štruktúry."""
+        await self.schema.data_async(db_spojenie)
+        self.obnov()
+        return self
+
+    def obnov(self) -> None:
+        """Obnoví odvodené štruktúry, ak sa od posledného volania zmenila schéma (bez prístupu k databáze)."""
+        with self._zamok:
+            data = self.schema.aktualne_data()
+            if self.schema.verzia == self._verzia:
+                return
+            self.popis_schemy = self.schema.popis()
+            self.popis_tabuliek = self.schema.popis(s_prikladmi=False)
+            self.odtlacok = odtlacok_schemy(self.popis_schemy, self.dialekt, self.identita)
+            self.index = vytvor_index(data)
+            self.rychla_cesta.nastav_schemu((data or {}).get("tables"))
+            # Ručné príklady otázka→SQL zo schémy patria k jej odtlačku
+            priklady_dotazov.pridaj_pociatocne((data or {}).get("example_queries", []), self.odtlacok)
+            self._verzia = self.schema.verzia
+
+    def popis_pre_otazku(self, otazka: str) -> str:
+        """Popis len tabuliek relevantných k otázke (bez statických príkladov), pri vypnutom výbere všetky tabuľky."""
+        return vyber_popis_schemy(self.index, otazka, s_prikladmi=False) or self.popis_tabuliek
+
+
+def identita_databazy(konfiguracia: KonfiguraciaDatabazy) -> str:
+    """Identita databázy konfigurácie (dialekt, server, databáza, používateľ; bez hesla a nastavení pool-u)."""
+    casti = (konfiguracia.dialekt.lower(), konfiguracia.hostitel, konfiguracia.port, konfiguracia.databaza, konfiguracia.pouzivatelske_meno)
+    return "|".join(str(cast or "") for cast in casti)
+
+
+class KontextyDatabaz:
+    """
+    Kontext pre každú databázu, s ktorou relácie pracujú (napr. iná databáza pre používateľa či tenanta),
+    aby schéma, index tabuliek, rýchla cesta so slovníkom autorov aj odtlačok pre cache a príklady patrili
+    jej, nie databáze aplikácie. Predvolená databáza má `kontext_aplikacie` (schéma z YAML a katalógu),
+    ostatné len schému z katalógu. Počet ostatných kontextov obmedzuje LRU `max_kontextov`.
+    """
+
+    def __init__(self, predvoleny: KontextDatabazy, predvolena_konfiguracia: KonfiguraciaDatabazy, max_kontextov: int = 16):
+        self._predvoleny = predvoleny
+        self._predvolena_identita = identita_databazy(predvolena_konfiguracia)
+        self.max_kontextov = max_kontextov
+        self._kontexty: "OrderedDict[str, KontextDatabazy]" = OrderedDict()
+        self._zamok = threading.Lock()
+
+    def pre_konfiguraciu(self, konfiguracia: KonfiguraciaDatabazy) -> KontextDatabazy:
+        """Kontext databázy konfigurácie (pri prvom použití ho vytvorí, schéma sa načíta až v `priprav`)."""
+        identita = identita_databazy(konfiguracia)
+        if identita == self._predvolena_identita:
+            return self._predvoleny
+        with self._zamok:
+            kontext = self._kontexty.get(identita)
+            if kontext is None:
+                kontext = KontextDatabazy(SchemaDatabazy(s_yaml=False), konfiguracia.dialekt, identita=identita)
+                self._kontexty[identita] = kontext
+                while len(self._kontexty) > self.max_kontextov:
+                    self._kontexty.popitem(last=False)
+            self._kontexty.move_to_end(identita)
+            return kontext
+
+
+# Kontext predvolenej databázy aplikácie; schéma sa načíta pri prvom použití
+kontext_aplikacie = KontextDatabazy(schema_aplikacie, db_konfiguracia.dialekt, identita=identita_databazy(db_konfiguracia))
+# Kontexty databáz relácií s vlastnou konfiguráciou
+kontexty_databaz = KontextyDatabaz(kontext_aplikacie, db_konfiguracia, max_kontextov=int(os.getenv("DB_MAX_POOLOV", "16")))
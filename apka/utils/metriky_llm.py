@@ -0,0 +1,268 @@
+"""
+Metriky volaní LLM: latencia, čas do prvého tokenu, čakanie na plánovač, tokeny, opakovania a náklady
+pre každú úlohu (`sql_generation`, `image_prompt`, ...). Hodnoty sa zbierajú do histogramov v procese,
+exportujú sa v textovom formáte Prometheus a pravidelne sa sumarizujú do logu.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from apka.utils.planovac_llm import LLMPretazene, planovac_llm
+from apka.widgets.spolocne import zapisovac
+
+HRANICE_SEKUND = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+HRANICE_TOKENOV = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+class Histogram:
+    """Histogram s pevnými hranicami košov (kumulatívne ako v Prometheus), súčtom a počtom hodnôt."""
+
+    def __init__(self, hranice: Sequence[float]):
+        self.hranice = tuple(hranice)
+        self.pocty = [0] * (len(self.hranice) + 1)
+        self.sucet = 0.0
+        self.pocet = 0
+
+    def pridaj(self, hodnota: float) -> None:
+        index = next((i for i, hranica in enumerate(self.hranice) if hodnota <= hranica), len(self.hranice))
+        self.pocty[index] += 1
+        self.sucet += hodnota
+        self.pocet += 1
+
+    def kvantil(self, q: float) -> float:
+        """Odhad kvantilu lineárnou interpoláciou v koši (nad poslednou hranicou vráti poslednú hranicu)."""
+        if not self.pocet:
+            return 0.0
+        ciel = q * self.pocet
+        kumulativne = 0
+        for i, pocet in enumerate(self.pocty):
+            if pocet and kumulativne + pocet >= ciel:
+                if i == len(self.hranice):
+                    return self.hranice[-1]
+                dolna = self.hranice[i - 1] if i else 0.0
+                return dolna + (self.hranice[i] - dolna) * (ciel - kumulativne) / pocet
+            kumulativne += pocet
+        return self.hranice[-1]
+
+
+class MetrikyLLM:
+    """Histogramy a počítadlá volaní LLM podľa (úloha, model)."""
+
+    HISTOGRAMY = {
+        "latencia_sekundy": ("Trvanie volania API (posledný pokus)", HRANICE_SEKUND),
+        "ttft_sekundy": ("Čas do prvého tokenu vrátane čakania na plánovač", HRANICE_SEKUND),
+        "cakanie_sekundy": ("Čakanie na rozpočet plánovača a neúspešné pokusy", HRANICE_SEKUND),
+        "tokeny_vstup": ("Tokeny promptu na volanie", HRANICE_TOKENOV),
+        "tokeny_vystup": ("Tokeny odpovede na volanie", HRANICE_TOKENOV),
+    }
+
+    def __init__(self, interval_suhrnu_s: float = 300.0):
+        self.interval_suhrnu_s = interval_suhrnu_s
+        self._zamok = threading.Lock()
+        self._histogramy: Dict[Tuple[str, str], Dict[str, Histogram]] = {}
+        self._pocitadla: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._uloha_suhrnu: Optional[asyncio.Task] = None
+        # Register LLM klientov (`RegisterLLM`), ktorého vytváranie a znovupoužitie klientov sa exportuje
+        self._register_klientov = None
+
+    def pripoj_register(self, register) -> None:
+        """Pripojí register LLM klientov; jeho štatistiky sa pridajú do exportu a súhrnu v logu."""
+        self._register_klientov = register
+
+    def zaznamenaj(
+        self,
+        uloha: str,
+        model: str,
+        vysledok: str = "ok",
+        latencia_s: Optional[float] = None,
+        ttft_s: Optional[float] = None,
+        cakanie_s: float = 0.0,
+        tokeny_vstup: int = 0,
+        tokeny_vystup: int = 0,
+        opakovania: int = 0,
+        naklady_usd: float = 0.0,
+    ) -> None:
+        """Zaznamená jedno volanie LLM; `vysledok` je `ok`, `chyba` alebo `odmietnute` (preťaženie)."""
+        kluc = (uloha, model)
+        with self._zamok:
+            histogramy = self._histogramy.setdefault(
+                kluc, {nazov: Histogram(hranice) for nazov, (_, hranice) in self.HISTOGRAMY.items()}
+            )
+            pocitadla = self._pocitadla.setdefault(
+                kluc, {"ok": 0, "chyba": 0, "odmietnute": 0, "opakovania": 0, "tokeny_vstup": 0, "tokeny_vystup": 0, "naklady_usd": 0.0}
+            )
+            pocitadla[vysledok] += 1
+            pocitadla["opakovania"] += opakovania
+            if vysledok != "ok":
+                return
+            histogramy["latencia_sekundy"].pridaj(latencia_s or 0.0)
+            histogramy["ttft_sekundy"].pridaj(ttft_s if ttft_s is not None else latencia_s or 0.0)
+            histogramy["cakanie_sekundy"].pridaj(cakanie_s)
+            histogramy["tokeny_vstup"].pridaj(tokeny_vstup)
+            histogramy["tokeny_vystup"].pridaj(tokeny_vystup)
+            pocitadla["tokeny_vstup"] += tokeny_vstup
+            pocitadla["tokeny_vystup"] += tokeny_vystup
+            pocitadla["naklady_usd"] += naklady_usd
+
+    def suhrn(self) -> Dict[str, Dict[str, Any]]:
+        """Pre každú úlohu a model počty volaní, p50/p95 latencie, TTFT a čakania, tokeny a náklady."""
+        with self._zamok:
+            vysledok = {}
+            for (uloha, model), pocitadla in self._pocitadla.items():
+                histogramy = self._histogramy[(uloha, model)]
+                vysledok[f"{uloha}/{model}"] = {
+                    **{k: round(v, 6) if isinstance(v, float) else v for k, v in pocitadla.items()},
+                    "latencia_p50_s": round(histogramy["latencia_sekundy"].kvantil(0.5), 3),
+                    "latencia_p95_s": round(histogramy["latencia_sekundy"].kvantil(0.95), 3),
+                    "ttft_p50_s": round(histogramy["ttft_sekundy"].kvantil(0.5), 3),
+                    "cakanie_p95_s": round(histogramy["cakanie_sekundy"].kvantil(0.95), 3),
+                }
+            return vysledok
+
+    def prometheus(self) -> str:
+        """Metriky v textovom formáte Prometheus (vrátane stavu plánovača LLM)."""
+        riadky: List[str] = []
+        with self._zamok:
+            for nazov, (popis, hranice) in self.HISTOGRAMY.items():
+                riadky += [f"# HELP llm_{nazov} {popis}", f"# TYPE llm_{nazov} histogram"]
+                for (uloha, model), histogramy in self._histogramy.items():
+                    histogram = histogramy[nazov]
+                    stitky = f'uloha="{uloha}",model="{model}"'
+                    kumulativne = 0
+                    for hranica, pocet in zip(list(hranice) + ["+Inf"], histogram.pocty):
+                        kumulativne += pocet
+                        riadky.append(f'llm_{nazov}_bucket{{{stitky},le="{hranica}"}} {kumulativne}')
+                    riadky.append(f"llm_{nazov}_sum{{{stitky}}} {histogram.sucet:g}")
+                    riadky.append(f"llm_{nazov}_count{{{stitky}}} {histogram.pocet}")
+            riadky += ["# HELP llm_volania_celkom Volania LLM podľa výsledku", "# TYPE llm_volania_celkom counter"]
+            for (uloha, model), pocitadla in self._pocitadla.items():
+                for vysledok in ("ok", "chyba", "odmietnute"):
+                    riadky.append(f'llm_volania_celkom{{uloha="{uloha}",model="{model}",vysledok="{vysledok}"}} {pocitadla[vysledok]}')
+            for nazov, popis in (
+                ("opakovania", "Opakované pokusy po dočasnej chybe"),
+                ("tokeny_vstup", "Tokeny promptov"),
+                ("tokeny_vystup", "Tokeny odpovedí"),
+                ("naklady_usd", "Odhadované náklady v USD"),
+            ):
+                riadky += [f"# HELP llm_{nazov}_celkom {popis}", f"# TYPE llm_{nazov}_celkom counter"]
+                for (uloha, model), pocitadla in self._pocitadla.items():
+                    riadky.append(f'llm_{nazov}_celkom{{uloha="{uloha}",model="{model}"}} {pocitadla[nazov]:g}')
+
+        planovac = planovac_llm.statistiky()
+        riadky += [
+            "# HELP llm_planovac_fronta Volania čakajúce na rozpočet plánovača",
+            "# TYPE llm_planovac_fronta gauge",
+            f"llm_planovac_fronta {planovac['fronta']}",
+            "# HELP llm_planovac_obmedzenia_api_celkom Odpovede 429 z API",
+            "# TYPE llm_planovac_obmedzenia_api_celkom counter",
+            f"llm_planovac_obmedzenia_api_celkom {planovac['obmedzenia_api']}",
+        ]
+        if self._register_klientov is not None:
+            ulohy = self._register_klientov.statistiky()["ulohy"]
+            for nazov, popis in (
+                ("vytvorene", "Vytvorené LLM klienty (prvé použitie úlohy alebo zmena konfigurácie)"),
+                ("znovupouzite", "Volania, ktoré použili už vytvoreného LLM klienta"),
+                ("cas_vytvarania_ms", "Čas strávený vytváraním LLM klientov v milisekundách"),
+            ):
+                riadky += [f"# HELP llm_klienty_{nazov}_celkom {popis}", f"# TYPE llm_klienty_{nazov}_celkom counter"]
+                for uloha, statistiky in ulohy.items():
+                    riadky.append(f'llm_klienty_{nazov}_celkom{{uloha="{uloha}"}} {statistiky[nazov]:g}')
+        return "\n".join(riadky) + "\n"
+
+    def zaloguj_suhrn(self) -> None:
+        for kluc, hodnoty in self.suhrn().items():
+            zapisovac.info(
+                f"📊 LLM {kluc}: {hodnoty['ok']} volaní (chyby {hodnoty['chyba']}, odmietnuté {hodnoty['odmietnute']}, "
+                f"opakovania {hodnoty['opakovania']}), latencia p50 {hodnoty['latencia_p50_s']} s / p95 {hodnoty['latencia_p95_s']} s, "
+                f"TTFT p50 {hodnoty['ttft_p50_s']} s, čakanie p95 {hodnoty['cakanie_p95_s']} s, "
+                f"tokeny {hodnoty['tokeny_vstup']}/{hodnoty['tokeny_vystup']}, {hodnoty['naklady_usd']:.4f} USD"
+            )
+        if self._register_klientov is not None:
+            for uloha, hodnoty in self._register_klientov.statistiky()["ulohy"].items():
+                zapisovac.info(
+                    f"📊 LLM klienty {uloha}: vytvorené {hodnoty['vytvorene']} ({hodnoty['cas_vytvarania_ms']} ms), "
+                    f"znovupoužité {hodnoty['znovupouzite']} ({hodnoty['miera_znovupouzitia']:.0%})"
+                )
+
+    def spusti_suhrn(self) -> None:
+        """Spustí pravidelný súhrn do logu v bežiacom event loope (raz; pri intervale 0 nič)."""
+        if self.interval_suhrnu_s <= 0 or (self._uloha_suhrnu is not None and not self._uloha_suhrnu.done()):
+            return
+        self._uloha_suhrnu = asyncio.get_running_loop().create_task(self._pravidelny_suhrn())
+
+    async def _pravidelny_suhrn(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_suhrnu_s)
+            self.zaloguj_suhrn()
+
+
+class MetrikyCallback(BaseCallbackHandler):
+    """
+    Callback LangChain pre inštanciu LLM jednej úlohy: meria každé volanie a zapisuje ho do `MetrikyLLM`.
+    Pri volaniach bez streamovania sa čas do prvého tokenu odhaduje ako celkový čas mínus čas generovania
+    odpovede, ktorý Groq vracia v `usage.completion_time`.
+    """
+
+    run_inline = True
+
+    def __init__(
+        self, metriky: MetrikyLLM, uloha: str, model: str,
+        cena_vstup_za_milion: float = 0.0, cena_vystup_za_milion: float = 0.0,
+    ):
+        self.metriky = metriky
+        self.uloha = uloha
+        self.model = model
+        self.cena_vstup_za_milion = cena_vstup_za_milion
+        self.cena_vystup_za_milion = cena_vystup_za_milion
+        self._behy: Dict[UUID, List[Optional[float]]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self._behy[run_id] = [time.perf_counter(), None]
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs) -> None:
+        self._behy[run_id] = [time.perf_counter(), None]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        beh = self._behy.get(run_id)
+        if beh is not None and beh[1] is None:
+            beh[1] = time.perf_counter() - beh[0]
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        beh = self._behy.pop(run_id, None)
+        if beh is None:
+            return
+        spolu = time.perf_counter() - beh[0]
+        vystup = response.llm_output or {}
+        pouzitie = vystup.get("token_usage") or {}
+        # Plánovač dopĺňa počet pokusov a trvanie posledného (úspešného) volania API
+        latencia = vystup.get("trvanie_volania_s", spolu)
+        ttft = beh[1]
+        if ttft is None and pouzitie.get("completion_time") is not None:
+            ttft = max(spolu - pouzitie["completion_time"], 0.0)
+        tokeny_vstup = pouzitie.get("prompt_tokens", 0)
+        tokeny_vystup = pouzitie.get("completion_tokens", 0)
+        self.metriky.zaznamenaj(
+            self.uloha, self.model,
+            latencia_s=latencia,
+            ttft_s=ttft,
+            cakanie_s=max(spolu - latencia, 0.0),
+            tokeny_vstup=tokeny_vstup,
+            tokeny_vystup=tokeny_vystup,
+            opakovania=vystup.get("opakovania", 0),
+            naklady_usd=(tokeny_vstup * self.cena_vstup_za_milion + tokeny_vystup * self.cena_vystup_za_milion) / 1_000_000,
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._behy.pop(run_id, None)
+        self.metriky.zaznamenaj(self.uloha, self.model, "odmietnute" if isinstance(error, LLMPretazene) else "chyba")
+
+
+# Globálne metriky, súhrn do logu každých LLM_METRIKY_INTERVAL_S sekúnd (0 = bez súhrnu)
+metriky_llm = MetrikyLLM(interval_suhrnu_s=float(os.getenv("LLM_METRIKY_INTERVAL_S", "300")))
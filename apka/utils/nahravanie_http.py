@@ -0,0 +1,256 @@
+"""
+Nahrávanie a prehrávanie HTTP komunikácie s externými API (Groq, Together, Tavily, Ultravox).
+
+V režime `nahravaj` sa každá dvojica požiadavka/odpoveď uloží do JSON nahrávky, v režime `prehravaj`
+sa odpovede podávajú z nahrávok bez siete, s nahranou alebo pevnou (syntetickou) latenciou. Kľúčom
+nahrávky je služba, metóda, URL a normalizované telo požiadavky bez tajomstiev; opakované rovnaké
+požiadavky sa prehrávajú v nahranom poradí.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from apka.widgets.spolocne import scratch_pad_adresar, zapisovac
+
+REZIMY = ("vypnute", "nahravaj", "prehravaj")
+# Polia tela požiadavky s tajomstvami: nevstupujú do kľúča a neukladajú sa
+TAJNE_POLIA = {"api_key", "apiKey"}
+# Hlavičky odpovede, ktoré po uložení dekódovaného tela neplatia
+VYNECHANE_HLAVICKY = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+class NahravacHTTP:
+    """Nahrávanie/prehrávanie HTTP pre httpx (Groq, Together) aj requests (Tavily, Ultravox REST)."""
+
+    def __init__(self, rezim: str = "vypnute", adresar: Optional[str] = None, latencia_s: Optional[float] = None):
+        if rezim not in REZIMY:
+            zapisovac.warning(f"⚠️ Neznámy režim nahrávania HTTP '{rezim}', nahrávanie je vypnuté")
+            rezim = "vypnute"
+        self.rezim = rezim
+        self.adresar = adresar or os.path.join(scratch_pad_adresar, "nahravky")
+        # None = prehrávať s nahranou latenciou, inak pevná latencia každej odpovede
+        self.latencia_s = latencia_s
+        self._zamok = threading.Lock()
+        self._nahravky: Dict[str, Dict[str, Any]] = {}
+        self._poradie: Dict[str, int] = {}
+        self._statistiky = {"nahrane": 0, "prehrane": 0, "chybajuce": 0}
+        if rezim != "vypnute":
+            zapisovac.info(f"📼 HTTP {rezim} ({self.adresar})")
+
+    @property
+    def aktivny(self) -> bool:
+        return self.rezim != "vypnute"
+
+    def api_kluc(self, premenna: str) -> Optional[str]:
+        """API kľúč z prostredia; pri prehrávaní stačí zástupná hodnota (sieť sa nepoužije)."""
+        return os.getenv(premenna) or ("prehravanie" if self.rezim == "prehravaj" else None)
+
+    # --- Napojenie na klientov ---
+
+    def httpx_klient(self, sluzba: str, limity: Optional[httpx.Limits] = None) -> httpx.Client:
+        """Synchrónny httpx klient, ktorého požiadavky idú cez nahrávač (pri vypnutom nahrávaní bežný klient)."""
+        vnutorny = httpx.HTTPTransport(limits=limity) if limity else httpx.HTTPTransport()
+        if not self.aktivny:
+            return httpx.Client(transport=vnutorny)
+        return httpx.Client(transport=_HttpxTransport(self, sluzba, vnutorny))
+
+    def httpx_klient_async(self, sluzba: str, limity: Optional[httpx.Limits] = None) -> httpx.AsyncClient:
+        """Asynchrónna obdoba `httpx_klient`."""
+        vnutorny = httpx.AsyncHTTPTransport(limits=limity) if limity else httpx.AsyncHTTPTransport()
+        if not self.aktivny:
+            return httpx.AsyncClient(transport=vnutorny)
+        return httpx.AsyncClient(transport=_HttpxAsyncTransport(self, sluzba, vnutorny))
+
+    def requests_session(self, sluzba: str) -> requests.Session:
+        """Session pre knižnice nad `requests`; pri aktívnom nahrávaní s adaptérom nahrávača."""
+        session = requests.Session()
+        if self.aktivny:
+            adapter = _RequestsAdapter(self, sluzba)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Počty nahraných, prehraných a chýbajúcich odpovedí."""
+        with self._zamok:
+            return {"rezim": self.rezim, **self._statistiky}
+
+    # --- Nahrávky ---
+
+    def nahraj(
+        self, sluzba: str, metoda: str, url: str, telo: bytes,
+        status: int, hlavicky: Dict[str, str], telo_odpovede: bytes, trvanie_s: float,
+    ) -> None:
+        kluc, poziadavka = self._kluc(sluzba, metoda, url, telo)
+        odpoved = {
+            "status": status,
+            "hlavicky": {k: v for k, v in hlavicky.items() if k.lower() not in VYNECHANE_HLAVICKY},
+            "telo": telo_odpovede.decode("utf-8", errors="replace"),
+            "trvanie_s": round(trvanie_s, 4),
+        }
+        with self._zamok:
+            # Prvé nahratie kľúča v procese prepíše staršiu nahrávku, ďalšie sa pridávajú v poradí
+            nahravka = self._nahravky.setdefault(kluc, {"sluzba": sluzba, "poziadavka": poziadavka, "odpovede": []})
+            nahravka["odpovede"].append(odpoved)
+            self._statistiky["nahrane"] += 1
+            cesta = self._cesta(sluzba, kluc)
+            os.makedirs(os.path.dirname(cesta), exist_ok=True)
+            with open(cesta, "w", encoding="utf-8") as f:
+                json.dump(nahravka, f, ensure_ascii=False, indent=1)
+
+    def prehraj(self, sluzba: str, metoda: str, url: str, telo: bytes) -> Tuple[int, Dict[str, str], bytes, float]:
+        """Vráti (status, hlavičky, telo, latencia_s) ďalšej nahranej odpovede; chýbajúca nahrávka = 404."""
+        kluc, _ = self._kluc(sluzba, metoda, url, telo)
+        with self._zamok:
+            nahravka = self._nahravky.get(kluc) or self._nacitaj(sluzba, kluc)
+            if nahravka is None or not nahravka["odpovede"]:
+                self._statistiky["chybajuce"] += 1
+                sprava = f"Nahrávka pre {sluzba} {metoda} {url} neexistuje ({self._cesta(sluzba, kluc)})"
+                zapisovac.warning(f"📼 {sprava}")
+                telo_chyby = json.dumps({"error": {"message": sprava, "type": "chybajuca_nahravka"}}).encode()
+                return 404, {"content-type": "application/json"}, telo_chyby, 0.0
+            poradie = self._poradie.get(kluc, 0)
+            self._poradie[kluc] = poradie + 1
+            odpoved = nahravka["odpovede"][poradie % len(nahravka["odpovede"])]
+            self._statistiky["prehrane"] += 1
+        latencia = odpoved["trvanie_s"] if self.latencia_s is None else self.latencia_s
+        return odpoved["status"], odpoved["hlavicky"], odpoved["telo"].encode("utf-8"), latencia
+
+    def _kluc(self, sluzba: str, metoda: str, url: str, telo: bytes) -> Tuple[str, Any]:
+        try:
+            obsah = json.loads(telo) if telo else None
+            if isinstance(obsah, dict):
+                obsah = {k: v for k, v in obsah.items() if k not in TAJNE_POLIA}
+            normalizovane = json.dumps(obsah, sort_keys=True, ensure_ascii=False)
+        except (ValueError, UnicodeDecodeError):
+            obsah = hashlib.sha256(telo).hexdigest()
+            normalizovane = obsah
+        odtlacok = hashlib.sha256(f"{sluzba}\n{metoda.upper()}\n{url}\n{normalizovane}".encode("utf-8")).hexdigest()
+        return odtlacok[:24], {"metoda": metoda.upper(), "url": url, "telo": obsah}
+
+    def _cesta(self, sluzba: str, kluc: str) -> str:
+        return os.path.join(self.adresar, sluzba, f"{kluc}.json")
+
+    def _nacitaj(self, sluzba: str, kluc: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._cesta(sluzba, kluc), "r", encoding="utf-8") as f:
+                nahravka = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._nahravky[kluc] = nahravka
+        return nahravka
+
+
+class _HttpxTransport(httpx.BaseTransport):
+    def __init__(self, nahravac: NahravacHTTP, sluzba: str, vnutorny: httpx.BaseTransport):
+        self._nahravac, self._sluzba, self._vnutorny = nahravac, sluzba, vnutorny
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        telo = request.read()
+        if self._nahravac.rezim == "prehravaj":
+            status, hlavicky, telo_odpovede, latencia = self._nahravac.prehraj(self._sluzba, request.method, str(request.url), telo)
+            time.sleep(latencia)
+            return httpx.Response(status, headers=hlavicky, content=telo_odpovede, request=request)
+        zaciatok = time.perf_counter()
+        odpoved = self._vnutorny.handle_request(request)
+        try:
+            telo_odpovede = odpoved.read()
+        finally:
+            odpoved.close()
+        self._nahravac.nahraj(
+            self._sluzba, request.method, str(request.url), telo,
+            odpoved.status_code, dict(odpoved.headers), telo_odpovede, time.perf_counter() - zaciatok,
+        )
+        return _odpoved_httpx(odpoved, telo_odpovede, request)
+
+    def close(self) -> None:
+        self._vnutorny.close()
+
+
+class _HttpxAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, nahravac: NahravacHTTP, sluzba: str, vnutorny: httpx.AsyncBaseTransport):
+        self._nahravac, self._sluzba, self._vnutorny = nahravac, sluzba, vnutorny
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        telo = await request.aread()
+        if self._nahravac.rezim == "prehravaj":
+            status, hlavicky, telo_odpovede, latencia = self._nahravac.prehraj(self._sluzba, request.method, str(request.url), telo)
+            await asyncio.sleep(latencia)
+            return httpx.Response(status, headers=hlavicky, content=telo_odpovede, request=request)
+        zaciatok = time.perf_counter()
+        odpoved = await self._vnutorny.handle_async_request(request)
+        try:
+            telo_odpovede = await odpoved.aread()
+        finally:
+            await odpoved.aclose()
+        self._nahravac.nahraj(
+            self._sluzba, request.method, str(request.url), telo,
+            odpoved.status_code, dict(odpoved.headers), telo_odpovede, time.perf_counter() - zaciatok,
+        )
+        return _odpoved_httpx(odpoved, telo_odpovede, request)
+
+    async def aclose(self) -> None:
+        await self._vnutorny.aclose()
+
+
+def _odpoved_httpx(odpoved: httpx.Response, telo: bytes, request: httpx.Request) -> httpx.Response:
+    """Odpoveď s už dekódovaným telom (bez hlavičiek kódovania prenosu)."""
+    hlavicky = [(k, v) for k, v in odpoved.headers.multi_items() if k.lower() not in VYNECHANE_HLAVICKY]
+    return httpx.Response(odpoved.status_code, headers=hlavicky, content=telo, request=request)
+
+
+class _RequestsAdapter(HTTPAdapter):
+    def __init__(self, nahravac: NahravacHTTP, sluzba: str):
+        super().__init__()
+        self._nahravac, self._sluzba = nahravac, sluzba
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        telo = request.body or b""
+        if isinstance(telo, str):
+            telo = telo.encode("utf-8")
+        if self._nahravac.rezim == "prehravaj":
+            status, hlavicky, telo_odpovede, latencia = self._nahravac.prehraj(self._sluzba, request.method, request.url, telo)
+            time.sleep(latencia)
+            return self._odpoved(request, status, hlavicky, telo_odpovede)
+        zaciatok = time.perf_counter()
+        odpoved = super().send(request, **kwargs)
+        self._nahravac.nahraj(
+            self._sluzba, request.method, request.url, telo,
+            odpoved.status_code, dict(odpoved.headers), odpoved.content, time.perf_counter() - zaciatok,
+        )
+        return odpoved
+
+    @staticmethod
+    def _odpoved(request: requests.PreparedRequest, status: int, hlavicky: Dict[str, str], telo: bytes) -> requests.Response:
+        odpoved = requests.Response()
+        odpoved.status_code = status
+        odpoved.headers = CaseInsensitiveDict(hlavicky)
+        odpoved._content = telo
+        odpoved.url = request.url
+        odpoved.request = request
+        odpoved.encoding = requests.utils.get_encoding_from_headers(odpoved.headers) or "utf-8"
+        odpoved.reason = "Replayed"
+        return odpoved
+
+
+def _latencia_z_prostredia(hodnota: str) -> Optional[float]:
+    """`nahrana` = latencia z nahrávky, inak pevná latencia v milisekundách."""
+    return None if hodnota == "nahrana" else float(hodnota) / 1000
+
+
+# Globálny nahrávač, konfigurovateľný cez premenné prostredia
+nahravac_http = NahravacHTTP(
+    rezim=os.getenv("HTTP_NAHRAVANIE", "vypnute"),
+    adresar=os.getenv("HTTP_NAHRAVKY_ADRESAR") or None,
+    latencia_s=_latencia_z_prostredia(os.getenv("HTTP_PREHRAVANIE_LATENCIA", "nahrana")),
+)
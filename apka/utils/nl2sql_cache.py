@@ -0,0 +1,313 @@
+"""Sémantická cache prekladov otázok v prirodzenom jazyku na SQL."""
+
+import atexit
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from apka.models.sql_models import SQLDotaz
+from apka.utils.normalizacia_textu import cisla_v_texte, normalizuj_otazku, trigramy
+from apka.widgets.spolocne import scratch_pad_adresar, zapisovac
+
+
+def odtlacok_schemy(popis_schemy: str, dialekt: str, databaza: str = "") -> str:
+    """Vráti krátky odtlačok popisu schémy, dialektu a identity databázy (zmena schémy zneplatní cache)."""
+    return hashlib.sha256(f"{dialekt.lower()}\n{databaza}\n{popis_schemy}".encode("utf-8")).hexdigest()[:16]
+
+
+def prenes_parametre(polozka: Dict[str, Any], cisla: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parametre uloženej šablóny pre otázku s číslami `cisla`. Číslo, ktoré sa v novej otázke zmenilo,
+    sa prenesie do parametrov s jeho pôvodnou hodnotou; ak taký parameter nie je (číslo je priamo
+    v SQL), šablónu pre otázku použiť nemožno a vráti None.
+    """
+    parametre = dict(polozka.get("parametre") or {})
+    if polozka["cisla"] == cisla:
+        return parametre
+    if len(polozka["cisla"]) != len(cisla):
+        return None
+    for stare, nove in zip(polozka["cisla"], cisla):
+        if stare == nove:
+            continue
+        nazvy = [
+            nazov for nazov, hodnota in parametre.items()
+            if not isinstance(hodnota, bool) and isinstance(hodnota, (int, str)) and str(hodnota) == stare
+        ]
+        if not nazvy:
+            return None
+        for nazov in nazvy:
+            parametre[nazov] = int(nove) if isinstance(parametre[nazov], int) else nove
+    return parametre
+
+
+# Kmene slov, za ktorými „od" označuje autora („kníh od Mňačka" = „kníh, ktoré má Mňačko"), nie začiatok obdobia
+AUTORSKE_KMENE = {"knih", "diel", "titul", "roman"}
+# Kmene slov, pred ktorými je „od" začiatkom obdobia („knihy od roku 1960")
+CASOVE_KMENE = {"rok", "mesiac", "tyzden", "tyzdn", "den", "dna", "dni", "datum"}
+
+
+def vyznamove_tokeny(kanonicka: str) -> List[str]:
+    """Tokeny kanonickej otázky bez „od" v autorskom význame, ktoré na SQL nemá vplyv (ako „má")."""
+    tokeny = kanonicka.split()
+    return [
+        token for i, token in enumerate(tokeny)
+        if not (
+            token == "od" and 0 < i < len(tokeny) - 1 and tokeny[i - 1] in AUTORSKE_KMENE
+            and not tokeny[i + 1].isdigit() and tokeny[i + 1] not in CASOVE_KMENE
+        )
+    ]
+
+
+def slova_bez_cisel(kanonicka: str) -> Counter:
+    """Významové tokeny kanonickej otázky okrem čísel (mená, predložky a ostatné slová, ktoré šablóna neparametrizuje)."""
+    return Counter(token for token in vyznamove_tokeny(kanonicka) if not token.isdigit())
+
+
+def _vektor_bez_cisel(kanonicka: str) -> Counter:
+    """Trigramy významových tokenov s číslami nahradenými znakom '#' (čísla porovnáva `prenes_parametre`)."""
+    return trigramy(re.sub(r"\d+", "#", " ".join(vyznamove_tokeny(kanonicka))))
+
+
+def _kosinusova_podobnost(a, b) -> float:
+    """Kosínusová podobnosť dvoch riedkych vektorov (Counter/dict)."""
+    if len(a) > len(b):
+        a, b = b, a
+    skalarny_sucin = sum(hodnota * b.get(kluc, 0) for kluc, hodnota in a.items())
+    if not skalarny_sucin:
+        return 0.0
+    norma_a = math.sqrt(sum(h * h for h in a.values()))
+    norma_b = math.sqrt(sum(h * h for h in b.values()))
+    return skalarny_sucin / (norma_a * norma_b)
+
+
+class SemantickaCacheDotazov:
+    """
+    LRU/TTL cache NL→SQL s presným a približným (trigramovým) vyhľadávaním a perzistenciou na disk.
+    Približná zhoda smie od uloženej otázky líšiť len poradím slov, výplňovými slovami (aj „od" autora,
+    napr. „počet kníh od Mňačka" = „koľko kníh má Mňačko") a číslami: významové slová (mená, smerové
+    predložky) musia byť rovnaké a zmenené čísla sa prenesú do parametrov uloženej SQL šablóny.
+    """
+
+    def __init__(
+        self,
+        cesta_suboru: Optional[str] = None,
+        max_poloziek: int = 500,
+        ttl_s: float = 7 * 24 * 3600,
+        prah_podobnosti: float = 0.88,
+        oneskorenie_zapisu_s: float = 2.0,
+    ):
+        self._cesta_suboru = cesta_suboru
+        self._max_poloziek = max_poloziek
+        self._ttl_s = ttl_s
+        self._prah_podobnosti = prah_podobnosti
+        self._zamok = threading.Lock()
+        # kľúč = "<odtlačok>|<kanonická otázka>" -> položka; poradie = LRU poradie
+        self._polozky: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Invertovaný index trigram -> kľúče položiek (kandidáti na približnú zhodu)
+        self._index: Dict[str, Set[str]] = {}
+        self._statistiky = {"presne_zasahy": 0, "podobne_zasahy": 0, "zasahy_sablon": 0, "minutia": 0}
+        # Zápis na disk beží na pozadí a zmeny za `oneskorenie_zapisu_s` sa zapíšu naraz
+        self._oneskorenie_zapisu_s = oneskorenie_zapisu_s
+        self._casovac_zapisu: Optional[threading.Timer] = None
+        self._zamok_zapisu = threading.Lock()
+        self._nacitaj_z_disku()
+
+    # --- Verejné API ---
+
+    def najdi(self, otazka: str, odtlacok: str) -> Optional[SQLDotaz]:
+        """Vráti uložený SQL dotaz pre otázku (presná alebo približná zhoda), inak None."""
+        kanonicka = normalizuj_otazku(otazka)
+        kluc = f"{odtlacok}|{kanonicka}"
+        teraz = time.time()
+
+        with self._zamok:
+            polozka = self._polozky.get(kluc)
+            if polozka and not self._je_expirovana(polozka, teraz):
+                self._polozky.move_to_end(kluc)
+                self._statistiky["presne_zasahy"] += 1
+                return SQLDotaz(dotaz=polozka["dotaz"], parametre=polozka.get("parametre") or {}, vysvetlenie=polozka["vysvetlenie"])
+
+            cisla = cisla_v_texte(otazka)
+            najlepsi = self._najdi_podobny(kanonicka, odtlacok, cisla, teraz)
+            if najlepsi:
+                najlepsi_kluc, parametre = najlepsi
+                polozka = self._polozky[najlepsi_kluc]
+                self._polozky.move_to_end(najlepsi_kluc)
+                self._statistiky["podobne_zasahy"] += 1
+                vysvetlenie = polozka["vysvetlenie"]
+                if polozka["cisla"] != cisla:
+                    self._statistiky["zasahy_sablon"] += 1
+                    for stare, nove in zip(polozka["cisla"], cisla):
+                        vysvetlenie = re.sub(rf"(?<!\d){stare}(?!\d)", nove, vysvetlenie)
+                return SQLDotaz(dotaz=polozka["dotaz"], parametre=parametre, vysvetlenie=vysvetlenie)
+
+            self._statistiky["minutia"] += 1
+            return None
+
+    def uloz(self, otazka: str, odtlacok: str, sql_dotaz: SQLDotaz) -> None:
+        """Uloží úspešne vykonaný preklad otázky na SQL."""
+        kanonicka = normalizuj_otazku(otazka)
+        if not kanonicka:
+            return
+        kluc = f"{odtlacok}|{kanonicka}"
+        polozka = {
+            "odtlacok": odtlacok,
+            "otazka": otazka,
+            "kanonicka": kanonicka,
+            "cisla": cisla_v_texte(otazka),
+            "dotaz": sql_dotaz.dotaz,
+            "parametre": sql_dotaz.parametre,
+            "vysvetlenie": sql_dotaz.vysvetlenie,
+            "vytvorene": time.time(),
+        }
+        with self._zamok:
+            if kluc in self._polozky:
+                self._odstran(kluc)
+            self._pridaj(kluc, polozka)
+            while len(self._polozky) > self._max_poloziek:
+                self._odstran(next(iter(self._polozky)))
+            self._naplanuj_zapis()
+
+    def vycisti(self) -> None:
+        """Vymaže všetky položky cache (aj na disku)."""
+        with self._zamok:
+            self._polozky.clear()
+            self._index.clear()
+            self._naplanuj_zapis()
+
+    def zapis_na_disk(self) -> None:
+        """Hneď zapíše čakajúce zmeny na disk (pri ukončení procesu)."""
+        with self._zamok:
+            if self._casovac_zapisu is None:
+                return
+            self._casovac_zapisu.cancel()
+            self._casovac_zapisu = None
+        self._uloz_na_disk()
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Vráti počty zásahov/minutí a úspešnosť cache."""
+        with self._zamok:
+            zasahy = self._statistiky["presne_zasahy"] + self._statistiky["podobne_zasahy"]
+            spolu = zasahy + self._statistiky["minutia"]
+            return {
+                **self._statistiky,
+                "pocet_poloziek": len(self._polozky),
+                "miera_zasahov": zasahy / spolu if spolu else 0.0,
+                "miera_minuti": self._statistiky["minutia"] / spolu if spolu else 0.0,
+            }
+
+    # --- Interné pomocné metódy (volajú sa pod zámkom) ---
+
+    def _je_expirovana(self, polozka: Dict[str, Any], teraz: float) -> bool:
+        return teraz - polozka["vytvorene"] > self._ttl_s
+
+    def _najdi_podobny(
+        self, kanonicka: str, odtlacok: str, cisla: List[str], teraz: float
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        vektor = _vektor_bez_cisel(kanonicka)
+        slova = slova_bez_cisel(kanonicka)
+        kandidati: Set[str] = set()
+        for trigram in vektor:
+            kandidati |= self._index.get(trigram, set())
+
+        najlepsi, najlepsia_podobnost = None, self._prah_podobnosti
+        for kluc in kandidati:
+            polozka = self._polozky[kluc]
+            # Iná schéma/dialekt nesmie zdieľať SQL
+            if polozka["odtlacok"] != odtlacok or self._je_expirovana(polozka, teraz):
+                continue
+            # Iné slovo (napr. „Peter Novák" vs. „Petra Nováková") nie je v parametroch, SQL by filtrovalo podľa iného
+            if polozka["slova"] != slova:
+                continue
+            # Iné čísla (roky, limity) zdieľajú len šablónu, v ktorej sú ako parametre
+            parametre = prenes_parametre(polozka, cisla)
+            if parametre is None:
+                continue
+            podobnost = _kosinusova_podobnost(vektor, polozka["vektor"])
+            if podobnost >= najlepsia_podobnost:
+                najlepsi, najlepsia_podobnost = (kluc, parametre), podobnost
+        return najlepsi
+
+    def _pridaj(self, kluc: str, polozka: Dict[str, Any]) -> None:
+        polozka["vektor"] = _vektor_bez_cisel(polozka["kanonicka"])
+        polozka["slova"] = slova_bez_cisel(polozka["kanonicka"])
+        self._polozky[kluc] = polozka
+        for trigram in polozka["vektor"]:
+            self._index.setdefault(trigram, set()).add(kluc)
+
+    def _odstran(self, kluc: str) -> None:
+        polozka = self._polozky.pop(kluc)
+        for trigram in polozka["vektor"]:
+            kluce = self._index.get(trigram)
+            if kluce:
+                kluce.discard(kluc)
+                if not kluce:
+                    del self._index[trigram]
+
+    def _naplanuj_zapis(self) -> None:
+        if not self._cesta_suboru or self._casovac_zapisu is not None:
+            return
+        self._casovac_zapisu = threading.Timer(self._oneskorenie_zapisu_s, self._zapis_z_casovaca)
+        self._casovac_zapisu.name = "nl2sql-cache-zapis"
+        self._casovac_zapisu.daemon = True
+        self._casovac_zapisu.start()
+
+    def _zapis_z_casovaca(self) -> None:
+        with self._zamok:
+            self._casovac_zapisu = None
+        self._uloz_na_disk()
+
+    def _uloz_na_disk(self) -> None:
+        """Zapíše snímku položiek; volá sa mimo zámku cache (vyhľadávanie počas zápisu nečaká)."""
+        # Zápisy sa nesmú prekrývať (rovnaký dočasný súbor, staršia snímka nesmie prepísať novšiu)
+        with self._zamok_zapisu:
+            with self._zamok:
+                data = [
+                    {k: v for k, v in polozka.items() if k not in ("vektor", "slova")}
+                    for polozka in self._polozky.values()
+                ]
+            try:
+                docasny_subor = f"{self._cesta_suboru}.tmp"
+                with open(docasny_subor, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(docasny_subor, self._cesta_suboru)
+            except Exception as e:
+                zapisovac.warning(f"⚠️ Nepodarilo sa uložiť NL2SQL cache na disk: {e}")
+
+    def _nacitaj_z_disku(self) -> None:
+        if not self._cesta_suboru or not os.path.exists(self._cesta_suboru):
+            return
+        try:
+            with open(self._cesta_suboru, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            teraz = time.time()
+            for polozka in data[-self._max_poloziek:]:
+                # Kanonický tvar sa prepočíta z otázky (pravidlá normalizácie sa mohli zmeniť),
+                # položky bez uloženej otázky sa zahodia
+                if "otazka" not in polozka or self._je_expirovana(polozka, teraz):
+                    continue
+                polozka["kanonicka"] = normalizuj_otazku(polozka["otazka"])
+                kluc = f"{polozka['odtlacok']}|{polozka['kanonicka']}"
+                if kluc in self._polozky:
+                    self._odstran(kluc)
+                self._pridaj(kluc, polozka)
+            zapisovac.info(f"NL2SQL cache načítaná z disku: {len(self._polozky)} položiek")
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa načítať NL2SQL cache z disku: {e}")
+
+
+# Globálna inštancia cache, konfigurovateľná cez premenné prostredia
+nl2sql_cache = SemantickaCacheDotazov(
+    cesta_suboru=os.getenv("NL2SQL_CACHE_SUBOR", os.path.join(scratch_pad_adresar, "nl2sql_cache.json")),
+    max_poloziek=int(os.getenv("NL2SQL_CACHE_MAX_POLOZIEK", "500")),
+    ttl_s=float(os.getenv("NL2SQL_CACHE_TTL_S", str(7 * 24 * 3600))),
+    prah_podobnosti=float(os.getenv("NL2SQL_CACHE_PRAH_PODOBNOSTI", "0.88")),
+    oneskorenie_zapisu_s=float(os.getenv("NL2SQL_CACHE_ONESKORENIE_ZAPISU_S", "2")),
+)
+atexit.register(nl2sql_cache.zapis_na_disk)
@@ -0,0 +1,88 @@
+"""Pomocné funkcie na normalizáciu otázok v prirodzenom jazyku (slovenčina)."""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import List
+
+# Výplňové slová, ktoré nemenia význam otázky nad dátami
+STOP_SLOVA = {
+    "a", "aj", "alebo", "ako", "je", "ma", "maju", "mi", "na", "nam",
+    "pre", "prosim", "su", "sa", "si", "to", "v", "vo",
+    "ukaz", "ukazte", "zobraz", "zobrazte", "vypis", "vypiste", "daj", "dajte", "chcem", "vidiet",
+}
+
+# Predložky určujúce smer či vzťah („do roku 1960" vs. „od roku 1960", „s pokutou" vs. „za pokutu");
+# v kanonickom tvare ostávajú, inak by rôzne otázky dostali rovnaký kľúč
+SMEROVE_PREDLOZKY = {"do", "od", "po", "s", "z", "za"}
+
+# Synonymá zjednotené na jeden tvar (po odstránení diakritiky)
+SYNONYMA = {
+    "kolko": "pocet",
+    "pocty": "pocet",
+    "poctu": "pocet",
+    "najviac": "top",
+    "najcastejsie": "top",
+    "najpopularnejsi": "top",
+    "najpopularnejsie": "top",
+    "najoblubenejsie": "top",
+    "citatel": "pouzivatel",
+    "citatelia": "pouzivatel",
+    "citatelov": "pouzivatel",
+    "so": "s",
+    "zo": "z",
+}
+
+# Koncovky, ktoré sa pri jednoduchom stemmingu odstraňujú (od najdlhšej)
+KONCOVKY = ("ami", "ach", "och", "ov", "om", "ou", "ej", "ia", "ie", "iu", "a", "e", "i", "o", "u", "y")
+
+MAX_DLZKA_KMENA = 6
+
+
+def odstran_diakritiku(text: str) -> str:
+    """Odstráni diakritiku z textu (napr. 'Mňačko' -> 'Mnacko')."""
+    rozlozeny = unicodedata.normalize("NFKD", text)
+    return "".join(znak for znak in rozlozeny if not unicodedata.combining(znak))
+
+
+def tokenizuj(text: str) -> List[str]:
+    """Rozdelí text na malé tokeny bez diakritiky a interpunkcie."""
+    return re.findall(r"[a-z0-9]+", odstran_diakritiku(text).lower())
+
+
+def kmen(slovo: str) -> str:
+    """Vráti zjednodušený kmeň slova; čísla ponecháva bez zmeny."""
+    if slovo.isdigit():
+        return slovo
+    for koncovka in KONCOVKY:
+        if slovo.endswith(koncovka) and len(slovo) - len(koncovka) >= 3:
+            slovo = slovo[: -len(koncovka)]
+            break
+    return slovo[:MAX_DLZKA_KMENA]
+
+
+def kanonicke_tokeny(text: str) -> List[str]:
+    """Vráti kmene významových slov otázky po aplikovaní synoným a stop slov."""
+    tokeny = []
+    for token in tokenizuj(text):
+        token = SYNONYMA.get(token, token)
+        if token in STOP_SLOVA:
+            continue
+        tokeny.append(kmen(token))
+    return tokeny
+
+
+def normalizuj_otazku(text: str) -> str:
+    """Vráti kanonický tvar otázky použiteľný ako kľúč (napr. pre cache)."""
+    return " ".join(kanonicke_tokeny(text))
+
+
+def cisla_v_texte(text: str) -> List[str]:
+    """Vráti čísla nachádzajúce sa v texte v poradí výskytu."""
+    return re.findall(r"\d+", text)
+
+
+def trigramy(text: str) -> Counter:
+    """Vráti počty znakových trigramov textu (s okrajovými medzerami)."""
+    doplneny = f"  {text} "
+    return Counter(doplneny[i:i + 3] for i in range(len(doplneny) - 2))
@@ -0,0 +1,339 @@
+"""
+Spoločný plánovač volaní LLM pre všetky relácie procesu: rozpočty požiadaviek a tokenov za minútu,
+prioritná fronta (interaktívne SQL pred generovaním textov na pozadí) a rýchle odmietnutie pri preťažení.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import groq
+
+from apka.widgets.spolocne import zapisovac
+
+T = TypeVar("T")
+
+# Interval, po ktorom synchrónne volanie znova skúsi získať rozpočet
+INTERVAL_SYNC_S = 0.05
+
+
+class LLMPretazene(Exception):
+    """LLM je preťažené (vyčerpaný rozpočet, plná fronta alebo limit API); volajúci má odpovedať „skúste neskôr"."""
+
+
+@dataclass(order=True)
+class _Cakatel:
+    priorita: int
+    poradie: int
+    tokeny: int = field(compare=False)
+    uloha: str = field(compare=False)
+    buducnost: asyncio.Future = field(compare=False)
+    pridelene: bool = field(default=False, compare=False)
+    zruseny: bool = field(default=False, compare=False)
+
+
+def _je_docasna_chyba(chyba: Exception) -> bool:
+    """Chyby, po ktorých má zmysel volanie zopakovať: limit API (429), chyba servera, výpadok spojenia."""
+    if isinstance(chyba, groq.APIConnectionError):
+        return True
+    return isinstance(chyba, groq.APIStatusError) and (chyba.status_code == 429 or chyba.status_code >= 500)
+
+
+def _pauza_z_chyby(chyba: Exception, predvolena_s: float) -> float:
+    """Čas čakania podľa hlavičky `retry-after` odpovede 429, inak predvolený."""
+    odpoved = getattr(chyba, "response", None)
+    try:
+        return float(odpoved.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return predvolena_s
+
+
+class PlanovacLLM:
+    """
+    Token bucket pre požiadavky (RPM) a tokeny (TPM), spoločný pre všetky relácie. Volanie, na ktoré
+    rozpočet nestačí, čaká vo fronte zoradenej podľa priority (nižšie číslo = skôr) a poradia. Ak by
+    odhadované čakanie presiahlo `max_cakanie_s` volania alebo je fronta plná, volanie sa hneď odmietne
+    výnimkou `LLMPretazene` namiesto hromadenia opakovaní. Odpoveď 429 pozastaví všetky volania
+    na čas z `retry-after` a volanie sa zopakuje v rámci rovnakého termínu.
+    """
+
+    def __init__(self, rpm: int = 30, tpm: int = 12_000, max_fronta: int = 50, pauza_429_s: float = 2.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_fronta = max_fronta
+        self.pauza_429_s = pauza_429_s
+        self._zamok = threading.Lock()
+        self._poziadavky = float(rpm)
+        self._tokeny = float(tpm)
+        self._aktualizovane = time.monotonic()
+        self._pauza_do = 0.0
+        self._fronta: List[_Cakatel] = []
+        self._poradie = itertools.count()
+        self._slucka: Optional[asyncio.AbstractEventLoop] = None
+        self._casovac: Optional[asyncio.TimerHandle] = None
+        self._statistiky: Dict[str, Dict[str, float]] = {}
+        self._obmedzenia_api = 0
+
+    # --- Verejné API ---
+
+    async def vykonaj(
+        self,
+        volanie: Callable[[], Awaitable[T]],
+        uloha: str = "default",
+        priorita: int = 1,
+        odhad_tokenov: int = 1000,
+        max_cakanie_s: float = 30.0,
+        max_pokusov: int = 2,
+    ) -> T:
+        """Vykoná asynchrónne volanie LLM, keď naň vyjde rozpočet; dočasné chyby zopakuje najviac `max_pokusov`-krát."""
+        termin = time.monotonic() + max_cakanie_s
+        for pokus in range(max_pokusov + 1):
+            await self._rezervuj(uloha, priorita, odhad_tokenov, termin)
+            try:
+                return await volanie()
+            except Exception as e:
+                if pokus == max_pokusov or not _je_docasna_chyba(e):
+                    raise
+                self._po_chybe(uloha, e)
+
+    def vykonaj_sync(
+        self,
+        volanie: Callable[[], T],
+        uloha: str = "default",
+        priorita: int = 1,
+        odhad_tokenov: int = 1000,
+        max_cakanie_s: float = 30.0,
+        max_pokusov: int = 2,
+    ) -> T:
+        """Synchrónna obdoba `vykonaj`; čaká mimo fronty a prednosť dáva čakajúcim asynchrónnym volaniam."""
+        termin = time.monotonic() + max_cakanie_s
+        for pokus in range(max_pokusov + 1):
+            self._rezervuj_sync(uloha, priorita, odhad_tokenov, termin)
+            try:
+                return volanie()
+            except Exception as e:
+                if pokus == max_pokusov or not _je_docasna_chyba(e):
+                    raise
+                self._po_chybe(uloha, e)
+
+    def uprav_tokeny(self, odhad_tokenov: int, skutocne_tokeny: Optional[int]) -> None:
+        """Po odpovedi nahradí odhad tokenov skutočnou spotrebou (pri nadhodnotení vráti rozdiel do rozpočtu)."""
+        if skutocne_tokeny is None or not self.tpm:
+            return
+        with self._zamok:
+            self._tokeny = min(self._tokeny + min(odhad_tokenov, self.tpm) - skutocne_tokeny, self.tpm)
+        self._naplanuj_rozdelenie()
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Vráti dĺžku fronty, zostávajúci rozpočet, počet odpovedí 429 a pre každú úlohu vybavené/odmietnuté volania a čakanie."""
+        with self._zamok:
+            self._dopln()
+            ulohy = {}
+            for uloha, statistiky in self._statistiky.items():
+                ulohy[uloha] = {
+                    "vybavene": statistiky["vybavene"],
+                    "odmietnute": statistiky["odmietnute"],
+                    "opakovania": statistiky["opakovania"],
+                    "cakanie_priemer_ms": round(statistiky["cakanie_s"] / statistiky["vybavene"] * 1000, 1) if statistiky["vybavene"] else 0.0,
+                    "cakanie_max_ms": round(statistiky["cakanie_max_s"] * 1000, 1),
+                }
+            return {
+                "fronta": sum(not cakatel.zruseny for cakatel in self._fronta),
+                "dostupne_poziadavky": round(self._poziadavky, 1) if self.rpm else None,
+                "dostupne_tokeny": round(self._tokeny) if self.tpm else None,
+                "obmedzenia_api": self._obmedzenia_api,
+                "ulohy": ulohy,
+            }
+
+    # --- Rezervácia rozpočtu ---
+
+    async def _rezervuj(self, uloha: str, priorita: int, tokeny: int, termin: float) -> None:
+        tokeny = min(tokeny, self.tpm) if self.tpm else tokeny
+        zaciatok = time.monotonic()
+        slucka = asyncio.get_running_loop()
+        with self._zamok:
+            if self._slucka is not slucka and (not self._fronta or self._slucka is None or self._slucka.is_closed()):
+                self._slucka, self._casovac = slucka, None
+            self._dopln()
+            cakatel = None
+            if self._zive_cakatelia(priorita) or not self._je_rozpocet(tokeny):
+                self._odmietni_ak_treba(uloha, priorita, tokeny, termin)
+                cakatel = _Cakatel(priorita, next(self._poradie), tokeny, uloha, slucka.create_future())
+                heapq.heappush(self._fronta, cakatel)
+            else:
+                self._odober(tokeny)
+        if cakatel is None:
+            self._zaznamenaj(uloha, zaciatok)
+            return
+
+        self._rozdel()
+        try:
+            await asyncio.wait_for(cakatel.buducnost, timeout=max(termin - time.monotonic(), 0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._zamok:
+                if cakatel.pridelene:
+                    # Rozpočet pridelený v okamihu zrušenia sa vráti
+                    self._vrat(cakatel.tokeny)
+                cakatel.zruseny = True
+                if isinstance(e, asyncio.TimeoutError):
+                    self._statistika(uloha)["odmietnute"] += 1
+            self._rozdel()
+            if isinstance(e, asyncio.TimeoutError):
+                zapisovac.warning(f"🚦 LLM '{uloha}': rozpočet sa neuvoľnil včas, volanie odmietnuté")
+                raise LLMPretazene("LLM je momentálne preťažené, skúste to prosím o chvíľu.") from None
+            raise
+        self._zaznamenaj(uloha, zaciatok)
+
+    def _rezervuj_sync(self, uloha: str, priorita: int, tokeny: int, termin: float) -> None:
+        tokeny = min(tokeny, self.tpm) if self.tpm else tokeny
+        zaciatok = time.monotonic()
+        while True:
+            with self._zamok:
+                self._dopln()
+                if not self._zive_cakatelia(priorita) and self._je_rozpocet(tokeny):
+                    self._odober(tokeny)
+                    break
+                self._odmietni_ak_treba(uloha, priorita, tokeny, termin)
+            time.sleep(INTERVAL_SYNC_S)
+        self._zaznamenaj(uloha, zaciatok)
+
+    def _odmietni_ak_treba(self, uloha: str, priorita: int, tokeny: int, termin: float) -> None:
+        """Pri plnej fronte alebo odhadovanom čakaní za termínom hneď odmietne volanie (volá sa pod zámkom)."""
+        teraz = time.monotonic()
+        if len(self._fronta) >= self.max_fronta:
+            self._fronta = [cakatel for cakatel in self._fronta if not cakatel.zruseny]
+            heapq.heapify(self._fronta)
+        if len(self._fronta) >= self.max_fronta:
+            dovod = f"plná fronta ({len(self._fronta)})"
+        elif teraz + self._odhad_cakania(priorita, tokeny) > termin:
+            dovod = f"odhadované čakanie {self._odhad_cakania(priorita, tokeny):.1f} s"
+        elif teraz > termin:
+            dovod = "vypršal termín"
+        else:
+            return
+        self._statistika(uloha)["odmietnute"] += 1
+        zapisovac.warning(f"🚦 LLM '{uloha}' (priorita {priorita}) odmietnuté: {dovod}")
+        raise LLMPretazene("LLM je momentálne preťažené, skúste to prosím o chvíľu.")
+
+    def _odhad_cakania(self, priorita: int, tokeny: int) -> float:
+        """Čas, kým rozpočet pokryje čakajúcich s rovnakou alebo vyššou prioritou a nové volanie."""
+        pred = [cakatel for cakatel in self._fronta if not cakatel.zruseny and cakatel.priorita <= priorita]
+        cakanie = max(self._pauza_do - time.monotonic(), 0.0)
+        if self.rpm:
+            cakanie = max(cakanie, (len(pred) + 1 - self._poziadavky) * 60 / self.rpm)
+        if self.tpm:
+            cakanie = max(cakanie, (sum(cakatel.tokeny for cakatel in pred) + tokeny - self._tokeny) * 60 / self.tpm)
+        return cakanie
+
+    # --- Rozdeľovanie rozpočtu čakajúcim (beží v event loope) ---
+
+    def _rozdel(self) -> None:
+        with self._zamok:
+            self._dopln()
+            cakanie = None
+            while self._fronta:
+                cakatel = self._fronta[0]
+                if cakatel.zruseny or cakatel.buducnost.done():
+                    heapq.heappop(self._fronta)
+                    continue
+                cakanie = self._cas_do_rozpoctu(cakatel.tokeny)
+                if cakanie > 0:
+                    break
+                heapq.heappop(self._fronta)
+                self._odober(cakatel.tokeny)
+                cakatel.pridelene = True
+                cakatel.buducnost.set_result(None)
+                cakanie = None
+            if self._casovac is not None:
+                self._casovac.cancel()
+                self._casovac = None
+            if cakanie is not None and self._slucka is not None and not self._slucka.is_closed():
+                self._casovac = self._slucka.call_later(cakanie, self._rozdel)
+
+    def _naplanuj_rozdelenie(self) -> None:
+        """Spustí rozdelenie v event loope fronty (aj z iného vlákna)."""
+        slucka = self._slucka
+        if slucka is not None and not slucka.is_closed():
+            slucka.call_soon_threadsafe(self._rozdel)
+
+    def _po_chybe(self, uloha: str, chyba: Exception) -> None:
+        with self._zamok:
+            self._statistika(uloha)["opakovania"] += 1
+        if isinstance(chyba, groq.APIStatusError) and chyba.status_code == 429:
+            pauza = _pauza_z_chyby(chyba, self.pauza_429_s)
+            with self._zamok:
+                self._obmedzenia_api += 1
+                self._pauza_do = max(self._pauza_do, time.monotonic() + pauza)
+                # API hlási prekročenie: lokálny rozpočet sa vyprázdni, aby sa po pauze neposlala ďalšia dávka naraz
+                self._poziadavky = min(self._poziadavky, 0.0)
+                self._tokeny = min(self._tokeny, 0.0)
+            zapisovac.warning(f"🚦 Limit API pri úlohe '{uloha}': všetky volania LLM pozastavené na {pauza:.1f} s")
+        else:
+            zapisovac.warning(f"⚠️ Dočasná chyba LLM pri úlohe '{uloha}', volanie sa zopakuje: {chyba}")
+
+    # --- Token bucket (volá sa pod zámkom) ---
+
+    def _dopln(self) -> None:
+        teraz = time.monotonic()
+        uplynulo = teraz - self._aktualizovane
+        self._aktualizovane = teraz
+        if self.rpm:
+            self._poziadavky = min(self._poziadavky + uplynulo * self.rpm / 60, self.rpm)
+        if self.tpm:
+            self._tokeny = min(self._tokeny + uplynulo * self.tpm / 60, self.tpm)
+
+    def _cas_do_rozpoctu(self, tokeny: int) -> float:
+        cakanie = max(self._pauza_do - time.monotonic(), 0.0)
+        if self.rpm and self._poziadavky < 1:
+            cakanie = max(cakanie, (1 - self._poziadavky) * 60 / self.rpm)
+        if self.tpm and self._tokeny < tokeny:
+            cakanie = max(cakanie, (tokeny - self._tokeny) * 60 / self.tpm)
+        return cakanie
+
+    def _je_rozpocet(self, tokeny: int) -> bool:
+        return self._cas_do_rozpoctu(tokeny) <= 0
+
+    def _odober(self, tokeny: int) -> None:
+        if self.rpm:
+            self._poziadavky -= 1
+        if self.tpm:
+            self._tokeny -= tokeny
+
+    def _vrat(self, tokeny: int) -> None:
+        if self.rpm:
+            self._poziadavky = min(self._poziadavky + 1, self.rpm)
+        if self.tpm:
+            self._tokeny = min(self._tokeny + tokeny, self.tpm)
+
+    def _zive_cakatelia(self, priorita: int) -> bool:
+        return any(not cakatel.zruseny and cakatel.priorita <= priorita for cakatel in self._fronta)
+
+    # --- Štatistiky ---
+
+    def _statistika(self, uloha: str) -> Dict[str, float]:
+        return self._statistiky.setdefault(
+            uloha, {"vybavene": 0, "odmietnute": 0, "opakovania": 0, "cakanie_s": 0.0, "cakanie_max_s": 0.0}
+        )
+
+    def _zaznamenaj(self, uloha: str, zaciatok: float) -> None:
+        cakanie = time.monotonic() - zaciatok
+        with self._zamok:
+            statistiky = self._statistika(uloha)
+            statistiky["vybavene"] += 1
+            statistiky["cakanie_s"] += cakanie
+            statistiky["cakanie_max_s"] = max(statistiky["cakanie_max_s"], cakanie)
+        if cakanie > 1:
+            zapisovac.info(f"🚦 LLM '{uloha}' čakalo na rozpočet {cakanie:.1f} s")
+
+
+# Globálny plánovač zdieľaný všetkými reláciami, konfigurovateľný cez premenné prostredia (0 = bez limitu)
+planovac_llm = PlanovacLLM(
+    rpm=int(os.getenv("LLM_LIMIT_RPM", "30")),
+    tpm=int(os.getenv("LLM_LIMIT_TPM", "12000")),
+    max_fronta=int(os.getenv("LLM_MAX_FRONTA", "50")),
+)
@@ -0,0 +1,297 @@
+"""Poradca indexov: zo zaznamenanej záťaže (SQL + plány) navrhne CREATE INDEX s odhadom prínosu."""
+
+import json
+import math
+import os
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from apka.utils.strazca_dotazov import aliasy_tabuliek
+from apka.widgets.spolocne import scratch_pad_adresar, zapisovac
+
+# Najviac toľko stĺpcov v navrhovanom indexe
+MAX_STLPCOV_INDEXU = 3
+# Ako často (s) sa zaznamenaná záťaž ukladá na disk
+INTERVAL_UKLADANIA_S = 10.0
+# Odhad podielu riadkov, ktoré prejdú rozsahovou podmienkou (<, >, BETWEEN, LIKE)
+SELEKTIVITA_ROZSAHU = 0.25
+
+
+def sablona_dotazu(dotaz: str) -> str:
+    """Nahradí literály v SQL znakom '?', aby sa opakované dotazy s inými hodnotami zoskupili."""
+    sablona = re.sub(r"'(?:[^']|'')*'", "?", dotaz.strip().rstrip(";"))
+    sablona = re.sub(r"(?<![\w.])\d+(?:\.\d+)?\b", "?", sablona)
+    return re.sub(r"\s+", " ", sablona).strip()
+
+
+class PoradcaIndexov:
+    """
+    Zaznamenáva vykonané čítacie dotazy (šablóna SQL, počet, časy, plán `EXPLAIN QUERY PLAN`)
+    a nad touto záťažou hľadá opakované úplné prehľadávania tabuliek a dočasné B-stromy
+    pre ORDER BY/GROUP BY. Pre ne navrhne indexy (rovnosť → rozsah → triedenie) s odhadom
+    ušetrených prečítaných riadkov. Analýza plánov je zatiaľ len pre SQLite.
+    """
+
+    def __init__(self, cesta_suboru: Optional[str] = None, max_dotazov: int = 500):
+        self._cesta_suboru = cesta_suboru
+        self.max_dotazov = max_dotazov
+        self._zamok = threading.Lock()
+        self._dotazy: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._naposledy_ulozene = 0.0
+        self._nacitaj_z_disku()
+
+    # --- Zaznamenávanie záťaže ---
+
+    def zaznamenaj(self, spojenie, dotaz: str, trvanie_s: float) -> None:
+        """Zaznamená vykonanie dotazu; plán sa zistí len pri prvom výskyte šablóny."""
+        sablona = sablona_dotazu(dotaz)
+        with self._zamok:
+            polozka = self._dotazy.get(sablona)
+        plan = None
+        if polozka is None and spojenie.dialect.name == "sqlite":
+            try:
+                plan = [riadok[3] for riadok in spojenie.execute(text(f"EXPLAIN QUERY PLAN {dotaz}"))]
+            except Exception as e:
+                zapisovac.warning(f"⚠️ Poradca indexov: nepodarilo sa získať plán dotazu: {e}")
+
+        with self._zamok:
+            polozka = self._dotazy.get(sablona)
+            if polozka is None:
+                polozka = {"priklad": dotaz, "plan": plan, "pocet": 0, "cas_spolu_s": 0.0}
+                self._dotazy[sablona] = polozka
+                while len(self._dotazy) > self.max_dotazov:
+                    self._dotazy.popitem(last=False)
+            polozka["pocet"] += 1
+            polozka["cas_spolu_s"] += trvanie_s
+            self._dotazy.move_to_end(sablona)
+            if time.monotonic() - self._naposledy_ulozene > INTERVAL_UKLADANIA_S:
+                self._uloz_na_disk()
+
+    def zataz(self) -> List[Dict[str, Any]]:
+        """Vráti kópiu zaznamenanej záťaže (šablóna, príklad, plán, počet, čas)."""
+        with self._zamok:
+            return [{"sablona": sablona, **polozka} for sablona, polozka in self._dotazy.items()]
+
+    def uloz(self) -> None:
+        """Okamžite uloží zaznamenanú záťaž na disk."""
+        with self._zamok:
+            self._uloz_na_disk()
+
+    # --- Analýza a návrhy ---
+
+    def navrhni(self, engine: Engine, min_vykonani: int = 1) -> List[Dict[str, Any]]:
+        """
+        Navrhne indexy pre zaznamenanú záťaž. Každý návrh obsahuje `tabulka`, `stlpce`, `sql`
+        (CREATE INDEX), `odhad_prinosu` (ušetrené prečítané riadky za celú záťaž), `dovody`
+        a `dotazy` (príklady SQL, ktorým index pomôže), zoradené podľa prínosu.
+        """
+        if engine.dialect.name != "sqlite":
+            zapisovac.info(f"Poradca indexov: analýza plánov pre dialekt {engine.dialect.name} nie je podporovaná.")
+            return []
+
+        inspector = inspect(engine)
+        tabulky = set(inspector.get_table_names())
+        stlpce_tabuliek: Dict[str, List[str]] = {}
+        existujuce: Dict[str, List[List[str]]] = {}
+        statistiky_stlpcov: Dict[Tuple[str, str], int] = {}
+        navrhy: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+
+        with engine.connect() as spojenie:
+            def velkost(tabulka: str) -> int:
+                return spojenie.execute(text(f'SELECT COUNT(*) FROM "{tabulka}"')).scalar() or 0
+
+            def rozne_hodnoty(tabulka: str, stlpec: str) -> int:
+                if (tabulka, stlpec) not in statistiky_stlpcov:
+                    statistiky_stlpcov[(tabulka, stlpec)] = spojenie.execute(
+                        text(f'SELECT COUNT(DISTINCT "{stlpec}") FROM "{tabulka}"')
+                    ).scalar() or 1
+                return statistiky_stlpcov[(tabulka, stlpec)]
+
+            velkosti: Dict[str, int] = {}
+            for polozka in self.zataz():
+                if polozka["pocet"] < min_vykonani:
+                    continue
+                plan = polozka["plan"]
+                if plan is None:
+                    try:
+                        plan = [riadok[3] for riadok in spojenie.execute(text(f"EXPLAIN QUERY PLAN {polozka['priklad']}"))]
+                    except Exception:
+                        continue
+                aliasy = aliasy_tabuliek(polozka["priklad"])
+                triedenie = any("TEMP B-TREE" in detail for detail in plan)
+
+                for detail in plan:
+                    zhoda = re.match(r"SCAN (\w+)\b(?! USING (?:COVERING )?INDEX)", detail)
+                    if not zhoda:
+                        continue
+                    alias = zhoda.group(1)
+                    tabulka = aliasy.get(alias.lower(), alias)
+                    if tabulka not in tabulky:
+                        continue
+                    if tabulka not in stlpce_tabuliek:
+                        stlpce_tabuliek[tabulka] = [stlpec["name"] for stlpec in inspector.get_columns(tabulka)]
+                        pk = inspector.get_pk_constraint(tabulka).get("constrained_columns") or []
+                        existujuce[tabulka] = [pk] + [index["column_names"] for index in inspector.get_indexes(tabulka)]
+                        velkosti[tabulka] = velkost(tabulka)
+
+                    # Stĺpce bez aliasu sa dajú priradiť tabuľke len v dotaze nad jedinou tabuľkou
+                    jedina_tabulka = len(set(aliasy.values()) & tabulky) <= 1
+                    rovnost, spojenia, rozsah, poradie = _pouzitia_stlpcov(
+                        polozka["priklad"], alias, stlpce_tabuliek[tabulka], bez_aliasu=jedina_tabulka
+                    )
+                    stlpce = _zloz_index(rovnost, spojenia, rozsah, poradie if triedenie else [])
+                    if not stlpce or _je_pokryty(stlpce, existujuce[tabulka]):
+                        continue
+
+                    # Odhad: úplné prehľadávanie N riadkov vs. vyhľadanie v indexe + zodpovedajúce riadky
+                    n = velkosti[tabulka]
+                    zhodne = n
+                    for stlpec in stlpce:
+                        if stlpec in rovnost or stlpec in spojenia:
+                            zhodne /= rozne_hodnoty(tabulka, stlpec)
+                        elif stlpec in rozsah:
+                            zhodne *= SELEKTIVITA_ROZSAHU
+                            break
+                    po = math.log2(n + 1) + zhodne
+                    prinos = max(0.0, n - po)
+                    if triedenie and poradie and stlpce[-1] in poradie:
+                        prinos += n * math.log2(n + 1)
+                    prinos *= polozka["pocet"]
+                    if prinos <= 0:
+                        continue
+
+                    kluc = (tabulka, tuple(stlpce))
+                    navrh = navrhy.setdefault(kluc, {
+                        "tabulka": tabulka,
+                        "stlpce": stlpce,
+                        "sql": f'CREATE INDEX IF NOT EXISTS idx_{tabulka}_{"_".join(stlpce)} ON {tabulka} ({", ".join(stlpce)})',
+                        "odhad_prinosu": 0.0,
+                        "cas_dotazov_s": 0.0,
+                        "dovody": [],
+                        "dotazy": [],
+                    })
+                    navrh["odhad_prinosu"] += prinos
+                    navrh["cas_dotazov_s"] += polozka["cas_spolu_s"]
+                    dovod = f"{detail} ({polozka['pocet']}×, {n} riadkov)"
+                    if dovod not in navrh["dovody"]:
+                        navrh["dovody"].append(dovod)
+                    if polozka["priklad"] not in navrh["dotazy"]:
+                        navrh["dotazy"].append(polozka["priklad"])
+
+        return sorted(navrhy.values(), key=lambda navrh: navrh["odhad_prinosu"], reverse=True)
+
+    # --- Perzistencia ---
+
+    def _uloz_na_disk(self) -> None:
+        self._naposledy_ulozene = time.monotonic()
+        if not self._cesta_suboru:
+            return
+        try:
+            docasny_subor = f"{self._cesta_suboru}.tmp"
+            with open(docasny_subor, "w", encoding="utf-8") as f:
+                json.dump(self._dotazy, f, ensure_ascii=False)
+            os.replace(docasny_subor, self._cesta_suboru)
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa uložiť záťaž dotazov pre poradcu indexov: {e}")
+
+    def _nacitaj_z_disku(self) -> None:
+        if not self._cesta_suboru or not os.path.exists(self._cesta_suboru):
+            return
+        try:
+            with open(self._cesta_suboru, "r", encoding="utf-8") as f:
+                self._dotazy = OrderedDict(json.load(f))
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa načítať záťaž dotazov pre poradcu indexov: {e}")
+
+
+def _pouzitia_stlpcov(
+    dotaz: str, alias: str, stlpce: List[str], bez_aliasu: bool
+) -> Tuple[List[str], List[str], List[str], List[str]]:
+    """
+    Roztriedi stĺpce tabuľky podľa použitia v dotaze: rovnosť s hodnotou (filter),
+    rovnosť so stĺpcom inej tabuľky (JOIN), rozsah a ORDER BY/GROUP BY.
+    """
+    zhoda_from = re.search(r"\bfrom\b", dotaz, flags=re.IGNORECASE)
+    telo = dotaz[zhoda_from.start():] if zhoda_from else dotaz
+    zhoda_poradia = re.search(r"\b(?:order|group)\s+by\b(.*)$", telo, flags=re.IGNORECASE | re.DOTALL)
+    klauzula_poradia = zhoda_poradia.group(1) if zhoda_poradia else ""
+
+    rovnost, spojenia, rozsah, poradie = [], [], [], []
+    for stlpec in stlpce:
+        odkazy = [rf"\b{re.escape(alias)}\.{re.escape(stlpec)}\b"]
+        if bez_aliasu:
+            odkazy.append(rf"(?<![\w.]){re.escape(stlpec)}\b")
+        for odkaz in odkazy:
+            if re.search(rf"{odkaz}\s*=\s*\w+\.\w+|\w+\.\w+\s*=\s*{odkaz}", telo, flags=re.IGNORECASE):
+                spojenia.append(stlpec)
+                break
+            if re.search(rf"{odkaz}\s*(?:=|\bIN\b|\bIS\b)|(?<![<>!])=\s*{odkaz}", telo, flags=re.IGNORECASE):
+                rovnost.append(stlpec)
+                break
+            if re.search(rf"{odkaz}\s*(?:<|>|\bBETWEEN\b|\bLIKE\b)|[<>]=?\s*{odkaz}", telo, flags=re.IGNORECASE):
+                rozsah.append(stlpec)
+                break
+        if any(re.search(odkaz, klauzula_poradia, flags=re.IGNORECASE) for odkaz in odkazy):
+            poradie.append(stlpec)
+    return rovnost, spojenia, rozsah, poradie
+
+
+def _zloz_index(rovnost: List[str], spojenia: List[str], rozsah: List[str], poradie: List[str]) -> List[str]:
+    """
+    Poradie stĺpcov indexu: najprv rovnosť, potom jeden rozsahový stĺpec, inak stĺpce triedenia.
+    Bez filtra na tabuľke navrhne index na stĺpec JOIN-u (tabuľka sa potom môže stať vnútorným cyklom).
+    """
+    if not rovnost and not rozsah:
+        return spojenia[:1] or poradie[:MAX_STLPCOV_INDEXU]
+    stlpce = list(rovnost)
+    if rozsah:
+        stlpce.append(rozsah[0])
+    else:
+        stlpce += [stlpec for stlpec in poradie if stlpec not in stlpce]
+    return stlpce[:MAX_STLPCOV_INDEXU]
+
+
+def _je_pokryty(stlpce: List[str], existujuce: List[List[str]]) -> bool:
+    """True, ak niektorý existujúci index (alebo PK) začína rovnakými stĺpcami."""
+    return any(index[:len(stlpce)] == stlpce for index in existujuce if index)
+
+
+def zmeraj_a_aplikuj(engine: Engine, navrhy: List[Dict[str, Any]], opakovani: int = 5) -> List[Dict[str, Any]]:
+    """
+    Zmeria dotazy, ktorým majú návrhy pomôcť, vytvorí všetky navrhnuté indexy (a spustí ANALYZE)
+    a dotazy zmeria znova. Vráti návrhy doplnené o `pred_ms`, `po_ms` (mediány súčtu časov dotazov).
+    Meria sa pred vytvorením prvého a po vytvorení posledného indexu, lebo plánovač
+    po ANALYZE môže pre dotaz použiť aj index navrhnutý pre iný dotaz.
+    """
+    def zmeraj(dotazy: List[str]) -> float:
+        casy = []
+        with engine.connect() as spojenie:
+            for _ in range(opakovani):
+                zaciatok = time.perf_counter()
+                for dotaz in dotazy:
+                    spojenie.execute(text(dotaz)).fetchall()
+                casy.append(time.perf_counter() - zaciatok)
+        return 1000 * statistics.median(casy)
+
+    pred = [zmeraj(navrh["dotazy"]) for navrh in navrhy]
+    with engine.begin() as spojenie:
+        for navrh in navrhy:
+            spojenie.execute(text(navrh["sql"]))
+            zapisovac.info(f"🗂️ Index vytvorený: {navrh['sql']}")
+        if engine.dialect.name == "sqlite":
+            spojenie.execute(text("ANALYZE"))
+    po = [zmeraj(navrh["dotazy"]) for navrh in navrhy]
+    return [{**navrh, "pred_ms": cas_pred, "po_ms": cas_po} for navrh, cas_pred, cas_po in zip(navrhy, pred, po)]
+
+
+# Záťaž sa zaznamenáva do scratchpad, aby ju vedel analyzovať samostatný skript (apka/helpers/navrhni_indexy.py)
+poradca_indexov = PoradcaIndexov(
+    cesta_suboru=os.getenv("DB_PORADCA_INDEXOV_SUBOR", os.path.join(scratch_pad_adresar, "zataz_dotazov.json")),
+)
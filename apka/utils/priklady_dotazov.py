@@ -0,0 +1,271 @@
+"""Perzistentné úložisko úspešných dvojíc otázka→SQL s výberom najpodobnejších príkladov pre prompt."""
+
+import json
+import math
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+from apka.utils.normalizacia_textu import kanonicke_tokeny, normalizuj_otazku, trigramy
+from apka.widgets.spolocne import scratch_pad_adresar, zapisovac
+
+# Podiel trigramovej podobnosti v celkovom skóre (zvyšok je BM25)
+VAHA_TRIGRAMOV = 0.3
+# Maximálny počet kandidátov z BM25 aj z trigramového indexu, ktorí sa hodnotia spolu
+MAX_KANDIDATOV = 200
+# Kandidát bez spoločného tokenu s otázkou (napr. preklep) musí mať aspoň takúto trigramovú podobnosť
+MIN_PODOBNOST_TRIGRAMOV = 0.3
+
+
+def _normalizuj_sql(sql: str) -> str:
+    return " ".join(sql.split()).rstrip(";").strip()
+
+
+class UlozistePrikladov:
+    """
+    Úložisko príkladov (JSONL, pripájanie na koniec) s inkrementálnym BM25 a trigramovým
+    invertovaným indexom. Hodnotia sa len príklady zdieľajúce s otázkou token alebo trigram,
+    takže vyhľadávanie ostáva rýchle aj pri desiatkach tisíc položiek.
+
+    Príklad patrí k dialektu a k odtlačku schémy, pre ktorú bol vygenerovaný; `najdi` vracia len
+    príklady rovnakej schémy. Opakované uloženie rovnakej otázky s rovnakým SQL sa ignoruje,
+    počet naučených príkladov je obmedzený `max_prikladov` (najstaršie sa vyradia) a súbor sa
+    po narastení prepíše len živými príkladmi.
+    """
+
+    def __init__(
+        self,
+        cesta_suboru: Optional[str] = None,
+        pociatocne_priklady: Optional[List[Dict[str, str]]] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_prikladov: int = 5000,
+    ):
+        self._cesta_suboru = cesta_suboru
+        self._k1, self._b = k1, b
+        self._max_prikladov = max(1, max_prikladov)
+        self._zamok = threading.Lock()
+        # Id príkladu je index v zozname; vyradený príklad nechá po sebe None
+        self._priklady: List[Optional[Dict[str, Optional[str]]]] = []
+        self._podla_kluca: Dict[str, int] = {}
+        # Kľúče naučených príkladov od najstaršieho (počiatočné sa nevyraďujú)
+        self._naucene: "OrderedDict[str, None]" = OrderedDict()
+        self._dlzky: List[int] = []
+        self._pocty_trigramov: List[int] = []
+        self._sucet_dlzok = 0
+        self._riadky_na_disku = 0
+        # token -> {id príkladu: početnosť}
+        self._postingy: Dict[str, Dict[int, int]] = {}
+        # trigram -> množina id príkladov
+        self._trigramy: Dict[str, Set[int]] = {}
+        self.pridaj_pociatocne(pociatocne_priklady or [])
+        self._nacitaj_z_disku()
+
+    def __len__(self) -> int:
+        return len(self._podla_kluca)
+
+    def pridaj(
+        self, otazka: str, sql: str, dialekt: Optional[str] = None, odtlacok: Optional[str] = None, uloz: bool = True
+    ) -> None:
+        """Pridá úspešný príklad otázka→SQL (alebo aktualizuje jeho SQL) a inkrementálne ho zaindexuje."""
+        zaznam = {"question": otazka, "sql": sql, "dialekt": dialekt, "odtlacok": odtlacok}
+        with self._zamok:
+            if not self._pridaj(zaznam, naucene=True):
+                return
+            self._obmedz()
+            if uloz and self._cesta_suboru:
+                self._pripis_na_disk(zaznam)
+
+    def pridaj_pociatocne(self, priklady: Iterable[Dict[str, str]], odtlacok: Optional[str] = None) -> None:
+        """Zaindexuje ručné príklady (napr. z YAML) pre schému `odtlacok`; naučené príklady neprepíšu a na disk sa neukladajú."""
+        with self._zamok:
+            for priklad in priklady:
+                self._pridaj(
+                    {"question": priklad["question"], "sql": priklad["sql"], "dialekt": priklad.get("dialekt"), "odtlacok": odtlacok},
+                    naucene=False,
+                )
+
+    def najdi(
+        self, otazka: str, dialekt: Optional[str] = None, k: int = 3, odtlacok: Optional[str] = None
+    ) -> List[Dict[str, Optional[str]]]:
+        """Vráti k najpodobnejších príkladov pre otázku (príklady iného dialektu alebo inej schémy sa vynechajú)."""
+        tokeny = set(kanonicke_tokeny(otazka))
+        vektor = set(trigramy(normalizuj_otazku(otazka)))
+        with self._zamok:
+            pocet = len(self._podla_kluca)
+            if not pocet or not tokeny:
+                return []
+            priemerna_dlzka = self._sucet_dlzok / pocet or 1
+
+            skore: Dict[int, float] = {}
+            for token in tokeny:
+                postingy = self._postingy.get(token)
+                if not postingy:
+                    continue
+                idf = math.log(1 + (pocet - len(postingy) + 0.5) / (len(postingy) + 0.5))
+                for id_prikladu, tf in postingy.items():
+                    if not self._vyhovuje(id_prikladu, dialekt, odtlacok):
+                        continue
+                    norma = self._k1 * (1 - self._b + self._b * self._dlzky[id_prikladu] / priemerna_dlzka)
+                    skore[id_prikladu] = skore.get(id_prikladu, 0.0) + idf * tf * (self._k1 + 1) / (tf + norma)
+
+            # Počet spoločných trigramov z invertovaného indexu (Jaccard bez prechádzania príkladov)
+            spolocne: Dict[int, int] = {}
+            for trigram in vektor:
+                for id_prikladu in self._trigramy.get(trigram, ()):
+                    spolocne[id_prikladu] = spolocne.get(id_prikladu, 0) + 1
+
+            def podobnost(id_prikladu: int) -> float:
+                pocet_spolocnych = spolocne.get(id_prikladu, 0)
+                return pocet_spolocnych / (len(vektor) + self._pocty_trigramov[id_prikladu] - pocet_spolocnych or 1)
+
+            kandidati = set(sorted(skore, key=skore.get, reverse=True)[:MAX_KANDIDATOV])
+            for id_prikladu in sorted(spolocne, key=spolocne.get, reverse=True)[:MAX_KANDIDATOV]:
+                if (
+                    id_prikladu not in skore
+                    and self._vyhovuje(id_prikladu, dialekt, odtlacok)
+                    and podobnost(id_prikladu) >= MIN_PODOBNOST_TRIGRAMOV
+                ):
+                    kandidati.add(id_prikladu)
+            if not kandidati:
+                return []
+
+            max_skore = max(skore.values(), default=0.0) or 1.0
+            vysledky = sorted(
+                (
+                    ((1 - VAHA_TRIGRAMOV) * skore.get(id_prikladu, 0.0) / max_skore + VAHA_TRIGRAMOV * podobnost(id_prikladu), id_prikladu)
+                    for id_prikladu in kandidati
+                ),
+                reverse=True,
+            )
+            return [dict(self._priklady[id_prikladu]) for _, id_prikladu in vysledky[:k]]
+
+    # --- Interné pomocné metódy (volajú sa pod zámkom) ---
+
+    @staticmethod
+    def _kluc(zaznam: Dict[str, Optional[str]]) -> str:
+        return f"{zaznam.get('odtlacok') or '*'}|{zaznam.get('dialekt') or '*'}|{normalizuj_otazku(zaznam['question'])}"
+
+    def _vyhovuje(self, id_prikladu: int, dialekt: Optional[str], odtlacok: Optional[str]) -> bool:
+        priklad = self._priklady[id_prikladu]
+        if dialekt and priklad["dialekt"] and priklad["dialekt"] != dialekt:
+            return False
+        return not (odtlacok and priklad["odtlacok"] and priklad["odtlacok"] != odtlacok)
+
+    def _pridaj(self, zaznam: Dict[str, Optional[str]], naucene: bool) -> bool:
+        """Vráti True, ak sa príklad pridal alebo sa zmenilo jeho SQL (vtedy ho treba uložiť)."""
+        kluc = self._kluc(zaznam)
+        id_prikladu = self._podla_kluca.get(kluc)
+        if id_prikladu is None:
+            self._zaindexuj(kluc, zaznam)
+        elif not naucene:
+            return False
+        else:
+            priklad = self._priklady[id_prikladu]
+            if _normalizuj_sql(priklad["sql"]) == _normalizuj_sql(zaznam["sql"]):
+                if kluc in self._naucene:
+                    self._naucene.move_to_end(kluc)
+                return False
+            priklad["sql"] = zaznam["sql"]
+        if naucene:
+            self._naucene[kluc] = None
+            self._naucene.move_to_end(kluc)
+        return True
+
+    def _zaindexuj(self, kluc: str, priklad: Dict[str, Optional[str]]) -> None:
+        id_prikladu = len(self._priklady)
+        tokeny = Counter(kanonicke_tokeny(priklad["question"]))
+        trigramy_prikladu = set(trigramy(normalizuj_otazku(priklad["question"])))
+        self._priklady.append({
+            "question": priklad["question"], "sql": priklad["sql"],
+            "dialekt": priklad.get("dialekt"), "odtlacok": priklad.get("odtlacok"),
+        })
+        self._podla_kluca[kluc] = id_prikladu
+        self._dlzky.append(sum(tokeny.values()))
+        self._pocty_trigramov.append(len(trigramy_prikladu))
+        self._sucet_dlzok += self._dlzky[-1]
+        for token, tf in tokeny.items():
+            self._postingy.setdefault(token, {})[id_prikladu] = tf
+        for trigram in trigramy_prikladu:
+            self._trigramy.setdefault(trigram, set()).add(id_prikladu)
+
+    def _odstran(self, kluc: str) -> None:
+        id_prikladu = self._podla_kluca.pop(kluc)
+        priklad, self._priklady[id_prikladu] = self._priklady[id_prikladu], None
+        self._sucet_dlzok -= self._dlzky[id_prikladu]
+        for token in set(kanonicke_tokeny(priklad["question"])):
+            postingy = self._postingy[token]
+            postingy.pop(id_prikladu, None)
+            if not postingy:
+                del self._postingy[token]
+        for trigram in set(trigramy(normalizuj_otazku(priklad["question"]))):
+            idcka = self._trigramy[trigram]
+            idcka.discard(id_prikladu)
+            if not idcka:
+                del self._trigramy[trigram]
+
+    def _obmedz(self) -> None:
+        """Vyradí najstaršie naučené príklady nad limit a po narastení zhutní index aj súbor."""
+        while len(self._naucene) > self._max_prikladov:
+            self._odstran(self._naucene.popitem(last=False)[0])
+        if len(self._priklady) > 2 * len(self._podla_kluca) + 100:
+            self._prestav_index()
+        if self._cesta_suboru and self._riadky_na_disku > 2 * self._max_prikladov:
+            self._prepis_disk()
+
+    def _prestav_index(self) -> None:
+        zive = [(kluc, self._priklady[id_prikladu]) for kluc, id_prikladu in sorted(self._podla_kluca.items(), key=lambda p: p[1])]
+        self._priklady, self._podla_kluca, self._dlzky, self._pocty_trigramov = [], {}, [], []
+        self._postingy, self._trigramy, self._sucet_dlzok = {}, {}, 0
+        for kluc, priklad in zive:
+            self._zaindexuj(kluc, priklad)
+
+    def _prepis_disk(self) -> None:
+        docasny = f"{self._cesta_suboru}.tmp"
+        try:
+            with open(docasny, "w", encoding="utf-8") as f:
+                for kluc in self._naucene:
+                    f.write(json.dumps(self._priklady[self._podla_kluca[kluc]], ensure_ascii=False) + "\n")
+            os.replace(docasny, self._cesta_suboru)
+            self._riadky_na_disku = len(self._naucene)
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa zhutniť súbor príkladov dotazov: {e}")
+
+    def _pripis_na_disk(self, zaznam: Dict[str, Optional[str]]) -> None:
+        try:
+            with open(self._cesta_suboru, "a", encoding="utf-8") as f:
+                f.write(json.dumps(zaznam, ensure_ascii=False) + "\n")
+            self._riadky_na_disku += 1
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa uložiť príklad dotazu na disk: {e}")
+
+    def _nacitaj_z_disku(self) -> None:
+        if not self._cesta_suboru or not os.path.exists(self._cesta_suboru):
+            return
+        try:
+            with self._zamok:
+                with open(self._cesta_suboru, "r", encoding="utf-8") as f:
+                    for riadok in f:
+                        if riadok.strip():
+                            zaznam = json.loads(riadok)
+                            self._riadky_na_disku += 1
+                            self._pridaj(
+                                {
+                                    "question": zaznam["question"], "sql": zaznam["sql"],
+                                    "dialekt": zaznam.get("dialekt"), "odtlacok": zaznam.get("odtlacok"),
+                                },
+                                naucene=True,
+                            )
+                self._obmedz()
+            zapisovac.info(f"Úložisko príkladov dotazov načítané z disku: {len(self)} príkladov")
+        except Exception as e:
+            zapisovac.warning(f"⚠️ Nepodarilo sa načítať príklady dotazov z disku: {e}")
+
+
+# Ručné príklady z popis_schemy.yaml pridáva kontext databázy pod odtlačkom jej schémy (na disk sa neukladajú)
+priklady_dotazov = UlozistePrikladov(
+    cesta_suboru=os.getenv("PRIKLADY_SUBOR", os.path.join(scratch_pad_adresar, "priklady_dotazov.jsonl")),
+    max_prikladov=int(os.getenv("PRIKLADY_MAX", "5000")),
+)
+POCET_PRIKLADOV_V_PROMPTE = int(os.getenv("PRIKLADY_TOP_K", "3"))
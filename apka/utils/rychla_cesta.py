@@ -0,0 +1,302 @@
+"""
+Rýchla cesta NL→SQL: deterministické rozpoznanie častých otázok nad knižničnou schémou
+a ich preklad na SQL šablóny s parametrami bez volania LLM.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from apka.models.sql_models import SQLDotaz
+from apka.utils.normalizacia_textu import SMEROVE_PREDLOZKY, STOP_SLOVA, kmen, odstran_diakritiku
+from apka.widgets.spolocne import zapisovac
+
+# Čísla slovom, ktoré sa v otázkach typu „päť najpopulárnejších autorov" vyskytujú najčastejšie
+CISLA_SLOVOM = {
+    "jeden": 1, "jedna": 1, "dva": 2, "dve": 2, "dvaja": 2, "tri": 3, "traja": 3, "styri": 4, "styria": 4,
+    "pat": 5, "piati": 5, "piatich": 5, "sest": 6, "sedem": 7, "osem": 8, "devat": 9, "desat": 10, "desiati": 10,
+    "desiatich": 10, "patnast": 15, "dvadsat": 20,
+}
+_OBDOBIE = (
+    r"(?:za\s+|v\s+|pocas\s+)?(?:posledn\w*|uplynul\w*|minul\w*)\s+(?:(?P<pocet>\d+|"
+    + "|".join(CISLA_SLOVOM) + r")\s+)?(?P<jednotka>dn\w*|den|tyzd\w*|mesiac\w*|rok\w*)"
+)
+DNI_JEDNOTKY = {"d": 1, "t": 7, "m": 30, "r": 365}
+
+
+def _vzor_top(entita: str) -> str:
+    """Vzor otázok „top N <entita> (podľa výpožičiek)", „N <entita> je najčítanejších" a „<entita> s najviac výpožičkami"."""
+    cislo = "|".join(CISLA_SLOVOM)
+    najviac = (
+        r"(?:najpopularnejs\w*|najcitanejs\w*|najoblubenejs\w*|najaktivnejs\w*|najpozic\w*"
+        r"|(?:najviac|najcastejsie)\s+pozic\w*|top)"
+    )
+    return (
+        rf"\b(?:top\s+)?(?:(?P<n>\d+|{cislo})\s+)?{najviac}\s+(?:(?P<n2>\d+|{cislo})\s+)?(?:{entita})"
+        rf"(?:\s+(?:podla\s+)?(?:poctu\s+)?(?:vypoz\w*|pozic\w*))?"
+        rf"|\b(?P<n3>\d+|{cislo})\s+(?:{entita})\s+(?:je|su)\s+{najviac}"
+        rf"|\b(?:{entita})\s+(?:(?:s|ma\w*|su|momentalne)\s+)*(?:najviac|najcastejsie|najvacs\w*\s+poctom)\s+(?:vypoz\w*|pozic\w*)"
+    )
+
+
+# Slová, ktoré nemenia význam otázky rozpoznanej zámerom (ostatné slová = otázka je zložitejšia, ide na LLM)
+VYPLNOVE_SLOVA = STOP_SLOVA | SMEROVE_PREDLOZKY | {
+    "so", "zo", "kolko", "pocet", "povedz", "povedzte", "prosim", "celkovo", "spolu", "vsetky", "vsetkych", "aktualne",
+    "kniznica", "kniznici", "kniznice", "nasej", "nasa", "podla", "vypoziciek", "vypozicky", "vypoziciach",
+    "ktore", "ktori", "ktory", "ktorych", "ake", "aki", "aky", "su", "boli", "bolo", "bol", "bola", "mame", "mate", "vyhodnot",
+}
+
+# Zámery: regulárny výraz nad normalizovanou otázkou, SQL šablóna a stĺpce schémy, ktoré šablóna používa.
+# Sloty: `n` (počet riadkov), `od` (začiatok obdobia), `id_autora` (autor rozpoznaný podľa mena v databáze).
+ZAMERY: List[Dict[str, Any]] = [
+    {
+        "nazov": "pocet_knih_autora",
+        "vzor": r"\b(?:kolko|pocet)\s+knih\s+(?:(?:ma|napisal\w*|vydal\w*)\s+)?(?:od\s+)?(?:autor\w*\s+|spisovatel\w*\s+)?(?P<autor>[a-z]+(?:\s+[a-z]+)?)\s*(?:napisal\w*)?$",
+        "sql": (
+            "SELECT a.meno, a.priezvisko, COUNT(k.id) AS pocet_knih FROM autori a "
+            "LEFT JOIN knihy k ON k.id_autora = a.id WHERE a.id = :id_autora GROUP BY a.id, a.meno, a.priezvisko"
+        ),
+        "vysvetlenie": "Počet kníh autora {autor} v knižnici",
+        "stlpce": {"autori": ["id", "meno", "priezvisko"], "knihy": ["id", "id_autora"]},
+    },
+    {
+        "nazov": "knihy_autora",
+        "vzor": r"\b(?:ktore|ake|zoznam)\s+knih\w*\s+(?:(?:ma|napisal\w*|vydal\w*)\s+)?(?:od\s+)?(?:autor\w*\s+|spisovatel\w*\s+)?(?P<autor>[a-z]+(?:\s+[a-z]+)?)\s*(?:napisal\w*)?$",
+        "sql": (
+            "SELECT k.nazov, k.rok_vydania FROM knihy k WHERE k.id_autora = :id_autora ORDER BY k.rok_vydania"
+        ),
+        "vysvetlenie": "Knihy autora {autor} zoradené podľa roku vydania",
+        "stlpce": {"knihy": ["nazov", "rok_vydania", "id_autora"]},
+    },
+    {
+        "nazov": "top_autori",
+        "vzor": _vzor_top(r"autor\w*"),
+        "sql": (
+            "SELECT a.meno, a.priezvisko, COUNT(v.id) AS pocet_vypoziciek FROM autori a "
+            "JOIN knihy k ON k.id_autora = a.id JOIN vypozicky v ON v.id_knihy = k.id "
+            "GROUP BY a.id, a.meno, a.priezvisko ORDER BY pocet_vypoziciek DESC LIMIT :n"
+        ),
+        "vysvetlenie": "{n} autorov s najväčším počtom výpožičiek ich kníh",
+        "stlpce": {"autori": ["id", "meno", "priezvisko"], "knihy": ["id", "id_autora"], "vypozicky": ["id", "id_knihy"]},
+    },
+    {
+        "nazov": "top_knihy",
+        "vzor": _vzor_top(r"knih\w*|knizk\w*|titul\w*"),
+        "sql": (
+            "SELECT k.nazov, COUNT(v.id) AS pocet_vypoziciek FROM knihy k JOIN vypozicky v ON v.id_knihy = k.id "
+            "GROUP BY k.id, k.nazov ORDER BY pocet_vypoziciek DESC LIMIT :n"
+        ),
+        "vysvetlenie": "{n} najčastejšie požičiavaných kníh",
+        "stlpce": {"knihy": ["id", "nazov"], "vypozicky": ["id", "id_knihy"]},
+    },
+    {
+        "nazov": "top_citatelia",
+        "vzor": _vzor_top(r"citatel\w*|pouzivatel\w*"),
+        "sql": (
+            "SELECT p.meno, p.priezvisko, COUNT(v.id) AS pocet_vypoziciek FROM pouzivatelia p "
+            "JOIN vypozicky v ON v.id_pouzivatela = p.id GROUP BY p.id, p.meno, p.priezvisko "
+            "ORDER BY pocet_vypoziciek DESC LIMIT :n"
+        ),
+        "vysvetlenie": "{n} čitateľov s najväčším počtom výpožičiek",
+        "stlpce": {"pouzivatelia": ["id", "meno", "priezvisko"], "vypozicky": ["id", "id_pouzivatela"]},
+    },
+    {
+        "nazov": "pocet_vypoziciek_za_obdobie",
+        "vzor": r"\b(?:kolko|pocet)\s+(?:bolo\s+)?vypoz\w*\s+(?:bolo\s+)?" + _OBDOBIE,
+        "sql": "SELECT COUNT(*) AS pocet_vypoziciek FROM vypozicky WHERE datum_vypozicky >= :od",
+        "vysvetlenie": "Počet výpožičiek od {od}",
+        "stlpce": {"vypozicky": ["datum_vypozicky"]},
+    },
+    {
+        "nazov": "vypozicky_za_obdobie",
+        "vzor": r"\bvypoz\w*\s+" + _OBDOBIE,
+        "sql": (
+            "SELECT v.datum_vypozicky, k.nazov AS kniha, p.meno, p.priezvisko, v.stav FROM vypozicky v "
+            "JOIN knihy k ON k.id = v.id_knihy JOIN pouzivatelia p ON p.id = v.id_pouzivatela "
+            "WHERE v.datum_vypozicky >= :od ORDER BY v.datum_vypozicky DESC"
+        ),
+        "vysvetlenie": "Výpožičky od {od}, najnovšie ako prvé",
+        "stlpce": {
+            "vypozicky": ["datum_vypozicky", "id_knihy", "id_pouzivatela", "stav"],
+            "knihy": ["id", "nazov"],
+            "pouzivatelia": ["id", "meno", "priezvisko"],
+        },
+    },
+]
+
+
+def normalizuj_pre_zamer(otazka: str) -> str:
+    """Malé písmená bez diakritiky, interpunkcia nahradená medzerou."""
+    return "".join(
+        (odstran_diakritiku(znak).lower()[:1] or " ") if znak.isalnum() else " " for znak in otazka
+    ).strip()
+
+
+def _cislo(hodnota: Optional[str], predvolene: int) -> int:
+    if not hodnota:
+        return predvolene
+    return int(hodnota) if hodnota.isdigit() else CISLA_SLOVOM[hodnota]
+
+
+class RychlaCesta:
+    """
+    Deterministický rozpoznávač zámerov pred generovaním SQL cez LLM. Otázka sa porovná so vzormi
+    `ZAMERY`; pri zhode (a ak okrem rozpoznanej časti obsahuje len výplňové slová) sa sloty doplnia
+    z otázky a vráti sa `SQLDotaz` so šablónou a parametrami. Autor sa hľadá v slovníku mien z databázy
+    (bez diakritiky, podľa kmeňa, takže zvládne aj skloňovanie). Zámery, ktorých stĺpce v schéme
+    chýbajú, sa vypnú. Ostatné otázky idú na LLM; pomer zásahov (pokrytie) je v `statistiky()`.
+    """
+
+    def __init__(
+        self,
+        tabulky: Optional[Dict[str, Any]] = None,
+        povolena: bool = True,
+        ttl_slovnika_s: float = 300.0,
+        predvoleny_pocet: int = 5,
+        max_pocet: int = 100,
+    ):
+        self.povolena = povolena
+        self.ttl_slovnika_s = ttl_slovnika_s
+        self.predvoleny_pocet = predvoleny_pocet
+        self.max_pocet = max_pocet
+        self.nastav_schemu(tabulky)
+        self._zamok = threading.Lock()
+        self._autori: List[Tuple[int, str, str, str, frozenset]] = []
+        self._autori_nacitane = 0.0
+        self._statistiky: Dict[str, Any] = {"zasahy": 0, "minutia": 0, "zamery": {}}
+
+    def nastav_schemu(self, tabulky: Optional[Dict[str, Any]]) -> None:
+        """Zapne zámery, ktorých stĺpce schéma `tabulky` obsahuje (None = všetky zámery)."""
+        self._zamery = [
+            {**zamer, "regex": re.compile(zamer["vzor"])} for zamer in ZAMERY if self._je_v_scheme(zamer, tabulky)
+        ]
+
+    @staticmethod
+    def _je_v_scheme(zamer: Dict[str, Any], tabulky: Optional[Dict[str, Any]]) -> bool:
+        if tabulky is None:
+            return True
+        for tabulka, stlpce in zamer["stlpce"].items():
+            existujuce = {stlpec["name"] for stlpec in tabulky.get(tabulka, {}).get("columns", [])}
+            chybajuce = set(stlpce) - existujuce
+            if chybajuce:
+                zapisovac.warning(
+                    f"⚠️ Rýchla cesta: zámer '{zamer['nazov']}' vypnutý, v schéme chýba {tabulka}.{', '.join(sorted(chybajuce))}"
+                )
+                return False
+        return True
+
+    # --- Verejné API ---
+
+    async def najdi(self, otazka: str, db_spojenie) -> Optional[SQLDotaz]:
+        """Vráti SQL pre rozpoznanú otázku, alebo None (otázka ide na LLM)."""
+        if not self.povolena:
+            return None
+        zaciatok = time.perf_counter()
+        text = normalizuj_pre_zamer(otazka)
+        sql_dotaz = None
+        for zamer in self._zamery:
+            zhoda = zamer["regex"].search(text)
+            if not zhoda or not self._len_vyplnove_slova(text, zhoda):
+                continue
+            sloty = await self._dopln_sloty(zhoda, db_spojenie)
+            if sloty is None:
+                continue
+            parametre, popis = sloty
+            sql_dotaz = SQLDotaz(dotaz=zamer["sql"], parametre=parametre, vysvetlenie=zamer["vysvetlenie"].format(**popis))
+            break
+
+        with self._zamok:
+            if sql_dotaz is None:
+                self._statistiky["minutia"] += 1
+            else:
+                self._statistiky["zasahy"] += 1
+                self._statistiky["zamery"][zamer["nazov"]] = self._statistiky["zamery"].get(zamer["nazov"], 0) + 1
+            pokrytie = self._statistiky["zasahy"] / (self._statistiky["zasahy"] + self._statistiky["minutia"])
+        if sql_dotaz is not None:
+            zapisovac.info(
+                f"⚡ Rýchla cesta: zámer '{zamer['nazov']}' za {1000 * (time.perf_counter() - zaciatok):.1f} ms "
+                f"(pokrytie {pokrytie:.0%})"
+            )
+        else:
+            zapisovac.info(f"Rýchla cesta: bez zhody, otázka ide na LLM (pokrytie {pokrytie:.0%})")
+        return sql_dotaz
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Vráti počty zásahov a minutí, pokrytie (podiel otázok bez LLM) a zásahy podľa zámeru."""
+        with self._zamok:
+            spolu = self._statistiky["zasahy"] + self._statistiky["minutia"]
+            return {
+                "zasahy": self._statistiky["zasahy"],
+                "minutia": self._statistiky["minutia"],
+                "pokrytie": self._statistiky["zasahy"] / spolu if spolu else 0.0,
+                "zamery": dict(self._statistiky["zamery"]),
+            }
+
+    # --- Interné pomocné metódy ---
+
+    @staticmethod
+    def _len_vyplnove_slova(text: str, zhoda: re.Match) -> bool:
+        zvysok = f"{text[:zhoda.start()]} {text[zhoda.end():]}".split()
+        return all(slovo in VYPLNOVE_SLOVA for slovo in zvysok)
+
+    async def _dopln_sloty(
+        self, zhoda: re.Match, db_spojenie
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Vráti (parametre SQL šablóny, hodnoty pre vysvetlenie), alebo None, ak sa slot nedá doplniť."""
+        parametre: Dict[str, Any] = {}
+        popis: Dict[str, Any] = {}
+        skupiny = zhoda.groupdict()
+        if "n" in skupiny:
+            parametre["n"] = popis["n"] = min(_cislo(skupiny["n"] or skupiny["n2"] or skupiny["n3"], self.predvoleny_pocet), self.max_pocet)
+        if "jednotka" in skupiny:
+            dni = _cislo(skupiny["pocet"], 1) * DNI_JEDNOTKY[skupiny["jednotka"][0]]
+            od = (datetime.now() - timedelta(days=dni)).replace(microsecond=0)
+            popis["od"] = od.strftime("%d.%m.%Y")
+            # SQLite ukladá čas ako text, ostatné databázy porovnávajú s hodnotou typu timestamp
+            dialekt = db_spojenie.konfiguracia.dialekt if db_spojenie.konfiguracia else "sqlite"
+            parametre["od"] = od.isoformat(sep=" ") if dialekt == "sqlite" else od
+        if "autor" in skupiny:
+            autor = await self._najdi_autora(zhoda.group("autor").split(), db_spojenie)
+            if autor is None:
+                return None
+            parametre["id_autora"], popis["autor"] = autor
+        return parametre, popis
+
+    async def _najdi_autora(self, slova: List[str], db_spojenie) -> Optional[Tuple[int, str]]:
+        """Autor podľa priezviska alebo jeho časti (a voliteľne mena) porovnaním kmeňov bez diakritiky; viac zhôd = None."""
+        autori = await self._slovnik_autorov(db_spojenie)
+        kmene = [kmen(slovo) for slovo in slova]
+        zhody = [
+            (id_autora, f"{meno} {priezvisko}")
+            for id_autora, meno, priezvisko, kmen_mena, kmene_priezviska in autori
+            if kmene[-1] in kmene_priezviska and (len(kmene) == 1 or kmene[0] == kmen_mena)
+        ]
+        return zhody[0] if len(zhody) == 1 else None
+
+    async def _slovnik_autorov(self, db_spojenie) -> List[Tuple[int, str, str, str, frozenset]]:
+        if self._autori and time.monotonic() - self._autori_nacitane < self.ttl_slovnika_s:
+            return self._autori
+        vysledok = await db_spojenie.vykonaj_dotaz_async("SELECT id, meno, priezvisko FROM autori")
+        if "rows" not in vysledok:
+            zapisovac.warning(f"⚠️ Rýchla cesta: nepodarilo sa načítať autorov: {vysledok.get('error')}")
+            return self._autori
+        self._autori = [
+            (id_autora, meno, priezvisko, kmen(normalizuj_pre_zamer(meno)),
+             frozenset(kmen(cast) for cast in normalizuj_pre_zamer(priezvisko).split()))
+            for id_autora, meno, priezvisko in vysledok["rows"].riadky()
+        ]
+        self._autori_nacitane = time.monotonic()
+        return self._autori
+
+
+def vytvor_rychlu_cestu(tabulky: Optional[Dict[str, Any]] = None) -> RychlaCesta:
+    """Rýchla cesta nad tabuľkami schémy, konfigurovateľná cez premenné prostredia."""
+    return RychlaCesta(
+        tabulky=tabulky,
+        povolena=os.getenv("RYCHLA_CESTA", "1") == "1",
+        ttl_slovnika_s=float(os.getenv("RYCHLA_CESTA_TTL_SLOVNIKA_S", "300")),
+        predvoleny_pocet=int(os.getenv("RYCHLA_CESTA_PREDVOLENY_POCET", "5")),
+    )
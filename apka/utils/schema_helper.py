@@ -1,46 +1,175 @@
 """Pomocné funkcie pre načítanie a formátovanie popisu schémy databázy."""
 
+import asyncio
 import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
 import yaml
 
-def nacitaj_popis_schemy():
-    """Načíta a naformátuje popis schémy z YAML súboru."""
-    # Cesta k YAML súboru so schémou, relatívne k tomuto súboru
-    schema_path = os.path.join(os.path.dirname(__file__), "../settings/popis_schemy.yaml")
+from apka.settings.databaza import poskytovatel_db
+from apka.utils.katalog_schemy import KatalogSchemy, zluc_s_popismi
+from apka.widgets.spolocne import zapisovac
+
+# Cesta k YAML súboru so schémou, relatívne k tomuto súboru
+CESTA_SCHEMY = os.path.join(os.path.dirname(__file__), "../settings/popis_schemy.yaml")
+
+
+def nacitaj_data_schemy():
+    """Načíta obsah sekcie `schema` z YAML súboru (tabuľky a príkladové dotazy) alebo None pri chybe."""
     try:
-        with open(schema_path, "r", encoding='utf-8') as f: # Pridané kódovanie UTF-8
+        with open(CESTA_SCHEMY, "r", encoding='utf-8') as f: # Pridané kódovanie UTF-8
             schema_data = yaml.safe_load(f)
     except FileNotFoundError:
-        print(f"Chyba: Súbor schémy nebol nájdený na ceste: {schema_path}")
-        return "Chyba: Popis schémy nie je dostupný."
+        zapisovac.error(f"Chyba: Súbor schémy nebol nájdený na ceste: {CESTA_SCHEMY}")
+        return None
     except Exception as e:
-        print(f"Chyba pri načítaní alebo spracovaní súboru schémy: {e}")
-        return "Chyba: Popis schémy nie je dostupný."
+        zapisovac.error(f"Chyba pri načítaní alebo spracovaní súboru schémy: {e}")
+        return None
 
     if not schema_data or "schema" not in schema_data or "tables" not in schema_data["schema"]:
-         print(f"Chyba: Neplatný formát súboru schémy: {schema_path}")
-         return "Chyba: Popis schémy má neplatný formát."
+         zapisovac.error(f"Chyba: Neplatný formát súboru schémy: {CESTA_SCHEMY}")
+         return None
+
+    return schema_data["schema"]
+
 
+def formatuj_tabulku(nazov_tabulky, info_tabulky):
+    """Naformátuje jednu tabuľku a jej stĺpce pre prompt."""
+    popis = f"{nazov_tabulky}\n"
+    if "columns" in info_tabulky:
+        for stlpec in info_tabulky["columns"]:
+            obmedzenia = f", {stlpec['constraints']}" if "constraints" in stlpec else ""
+            popis += f"- {stlpec['name']} ({stlpec['type']}{obmedzenia})\n"
+    return popis + "\n"
 
-    # Formátovanie popisu schémy
+
+def formatuj_priklady(priklady):
+    """Naformátuje príkladové dotazy (otázka + SQL) pre prompt."""
+    popis = "Príkladové dotazy:\n"
+    for priklad in priklady:
+        popis += f"O: {priklad['question']}\n"
+        popis += f"A: {priklad['sql']}\n\n"
+    return popis
+
+
+def formatuj_popis_schemy(tabulky, priklady=None):
+    """Naformátuje vybrané tabuľky (a voliteľne príkladové dotazy) do textu pre prompt."""
     popis = "Dostupné tabuľky a ich štruktúry:\n\n"
 
     # Pridanie tabuliek a ich stĺpcov
-    for nazov_tabulky, info_tabulky in schema_data["schema"]["tables"].items():
-        popis += f"{nazov_tabulky}\n"
-        if "columns" in info_tabulky:
-            for stlpec in info_tabulky["columns"]:
-                obmedzenia = f", {stlpec['constraints']}" if "constraints" in stlpec else ""
-                popis += f"- {stlpec['name']} ({stlpec['type']}{obmedzenia})\n"
-        popis += "\n"
+    for nazov_tabulky, info_tabulky in tabulky.items():
+        popis += formatuj_tabulku(nazov_tabulky, info_tabulky)
 
     # Pridanie príkladových dotazov, ak existujú
-    if "example_queries" in schema_data["schema"]:
-        popis += "Príkladové dotazy:\n"
-        for priklad in schema_data["schema"]["example_queries"]:
-            popis += f"O: {priklad['question']}\n"
-            popis += f"A: {priklad['sql']}\n\n"
+    if priklady:
+        popis += formatuj_priklady(priklady)
 
     return popis
-# Načítanie popisu schémy pri importe modulu
-POPIS_SCHEMY = nacitaj_popis_schemy()
+
+
+def cudzie_kluce(info_tabulky):
+    """Vráti názvy tabuliek, na ktoré tabuľka odkazuje cez cudzie kľúče ('foreign key to X.id')."""
+    ciele = set()
+    for stlpec in info_tabulky.get("columns", []):
+        zhoda = re.search(r"foreign key to (\w+)\.", str(stlpec.get("constraints", "")), flags=re.IGNORECASE)
+        if zhoda:
+            ciele.add(zhoda.group(1))
+    return ciele
+
+
+def nacitaj_popis_schemy(data_schemy=None, s_prikladmi=True):
+    """Naformátuje popis schémy (predvolene z YAML súboru)."""
+    if data_schemy is None:
+        data_schemy = nacitaj_data_schemy()
+    if data_schemy is None:
+        return "Chyba: Popis schémy nie je dostupný."
+    return formatuj_popis_schemy(data_schemy["tables"], data_schemy.get("example_queries") if s_prikladmi else None)
+
+
+class SchemaDatabazy:
+    """
+    Schéma databázy pre prompt, načítaná lenivo pri prvom použití (nie pri importe): štruktúra tabuliek
+    zo živej databázy (katalóg s cache na disku) doplnená o popisy a príkladové dotazy z YAML. Kým databáza
+    nie je pripojená (alebo pri `zdroj="yaml"`), platí schéma z YAML; katalóg sa načíta pri prvom použití
+    po pripojení. Samo sa nepripája, pripojenie berie od volajúceho alebo od poskytovateľa. Každá zmena
+    zvýši `verzia`, podľa ktorej si odvodené štruktúry (index tabuliek, rýchla cesta) obnovia stav.
+    """
+
+    def __init__(self, poskytovatel=None, s_yaml: bool = True, zdroj: str = "databaza", pauza_katalogu_s: float = 60.0):
+        self._poskytovatel = poskytovatel
+        self._s_yaml = s_yaml
+        self._zdroj = zdroj
+        self._pauza_katalogu_s = pauza_katalogu_s
+        self._zamok = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._yaml_nacitane = False
+        self._z_databazy = False
+        self._dalsi_pokus = 0.0
+        self._popisy: Dict[bool, str] = {}
+        self.verzia = 0
+
+    def data(self, db_spojenie=None) -> Optional[Dict[str, Any]]:
+        """Dáta schémy (`tables`, `example_queries`), pri prvom použití po pripojení doplnené z katalógu databázy."""
+        if self._z_databazy:
+            return self._data
+        with self._zamok:
+            self._nacitaj_yaml()
+            if self._zdroj == "databaza" and not self._z_databazy and time.monotonic() >= self._dalsi_pokus:
+                db_spojenie = db_spojenie or (self._poskytovatel.spojenie if self._poskytovatel else None)
+                if db_spojenie is not None and db_spojenie.je_pripojene():
+                    self._nacitaj_katalog(db_spojenie)
+        return self._data
+
+    async def data_async(self, db_spojenie=None) -> Optional[Dict[str, Any]]:
+        """Asynchrónna verzia `data` (introspekcia databázy beží mimo event loopu)."""
+        if self._z_databazy:
+            return self._data
+        slucka = asyncio.get_running_loop()
+        return await slucka.run_in_executor(None, self.data, db_spojenie)
+
+    def aktualne_data(self) -> Optional[Dict[str, Any]]:
+        """Doteraz načítané dáta schémy bez pokusu o načítanie katalógu (bez prístupu k databáze)."""
+        with self._zamok:
+            self._nacitaj_yaml()
+            return self._data
+
+    def popis(self, s_prikladmi: bool = True) -> str:
+        """Naformátovaný popis doteraz načítanej schémy pre prompt (s príkladovými dotazmi z YAML alebo len tabuľky)."""
+        data = self.aktualne_data()
+        popis = self._popisy.get(s_prikladmi)
+        if popis is None:
+            popis = nacitaj_popis_schemy(data, s_prikladmi) if data else "Chyba: Popis schémy nie je dostupný."
+            self._popisy[s_prikladmi] = popis
+        return popis
+
+    def _nacitaj_yaml(self) -> None:
+        if not self._yaml_nacitane:
+            self._yaml_nacitane = True
+            if self._s_yaml:
+                self._nastav(nacitaj_data_schemy())
+
+    def _nastav(self, data: Optional[Dict[str, Any]]) -> None:
+        self._data = data
+        self._popisy = {}
+        self.verzia += 1
+
+    def _nacitaj_katalog(self, db_spojenie) -> None:
+        try:
+            tabulky_db = KatalogSchemy(db_spojenie.engine).nacitaj()
+        except Exception as e:
+            self._dalsi_pokus = time.monotonic() + self._pauza_katalogu_s
+            zapisovac.warning(f"⚠️ Chyba pri introspekcii schémy databázy, zatiaľ platí schéma z YAML: {e}")
+            return
+        self._z_databazy = True
+        if not tabulky_db:
+            return
+        data = dict(self._data or {})
+        data["tables"] = zluc_s_popismi(tabulky_db, data.get("tables", {}))
+        self._nastav(data)
+
+
+# Schéma aplikácie (predvolená databáza); načíta sa pri prvom použití, SCHEMA_ZDROJ=yaml vynechá katalóg databázy
+schema_aplikacie = SchemaDatabazy(poskytovatel_db, zdroj=os.getenv("SCHEMA_ZDROJ", "databaza"))
@@ -0,0 +1,69 @@
+"""Špekulatívne generovanie SQL: viac kandidátov súbežne, vyhráva prvý, ktorý prejde overením."""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from apka.models.sql_models import SQLDotaz
+from apka.utils.planovac_llm import LLMPretazene
+from apka.widgets.spolocne import zapisovac
+
+# Počet súbežných kandidátov (1 = vypnuté, jeden dotaz bez špekulácie)
+POCET_KANDIDATOV = int(os.getenv("NL2SQL_POCET_KANDIDATOV", "1"))
+# Teploty kandidátov; pri viac kandidátoch ako teplôt sa teploty opakujú
+TEPLOTY_KANDIDATOV = [float(teplota) for teplota in os.getenv("NL2SQL_TEPLOTY_KANDIDATOV", "0.1,0.4,0.7").split(",")]
+
+
+def teploty_pre_kandidatov(pocet: int) -> List[float]:
+    """Vráti teplotu pre každého z `pocet` kandidátov."""
+    return [TEPLOTY_KANDIDATOV[i % len(TEPLOTY_KANDIDATOV)] for i in range(pocet)]
+
+
+async def prvy_platny_kandidat(
+    generatory: List[Callable[[], Awaitable[SQLDotaz]]],
+    over: Callable[[str, Dict[str, Any]], Awaitable[Optional[str]]],
+) -> Tuple[Optional[SQLDotaz], List[str]]:
+    """
+    Spustí všetky generátory kandidátov súbežne a každý hotový kandidát overí (`over` dostane šablónu
+    a parametre, vráti chybu alebo None). Vráti prvého platného kandidáta a zvyšných zruší. Ak neprejde žiadny,
+    vráti prvého vygenerovaného kandidáta (chybu nahlási vykonanie) a zoznam chýb.
+    """
+    async def kandidat(poradie: int, generator: Callable[[], Awaitable[SQLDotaz]]):
+        sql_dotaz = await generator()
+        return poradie, sql_dotaz, await over(sql_dotaz.dotaz, sql_dotaz.parametre)
+
+    zaciatok = time.perf_counter()
+    ulohy = [asyncio.create_task(kandidat(poradie, generator)) for poradie, generator in enumerate(generatory)]
+    chyby: List[str] = []
+    prvy: Optional[SQLDotaz] = None
+    pretazenie: Optional[LLMPretazene] = None
+    try:
+        for hotova in asyncio.as_completed(ulohy):
+            try:
+                poradie, sql_dotaz, chyba = await hotova
+            except Exception as e:
+                if isinstance(e, LLMPretazene):
+                    pretazenie = e
+                chyby.append(f"generovanie zlyhalo: {e}")
+                continue
+            prvy = prvy or sql_dotaz
+            if chyba is None:
+                zapisovac.info(
+                    f"🏁 Platný SQL kandidát #{poradie + 1}/{len(ulohy)} za {1000 * (time.perf_counter() - zaciatok):.0f} ms"
+                    f" (neplatných pred ním: {len(chyby)})"
+                )
+                return sql_dotaz, chyby
+            chyby.append(chyba)
+            zapisovac.warning(f"⚠️ SQL kandidát #{poradie + 1} neprešiel overením: {chyba}")
+    finally:
+        # Zvyšní kandidáti sa zrušia (ušetrí sa čakanie aj zvyšok tokenov)
+        for uloha in ulohy:
+            uloha.cancel()
+
+    if prvy is None and pretazenie is not None:
+        # Plánovač LLM odmietol kandidátov: volajúci má odpovedať „skúste neskôr", nie hlásiť chybu
+        raise pretazenie
+    if prvy is None:
+        raise RuntimeError(f"Nepodarilo sa vygenerovať žiadny SQL dotaz: {'; '.join(chyby)}")
+    return prvy, chyby
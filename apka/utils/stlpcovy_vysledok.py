@@ -0,0 +1,155 @@
+"""Kompaktný stĺpcový výsledok SQL dotazu (názvy stĺpcov + pole hodnôt pre každý stĺpec)."""
+
+import csv
+import io
+import json
+import math
+import numbers
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy je voliteľný, bez neho sa stĺpce vracajú ako zoznamy
+    np = None
+
+
+_zakoduj_retazec = json.encoder.encode_basestring
+# Rýchle kódovanie bežných typov hodnôt z DB; ostatné cez json.dumps (dátumy, Decimal ako text)
+_KODOVANIE_JSON = {
+    str: _zakoduj_retazec,
+    int: int.__repr__,
+    float: lambda hodnota: float.__repr__(hodnota) if math.isfinite(hodnota) else json.dumps(hodnota),
+    type(None): lambda _: "null",
+    bool: lambda hodnota: "true" if hodnota else "false",
+}
+
+
+def _json_hodnota(hodnota: Any) -> str:
+    kodovanie = _KODOVANIE_JSON.get(type(hodnota))
+    if kodovanie is not None:
+        return kodovanie(hodnota)
+    return json.dumps(hodnota, ensure_ascii=False, default=str)
+
+
+class StlpcovyVysledok:
+    """
+    Výsledok dotazu uložený po stĺpcoch namiesto slovníka pre každý riadok.
+    Riadky z kurzora sa transponujú raz (`zip(*riadky)`) a všetky výstupy (markdown, JSON,
+    CSV, dáta pre Plotly) sa skladajú priamo zo stĺpcov bez medzikroku cez slovníky.
+    """
+
+    __slots__ = ("stlpce", "data")
+
+    def __init__(self, stlpce: Sequence[str], data: Optional[List[list]] = None):
+        self.stlpce: List[str] = list(stlpce)
+        self.data: List[list] = data if data is not None else [[] for _ in self.stlpce]
+
+    @classmethod
+    def z_riadkov(cls, stlpce: Sequence[str], riadky: Iterable[Sequence[Any]]) -> "StlpcovyVysledok":
+        """Vytvorí výsledok z riadkov (n-tíc) kurzora."""
+        vysledok = cls(stlpce)
+        vysledok.pridaj_riadky(riadky)
+        return vysledok
+
+    def pridaj_riadky(self, riadky: Iterable[Sequence[Any]]) -> None:
+        """Pripojí ďalšie riadky (napr. ďalšiu dávku z `fetchmany`)."""
+        if not isinstance(riadky, (list, tuple)):
+            riadky = list(riadky)
+        if not riadky:
+            return
+        for stlpec, hodnoty in zip(self.data, zip(*riadky)):
+            stlpec.extend(hodnoty)
+
+    def pridaj(self, iny: "StlpcovyVysledok") -> None:
+        """Pripojí riadky iného výsledku s rovnakými stĺpcami."""
+        for stlpec, hodnoty in zip(self.data, iny.data):
+            stlpec.extend(hodnoty)
+
+    def __len__(self) -> int:
+        return len(self.data[0]) if self.data else 0
+
+    def __repr__(self) -> str:
+        return f"StlpcovyVysledok(stlpce={self.stlpce!r}, riadkov={len(self)})"
+
+    # --- Prístup k dátam ---
+
+    def riadky(self) -> Iterator[Tuple[Any, ...]]:
+        """Iteruje riadky ako n-tice."""
+        return zip(*self.data)
+
+    def vyrez(self, zaciatok: int, koniec: Optional[int] = None) -> "StlpcovyVysledok":
+        """Vráti výsledok len s riadkami [zaciatok:koniec]."""
+        return StlpcovyVysledok(self.stlpce, [stlpec[zaciatok:koniec] for stlpec in self.data])
+
+    def stlpec(self, nazov: str) -> list:
+        """Vráti hodnoty jedného stĺpca."""
+        return self.data[self.stlpce.index(nazov)]
+
+    def ako_numpy(self, nazov: str):
+        """Vráti stĺpec ako NumPy pole (číselné stĺpce ako float, None → NaN), ak je NumPy dostupný."""
+        if np is None:
+            raise RuntimeError("NumPy nie je nainštalovaný")
+        hodnoty = self.stlpec(nazov)
+        if self.je_ciselny(nazov):
+            return np.array([np.nan if hodnota is None else hodnota for hodnota in hodnoty], dtype=float)
+        return np.array(hodnoty, dtype=object)
+
+    def je_ciselny(self, nazov: str) -> bool:
+        """True, ak sú všetky nenulové hodnoty stĺpca čísla (bool sa za číslo nepovažuje)."""
+        return all(
+            isinstance(hodnota, numbers.Number) and not isinstance(hodnota, bool)
+            for hodnota in self.stlpec(nazov) if hodnota is not None
+        ) and any(hodnota is not None for hodnota in self.stlpec(nazov))
+
+    def do_slovnikov(self) -> List[Dict[str, Any]]:
+        """Zoznam slovníkov po riadkoch (len pre kód, ktorý ešte očakáva starý tvar)."""
+        return [dict(zip(self.stlpce, riadok)) for riadok in self.riadky()]
+
+    # --- Výstupy ---
+
+    def do_markdown(self) -> str:
+        """Markdown tabuľka (hlavička s tučnými názvami stĺpcov)."""
+        hlavicka = "| " + " | ".join(f"**{str(stlpec)}**" for stlpec in self.stlpce) + " |"
+        oddelovac = "|" + "|".join("---" for _ in self.stlpce) + "|"
+        texty = [[str(hodnota) for hodnota in stlpec] for stlpec in self.data]
+        riadky = ["| " + " | ".join(bunky) + " |" for bunky in zip(*texty)]
+        return "\n".join([hlavicka, oddelovac] + riadky)
+
+    def do_json(self, po_stlpcoch: bool = False) -> str:
+        """
+        JSON výsledku. Predvolene zoznam objektov po riadkoch (rovnaký výstup ako `json.dumps`
+        zoznamu slovníkov), s `po_stlpcoch=True` kompaktný tvar {"columns": [...], "data": {stĺpec: [...]}}.
+        Hodnoty sa kódujú po stĺpcoch; nepodporované typy (dátum, Decimal) ako text.
+        """
+        if po_stlpcoch:
+            return json.dumps(
+                {"columns": self.stlpce, "data": dict(zip(self.stlpce, self.data))}, ensure_ascii=False, default=str
+            )
+        # Šablóna objektu s kľúčmi zakódovanými raz; do nej sa dosadia zakódované bunky riadku
+        sablona = "{" + ", ".join(_zakoduj_retazec(str(stlpec)).replace("%", "%%") + ": %s" for stlpec in self.stlpce) + "}"
+        zakodovane = [list(map(_json_hodnota, stlpec)) for stlpec in self.data]
+        return "[" + ", ".join([sablona % bunky for bunky in zip(*zakodovane)]) + "]"
+
+    def do_csv(self, subor: Optional[TextIO] = None, s_hlavickou: bool = True) -> Optional[str]:
+        """Zapíše CSV do súboru (alebo vráti ako text, ak súbor nie je zadaný)."""
+        ciel = subor or io.StringIO()
+        zapisovac_csv = csv.writer(ciel)
+        if s_hlavickou:
+            zapisovac_csv.writerow(self.stlpce)
+        zapisovac_csv.writerows(self.riadky())
+        return None if subor else ciel.getvalue()
+
+    def do_plotly(self, x: Optional[str] = None, y: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Dáta pre Plotly graf: `x` (predvolene prvý nečíselný stĺpec) a `y` (predvolene prvý číselný),
+        spolu s názvami osí. Tvar zodpovedá parametrom nástroja `nakresli_plotly_graf`.
+        """
+        ciselne = [stlpec for stlpec in self.stlpce if self.je_ciselny(stlpec)]
+        x = x or next((stlpec for stlpec in self.stlpce if stlpec not in ciselne), self.stlpce[0])
+        y = y or next((stlpec for stlpec in ciselne if stlpec != x), None)
+        return {
+            "x_data": [str(hodnota) for hodnota in self.stlpec(x)],
+            "y_data": list(self.stlpec(y)) if y else [],
+            "x_title": x,
+            "y_title": y or "",
+        }
@@ -0,0 +1,224 @@
+"""Strážca nákladov SQL dotazov: odhad ceny z plánu (EXPLAIN) ešte pred vykonaním dotazu."""
+
+import json
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from apka.widgets.spolocne import zapisovac
+
+# Politiky pri prekročení limitu nákladov
+POLITIKY = ("odmietnut", "obmedzit", "potvrdit", "vypnuty")
+
+# Odhad počtu riadkov tabuľky/poddotazu, ktorého veľkosť nepoznáme (CTE, pohľad, ...)
+PREDVOLENY_POCET_RIADKOV = 1000
+# Ako dlho (s) platí zistený počet riadkov tabuľky
+TTL_VELKOSTI_TABULIEK_S = 60.0
+
+# Kľúčové slová, ktoré za názvom tabuľky nie sú alias
+_NIE_ALIAS = {
+    "on", "using", "where", "join", "inner", "left", "right", "full", "outer", "cross", "natural",
+    "group", "order", "limit", "having", "union", "except", "intersect", "window", "as", "offset",
+}
+
+
+def aliasy_tabuliek(dotaz: str) -> Dict[str, str]:
+    """Vráti mapu alias/názov -> tabuľka pre tabuľky vo FROM/JOIN (vrátane zoznamu oddeleného čiarkami)."""
+    aliasy: Dict[str, str] = {}
+    for zhoda in re.finditer(r"(?:\bfrom\b|\bjoin\b|,)\s*[\"`\[]?(\w+)[\"`\]]?(?:\s+(?:as\s+)?(\w+))?", dotaz, flags=re.IGNORECASE):
+        tabulka, alias = zhoda.group(1), zhoda.group(2)
+        aliasy.setdefault(tabulka.lower(), tabulka)
+        if alias and alias.lower() not in _NIE_ALIAS:
+            aliasy[alias.lower()] = tabulka
+    return aliasy
+
+
+def pridaj_limit(dotaz: str, limit: int) -> str:
+    """Obalí čítací dotaz tak, aby vrátil najviac `limit` riadkov."""
+    return f"SELECT * FROM ({dotaz.strip().rstrip(';')}) AS obmedzeny_dotaz LIMIT {int(limit)}"
+
+
+class StrazcaDotazov:
+    """
+    Pred vykonaním čítacieho dotazu získa jeho plán (SQLite `EXPLAIN QUERY PLAN`,
+    PostgreSQL `EXPLAIN (FORMAT JSON)`, MySQL `EXPLAIN`) a odhadne náklady a počet riadkov.
+    Pri prekročení limitu rozhodne podľa politiky: odmietnuť, pridať LIMIT alebo vyžiadať potvrdenie.
+
+    Náklady pri SQLite sú odhad počtu prečítaných riadkov (vnorené cykly plánu × veľkosti tabuliek,
+    bez selektivity podmienok WHERE), pri PostgreSQL jednotky plánovača (`Total Cost`),
+    pri MySQL súčet odhadov `rows` vnorených cyklov.
+    """
+
+    def __init__(
+        self,
+        politika: str = "potvrdit",
+        max_naklady: float = 10_000_000,
+        max_riadkov: float = 1_000_000,
+        limit_riadkov: int = 1000,
+    ):
+        if politika not in POLITIKY:
+            raise ValueError(f"Neznáma politika strážcu dotazov '{politika}', povolené: {', '.join(POLITIKY)}")
+        self.politika = politika
+        self.max_naklady = max_naklady
+        self.max_riadkov = max_riadkov
+        self.limit_riadkov = limit_riadkov
+        self._zamok = threading.Lock()
+        self._velkosti_tabuliek: Dict[str, Tuple[float, int]] = {}
+        self._statistiky = {"povolit": 0, "odmietnut": 0, "obmedzit": 0, "potvrdit": 0, "chyby": 0}
+
+    # --- Verejné API ---
+
+    def posud(self, spojenie, dotaz: str, parametre: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Posúdi dotaz (s hodnotami viazaných `parametre`) na otvorenom SQLAlchemy spojení. Vráti slovník s kľúčmi `rozhodnutie`
+        (povolit/odmietnut/obmedzit/potvrdit), `naklady`, `odhad_riadkov`, `dovody`, `cas_ms`
+        a pri rozhodnutí `obmedzit` aj upravený `dotaz`.
+        """
+        posudok: Dict[str, Any] = {"rozhodnutie": "povolit", "naklady": None, "odhad_riadkov": None, "dovody": []}
+        if self.politika == "vypnuty":
+            return posudok
+
+        zaciatok = time.perf_counter()
+        dialekt = spojenie.dialect.name
+        try:
+            if dialekt == "sqlite":
+                naklady, riadky, dovody = self._odhad_sqlite(spojenie, dotaz, parametre)
+            elif dialekt == "postgresql":
+                naklady, riadky, dovody = self._odhad_postgresql(spojenie, dotaz, parametre)
+            elif dialekt in ("mysql", "mariadb"):
+                naklady, riadky, dovody = self._odhad_mysql(spojenie, dotaz, parametre)
+            else:
+                return posudok
+        except Exception as e:
+            # Plán sa nepodarilo získať (napr. syntaktická chyba) - chybu nahlási samotné vykonanie
+            with self._zamok:
+                self._statistiky["chyby"] += 1
+            zapisovac.warning(f"⚠️ Strážca dotazov: nepodarilo sa získať plán dotazu: {e}")
+            return posudok
+
+        posudok.update(naklady=naklady, odhad_riadkov=riadky, dovody=dovody)
+        prekrocene = []
+        if naklady > self.max_naklady:
+            prekrocene.append(f"odhadované náklady {naklady:,.0f} > limit {self.max_naklady:,.0f}")
+        if riadky > self.max_riadkov:
+            prekrocene.append(f"odhadovaný počet riadkov {riadky:,.0f} > limit {self.max_riadkov:,.0f}")
+        if prekrocene:
+            posudok["dovody"] += prekrocene
+            posudok["rozhodnutie"] = self.politika
+            if self.politika == "obmedzit":
+                posudok["dotaz"] = pridaj_limit(dotaz, self.limit_riadkov)
+        posudok["cas_ms"] = round(1000 * (time.perf_counter() - zaciatok), 2)
+
+        with self._zamok:
+            self._statistiky[posudok["rozhodnutie"]] += 1
+        zapisovac.info(
+            f"🛡️ Strážca dotazov: {posudok['rozhodnutie']} (náklady {naklady:,.0f}, odhad riadkov {riadky:,.0f}, "
+            f"plán {posudok['cas_ms']} ms){': ' + '; '.join(posudok['dovody']) if posudok['dovody'] else ''}"
+        )
+        return posudok
+
+    def statistiky(self) -> Dict[str, int]:
+        """Vráti počty rozhodnutí strážcu (na ladenie limitov)."""
+        with self._zamok:
+            return dict(self._statistiky)
+
+    # --- SQLite ---
+
+    def _odhad_sqlite(self, spojenie, dotaz: str, parametre: Optional[Dict[str, Any]]) -> Tuple[float, float, List[str]]:
+        plan = [tuple(riadok) for riadok in spojenie.execute(text(f"EXPLAIN QUERY PLAN {dotaz}"), parametre)]
+        deti: Dict[int, List[Tuple[int, str]]] = {}
+        for id_uzla, rodic, _, detail in plan:
+            deti.setdefault(rodic, []).append((id_uzla, detail))
+        aliasy = aliasy_tabuliek(dotaz)
+        dovody: List[str] = []
+
+        def velkost(nazov: str) -> int:
+            tabulka = aliasy.get(nazov.lower(), nazov)
+            return self._velkost_tabulky_sqlite(spojenie, tabulka)
+
+        def skupina(rodic: int) -> Tuple[float, float]:
+            """Náklady a počet riadkov vnorených cyklov pod jedným uzlom plánu."""
+            naklady, riadky = 0.0, 1.0
+            skenovane: List[str] = []
+            for id_uzla, detail in deti.get(rodic, []):
+                zhoda = re.match(r"(SCAN|SEARCH) (\w+)", detail)
+                if zhoda and zhoda.group(2) != "CONSTANT":
+                    pocet = velkost(zhoda.group(2))
+                    if zhoda.group(1) == "SCAN":
+                        faktor = float(pocet)
+                        if pocet > 1:
+                            skenovane.append(zhoda.group(2))
+                    elif "rowid=?" in detail or ("PRIMARY KEY" in detail and "=?" in detail and ">" not in detail and "<" not in detail):
+                        faktor = 1.0
+                    elif ">" in detail or "<" in detail:
+                        faktor = max(1.0, pocet / 4)
+                    else:
+                        faktor = max(1.0, math.log2(pocet + 1))
+                    riadky *= faktor
+                    naklady += riadky
+                    # Poddotaz vo FROM (SCAN (subquery-N)) má vlastné uzly pod sebou
+                    naklady += skupina(id_uzla)[0]
+                elif "TEMP B-TREE" in detail:
+                    naklady += riadky * math.log2(riadky + 1)
+                else:
+                    # CO-ROUTINE, MATERIALIZE, LIST/SCALAR SUBQUERY, COMPOUND, ...
+                    naklady_poddotazu, _ = skupina(id_uzla)
+                    naklady += naklady_poddotazu * (riadky if "CORRELATED" in detail else 1.0)
+            if len(skenovane) > 1:
+                dovody.append(f"karteziánsky súčin / úplné prehľadávanie viacerých tabuliek: {', '.join(skenovane)}")
+            return naklady, riadky
+
+        naklady, riadky = skupina(0)
+        return naklady, riadky, dovody
+
+    def _velkost_tabulky_sqlite(self, spojenie, tabulka: str) -> int:
+        teraz = time.monotonic()
+        with self._zamok:
+            ulozena = self._velkosti_tabuliek.get(tabulka)
+        if ulozena and teraz - ulozena[0] < TTL_VELKOSTI_TABULIEK_S:
+            return ulozena[1]
+        try:
+            # MAX(rowid) je O(log n) a pre tabuľky bez mazania zodpovedá počtu riadkov
+            pocet = spojenie.execute(text(f'SELECT MAX(rowid) FROM "{tabulka}"')).scalar() or 0
+        except Exception:
+            pocet = PREDVOLENY_POCET_RIADKOV
+        with self._zamok:
+            self._velkosti_tabuliek[tabulka] = (teraz, int(pocet))
+        return int(pocet)
+
+    # --- PostgreSQL / MySQL ---
+
+    def _odhad_postgresql(self, spojenie, dotaz: str, parametre: Optional[Dict[str, Any]]) -> Tuple[float, float, List[str]]:
+        plan = spojenie.execute(text(f"EXPLAIN (FORMAT JSON) {dotaz}"), parametre).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        koren = plan[0]["Plan"]
+        dovody = []
+
+        def prejdi(uzol: dict) -> None:
+            if uzol.get("Node Type") == "Nested Loop" and not uzol.get("Join Filter") and all(
+                dieta.get("Node Type") == "Seq Scan" for dieta in uzol.get("Plans", [])
+            ):
+                dovody.append("nested loop nad dvoma sekvenčnými skenmi (možný karteziánsky súčin)")
+            for dieta in uzol.get("Plans", []):
+                prejdi(dieta)
+
+        prejdi(koren)
+        return float(koren["Total Cost"]), float(koren["Plan Rows"]), dovody
+
+    def _odhad_mysql(self, spojenie, dotaz: str, parametre: Optional[Dict[str, Any]]) -> Tuple[float, float, List[str]]:
+        vysledok = spojenie.execute(text(f"EXPLAIN {dotaz}"), parametre)
+        stlpce = list(vysledok.keys())
+        naklady, riadky = 0.0, 1.0
+        dovody = []
+        for riadok in vysledok:
+            zaznam = dict(zip(stlpce, riadok))
+            riadky *= float(zaznam.get("rows") or 1)
+            naklady += riadky
+            if zaznam.get("type") == "ALL" and riadky > float(zaznam.get("rows") or 1):
+                dovody.append(f"úplné prehľadávanie tabuľky {zaznam.get('table')} vo vnorenom cykle")
+        return naklady, riadky, dovody
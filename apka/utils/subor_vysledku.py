@@ -0,0 +1,174 @@
+"""Streamovaný zápis veľkého výsledku dotazu do súboru (CSV alebo Parquet) namiesto správy v chate."""
+
+import csv
+import itertools
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+from apka.utils.suhrn_vysledku import SuhrnVysledku
+from apka.widgets.spolocne import zapisovac
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet je voliteľný, bez pyarrow sa zapisuje CSV
+    pa = None
+    pq = None
+
+FORMATY = ("csv", "parquet")
+# Dávky sa do Parquet skupiny riadkov zlučujú, aby súbor nemal tisíce malých skupín
+RIADKOV_SKUPINY_PARQUET = 64 * 1024
+
+
+def dostupny_format(format_suboru: str) -> str:
+    """Vráti požadovaný formát, alebo 'csv', ak Parquet nie je k dispozícii (chýba pyarrow)."""
+    format_suboru = format_suboru.lower()
+    if format_suboru not in FORMATY:
+        zapisovac.warning(f"⚠️ Neznámy formát súboru výsledku '{format_suboru}', použije sa CSV")
+        return "csv"
+    if format_suboru == "parquet" and pa is None:
+        zapisovac.warning("⚠️ Parquet vyžaduje balík pyarrow, výsledok sa zapíše do CSV")
+        return "csv"
+    return format_suboru
+
+
+class ZapisovacVysledku:
+    """
+    Zapisuje výsledok po dávkach: každá dávka sa hneď zapíše a zahodí, takže v pamäti je vždy
+    najviac jedna (pri Parquet najviac jedna skupina riadkov). Parquet dostane schému z prvej
+    dávky (stĺpce len s NULL ako text).
+    """
+
+    def __init__(self, cesta: str, stlpce: List[str], format_suboru: str = "csv"):
+        self.cesta = cesta
+        self.stlpce = stlpce
+        self.format = format_suboru
+        self.pocet_riadkov = 0
+        self._subor = None
+        self._zapisovac_csv = None
+        self._zapisovac_parquet = None
+        self._schema = None
+        self._skupina: List[Any] = []
+        self._riadkov_skupiny = 0
+        if self.format == "csv":
+            # utf-8-sig, aby Excel správne zobrazil diakritiku
+            self._subor = open(cesta, "w", newline="", encoding="utf-8-sig")
+            self._zapisovac_csv = csv.writer(self._subor)
+            self._zapisovac_csv.writerow(stlpce)
+
+    def zapis(self, davka: StlpcovyVysledok) -> None:
+        """Zapíše jednu dávku riadkov."""
+        if not len(davka):
+            return
+        if self._zapisovac_csv is not None:
+            self._zapisovac_csv.writerows(davka.riadky())
+        else:
+            self._zapis_parquet(davka)
+        self.pocet_riadkov += len(davka)
+
+    def _zapis_parquet(self, davka: StlpcovyVysledok) -> None:
+        stlpce = {nazov: hodnoty for nazov, hodnoty in zip(self.stlpce, davka.data)}
+        if self._zapisovac_parquet is None:
+            tabulka = pa.Table.from_pydict(stlpce)
+            self._schema = pa.schema(
+                [pa.field(pole.name, pa.string()) if pa.types.is_null(pole.type) else pole for pole in tabulka.schema]
+            )
+            self._zapisovac_parquet = pq.ParquetWriter(self.cesta, self._schema)
+        self._skupina.append(pa.Table.from_pydict(stlpce, schema=self._schema))
+        self._riadkov_skupiny += len(davka)
+        if self._riadkov_skupiny >= RIADKOV_SKUPINY_PARQUET:
+            self._zapis_skupinu()
+
+    def _zapis_skupinu(self) -> None:
+        if self._skupina:
+            self._zapisovac_parquet.write_table(pa.concat_tables(self._skupina))
+            self._skupina, self._riadkov_skupiny = [], 0
+
+    def zatvor(self) -> None:
+        """Dokončí súbor (Parquet zapíše pätičku so schémou)."""
+        if self._subor is not None:
+            self._subor.close()
+            self._subor = None
+        if self._zapisovac_parquet is not None:
+            self._zapis_skupinu()
+            self._zapisovac_parquet.close()
+            self._zapisovac_parquet = None
+        elif self.format == "parquet" and not os.path.exists(self.cesta):
+            # Prázdny výsledok: súbor len so schémou
+            pq.write_table(pa.table({nazov: pa.array([], pa.string()) for nazov in self.stlpce}), self.cesta)
+
+    def __enter__(self) -> "ZapisovacVysledku":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.zatvor()
+
+
+def zapis_davky_do_suboru(
+    davky: Iterable[Dict[str, Any]], adresar: str, format_suboru: str = "csv", suhrn: Optional[SuhrnVysledku] = None
+) -> Dict[str, Any]:
+    """
+    Postupne zapíše dávky z `vykonaj_dotaz_po_davkach` do nového súboru v `adresar`
+    (a ak je zadaný `suhrn`, započíta ich doň).
+    Vráti `cesta`, `nazov`, `pocet_riadkov`, `orezane` a pri chybe `error` (rozpracovaný súbor sa zmaže).
+    Volá sa mimo event loopu (blokujúce čítanie z DB aj zápis na disk).
+    """
+    format_suboru = dostupny_format(format_suboru)
+    os.makedirs(adresar, exist_ok=True)
+    nazov = f"vysledok_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.{format_suboru}"
+    cesta = os.path.join(adresar, nazov)
+
+    zaciatok = time.perf_counter()
+    zapisovac_vysledku: Optional[ZapisovacVysledku] = None
+    orezane = False
+    try:
+        for davka in davky:
+            if "error" in davka:
+                raise RuntimeError(davka["error"])
+            if zapisovac_vysledku is None:
+                zapisovac_vysledku = ZapisovacVysledku(cesta, davka["columns"], format_suboru)
+            zapisovac_vysledku.zapis(davka["rows"])
+            if suhrn is not None:
+                suhrn.pridaj(davka["rows"])
+            orezane = davka["orezane"]
+        if zapisovac_vysledku is None:
+            raise RuntimeError("Dotaz nevrátil žiadne dávky")
+        zapisovac_vysledku.zatvor()
+    except Exception as e:
+        if zapisovac_vysledku is not None:
+            zapisovac_vysledku.zatvor()
+        if os.path.exists(cesta):
+            os.remove(cesta)
+        zapisovac.error(f"❌ Zápis výsledku do súboru zlyhal: {e}")
+        return {"error": str(e)}
+
+    zapisovac.info(
+        f"💾 Výsledok ({zapisovac_vysledku.pocet_riadkov} riadkov) zapísaný do {cesta} "
+        f"za {1000 * (time.perf_counter() - zaciatok):.0f} ms ({os.path.getsize(cesta) / 1024:.0f} kB)"
+    )
+    return {"cesta": cesta, "nazov": nazov, "pocet_riadkov": zapisovac_vysledku.pocet_riadkov, "orezane": orezane}
+
+
+def nacitaj_riadky_zo_suboru(cesta: str, od: int, pocet: int) -> StlpcovyVysledok:
+    """Načíta riadky [od:od+pocet] zo súboru s výsledkom (CSV hodnoty ako text) bez načítania celého súboru."""
+    if cesta.endswith(".parquet"):
+        subor = pq.ParquetFile(cesta)
+        vysledok = StlpcovyVysledok(subor.schema_arrow.names)
+        preskocit = od
+        for davka in subor.iter_batches(batch_size=RIADKOV_SKUPINY_PARQUET):
+            if preskocit >= davka.num_rows:
+                preskocit -= davka.num_rows
+                continue
+            cast = davka.slice(preskocit, pocet - len(vysledok)).to_pydict()
+            vysledok.pridaj(StlpcovyVysledok(vysledok.stlpce, [cast[nazov] for nazov in vysledok.stlpce]))
+            preskocit = 0
+            if len(vysledok) >= pocet:
+                break
+        return vysledok
+    with open(cesta, newline="", encoding="utf-8-sig") as subor:
+        citac = csv.reader(subor)
+        stlpce = next(citac)
+        return StlpcovyVysledok.z_riadkov(stlpce, itertools.islice(citac, od, od + pocet))
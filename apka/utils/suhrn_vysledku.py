@@ -0,0 +1,186 @@
+"""Kompaktný súhrn výsledku dotazu pre hlasový model (štatistiky stĺpcov namiesto všetkých riadkov)."""
+
+import heapq
+import numbers
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok, np
+
+# Počet najčastejších hodnôt / najvyšších riadkov v súhrne
+SUHRN_TOP_K = int(os.getenv("SUHRN_TOP_K", "5"))
+# Počet prvých riadkov priložených k súhrnu (menší výsledok dostane model celý)
+SUHRN_UKAZKA_RIADKOV = int(os.getenv("SUHRN_UKAZKA_RIADKOV", "5"))
+# Nad týmto počtom rôznych hodnôt stĺpca sa ďalšie hodnoty prestanú sledovať (ochrana pamäte)
+MAX_SLEDOVANYCH_HODNOT = 100_000
+
+
+def _zaokruhli(hodnota: Optional[float]) -> Optional[float]:
+    if hodnota is None:
+        return None
+    if float(hodnota).is_integer():
+        return int(hodnota)
+    return round(float(hodnota), 4 if abs(hodnota) < 1 else 2)
+
+
+class _SuhrnStlpca:
+    """Priebežné štatistiky jedného stĺpca (po dávkach)."""
+
+    __slots__ = ("ciselny", "pocet", "prazdne", "sucet", "minimum", "maximum", "hodnoty", "pretecene", "najvyssie")
+
+    def __init__(self):
+        self.ciselny: Optional[bool] = None  # None, kým stĺpec nemá nenulovú hodnotu
+        self.pocet = 0
+        self.prazdne = 0
+        self.sucet = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.hodnoty: Counter = Counter()
+        self.pretecene = False
+        self.najvyssie: List[tuple] = []  # halda (hodnota, poradie, popis) pre top-k
+
+    def urci_typ(self, hodnoty: list) -> None:
+        """Určí typ stĺpca podľa prvej dávky s nenulovými hodnotami (aj `Decimal` z NUMERIC/SUM/AVG je číslo)."""
+        if self.ciselny is None:
+            nenulove = [hodnota for hodnota in hodnoty if hodnota is not None]
+            if nenulove:
+                self.ciselny = all(isinstance(h, numbers.Number) and not isinstance(h, bool) for h in nenulove)
+
+    def pridaj(self, hodnoty: list, popisy: Optional[list], posun: int, top_k: int) -> None:
+        if self.ciselny:
+            try:
+                self._pridaj_cisla(hodnoty, popisy, posun, top_k)
+            except (TypeError, ValueError):
+                # Stĺpec s nečíselnými hodnotami v neskoršej dávke: ďalej len ako text
+                self.ciselny = False
+                self.najvyssie = []
+        if not self.ciselny:
+            self.prazdne += sum(hodnota is None for hodnota in hodnoty)
+            self.pocet += len(hodnoty)
+        if not self.pretecene:
+            self.hodnoty.update(hodnoty)
+            if len(self.hodnoty) > MAX_SLEDOVANYCH_HODNOT:
+                self.pretecene = True
+
+    def _pridaj_cisla(self, hodnoty: list, popisy: Optional[list], posun: int, top_k: int) -> None:
+        if np is not None:
+            pole = np.array(hodnoty, dtype=float)  # None -> NaN
+            platne = ~np.isnan(pole)
+            pocet_platnych = int(platne.sum())
+            if pocet_platnych:
+                sucet, minimum, maximum = float(np.nansum(pole)), float(np.nanmin(pole)), float(np.nanmax(pole))
+                # Kandidáti na top-k z dávky bez triedenia celej dávky
+                k = min(top_k, pocet_platnych)
+                vyplnene = np.where(platne, pole, -np.inf)
+                indexy = np.argpartition(vyplnene, -k)[-k:] if k else []
+                kandidati = [(float(pole[i]), int(i)) for i in indexy]
+        else:
+            platne_hodnoty = [(float(h), i) for i, h in enumerate(hodnoty) if h is not None]
+            pocet_platnych = len(platne_hodnoty)
+            if pocet_platnych:
+                cisla = [hodnota for hodnota, _ in platne_hodnoty]
+                sucet, minimum, maximum = sum(cisla), min(cisla), max(cisla)
+                kandidati = heapq.nlargest(top_k, platne_hodnoty)
+        self.pocet += len(hodnoty)
+        self.prazdne += len(hodnoty) - pocet_platnych
+        if not pocet_platnych:
+            return
+        self.sucet += sucet
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+        for hodnota, index in kandidati:
+            polozka = (hodnota, -(posun + index), popisy[index] if popisy is not None else None)
+            if len(self.najvyssie) < top_k:
+                heapq.heappush(self.najvyssie, polozka)
+            elif polozka > self.najvyssie[0]:
+                heapq.heapreplace(self.najvyssie, polozka)
+
+    def vysledok(self, nazov: str, stlpec_popisu: Optional[str], top_k: int) -> Dict[str, Any]:
+        rozne = len(self.hodnoty) - (1 if None in self.hodnoty else 0)
+        suhrn: Dict[str, Any] = {
+            "typ": "cislo" if self.ciselny else "text",
+            "prazdne": self.prazdne,
+            "rozne": f"viac ako {MAX_SLEDOVANYCH_HODNOT}" if self.pretecene else rozne,
+        }
+        platne = self.pocet - self.prazdne
+        if self.ciselny and platne:
+            suhrn.update(
+                sucet=_zaokruhli(self.sucet),
+                minimum=_zaokruhli(self.minimum),
+                maximum=_zaokruhli(self.maximum),
+                priemer=_zaokruhli(self.sucet / platne),
+            )
+            if stlpec_popisu:
+                suhrn["najvyssie"] = [
+                    {stlpec_popisu: popis, nazov: _zaokruhli(hodnota)}
+                    for hodnota, _, popis in sorted(self.najvyssie, reverse=True)
+                ]
+        elif not self.ciselny and not self.pretecene:
+            najcastejsie = [
+                [hodnota, pocet] for hodnota, pocet in self.hodnoty.most_common(top_k + 1) if hodnota is not None
+            ][:top_k]
+            # Pri samých jedinečných hodnotách (napr. mená) nemajú početnosti výpovednú hodnotu
+            if najcastejsie and najcastejsie[0][1] > 1:
+                suhrn["najcastejsie"] = najcastejsie
+        return suhrn
+
+
+class SuhrnVysledku:
+    """
+    Súhrn výsledku dotazu počítaný po dávkach (aj pri streamovanom zápise do súboru):
+    počet riadkov, pre číselné stĺpce súčet/min/max/priemer a najvyššie hodnoty s popisom
+    (prvý textový stĺpec), pre textové počet rôznych a najčastejšie hodnoty. Číselné štatistiky
+    sa počítajú vektorovo cez NumPy, ak je k dispozícii.
+    """
+
+    def __init__(self, top_k: int = SUHRN_TOP_K, ukazka_riadkov: int = SUHRN_UKAZKA_RIADKOV):
+        self.top_k = top_k
+        self.ukazka_riadkov = ukazka_riadkov
+        self.stlpce: List[str] = []
+        self.pocet_riadkov = 0
+        self._stlpce: List[_SuhrnStlpca] = []
+        self._ukazka: Optional[StlpcovyVysledok] = None
+
+    def pridaj(self, davka: StlpcovyVysledok) -> None:
+        """Započíta ďalšiu dávku riadkov."""
+        if self._ukazka is None:
+            self.stlpce = list(davka.stlpce)
+            self._stlpce = [_SuhrnStlpca() for _ in self.stlpce]
+            self._ukazka = StlpcovyVysledok(self.stlpce)
+        if len(self._ukazka) < self.ukazka_riadkov:
+            self._ukazka.pridaj(davka.vyrez(0, self.ukazka_riadkov - len(self._ukazka)))
+        for stlpec, hodnoty in zip(self._stlpce, davka.data):
+            stlpec.urci_typ(hodnoty)
+        index_popisu = self._index_popisu()
+        popisy = davka.data[index_popisu] if index_popisu is not None else None
+        for stlpec, hodnoty in zip(self._stlpce, davka.data):
+            stlpec.pridaj(hodnoty, popisy, self.pocet_riadkov, self.top_k)
+        self.pocet_riadkov += len(davka)
+
+    def _index_popisu(self) -> Optional[int]:
+        """Index prvého stĺpca, ktorý nie je číselný (popis riadku pre najvyššie hodnoty)."""
+        for index, stlpec in enumerate(self._stlpce):
+            if stlpec.ciselny is False:
+                return index
+        return None
+
+    def vysledok(self) -> Dict[str, Any]:
+        """Vráti súhrn ako slovník pripravený na JSON."""
+        index_popisu = self._index_popisu()
+        stlpec_popisu = self.stlpce[index_popisu] if index_popisu is not None else None
+        return {
+            "pocet_riadkov": self.pocet_riadkov,
+            "stlpce": {
+                nazov: stlpec.vysledok(nazov, stlpec_popisu, self.top_k)
+                for nazov, stlpec in zip(self.stlpce, self._stlpce)
+            },
+            "prve_riadky": [list(riadok) for riadok in self._ukazka.riadky()] if self._ukazka is not None else [],
+        }
+
+
+def zhrn_vysledok(vysledok: StlpcovyVysledok, top_k: int = SUHRN_TOP_K) -> Dict[str, Any]:
+    """Súhrn celého výsledku v pamäti."""
+    suhrn = SuhrnVysledku(top_k)
+    suhrn.pridaj(vysledok)
+    return suhrn.vysledok()
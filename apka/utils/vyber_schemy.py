@@ -0,0 +1,161 @@
+"""Výber relevantných tabuliek schémy pre otázku (zmenšenie promptu pri veľkých databázach)."""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from apka.utils.normalizacia_textu import kanonicke_tokeny, trigramy
+from apka.utils.schema_helper import (
+    cudzie_kluce,
+    formatuj_popis_schemy,
+    formatuj_priklady,
+    formatuj_tabulku,
+)
+
+# Váha BM25 skóre voči trigramovej (vektorovej) podobnosti
+VAHA_BM25 = 0.7
+# Tabuľky so skóre pod týmto podielom skóre najlepšej tabuľky sa nepovažujú za relevantné
+MIN_RELATIVNE_SKORE = 0.4
+
+
+def odhadni_tokeny(text: str) -> int:
+    """Hrubý odhad počtu tokenov (≈ 4 znaky na token)."""
+    return len(text) // 4 + 1
+
+
+def _kosinus(a: Counter, b: Counter) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    sucin = sum(hodnota * b.get(kluc, 0) for kluc, hodnota in a.items())
+    if not sucin:
+        return 0.0
+    return sucin / (math.sqrt(sum(h * h for h in a.values())) * math.sqrt(sum(h * h for h in b.values())))
+
+
+class IndexSchemy:
+    """Lokálny kľúčovo-slovný (BM25) a trigramový index nad popismi tabuliek a stĺpcov."""
+
+    def __init__(self, tabulky: Dict[str, dict], priklady: Optional[List[dict]] = None, k1: float = 1.2, b: float = 0.75):
+        self.tabulky = tabulky
+        self.priklady = priklady or []
+        self._k1, self._b = k1, b
+
+        self._tokeny: Dict[str, Counter] = {}
+        self._vektory: Dict[str, Counter] = {}
+        # Tabuľky, na ktoré daná tabuľka odkazuje cudzím kľúčom (potrebné pre JOIN)
+        self.odkazy: Dict[str, Set[str]] = {nazov: set() for nazov in tabulky}
+        for nazov, info in tabulky.items():
+            casti = [nazov, info.get("description", "")]
+            for stlpec in info.get("columns", []):
+                casti += [stlpec.get("name", ""), stlpec.get("description", "")]
+            tokeny = kanonicke_tokeny(" ".join(casti))
+            # Názov tabuľky je najsilnejší signál, započítame ho viackrát
+            tokeny += kanonicke_tokeny(nazov) * 2
+            self._tokeny[nazov] = Counter(tokeny)
+            self._vektory[nazov] = trigramy(" ".join(tokeny))
+            self.odkazy[nazov] = {ciel for ciel in cudzie_kluce(info) if ciel in tabulky}
+
+        self._priemerna_dlzka = sum(sum(t.values()) for t in self._tokeny.values()) / max(len(self._tokeny), 1)
+        pocet_dokumentov = len(self._tokeny)
+        vyskyty = Counter(token for tokeny in self._tokeny.values() for token in tokeny)
+        self._idf = {
+            token: math.log(1 + (pocet_dokumentov - n + 0.5) / (n + 0.5)) for token, n in vyskyty.items()
+        }
+
+    def skore(self, otazka: str) -> List[Tuple[str, float]]:
+        """Vráti tabuľky zoradené podľa relevancie k otázke (len s kladným skóre)."""
+        tokeny = kanonicke_tokeny(otazka)
+        vektor_otazky = trigramy(" ".join(tokeny))
+
+        bm25 = {}
+        for nazov, tokeny_tabulky in self._tokeny.items():
+            dlzka = sum(tokeny_tabulky.values())
+            hodnota = 0.0
+            for token in set(tokeny):
+                tf = tokeny_tabulky.get(token, 0)
+                if tf:
+                    hodnota += self._idf[token] * tf * (self._k1 + 1) / (
+                        tf + self._k1 * (1 - self._b + self._b * dlzka / self._priemerna_dlzka)
+                    )
+            bm25[nazov] = hodnota
+
+        max_bm25 = max(bm25.values(), default=0.0) or 1.0
+        vysledok = []
+        for nazov in self.tabulky:
+            kombinovane = VAHA_BM25 * bm25[nazov] / max_bm25 + (1 - VAHA_BM25) * _kosinus(vektor_otazky, self._vektory[nazov])
+            if bm25[nazov] > 0:
+                vysledok.append((nazov, kombinovane))
+        return sorted(vysledok, key=lambda polozka: polozka[1], reverse=True)
+
+    def vyber_tabulky(self, otazka: str, rozpocet_tokenov: int) -> List[str]:
+        """Vyberie relevantné tabuľky a ich FK susedov tak, aby sa zmestili do rozpočtu tokenov."""
+        vybrane: List[str] = []
+        minute = 0
+
+        def pridaj(nazov: str) -> bool:
+            nonlocal minute
+            if nazov in vybrane:
+                return True
+            cena = odhadni_tokeny(formatuj_tabulku(nazov, self.tabulky[nazov]))
+            if minute + cena > rozpocet_tokenov and vybrane:
+                return False
+            vybrane.append(nazov)
+            minute += cena
+            return True
+
+        skore = self.skore(otazka)
+        if not skore:
+            return vybrane
+        prah = skore[0][1] * MIN_RELATIVNE_SKORE
+        for nazov, hodnota in skore:
+            if hodnota < prah or not pridaj(nazov):
+                break
+        # Tabuľky, na ktoré vybrané tabuľky odkazujú cudzím kľúčom, aby LLM poznal stĺpce pre JOIN
+        for nazov in list(vybrane):
+            for sused in sorted(self.odkazy[nazov]):
+                pridaj(sused)
+        return vybrane
+
+    def popis_pre_otazku(self, otazka: str, rozpocet_tokenov: int, s_prikladmi: bool = True) -> str:
+        """Vráti naformátovaný popis len relevantných tabuliek (pri žiadnej zhode celú schému)."""
+        vybrane = self.vyber_tabulky(otazka, rozpocet_tokenov)
+        if not vybrane:
+            return formatuj_popis_schemy(self.tabulky, self.priklady if s_prikladmi else None)
+
+        popis = formatuj_popis_schemy({nazov: self.tabulky[nazov] for nazov in vybrane})
+        if s_prikladmi:
+            # Príklady pridáme len ak pracujú s vybranými tabuľkami a zmestia sa do rozpočtu
+            zvysok = rozpocet_tokenov - odhadni_tokeny(popis)
+            vhodne = []
+            for priklad in self.priklady:
+                if not any(re.search(rf"\b{nazov}\b", priklad["sql"]) for nazov in set(self.tabulky) - set(vybrane)):
+                    cena = odhadni_tokeny(formatuj_priklady([priklad]))
+                    if cena <= zvysok:
+                        vhodne.append(priklad)
+                        zvysok -= cena
+            if vhodne:
+                popis += formatuj_priklady(vhodne)
+        return popis
+
+
+# Rozpočet a zapnutie výberu sú konfigurovateľné cez premenné prostredia
+ROZPOCET_TOKENOV_SCHEMY = int(os.getenv("SCHEMA_ROZPOCET_TOKENOV", "800"))
+VYBER_SCHEMY_ZAPNUTY = os.getenv("SCHEMA_VYBER_TABULIEK", "1") == "1"
+
+
+def vytvor_index(data_schemy: Optional[dict]) -> Optional[IndexSchemy]:
+    """Index nad dátami schémy (None, ak schéma nie je dostupná)."""
+    if not data_schemy or not data_schemy.get("tables"):
+        return None
+    return IndexSchemy(data_schemy["tables"], data_schemy.get("example_queries"))
+
+
+def vyber_popis_schemy(
+    index: Optional[IndexSchemy], otazka: str, rozpocet_tokenov: Optional[int] = None, s_prikladmi: bool = True
+) -> Optional[str]:
+    """Vráti popis schémy zúžený na otázku, alebo None, ak je výber vypnutý/nedostupný."""
+    if not VYBER_SCHEMY_ZAPNUTY or index is None:
+        return None
+    return index.popis_pre_otazku(otazka, rozpocet_tokenov or ROZPOCET_TOKENOV_SCHEMY, s_prikladmi)
@@ -1,61 +1,281 @@
 """Konfigurácia a inicializácia AI modelov."""
 
+import copy
+import json
 import os
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
 import yaml
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
 from langchain_groq import ChatGroq
+from apka.utils.metriky_llm import MetrikyCallback, metriky_llm
+from apka.utils.nahravanie_http import nahravac_http
+from apka.utils.planovac_llm import planovac_llm
 from apka.widgets.spolocne import zapisovac
 
+# Cesta ku konfiguračnému súboru, relatívne k tomuto súboru
+CESTA_KONFIGURACIE = os.path.join(os.path.dirname(__file__), "../settings/definicia_modelov.yaml")
+NUDZOVA_KONFIGURACIA = {"default": {"name": "llama-3.1-70b-versatile", "temperature": 0.1, "max_retries": 2}}
+# Volania LLM idú cez spoločný plánovač (rozpočty RPM/TPM, priority, odmietnutie pri preťažení)
+PLANOVAC_POVOLENY = os.getenv("LLM_PLANOVAC", "1") == "1"
+# Odhad tokenov odpovede, kým nie je známa skutočná spotreba
+ODHAD_TOKENOV_ODPOVEDE = 512
 
-def nacitaj_konfiguraciu_modelov():
-    """Načíta konfiguráciu AI modelov z YAML súboru."""
-    # Cesta ku konfiguračnému súboru, relatívne k tomuto súboru
-    config_path = os.path.join(os.path.dirname(__file__), "../settings/definicia_modelov.yaml")
-    try:
-        with open(config_path, "r", encoding='utf-8') as f:
-            return yaml.safe_load(f)["models"]
-    except FileNotFoundError:
-        zapisovac.error(f"❌ Konfiguračný súbor modelov nebol nájdený: {config_path}")
-        return {"default": {"name": "llama-3.1-70b-versatile", "temperature": 0.1, "max_retries": 2}} # Fallback
-    except Exception as e:
-        zapisovac.error(f"❌ Chyba pri načítaní konfigurácie modelov: {str(e)}")
-        return {"default": {"name": "llama-3.1-70b-versatile", "temperature": 0.1, "max_retries": 2}}
 
+class PlanovanyChatGroq(ChatGroq):
+    """
+    ChatGroq, ktorého volania prechádzajú spoločným plánovačom `planovac_llm`. Opakovania po chybách
+    riadi plánovač (odpoveď 429 pozastaví všetky relácie naraz), klient Groq sám neopakuje.
+    """
 
-def ziskaj_llm(uloha: str = "default") -> ChatGroq:
-    """Vráti nakonfigurovanú inštanciu LLM pre špecifikovanú úlohu."""
-    try:
-        konfiguracia = nacitaj_konfiguraciu_modelov()
-        predvolena_konfiguracia = konfiguracia.get("default", {})
-        konfiguracia_ulohy = konfiguracia.get(uloha, {})
-
-        # Zlúčenie predvolenej konfigurácie s konfiguráciou špecifickou pre úlohu
-        konfiguracia_modelu = {**predvolena_konfiguracia, **konfiguracia_ulohy}
-
-        if not konfiguracia_modelu:
-             zapisovac.warning(f"⚠️ Nebola nájdená konfigurácia pre úlohu '{uloha}' ani predvolená konfigurácia. Používa sa núdzová konfigurácia.")
-             # Núdzová konfigurácia, ak zlyhá načítanie aj predvolenej
-             return ChatGroq(
-                 model="llama-3.1-70b-versatile", # Alebo iný spoľahlivý model
-                 api_key=os.environ.get("GROQ_API_KEY"),
-                 temperature=0.1,
-                 max_retries=2,
-             )
-
-        return ChatGroq(
-            model=konfiguracia_modelu["name"],
-            api_key=os.environ.get("GROQ_API_KEY"),
-            temperature=konfiguracia_modelu["temperature"],
-            max_retries=konfiguracia_modelu["max_retries"],
+    uloha: str = "default"
+    priorita: int = 1
+    max_cakanie_s: float = 30.0
+    max_pokusov: int = 2
+
+    def _odhad_tokenov(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> int:
+        znaky = sum(len(str(sprava.content)) for sprava in messages) + len(json.dumps(kwargs.get("tools", []), default=str))
+        return znaky // 4 + (self.max_tokens or ODHAD_TOKENOV_ODPOVEDE)
+
+    def _planovanie(self, odhad_tokenov: int) -> Dict[str, Any]:
+        return dict(
+            uloha=self.uloha, priorita=self.priorita, odhad_tokenov=odhad_tokenov,
+            max_cakanie_s=self.max_cakanie_s, max_pokusov=self.max_pokusov,
         )
-    except Exception as e:
-        zapisovac.error(f"❌ Chyba pri inicializácii LLM pre úlohu '{uloha}': {str(e)}")
-        # Núdzová konfigurácia pri akejkoľvek chybe
-        return ChatGroq(
-            model="llama-3.1-70b-versatile",
-            api_key=os.environ.get("GROQ_API_KEY"),
-            temperature=0.1,
-            max_retries=2,
+
+    @staticmethod
+    def _pouzite_tokeny(vysledok: ChatResult) -> Optional[int]:
+        return ((vysledok.llm_output or {}).get("token_usage") or {}).get("total_tokens")
+
+    @staticmethod
+    def _dopln_meranie(vysledok: ChatResult, pokusy: List[float]) -> ChatResult:
+        """Do výstupu pridá počet opakovaní a trvanie posledného volania API (pre metriky)."""
+        vysledok.llm_output = {
+            **(vysledok.llm_output or {}),
+            "opakovania": len(pokusy) - 1,
+            "trvanie_volania_s": time.perf_counter() - pokusy[-1],
+        }
+        return vysledok
+
+    def _combine_llm_outputs(self, llm_outputs: List[Optional[dict]]) -> dict:
+        spojene = super()._combine_llm_outputs(llm_outputs)
+        vystupy = [vystup for vystup in llm_outputs if vystup and "trvanie_volania_s" in vystup]
+        if vystupy:
+            spojene["opakovania"] = sum(vystup["opakovania"] for vystup in vystupy)
+            spojene["trvanie_volania_s"] = max(vystup["trvanie_volania_s"] for vystup in vystupy)
+        return spojene
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        odhad = self._odhad_tokenov(messages, kwargs)
+        zakladne_volanie = partial(super()._generate, messages, stop=stop, run_manager=run_manager, **kwargs)
+        pokusy: List[float] = []
+
+        def volanie() -> ChatResult:
+            pokusy.append(time.perf_counter())
+            return zakladne_volanie()
+
+        vysledok = planovac_llm.vykonaj_sync(volanie, **self._planovanie(odhad))
+        planovac_llm.uprav_tokeny(odhad, self._pouzite_tokeny(vysledok))
+        return self._dopln_meranie(vysledok, pokusy)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        odhad = self._odhad_tokenov(messages, kwargs)
+        zakladne_volanie = partial(super()._agenerate, messages, stop=stop, run_manager=run_manager, **kwargs)
+        pokusy: List[float] = []
+
+        async def volanie() -> ChatResult:
+            pokusy.append(time.perf_counter())
+            return await zakladne_volanie()
+
+        vysledok = await planovac_llm.vykonaj(volanie, **self._planovanie(odhad))
+        planovac_llm.uprav_tokeny(odhad, self._pouzite_tokeny(vysledok))
+        return self._dopln_meranie(vysledok, pokusy)
+
+
+class RegisterLLM:
+    """
+    Procesový register LLM klientov. Pre každú úlohu (a teplotu) drží jednu nakonfigurovanú inštanciu
+    `ChatGroq`; všetky inštancie zdieľajú HTTP klientov s pool-om keep-alive spojení, takže ďalšie
+    volanie nerobí nový TLS handshake. YAML s definíciou modelov sa znova načíta len pri zmene
+    jeho mtime; klienti úloh, ktorých konfigurácia sa zmenila, sa potom vytvoria nanovo.
+    """
+
+    def __init__(
+        self,
+        cesta_konfiguracie: str = CESTA_KONFIGURACIE,
+        max_spojeni: int = 20,
+        keepalive_s: float = 60.0,
+    ):
+        self._cesta_konfiguracie = cesta_konfiguracie
+        self._limity_http = httpx.Limits(
+            max_connections=max_spojeni, max_keepalive_connections=max_spojeni, keepalive_expiry=keepalive_s
         )
+        self._zamok = threading.Lock()
+        self._konfiguracia: Dict[str, Any] = {}
+        self._mtime: Optional[float] = None
+        self._klienti: Dict[Tuple[str, Optional[float]], Tuple[str, ChatGroq]] = {}
+        self._http_klient: Optional[httpx.Client] = None
+        self._http_klient_async: Optional[httpx.AsyncClient] = None
+        self._statistiky_uloh: Dict[str, Dict[str, float]] = {}
+        self._statistiky = {"nacitania_konfiguracie": 0, "kontroly_konfiguracie": 0}
+
+    # --- Verejné API ---
+
+    def konfiguracia(self) -> Dict[str, Any]:
+        """Vráti sekciu `models` z YAML (znova načítanú len pri zmene mtime súboru)."""
+        with self._zamok:
+            return copy.deepcopy(self._aktualna_konfiguracia())
+
+    def ziskaj(self, uloha: str = "default", teplota: Optional[float] = None) -> ChatGroq:
+        """Vráti zdieľanú inštanciu LLM pre úlohu (voliteľne s inou teplotou)."""
+        with self._zamok:
+            konfiguracia = self._aktualna_konfiguracia()
+            konfiguracia_modelu = {**konfiguracia.get("default", {}), **konfiguracia.get(uloha, {})}
+            odtlacok = json.dumps(konfiguracia_modelu, sort_keys=True, default=str)
+            statistiky = self._statistiky_uloh.setdefault(
+                uloha, {"vytvorene": 0, "znovupouzite": 0, "cas_vytvarania_ms": 0.0}
+            )
+            ulozeny = self._klienti.get((uloha, teplota))
+            if ulozeny is not None and ulozeny[0] == odtlacok:
+                statistiky["znovupouzite"] += 1
+                return ulozeny[1]
+
+            zaciatok = time.perf_counter()
+            llm = self._vytvor(uloha, konfiguracia_modelu, teplota)
+            trvanie_ms = 1000 * (time.perf_counter() - zaciatok)
+            self._klienti[(uloha, teplota)] = (odtlacok, llm)
+            statistiky["vytvorene"] += 1
+            statistiky["cas_vytvarania_ms"] += trvanie_ms
+        zapisovac.info(f"🧠 LLM klient pre úlohu '{uloha}' (teplota {teplota}) vytvorený za {trvanie_ms:.1f} ms")
+        return llm
+
+    def statistiky(self) -> Dict[str, Any]:
+        """Vráti počty načítaní YAML a pre každú úlohu počet vytvorených/znovupoužitých klientov a čas vytvárania."""
+        with self._zamok:
+            ulohy = {}
+            for uloha, statistiky in self._statistiky_uloh.items():
+                spolu = statistiky["vytvorene"] + statistiky["znovupouzite"]
+                ulohy[uloha] = {
+                    **statistiky,
+                    "cas_vytvarania_ms": round(statistiky["cas_vytvarania_ms"], 2),
+                    "miera_znovupouzitia": statistiky["znovupouzite"] / spolu if spolu else 0.0,
+                }
+            return {**self._statistiky, "pocet_klientov": len(self._klienti), "ulohy": ulohy}
+
+    def zatvor(self) -> None:
+        """Zahodí klientov a zatvorí synchrónny HTTP pool (asynchrónny sa uvoľní s event loopom)."""
+        with self._zamok:
+            self._klienti.clear()
+            if self._http_klient is not None:
+                self._http_klient.close()
+            self._http_klient, self._http_klient_async = None, None
+
+    # --- Interné pomocné metódy (volajú sa pod zámkom) ---
+
+    def _aktualna_konfiguracia(self) -> Dict[str, Any]:
+        self._statistiky["kontroly_konfiguracie"] += 1
+        try:
+            mtime = os.stat(self._cesta_konfiguracie).st_mtime
+        except OSError:
+            mtime = None
+        if self._konfiguracia and mtime == self._mtime:
+            return self._konfiguracia
+
+        self._konfiguracia = self._nacitaj()
+        self._mtime = mtime
+        self._statistiky["nacitania_konfiguracie"] += 1
+        if self._statistiky["nacitania_konfiguracie"] > 1:
+            zapisovac.info(f"🔄 Konfigurácia modelov sa zmenila, načítaná znova: {self._cesta_konfiguracie}")
+        return self._konfiguracia
+
+    def _nacitaj(self) -> Dict[str, Any]:
+        try:
+            with open(self._cesta_konfiguracie, "r", encoding='utf-8') as f:
+                return yaml.safe_load(f)["models"]
+        except FileNotFoundError:
+            zapisovac.error(f"❌ Konfiguračný súbor modelov nebol nájdený: {self._cesta_konfiguracie}")
+            return copy.deepcopy(NUDZOVA_KONFIGURACIA)
+        except Exception as e:
+            zapisovac.error(f"❌ Chyba pri načítaní konfigurácie modelov: {str(e)}")
+            return copy.deepcopy(NUDZOVA_KONFIGURACIA)
+
+    def _http_klienti(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        if self._http_klient is None:
+            # Pri HTTP_NAHRAVANIE idú volania Groq cez nahrávač (nahrávanie/prehrávanie bez siete)
+            self._http_klient = nahravac_http.httpx_klient("groq", self._limity_http)
+            self._http_klient_async = nahravac_http.httpx_klient_async("groq", self._limity_http)
+        return self._http_klient, self._http_klient_async
+
+    def _vytvor(self, uloha: str, konfiguracia_modelu: Dict[str, Any], teplota: Optional[float]) -> ChatGroq:
+        http_klient, http_klient_async = self._http_klienti()
+        try:
+            if not konfiguracia_modelu:
+                zapisovac.warning(f"⚠️ Nebola nájdená konfigurácia pre úlohu '{uloha}' ani predvolená konfigurácia. Používa sa núdzová konfigurácia.")
+                konfiguracia_modelu = NUDZOVA_KONFIGURACIA["default"]
+            # Každé volanie sa meria (latencia, TTFT, tokeny, opakovania, náklady) pod názvom úlohy
+            metriky = MetrikyCallback(
+                metriky_llm, uloha, konfiguracia_modelu["name"],
+                cena_vstup_za_milion=konfiguracia_modelu.get("cena_vstup_usd_za_milion", 0.0),
+                cena_vystup_za_milion=konfiguracia_modelu.get("cena_vystup_usd_za_milion", 0.0),
+            )
+            if PLANOVAC_POVOLENY:
+                return PlanovanyChatGroq(
+                    model=konfiguracia_modelu["name"],
+                    api_key=nahravac_http.api_kluc("GROQ_API_KEY"),
+                    temperature=konfiguracia_modelu["temperature"] if teplota is None else teplota,
+                    max_retries=0,
+                    http_client=http_klient,
+                    http_async_client=http_klient_async,
+                    uloha=uloha,
+                    priorita=konfiguracia_modelu.get("priorita", 1),
+                    max_cakanie_s=konfiguracia_modelu.get("max_cakanie_s", 30.0),
+                    max_pokusov=konfiguracia_modelu["max_retries"],
+                    callbacks=[metriky],
+                )
+            return ChatGroq(
+                model=konfiguracia_modelu["name"],
+                api_key=nahravac_http.api_kluc("GROQ_API_KEY"),
+                temperature=konfiguracia_modelu["temperature"] if teplota is None else teplota,
+                max_retries=konfiguracia_modelu["max_retries"],
+                http_client=http_klient,
+                http_async_client=http_klient_async,
+                callbacks=[metriky],
+            )
+        except Exception as e:
+            zapisovac.error(f"❌ Chyba pri inicializácii LLM pre úlohu '{uloha}': {str(e)}")
+            # Núdzová konfigurácia pri akejkoľvek chybe
+            return ChatGroq(
+                model="llama-3.1-70b-versatile",
+                api_key=nahravac_http.api_kluc("GROQ_API_KEY"),
+                temperature=0.1,
+                max_retries=2,
+                http_client=http_klient,
+                http_async_client=http_klient_async,
+                callbacks=[MetrikyCallback(metriky_llm, uloha, "llama-3.1-70b-versatile")],
+            )
+
+
+# Globálny register, konfigurovateľný cez premenné prostredia
+register_llm = RegisterLLM(
+    max_spojeni=int(os.getenv("LLM_HTTP_MAX_SPOJENI", "20")),
+    keepalive_s=float(os.getenv("LLM_HTTP_KEEPALIVE_S", "60")),
+)
+metriky_llm.pripoj_register(register_llm)
+
+
+def nacitaj_konfiguraciu_modelov():
+    """Načíta konfiguráciu AI modelov z YAML súboru (z cache registra, kým sa súbor nezmení)."""
+    return register_llm.konfiguracia()
+
+
+def ziskaj_llm(uloha: str = "default", teplota: Optional[float] = None) -> ChatGroq:
+    """Vráti nakonfigurovanú inštanciu LLM pre špecifikovanú úlohu (voliteľne s inou teplotou)."""
+    return register_llm.ziskaj(uloha, teplota)
 
 
 def ziskaj_konfiguraciu_generovania_obrazkov(uloha: str = "image_generation") -> dict:
@@ -0,0 +1,18 @@
+"""Spoločné nastavenie testov: zástupné API kľúče a súbory globálnych inštancií mimo scratchpadu."""
+
+import os
+import tempfile
+
+# Moduly apky pri importe vytvárajú klientov externých API a globálne inštancie s perzistenciou;
+# testy nesmú potrebovať skutočné kľúče ani zapisovať do scratchpadu
+_docasny_adresar = tempfile.mkdtemp(prefix="testy_apky_")
+for premenna, hodnota in {
+    "GROQ_API_KEY": "test",
+    "TOGETHER_API_KEY": "test",
+    "TAVILY_API_KEY": "test",
+    "DB_ZAHRIATIE_S": "-1",
+    "NL2SQL_CACHE_SUBOR": os.path.join(_docasny_adresar, "nl2sql_cache.json"),
+    "PRIKLADY_SUBOR": os.path.join(_docasny_adresar, "priklady.jsonl"),
+    "HTTP_NAHRAVKY_ADRESAR": os.path.join(_docasny_adresar, "nahravky"),
+}.items():
+    os.environ.setdefault(premenna, hodnota)
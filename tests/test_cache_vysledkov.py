@@ -0,0 +1,70 @@
+"""Testy cache výsledkov dotazov a jej zneplatnenia zápisom."""
+
+import pytest
+
+from apka.settings.databaza import CacheVysledkov, ciel_zapisu, tabulky_v_dotaze
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+
+SPOJENIE_CIARKOU = "SELECT a.priezvisko, k.nazov FROM autori a, knihy k WHERE k.id_autora = a.id"
+
+
+def uloz(cache: CacheVysledkov, dotaz: str) -> None:
+    cache.uloz(dotaz, 0, cache.snimka(dotaz), ["x"], StlpcovyVysledok.z_riadkov(["x"], [(1,)]))
+
+
+@pytest.mark.parametrize("dotaz, tabulky", [
+    (SPOJENIE_CIARKOU, {"autori", "knihy"}),
+    ("UPDATE public.knihy SET nazov = 'a, from b' WHERE id = 1", {"knihy"}),
+    ('SELECT * FROM "kniznica"."autori" AS a JOIN knihy k ON a.id = k.id_autora, vypozicky v', {"autori", "knihy", "vypozicky"}),
+    ("SELECT * FROM (SELECT * FROM knihy, autori) x, vypozicky ORDER BY x.a, x.b", {"knihy", "autori", "vypozicky"}),
+    ("SELECT id FROM knihy WHERE id_autora IN (SELECT id FROM autori, pobocky)", {"knihy", "autori", "pobocky"}),
+    ("INSERT INTO knihy (nazov, rok_vydania) VALUES ('x', 1)", {"knihy"}),
+])
+def test_tabulky_v_dotaze(dotaz, tabulky):
+    assert tabulky_v_dotaze(dotaz) == tabulky
+
+
+def test_ciel_zapisu():
+    assert ciel_zapisu("UPDATE public.knihy SET nazov = 'x'") == "knihy"
+    assert ciel_zapisu("DELETE FROM vypozicky WHERE id = 1") == "vypozicky"
+    assert ciel_zapisu("WITH x AS (SELECT 1) UPDATE knihy SET nazov = 'x'") is None
+
+
+def test_zapis_do_tabulky_zo_spojenia_ciarkou_zneplatni_vysledok():
+    cache = CacheVysledkov()
+    uloz(cache, SPOJENIE_CIARKOU)
+
+    cache.zaznamenaj_zapis("UPDATE knihy SET nazov = 'x' WHERE id = 1")
+
+    assert cache.najdi(SPOJENIE_CIARKOU, 0) is None
+
+
+def test_zapis_s_nazvom_schemy_zneplatni_vysledok():
+    cache = CacheVysledkov()
+    uloz(cache, "SELECT * FROM knihy")
+
+    cache.zaznamenaj_zapis("UPDATE public.knihy SET nazov = 'x' WHERE id = 1")
+
+    assert cache.najdi("SELECT * FROM knihy", 0) is None
+
+
+def test_zapis_do_inej_tabulky_vysledok_ponecha():
+    cache = CacheVysledkov()
+    uloz(cache, SPOJENIE_CIARKOU)
+
+    cache.zaznamenaj_zapis("INSERT INTO vypozicky (id_knihy) VALUES (1)")
+
+    assert cache.najdi(SPOJENIE_CIARKOU, 0) is not None
+
+
+@pytest.mark.parametrize("zapis", [
+    "WITH stare AS (SELECT id FROM vypozicky) DELETE FROM vypozicky WHERE id IN (SELECT id FROM stare)",
+    "CALL prepocitaj_statistiky()",
+])
+def test_neurceny_ciel_zapisu_zneplatni_celu_cache(zapis):
+    cache = CacheVysledkov()
+    uloz(cache, "SELECT * FROM knihy")
+
+    cache.zaznamenaj_zapis(zapis)
+
+    assert cache.najdi("SELECT * FROM knihy", 0) is None
@@ -0,0 +1,42 @@
+"""Testy exportu metrík LLM vrátane registra klientov."""
+
+from apka.utils.metriky_llm import MetrikyLLM
+from apka.widgets.LLM_modely import RegisterLLM, metriky_llm, register_llm
+
+KONFIGURACIA = """
+models:
+  default:
+    name: llama-3.3-70b-versatile
+    temperature: 0.2
+    max_retries: 1
+  sql_generation:
+    temperature: 0.0
+"""
+
+
+def test_prometheus_exportuje_register_klientov(tmp_path):
+    cesta = tmp_path / "definicia_modelov.yaml"
+    cesta.write_text(KONFIGURACIA, encoding="utf-8")
+    register, metriky = RegisterLLM(cesta_konfiguracie=str(cesta)), MetrikyLLM()
+    metriky.pripoj_register(register)
+
+    register.ziskaj("sql_generation")
+    register.ziskaj("sql_generation")
+    register.ziskaj("default")
+
+    export = metriky.prometheus()
+    assert 'llm_klienty_vytvorene_celkom{uloha="sql_generation"} 1' in export
+    assert 'llm_klienty_znovupouzite_celkom{uloha="sql_generation"} 1' in export
+    assert 'llm_klienty_vytvorene_celkom{uloha="default"} 1' in export
+    assert "# TYPE llm_klienty_cas_vytvarania_ms_celkom counter" in export
+    register.zatvor()
+
+
+def test_bez_registra_sa_klienty_neexportuju():
+    assert "llm_klienty_" not in MetrikyLLM().prometheus()
+
+
+def test_globalny_register_je_v_exporte():
+    register_llm.ziskaj("default")
+
+    assert 'llm_klienty_vytvorene_celkom{uloha="default"}' in metriky_llm.prometheus()
@@ -0,0 +1,111 @@
+"""Testy nahrávania a prehrávania HTTP komunikácie bez siete."""
+
+import json
+
+import httpx
+
+from apka.utils.nahravanie_http import NahravacHTTP
+
+URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+def telo(**polia) -> bytes:
+    return json.dumps(polia).encode()
+
+
+def nahraj(adresar, *odpovede, poziadavka=None):
+    nahravac = NahravacHTTP(rezim="nahravaj", adresar=str(adresar))
+    for odpoved in odpovede:
+        nahravac.nahraj("groq", "POST", URL, poziadavka or telo(model="m", prompt="ahoj"),
+                        200, {"content-type": "application/json"}, odpoved, 0.5)
+    return nahravac
+
+
+def test_chybajuca_nahravka_vrati_404(tmp_path):
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+
+    status, hlavicky, odpoved, latencia = nahravac.prehraj("groq", "POST", URL, telo(prompt="ahoj"))
+
+    assert (status, latencia) == (404, 0.0)
+    assert hlavicky["content-type"] == "application/json"
+    assert json.loads(odpoved)["error"]["type"] == "chybajuca_nahravka"
+    assert nahravac.statistiky() == {"rezim": "prehravaj", "nahrane": 0, "prehrane": 0, "chybajuce": 1}
+
+
+def test_httpx_klient_pri_chybajucej_nahravke_nepouzije_siet(tmp_path):
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+
+    with nahravac.httpx_klient("groq") as klient:
+        odpoved = klient.post(URL, json={"prompt": "ahoj"})
+
+    assert odpoved.status_code == 404
+    assert odpoved.json()["error"]["type"] == "chybajuca_nahravka"
+    assert nahravac.statistiky()["chybajuce"] == 1
+
+
+def test_requests_session_pri_chybajucej_nahravke(tmp_path):
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+
+    odpoved = nahravac.requests_session("tavily").post("https://api.tavily.com/search", json={"query": "x"})
+
+    assert odpoved.status_code == 404
+    assert odpoved.json()["error"]["type"] == "chybajuca_nahravka"
+
+
+def test_nahravka_sa_prehra_v_novom_procese(tmp_path):
+    nahraj(tmp_path, b'{"odpoved": 1}')
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path))
+
+    status, _, odpoved, latencia = nahravac.prehraj("groq", "POST", URL, telo(model="m", prompt="ahoj"))
+
+    assert (status, json.loads(odpoved), latencia) == (200, {"odpoved": 1}, 0.5)
+    assert nahravac.statistiky()["prehrane"] == 1
+
+
+def test_opakovane_poziadavky_sa_prehraju_v_nahranom_poradi(tmp_path):
+    nahraj(tmp_path, b"1", b"2")
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+
+    odpovede = [nahravac.prehraj("groq", "POST", URL, telo(model="m", prompt="ahoj"))[2] for _ in range(3)]
+
+    assert odpovede == [b"1", b"2", b"1"]
+
+
+def test_kluc_nezavisi_od_poradia_poli_ani_api_kluca(tmp_path):
+    nahraj(tmp_path, b"ok", poziadavka=telo(model="m", prompt="ahoj", api_key="tajny"))
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+
+    status, _, _, _ = nahravac.prehraj("groq", "POST", URL, json.dumps({"prompt": "ahoj", "model": "m", "api_key": "iny"}).encode())
+
+    assert status == 200
+    assert "tajny" not in "".join(subor.read_text() for subor in tmp_path.rglob("*.json"))
+
+
+def test_ine_telo_je_chybajuca_nahravka(tmp_path):
+    nahraj(tmp_path, b"ok")
+    nahravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+
+    assert nahravac.prehraj("groq", "POST", URL, telo(model="m", prompt="cau"))[0] == 404
+    assert nahravac.prehraj("together", "POST", URL, telo(model="m", prompt="ahoj"))[0] == 404
+
+
+def test_nahravanie_cez_httpx_klienta(tmp_path):
+    nahravac = NahravacHTTP(rezim="nahravaj", adresar=str(tmp_path))
+    klient = nahravac.httpx_klient("groq")
+    # Skutočný transport nahradí lokálna odpoveď, nahrávač ju zaznamená ako zo siete
+    klient._transport._vnutorny = httpx.MockTransport(lambda poziadavka: httpx.Response(200, json={"odpoved": "sieť"}))
+
+    with klient:
+        assert klient.post(URL, json={"prompt": "ahoj"}).json() == {"odpoved": "sieť"}
+
+    prehravac = NahravacHTTP(rezim="prehravaj", adresar=str(tmp_path), latencia_s=0)
+    with prehravac.httpx_klient("groq") as klient:
+        assert klient.post(URL, json={"prompt": "ahoj"}).json() == {"odpoved": "sieť"}
+    assert nahravac.statistiky()["nahrane"] == 1
+
+
+def test_neznamy_rezim_vypne_nahravanie(tmp_path):
+    nahravac = NahravacHTTP(rezim="prehrat", adresar=str(tmp_path))
+
+    assert nahravac.rezim == "vypnute"
+    assert not nahravac.aktivny
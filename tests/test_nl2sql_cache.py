@@ -0,0 +1,176 @@
+"""Testy normalizácie otázok a sémantickej NL2SQL cache."""
+
+import json
+import time
+
+import pytest
+
+from apka.models.sql_models import SQLDotaz
+from apka.utils.nl2sql_cache import SemantickaCacheDotazov, odtlacok_schemy
+from apka.utils.normalizacia_textu import cisla_v_texte, kmen, normalizuj_otazku
+
+ODTLACOK = odtlacok_schemy("autori(id, meno, priezvisko)", "sqlite")
+
+
+def sql(dotaz: str, **parametre) -> SQLDotaz:
+    return SQLDotaz(dotaz=dotaz, parametre=parametre, vysvetlenie="test")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemantickaCacheDotazov(cesta_suboru=str(tmp_path / "cache.json"))
+
+
+# --- Normalizácia ---
+
+def test_normalizacia_ignoruje_diakritiku_interpunkciu_a_synonyma():
+    assert normalizuj_otazku("Koľko kníh napísal Ladislav Mňačko?") == normalizuj_otazku("kolko knih napisal ladislav mnacko")
+    assert normalizuj_otazku("Knihy so zľavou") == normalizuj_otazku("knihy s zlavou")
+
+
+def test_normalizacia_vynecha_stop_slova():
+    assert normalizuj_otazku("Ukáž mi prosím všetky knihy") == normalizuj_otazku("všetky knihy")
+
+
+def test_normalizacia_zachova_smerove_predlozky():
+    assert normalizuj_otazku("knihy vydané do roku 1960") != normalizuj_otazku("knihy vydané od roku 1960")
+
+
+def test_kmen_necha_cisla_a_skrati_koncovku():
+    assert kmen("1960") == "1960"
+    assert kmen("autorov") == "autor"
+
+
+def test_cisla_v_texte():
+    assert cisla_v_texte("Top 10 kníh z roku 1960") == ["10", "1960"]
+
+
+# --- Zásahy a minutia ---
+
+def test_presny_zasah_po_normalizacii(cache):
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+
+    vysledok = cache.najdi("kolko knih napisal ladislav mnacko", ODTLACOK)
+
+    assert vysledok is not None and vysledok.dotaz == "SELECT 1"
+    assert cache.statistiky()["presne_zasahy"] == 1
+
+
+def test_podobny_zasah_pri_inom_poradi_slov(cache):
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+
+    assert cache.najdi("Ladislav Mňačko napísal koľko kníh?", ODTLACOK) is not None
+    assert cache.statistiky()["podobne_zasahy"] == 1
+
+
+def test_podobny_zasah_pri_parafraze_s_autorskym_od(cache):
+    cache.uloz("koľko kníh má Mňačko", ODTLACOK, sql("SELECT 1"))
+
+    vysledok = cache.najdi("počet kníh od Mňačka", ODTLACOK)
+
+    assert vysledok is not None and vysledok.dotaz == "SELECT 1"
+    assert cache.statistiky()["podobne_zasahy"] == 1
+
+
+def test_parafraza_s_inym_autorom_je_minutie(cache):
+    cache.uloz("koľko kníh má Mňačko", ODTLACOK, sql("SELECT 1"))
+
+    assert cache.najdi("počet kníh od Tatarku", ODTLACOK) is None
+
+
+def test_casove_od_nie_je_vyplnove_slovo(cache):
+    cache.uloz("Knihy roku 1960", ODTLACOK, sql("SELECT * FROM knihy WHERE rok_vydania = :rok", rok=1960))
+
+    assert cache.najdi("Knihy od roku 1960", ODTLACOK) is None
+
+
+def test_zmenene_cislo_sa_prenesie_do_parametrov_sablony(cache):
+    cache.uloz("Knihy vydané do roku 1960", ODTLACOK, sql("SELECT * FROM knihy WHERE rok_vydania < :rok", rok=1960))
+
+    vysledok = cache.najdi("Knihy vydané do roku 1975", ODTLACOK)
+
+    assert vysledok is not None
+    assert vysledok.parametre == {"rok": 1975}
+    assert cache.statistiky()["zasahy_sablon"] == 1
+
+
+def test_zmenene_cislo_priamo_v_sql_je_minutie(cache):
+    cache.uloz("Knihy vydané do roku 1960", ODTLACOK, sql("SELECT * FROM knihy WHERE rok_vydania < 1960"))
+
+    assert cache.najdi("Knihy vydané do roku 1975", ODTLACOK) is None
+
+
+def test_ine_meno_je_minutie(cache):
+    cache.uloz("Koľko kníh napísal Peter Novák?", ODTLACOK, sql("SELECT 1"))
+
+    assert cache.najdi("Koľko kníh napísala Petra Nováková?", ODTLACOK) is None
+    assert cache.statistiky()["minutia"] == 1
+
+
+def test_ina_smerova_predlozka_je_minutie(cache):
+    cache.uloz("Knihy vydané do roku 1960", ODTLACOK, sql("SELECT * FROM knihy WHERE rok_vydania < :rok", rok=1960))
+
+    assert cache.najdi("Knihy vydané od roku 1960", ODTLACOK) is None
+
+
+def test_iny_odtlacok_schemy_je_minutie(cache):
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+
+    assert cache.najdi("Koľko kníh napísal Ladislav Mňačko?", odtlacok_schemy("autori(id)", "sqlite")) is None
+    assert cache.najdi("Koľko kníh napísal Ladislav Mňačko?", odtlacok_schemy("autori(id, meno, priezvisko)", "postgresql")) is None
+
+
+def test_expirovana_polozka_je_minutie(tmp_path):
+    cache = SemantickaCacheDotazov(ttl_s=0.01)
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+    time.sleep(0.02)
+
+    assert cache.najdi("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK) is None
+
+
+def test_lru_vyradi_najdlhsie_nepouzitu_polozku():
+    cache = SemantickaCacheDotazov(max_poloziek=2)
+    cache.uloz("Ktoré knihy sú v žánri román?", ODTLACOK, sql("SELECT 1"))
+    cache.uloz("Ktorí autori sú zo Slovenska?", ODTLACOK, sql("SELECT 2"))
+    cache.najdi("Ktoré knihy sú v žánri román?", ODTLACOK)
+    cache.uloz("Aké pobočky má knižnica?", ODTLACOK, sql("SELECT 3"))
+
+    assert cache.najdi("Ktoré knihy sú v žánri román?", ODTLACOK) is not None
+    assert cache.najdi("Ktorí autori sú zo Slovenska?", ODTLACOK) is None
+    assert cache.statistiky()["pocet_poloziek"] == 2
+
+
+def test_cache_sa_nacita_z_disku(tmp_path):
+    cesta = str(tmp_path / "cache.json")
+    cache = SemantickaCacheDotazov(cesta_suboru=cesta)
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+    cache.zapis_na_disk()
+
+    nova = SemantickaCacheDotazov(cesta_suboru=cesta)
+
+    assert nova.najdi("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK).dotaz == "SELECT 1"
+
+
+def test_ulozenie_nezapisuje_na_disk_hned(tmp_path):
+    cesta = tmp_path / "cache.json"
+    cache = SemantickaCacheDotazov(cesta_suboru=str(cesta), oneskorenie_zapisu_s=60)
+
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+    cache.uloz("Ktorí autori sú zo Slovenska?", ODTLACOK, sql("SELECT 2"))
+
+    assert not cesta.exists()
+    cache.zapis_na_disk()
+    assert len(json.loads(cesta.read_text(encoding="utf-8"))) == 2
+
+
+def test_zmeny_sa_zapisu_na_pozadi(tmp_path):
+    cesta = tmp_path / "cache.json"
+    cache = SemantickaCacheDotazov(cesta_suboru=str(cesta), oneskorenie_zapisu_s=0.01)
+
+    cache.uloz("Koľko kníh napísal Ladislav Mňačko?", ODTLACOK, sql("SELECT 1"))
+
+    for _ in range(200):
+        if cesta.exists():
+            break
+        time.sleep(0.01)
+    assert json.loads(cesta.read_text(encoding="utf-8"))[0]["dotaz"] == "SELECT 1"
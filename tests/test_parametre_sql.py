@@ -0,0 +1,123 @@
+"""Testy SQL šablón s parametrami: prenos čísel do parametrov, vloženie literálov a cache príkazov."""
+
+from datetime import date
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from apka.settings.databaza import CachePrikazov, normalizuj_sql, vloz_parametre
+from apka.utils.nl2sql_cache import prenes_parametre
+
+
+# --- prenes_parametre ---
+
+def test_rovnake_cisla_vratia_kopiu_parametrov():
+    polozka = {"cisla": ["1960"], "parametre": {"rok": 1960}}
+
+    parametre = prenes_parametre(polozka, ["1960"])
+
+    assert parametre == {"rok": 1960}
+    assert parametre is not polozka["parametre"]
+
+
+def test_zmenene_cislo_zachova_typ_parametra():
+    assert prenes_parametre({"cisla": ["1960"], "parametre": {"rok": 1960}}, ["1975"]) == {"rok": 1975}
+    assert prenes_parametre({"cisla": ["1960"], "parametre": {"rok": "1960"}}, ["1975"]) == {"rok": "1975"}
+
+
+def test_prenesie_len_zmenene_cisla():
+    polozka = {"cisla": ["10", "2020"], "parametre": {"n": 10, "rok": 2020}}
+
+    assert prenes_parametre(polozka, ["5", "2020"]) == {"n": 5, "rok": 2020}
+
+
+def test_cislo_mimo_parametrov_zneplatni_sablonu():
+    assert prenes_parametre({"cisla": ["1960"], "parametre": {}}, ["1975"]) is None
+    assert prenes_parametre({"cisla": ["1960"], "parametre": None}, ["1975"]) is None
+
+
+def test_iny_pocet_cisel_zneplatni_sablonu():
+    assert prenes_parametre({"cisla": ["1960"], "parametre": {"rok": 1960}}, ["1960", "5"]) is None
+
+
+def test_logicka_hodnota_nie_je_cislo():
+    assert prenes_parametre({"cisla": ["1"], "parametre": {"aktivny": True}}, ["2"]) is None
+
+
+# --- normalizuj_sql / vloz_parametre ---
+
+def test_normalizuj_sql_zachova_literaly():
+    assert normalizuj_sql("  SELECT  *\n FROM t WHERE a = 'x   y' ; ") == "SELECT * FROM t WHERE a = 'x   y'"
+
+
+def test_vloz_parametre_ako_literaly_dialektu():
+    dotaz = "SELECT * FROM t WHERE a = :a AND b = :b"
+
+    assert vloz_parametre(dotaz, {"a": 5, "b": "O'Neil"}, sqlite.dialect()) == "SELECT * FROM t WHERE a = 5 AND b = 'O''Neil'"
+    assert vloz_parametre(dotaz, {"a": 5, "b": "x"}, postgresql.dialect()) == "SELECT * FROM t WHERE a = 5 AND b = 'x'"
+
+
+def test_vloz_parametre_ignoruje_nadbytocne_parametre():
+    assert vloz_parametre("SELECT * FROM t WHERE a = :a", {"a": 5, "x": 1}, sqlite.dialect()) == "SELECT * FROM t WHERE a = 5"
+
+
+def test_vloz_parametre_bez_parametrov_vrati_sablonu():
+    assert vloz_parametre("SELECT * FROM t WHERE a = :a", None, sqlite.dialect()) == "SELECT * FROM t WHERE a = :a"
+
+
+def test_vloz_parametre_s_chybajucim_parametrom_vrati_sablonu():
+    dotaz = "SELECT * FROM t WHERE a = :a AND b = :b"
+
+    assert vloz_parametre(dotaz, {"a": 5}, sqlite.dialect()) == dotaz
+
+
+def test_vloz_parametre_s_nepodporovanym_typom_vrati_sablonu():
+    dotaz = "SELECT * FROM t WHERE a = :a"
+
+    assert vloz_parametre(dotaz, {"a": object()}, sqlite.dialect()) == dotaz
+
+
+def test_vloz_parametre_datum():
+    assert vloz_parametre("SELECT * FROM t WHERE d >= :od", {"od": date(2024, 1, 31)}, sqlite.dialect()) == (
+        "SELECT * FROM t WHERE d >= '2024-01-31'"
+    )
+
+
+# --- CachePrikazov ---
+
+def test_rovnaka_sablona_vrati_rovnaky_prikaz():
+    cache = CachePrikazov()
+
+    prvy = cache.prikaz("SELECT * FROM t WHERE a = :a")
+    druhy = cache.prikaz("SELECT *\n  FROM t WHERE a = :a;")
+
+    assert prvy is druhy
+    statistiky = cache.statistiky()
+    assert (statistiky["zasahy"], statistiky["minutia"], statistiky["pocet_sablon"]) == (1, 1, 1)
+    assert statistiky["miera_zasahov"] == 0.5
+
+
+def test_rozne_literaly_su_rozne_sablony():
+    cache = CachePrikazov()
+
+    assert cache.prikaz("SELECT * FROM t WHERE a = 'x  y'") is not cache.prikaz("SELECT * FROM t WHERE a = 'x y'")
+
+
+def test_lru_vyradi_najstarsiu_sablonu():
+    cache = CachePrikazov(max_poloziek=2)
+    prvy = cache.prikaz("SELECT 1")
+    cache.prikaz("SELECT 2")
+    cache.prikaz("SELECT 1")
+    cache.prikaz("SELECT 3")
+
+    assert cache.prikaz("SELECT 1") is prvy
+    assert cache.statistiky()["pocet_sablon"] == 2
+    minutia = cache.statistiky()["minutia"]
+    cache.prikaz("SELECT 2")
+    assert cache.statistiky()["minutia"] == minutia + 1
+
+
+def test_nulova_velkost_vypne_cache():
+    cache = CachePrikazov(max_poloziek=0)
+
+    assert cache.prikaz("SELECT 1") is not cache.prikaz("SELECT 1")
+    assert cache.statistiky()["pocet_sablon"] == 0
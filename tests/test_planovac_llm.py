@@ -0,0 +1,146 @@
+"""Testy plánovača volaní LLM: token bucket, prioritná fronta a rýchle odmietnutie."""
+
+import asyncio
+import time
+
+import groq
+import httpx
+import pytest
+
+from apka.utils.planovac_llm import LLMPretazene, PlanovacLLM
+
+
+def odpoved(hodnota):
+    async def volanie():
+        return hodnota
+    return volanie
+
+
+def chyba_429(retry_after: str) -> groq.RateLimitError:
+    odpoved_api = httpx.Response(
+        429, request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions"), headers={"retry-after": retry_after}
+    )
+    return groq.RateLimitError("rate limit", response=odpoved_api, body=None)
+
+
+async def vycerpaj_tokeny(planovac: PlanovacLLM) -> None:
+    await planovac.vykonaj(odpoved(None), uloha="vycerpanie", odhad_tokenov=planovac.tpm)
+
+
+def test_volanie_v_rozpocte_sa_vykona_hned():
+    planovac = PlanovacLLM(rpm=10, tpm=10_000)
+
+    assert asyncio.run(planovac.vykonaj(odpoved("sql"), uloha="sql", odhad_tokenov=1000)) == "sql"
+
+    statistiky = planovac.statistiky()
+    assert statistiky["ulohy"]["sql"]["vybavene"] == 1
+    assert statistiky["dostupne_poziadavky"] == pytest.approx(9, abs=0.1)
+    assert statistiky["dostupne_tokeny"] == pytest.approx(9000, abs=5)
+
+
+def test_vycerpany_rozpocet_poziadaviek_odmietne_hned():
+    planovac = PlanovacLLM(rpm=1, tpm=0)
+
+    async def scenar():
+        await planovac.vykonaj(odpoved(1))
+        zaciatok = time.monotonic()
+        with pytest.raises(LLMPretazene):
+            await planovac.vykonaj(odpoved(2), max_cakanie_s=1)
+        return time.monotonic() - zaciatok
+
+    assert asyncio.run(scenar()) < 0.5
+    statistiky = planovac.statistiky()["ulohy"]["default"]
+    assert (statistiky["vybavene"], statistiky["odmietnute"]) == (1, 1)
+
+
+def test_volanie_pocka_na_doplnenie_tokenov():
+    # 60 000 tokenov za minútu = 1000 tokenov za sekundu
+    planovac = PlanovacLLM(rpm=0, tpm=60_000)
+
+    async def scenar():
+        await vycerpaj_tokeny(planovac)
+        zaciatok = time.monotonic()
+        await planovac.vykonaj(odpoved(None), uloha="sql", odhad_tokenov=100, max_cakanie_s=2)
+        return time.monotonic() - zaciatok
+
+    assert 0.05 < asyncio.run(scenar()) < 1
+    assert planovac.statistiky()["ulohy"]["sql"]["cakanie_max_ms"] > 50
+
+
+def test_vyssia_priorita_predbehne_skor_zaradene_volanie():
+    planovac = PlanovacLLM(rpm=0, tpm=60_000)
+    poradie = []
+
+    async def zavolaj(uloha: str, priorita: int):
+        async def volanie():
+            poradie.append(uloha)
+        await planovac.vykonaj(volanie, uloha=uloha, priorita=priorita, odhad_tokenov=100, max_cakanie_s=2)
+
+    async def scenar():
+        await vycerpaj_tokeny(planovac)
+        await asyncio.gather(zavolaj("popis", priorita=2), zavolaj("sql", priorita=0))
+
+    asyncio.run(scenar())
+    assert poradie == ["sql", "popis"]
+
+
+def test_plna_fronta_odmietne():
+    planovac = PlanovacLLM(rpm=0, tpm=60_000, max_fronta=1)
+
+    async def scenar():
+        await vycerpaj_tokeny(planovac)
+        return await asyncio.gather(
+            planovac.vykonaj(odpoved("prvy"), odhad_tokenov=100, max_cakanie_s=2),
+            planovac.vykonaj(odpoved("druhy"), odhad_tokenov=100, max_cakanie_s=2),
+            return_exceptions=True,
+        )
+
+    prvy, druhy = asyncio.run(scenar())
+    assert prvy == "prvy"
+    assert isinstance(druhy, LLMPretazene)
+
+
+def test_nadhodnoteny_odhad_vrati_tokeny_do_rozpoctu():
+    planovac = PlanovacLLM(rpm=0, tpm=1000)
+    asyncio.run(planovac.vykonaj(odpoved(None), odhad_tokenov=800))
+
+    planovac.uprav_tokeny(800, 300)
+
+    assert planovac.statistiky()["dostupne_tokeny"] == pytest.approx(700, abs=5)
+
+
+def test_odpoved_429_pozastavi_volania_a_zopakuje_volanie():
+    planovac = PlanovacLLM(rpm=600, tpm=0)
+    pokusy = []
+
+    async def volanie():
+        pokusy.append(time.monotonic())
+        if len(pokusy) == 1:
+            raise chyba_429("0.2")
+        return "ok"
+
+    assert asyncio.run(planovac.vykonaj(volanie, uloha="sql", max_cakanie_s=5)) == "ok"
+    assert pokusy[1] - pokusy[0] >= 0.2
+    statistiky = planovac.statistiky()
+    assert statistiky["obmedzenia_api"] == 1
+    assert statistiky["ulohy"]["sql"]["opakovania"] == 1
+
+
+def test_trvala_chyba_sa_neopakuje():
+    planovac = PlanovacLLM(rpm=10, tpm=0)
+
+    async def volanie():
+        raise ValueError("zlý prompt")
+
+    with pytest.raises(ValueError):
+        asyncio.run(planovac.vykonaj(volanie, uloha="sql"))
+    assert planovac.statistiky()["ulohy"]["sql"]["opakovania"] == 0
+
+
+def test_synchronne_volanie():
+    planovac = PlanovacLLM(rpm=1, tpm=0)
+
+    assert planovac.vykonaj_sync(lambda: "ok", uloha="popis") == "ok"
+    with pytest.raises(LLMPretazene):
+        planovac.vykonaj_sync(lambda: "ok", uloha="popis", max_cakanie_s=1)
+    assert planovac.statistiky()["ulohy"]["popis"]["odmietnute"] == 1
@@ -0,0 +1,157 @@
+"""Testy rýchlej cesty: rozpoznanie zámerov a doplnenie slotov bez volania LLM."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from apka.utils.rychla_cesta import RychlaCesta
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+
+AUTORI = [
+    (1, "Dominik", "Tatarka"),
+    (2, "Margita", "Figuli"),
+    (3, "Pavol Országh", "Hviezdoslav"),
+    (4, "Ján", "Novák"),
+    (5, "Peter", "Novák"),
+]
+
+
+class FalosneSpojenie:
+    """Spojenie, ktoré na dotaz rýchlej cesty vráti slovník autorov a počíta dotazy."""
+
+    def __init__(self, dialekt: str = "sqlite"):
+        self.konfiguracia = SimpleNamespace(dialekt=dialekt)
+        self.pocet_dotazov = 0
+
+    async def vykonaj_dotaz_async(self, dotaz, parametre=None):
+        self.pocet_dotazov += 1
+        return {"rows": StlpcovyVysledok.z_riadkov(["id", "meno", "priezvisko"], AUTORI)}
+
+
+def najdi(rychla_cesta: RychlaCesta, otazka: str, spojenie=None):
+    return asyncio.run(rychla_cesta.najdi(otazka, spojenie or FalosneSpojenie()))
+
+
+@pytest.fixture
+def rychla_cesta():
+    return RychlaCesta()
+
+
+# --- Autor ---
+
+@pytest.mark.parametrize("otazka, id_autora", [
+    ("Koľko kníh má autor Dominik Tatarka?", 1),
+    ("Koľko kníh napísal Tatarka?", 1),
+    ("Koľko kníh má autor Hviezdoslav?", 3),
+    ("Koľko kníh má Ján Novák?", 4),
+])
+def test_pocet_knih_autora(rychla_cesta, otazka, id_autora):
+    sql_dotaz = najdi(rychla_cesta, otazka)
+
+    assert sql_dotaz is not None
+    assert sql_dotaz.parametre == {"id_autora": id_autora}
+    assert ":id_autora" in sql_dotaz.dotaz
+    assert rychla_cesta.statistiky()["zamery"] == {"pocet_knih_autora": 1}
+
+
+def test_knihy_autora_zo_sklonovaneho_mena(rychla_cesta):
+    sql_dotaz = najdi(rychla_cesta, "Aké knihy napísala Margita Figuli?")
+
+    assert sql_dotaz.parametre == {"id_autora": 2}
+    assert sql_dotaz.vysvetlenie == "Knihy autora Margita Figuli zoradené podľa roku vydania"
+
+
+@pytest.mark.parametrize("otazka", ["Koľko kníh má Novák?", "Koľko kníh má autor Neexistujúci?"])
+def test_nejednoznacny_alebo_neznamy_autor_ide_na_llm(rychla_cesta, otazka):
+    assert najdi(rychla_cesta, otazka) is None
+
+
+def test_slovnik_autorov_sa_nacita_raz(rychla_cesta):
+    spojenie = FalosneSpojenie()
+    najdi(rychla_cesta, "Koľko kníh má autor Dominik Tatarka?", spojenie)
+    najdi(rychla_cesta, "Aké knihy napísala Margita Figuli?", spojenie)
+
+    assert spojenie.pocet_dotazov == 1
+
+
+def test_slovnik_autorov_po_vyprsani_ttl_sa_nacita_znova():
+    rychla_cesta, spojenie = RychlaCesta(ttl_slovnika_s=0), FalosneSpojenie()
+    najdi(rychla_cesta, "Koľko kníh má autor Dominik Tatarka?", spojenie)
+    najdi(rychla_cesta, "Koľko kníh má autor Dominik Tatarka?", spojenie)
+
+    assert spojenie.pocet_dotazov == 2
+
+
+# --- Počet riadkov ---
+
+@pytest.mark.parametrize("otazka, zamer, n", [
+    ("Top 5 autorov podľa výpožičiek", "top_autori", 5),
+    ("Ktorých desať kníh je najpožičiavanejších?", "top_knihy", 10),
+    ("Traja najaktívnejší čitatelia", "top_citatelia", 3),
+    ("Najpopulárnejší autori", "top_autori", 5),
+    ("Top 500 autorov", "top_autori", 100),
+])
+def test_top_n(rychla_cesta, otazka, zamer, n):
+    sql_dotaz = najdi(rychla_cesta, otazka)
+
+    assert sql_dotaz.parametre == {"n": n}
+    assert sql_dotaz.dotaz.endswith("LIMIT :n")
+    assert rychla_cesta.statistiky()["zamery"] == {zamer: 1}
+
+
+# --- Obdobie ---
+
+@pytest.mark.parametrize("otazka, dni", [
+    ("Koľko výpožičiek bolo za posledný mesiac?", 30),
+    ("Ukáž výpožičky za posledných 7 dní", 7),
+    ("Výpožičky za posledné dva týždne", 14),
+])
+def test_obdobie_v_sqlite_ako_text(rychla_cesta, otazka, dni):
+    sql_dotaz = najdi(rychla_cesta, otazka)
+
+    od = datetime.fromisoformat(sql_dotaz.parametre["od"])
+    assert abs(od - (datetime.now() - timedelta(days=dni))) < timedelta(seconds=5)
+
+
+def test_obdobie_v_postgresql_ako_datum(rychla_cesta):
+    sql_dotaz = najdi(rychla_cesta, "Koľko výpožičiek bolo za posledný rok?", FalosneSpojenie("postgresql"))
+
+    assert isinstance(sql_dotaz.parametre["od"], datetime)
+
+
+# --- Otázky mimo rýchlej cesty ---
+
+@pytest.mark.parametrize("otazka", [
+    "Top 5 autorov podľa výpožičiek v Bratislave",
+    "Priemerný počet strán kníh podľa žánru",
+    "Porovnaj výpožičky tento a minulý rok podľa pobočiek",
+])
+def test_zlozitejsia_otazka_ide_na_llm(rychla_cesta, otazka):
+    assert najdi(rychla_cesta, otazka) is None
+
+
+def test_vypnuta_rychla_cesta():
+    assert najdi(RychlaCesta(povolena=False), "Top 5 autorov podľa výpožičiek") is None
+
+
+def test_zamer_bez_stlpcov_v_scheme_sa_vypne():
+    tabulky = {
+        "autori": {"columns": [{"name": "id"}, {"name": "meno"}, {"name": "priezvisko"}]},
+        "knihy": {"columns": [{"name": "id"}, {"name": "id_autora"}, {"name": "nazov"}]},
+        "vypozicky": {"columns": [{"name": "id"}, {"name": "id_knihy"}]},
+    }
+    rychla_cesta = RychlaCesta(tabulky=tabulky)
+
+    assert najdi(rychla_cesta, "Top 5 autorov podľa výpožičiek") is not None
+    assert najdi(rychla_cesta, "Koľko výpožičiek bolo za posledný mesiac?") is None
+    assert najdi(rychla_cesta, "Aké knihy napísala Margita Figuli?") is None
+
+
+def test_pokrytie(rychla_cesta):
+    najdi(rychla_cesta, "Top 5 autorov podľa výpožičiek")
+    najdi(rychla_cesta, "Priemerný počet strán kníh podľa žánru")
+
+    statistiky = rychla_cesta.statistiky()
+    assert (statistiky["zasahy"], statistiky["minutia"], statistiky["pokrytie"]) == (1, 1, 0.5)
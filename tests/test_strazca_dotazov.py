@@ -0,0 +1,100 @@
+"""Testy rozhodnutí strážcu nákladov dotazov nad SQLite."""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from apka.utils.strazca_dotazov import StrazcaDotazov, aliasy_tabuliek, pridaj_limit
+
+KARTEZIANSKY_SUCIN = "SELECT * FROM knihy, autori"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as spojenie:
+        spojenie.execute(text("CREATE TABLE autori (id INTEGER PRIMARY KEY, meno TEXT)"))
+        spojenie.execute(text("CREATE TABLE knihy (id INTEGER PRIMARY KEY, id_autora INTEGER, nazov TEXT)"))
+        spojenie.execute(text("CREATE INDEX idx_knihy_autor ON knihy (id_autora)"))
+        spojenie.execute(text("INSERT INTO autori VALUES (:id, :meno)"), [{"id": i, "meno": f"autor {i}"} for i in range(1, 101)])
+        spojenie.execute(
+            text("INSERT INTO knihy VALUES (:id, :id_autora, :nazov)"),
+            [{"id": i, "id_autora": i % 100 + 1, "nazov": f"kniha {i}"} for i in range(1, 2001)],
+        )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def spojenie(engine):
+    with engine.connect() as spojenie:
+        yield spojenie
+
+
+def strazca(politika: str = "potvrdit") -> StrazcaDotazov:
+    return StrazcaDotazov(politika=politika, max_naklady=10_000, max_riadkov=5_000, limit_riadkov=10)
+
+
+def test_vyhladanie_podla_kluca_povoli(spojenie):
+    posudok = strazca().posud(spojenie, "SELECT * FROM autori WHERE id = :id", {"id": 1})
+
+    assert posudok["rozhodnutie"] == "povolit"
+    assert posudok["naklady"] == 1.0
+    assert posudok["odhad_riadkov"] == 1.0
+
+
+def test_spojenie_cez_index_pod_limitom_povoli(spojenie):
+    posudok = strazca().posud(spojenie, "SELECT * FROM knihy k JOIN autori a ON k.id_autora = a.id")
+
+    assert posudok["rozhodnutie"] == "povolit"
+    assert posudok["odhad_riadkov"] == 2000
+
+
+@pytest.mark.parametrize("politika", ["odmietnut", "potvrdit"])
+def test_karteziansky_sucin_nad_limitom(spojenie, politika):
+    posudok = strazca(politika).posud(spojenie, KARTEZIANSKY_SUCIN)
+
+    assert posudok["rozhodnutie"] == politika
+    assert posudok["odhad_riadkov"] == 200_000
+    assert any("karteziánsky súčin" in dovod for dovod in posudok["dovody"])
+    assert "dotaz" not in posudok
+
+
+def test_obmedzit_prida_limit(spojenie):
+    posudok = strazca("obmedzit").posud(spojenie, KARTEZIANSKY_SUCIN + ";")
+
+    assert posudok["rozhodnutie"] == "obmedzit"
+    assert posudok["dotaz"] == pridaj_limit(KARTEZIANSKY_SUCIN, 10)
+    assert len(spojenie.execute(text(posudok["dotaz"])).fetchall()) == 10
+
+
+def test_vypnuty_strazca_nezistuje_plan(spojenie):
+    posudok = strazca("vypnuty").posud(spojenie, KARTEZIANSKY_SUCIN)
+
+    assert posudok == {"rozhodnutie": "povolit", "naklady": None, "odhad_riadkov": None, "dovody": []}
+
+
+def test_chybny_dotaz_povoli_a_zaznamena_chybu(spojenie):
+    strazca_dotazov = strazca()
+
+    assert strazca_dotazov.posud(spojenie, "SELEC x")["rozhodnutie"] == "povolit"
+    assert strazca_dotazov.statistiky()["chyby"] == 1
+
+
+def test_statistiky_rozhodnuti(spojenie):
+    strazca_dotazov = strazca()
+    strazca_dotazov.posud(spojenie, "SELECT * FROM autori WHERE id = :id", {"id": 1})
+    strazca_dotazov.posud(spojenie, KARTEZIANSKY_SUCIN)
+
+    assert strazca_dotazov.statistiky() == {"povolit": 1, "odmietnut": 0, "obmedzit": 0, "potvrdit": 1, "chyby": 0}
+
+
+def test_neznama_politika():
+    with pytest.raises(ValueError):
+        StrazcaDotazov(politika="ignorovat")
+
+
+def test_aliasy_tabuliek():
+    assert aliasy_tabuliek("SELECT * FROM knihy k JOIN autori AS a ON k.id_autora = a.id WHERE a.id = 1") == {
+        "knihy": "knihy", "k": "knihy", "autori": "autori", "a": "autori",
+    }
+    assert aliasy_tabuliek("SELECT * FROM knihy, autori WHERE knihy.id = 1") == {"knihy": "knihy", "autori": "autori"}
@@ -0,0 +1,49 @@
+"""Testy súhrnu výsledku dotazu pre hlasový model."""
+
+from decimal import Decimal
+
+import pytest
+
+from apka.utils import suhrn_vysledku
+from apka.utils.stlpcovy_vysledok import StlpcovyVysledok
+from apka.utils.suhrn_vysledku import SuhrnVysledku, zhrn_vysledok
+
+HODNOTENIA = StlpcovyVysledok.z_riadkov(
+    ["pobocka", "hodnotenie"],
+    [("Petržalka", Decimal("3.10")), ("Ružinov", Decimal("2.90")), ("Nové Mesto", None), ("Staré Mesto", Decimal("3.30"))],
+)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "bez_numpy"])
+def numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(suhrn_vysledku, "np", None)
+
+
+def test_decimal_je_cislo(numpy):
+    stlpec = zhrn_vysledok(HODNOTENIA)["stlpce"]["hodnotenie"]
+
+    assert stlpec["typ"] == "cislo"
+    assert (stlpec["sucet"], stlpec["minimum"], stlpec["maximum"], stlpec["priemer"]) == (9.3, 2.9, 3.3, 3.1)
+    assert stlpec["prazdne"] == 1
+    assert stlpec["najvyssie"][0] == {"pobocka": "Staré Mesto", "hodnotenie": 3.3}
+
+
+def test_cisla_po_davkach(numpy):
+    suhrn = SuhrnVysledku(top_k=2)
+    suhrn.pridaj(StlpcovyVysledok.z_riadkov(["meno", "pocet"], [("a", 1), ("b", 5)]))
+    suhrn.pridaj(StlpcovyVysledok.z_riadkov(["meno", "pocet"], [("c", 3), ("d", 7)]))
+
+    vysledok = suhrn.vysledok()
+
+    assert vysledok["pocet_riadkov"] == 4
+    stlpec = vysledok["stlpce"]["pocet"]
+    assert (stlpec["sucet"], stlpec["priemer"]) == (16, 4)
+    assert [riadok["meno"] for riadok in stlpec["najvyssie"]] == ["d", "b"]
+
+
+def test_logicka_hodnota_nie_je_cislo():
+    stlpec = zhrn_vysledok(StlpcovyVysledok.z_riadkov(["aktivny"], [(True,), (False,), (True,)]))["stlpce"]["aktivny"]
+
+    assert stlpec["typ"] == "text"
+    assert stlpec["najcastejsie"] == [[True, 2], [False, 1]]